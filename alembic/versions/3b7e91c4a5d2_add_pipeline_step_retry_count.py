@@ -0,0 +1,28 @@
+"""add pipeline_step retry_count
+
+Revision ID: 3b7e91c4a5d2
+Revises: 8f3a2c1d9e47
+Create Date: 2026-10-16 11:38:05.902117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b7e91c4a5d2'
+down_revision: Union[str, None] = '8f3a2c1d9e47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Record in-process retries on the pipeline step."""
+    op.add_column('pipeline_step', sa.Column('retry_count', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade() -> None:
+    """Drop the retry counter."""
+    op.drop_column('pipeline_step', 'retry_count')
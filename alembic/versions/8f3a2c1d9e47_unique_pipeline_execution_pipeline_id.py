@@ -0,0 +1,68 @@
+"""unique pipeline_execution pipeline_id
+
+Revision ID: 8f3a2c1d9e47
+Revises: 21ca63bac998
+Create Date: 2026-10-16 09:12:44.318205
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8f3a2c1d9e47'
+down_revision: Union[str, None] = '21ca63bac998'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Make pipeline_id unique so execution tracking can upsert on it."""
+    # Concurrent SELECT-then-INSERT tracking could create several executions for
+    # one pipeline_id. Keep the earliest one, move steps/messages onto it and
+    # fold the counters in before adding the unique index.
+    op.execute("""
+        CREATE TEMPORARY TABLE pipeline_execution_dedupe AS
+        SELECT id, keep_id FROM (
+            SELECT id,
+                   FIRST_VALUE(id) OVER (PARTITION BY pipeline_id ORDER BY started_at, id) AS keep_id
+            FROM pipeline_execution
+        ) ranked
+        WHERE id <> keep_id
+    """)
+    op.execute("""
+        UPDATE pipeline_step SET execution_id = d.keep_id
+        FROM pipeline_execution_dedupe d WHERE pipeline_step.execution_id = d.id
+    """)
+    op.execute("""
+        UPDATE pipeline_message SET execution_id = d.keep_id
+        FROM pipeline_execution_dedupe d WHERE pipeline_message.execution_id = d.id
+    """)
+    op.execute("""
+        UPDATE pipeline_execution SET
+            step_count = pipeline_execution.step_count + totals.step_count,
+            message_count = pipeline_execution.message_count + totals.message_count,
+            error_count = pipeline_execution.error_count + totals.error_count
+        FROM (
+            SELECT d.keep_id,
+                   SUM(e.step_count) AS step_count,
+                   SUM(e.message_count) AS message_count,
+                   SUM(e.error_count) AS error_count
+            FROM pipeline_execution_dedupe d JOIN pipeline_execution e ON e.id = d.id
+            GROUP BY d.keep_id
+        ) totals
+        WHERE pipeline_execution.id = totals.keep_id
+    """)
+    op.execute("DELETE FROM pipeline_execution WHERE id IN (SELECT id FROM pipeline_execution_dedupe)")
+    op.execute("DROP TABLE pipeline_execution_dedupe")
+
+    op.drop_index(op.f('ix_pipeline_execution_pipeline_id'), table_name='pipeline_execution')
+    op.create_index(op.f('ix_pipeline_execution_pipeline_id'), 'pipeline_execution', ['pipeline_id'], unique=True)
+
+
+def downgrade() -> None:
+    """Restore the non-unique pipeline_id index."""
+    op.drop_index(op.f('ix_pipeline_execution_pipeline_id'), table_name='pipeline_execution')
+    op.create_index(op.f('ix_pipeline_execution_pipeline_id'), 'pipeline_execution', ['pipeline_id'], unique=False)
@@ -0,0 +1,46 @@
+"""add processed_message
+
+Revision ID: c4d82e6f1a93
+Revises: 3b7e91c4a5d2
+Create Date: 2026-10-16 14:21:37.510284
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4d82e6f1a93'
+down_revision: Union[str, None] = '3b7e91c4a5d2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Record processed message ids so redelivered messages can be skipped."""
+    op.create_table('processed_message',
+    sa.Column('processor_name', sa.String(length=100), nullable=False),
+    sa.Column('message_id', sa.String(length=36), nullable=False),
+    sa.Column('pipeline_id', sa.String(length=36), nullable=False),
+    sa.Column('tenant_id', sa.String(length=100), nullable=True),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('records_processed', sa.Integer(), nullable=False),
+    sa.Column('output_count', sa.Integer(), nullable=False),
+    sa.Column('processed_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('id', sa.String(length=36), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_processed_message_key', 'processed_message', ['processor_name', 'message_id'], unique=True)
+    op.create_index(op.f('ix_processed_message_expires_at'), 'processed_message', ['expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Drop the processed message table."""
+    op.drop_index(op.f('ix_processed_message_expires_at'), table_name='processed_message')
+    op.drop_index('ix_processed_message_key', table_name='processed_message')
+    op.drop_table('processed_message')
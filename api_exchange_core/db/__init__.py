@@ -27,7 +27,7 @@ from .db_config import (
 )
 from .db_credential_models import ExternalCredential
 from .db_pipeline_definition_models import PipelineDefinition, PipelineStepDefinition
-from .db_pipeline_tracking_models import PipelineExecution, PipelineMessage, PipelineStep
+from .db_pipeline_tracking_models import PipelineExecution, PipelineMessage, PipelineStep, ProcessedMessage
 from .db_tenant_models import Tenant
 
 # Re-export all models for easy access
@@ -53,5 +53,6 @@ __all__ = [
     "PipelineExecution",
     "PipelineStep",
     "PipelineMessage",
+    "ProcessedMessage",
     "Tenant",
 ]
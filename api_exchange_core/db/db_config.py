@@ -2,7 +2,7 @@ import os
 from typing import Any, Optional
 
 from pydantic import BaseModel, ConfigDict
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import Session, declarative_base, scoped_session, sessionmaker
 
 from ..exceptions import BaseError, ErrorCode, ValidationError
@@ -58,6 +58,26 @@ class DatabaseConfig(BaseModel):
         )
 
 
+def _enable_sqlite_savepoints(engine) -> None:
+    """
+    Make SQLAlchemy begin SQLite transactions itself, so savepoints nest inside them.
+
+    pysqlite only begins a transaction before a data-changing statement, so a
+    SAVEPOINT issued first would open the transaction and its RELEASE would
+    commit it. Batch tracking runs each write in a savepoint (Session.begin_nested).
+    Transactions take the write lock up front (BEGIN IMMEDIATE): two deferred
+    transactions that both read and then write would fail with "database is locked".
+    """
+
+    @event.listens_for(engine, "connect")
+    def disable_pysqlite_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def begin_immediate(connection):
+        connection.exec_driver_sql("BEGIN IMMEDIATE")
+
+
 class DatabaseManager:
     """
     Database connection manager that uses a Pydantic DatabaseConfig.
@@ -73,7 +93,9 @@ class DatabaseManager:
         connection_string = self.config.get_connection_string()
         if self.config.db_type.lower() == "sqlite":
             connect_args = {"check_same_thread": False}
-            return create_engine(connection_string, echo=self.config.echo, connect_args=connect_args)
+            engine = create_engine(connection_string, echo=self.config.echo, connect_args=connect_args)
+            _enable_sqlite_savepoints(engine)
+            return engine
         return create_engine(
             connection_string,
             echo=self.config.echo,
@@ -154,6 +176,7 @@ def import_all_models():
         PipelineExecution,
         PipelineMessage,
         PipelineStep,
+        ProcessedMessage,
     )
     from .db_tenant_models import Tenant  # noqa
 
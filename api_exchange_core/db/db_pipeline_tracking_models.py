@@ -17,7 +17,7 @@ class PipelineExecution(Base, UUIDMixin, TimestampMixin):
     __tablename__ = "pipeline_execution"
 
     # Core tracking
-    pipeline_id = Column(String(36), nullable=False, index=True)  # From Message.pipeline_id
+    pipeline_id = Column(String(36), nullable=False, unique=True, index=True)  # From Message.pipeline_id, upsert key
     tenant_id = Column(String(100), nullable=False, index=True)
     correlation_id = Column(String(36), nullable=True, index=True)  # For tracing
 
@@ -76,11 +76,12 @@ class PipelineStep(Base, UUIDMixin, TimestampMixin):
     duration_ms = Column(Integer, nullable=True)
 
     # Execution status
-    status = Column(String(20), nullable=False, default="processing")  # processing, completed, failed
+    status = Column(String(20), nullable=False, default="processing")  # processing, completed, failed, timed_out
 
     # Results
     output_count = Column(Integer, nullable=False, default=0)  # Number of output messages
     output_queues = Column(JSON, nullable=True)  # List of queues messages were sent to
+    retry_count = Column(Integer, nullable=False, default=0)  # In-process retries before the final attempt
 
     # Error information (if failed)
     error_message = Column(String(500), nullable=True)
@@ -131,3 +132,27 @@ class PipelineMessage(Base, UUIDMixin, TimestampMixin):
         Index("ix_pipeline_msg_step", "step_id", "message_type"),
         Index("ix_pipeline_msg_lookup", "tenant_id", "execution_id"),
     )
+
+
+class ProcessedMessage(Base, UUIDMixin, TimestampMixin):
+    """Processed message ids, used to short-circuit redelivered messages."""
+
+    __tablename__ = "processed_message"
+
+    # Dedupe key
+    processor_name = Column(String(100), nullable=False)
+    message_id = Column(String(36), nullable=False)  # Message.message_id
+    pipeline_id = Column(String(36), nullable=False)
+    tenant_id = Column(String(100), nullable=True)
+
+    # Recorded result
+    status = Column(String(20), nullable=False)  # success, partial_success
+    records_processed = Column(Integer, nullable=False, default=0)
+    output_count = Column(Integer, nullable=False, default=0)
+
+    # Retention
+    processed_at = Column(DateTime(timezone=True), nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)  # Redeliveries after this are reprocessed
+
+    # Indexes
+    __table_args__ = (Index("ix_processed_message_key", "processor_name", "message_id", unique=True),)
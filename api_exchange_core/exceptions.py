@@ -260,6 +260,20 @@ class ExternalServiceError(BaseError):
         super().__init__(message, error_code, 502, cause, **context)
 
 
+class ServiceError(BaseError):
+    """Internal framework errors, such as a missing optional dependency."""
+
+    def __init__(
+        self,
+        message: str,
+        error_code: ErrorCode = ErrorCode.INTERNAL_ERROR,
+        cause: Optional[Exception] = None,
+        **context,
+    ):
+        """Initialize service error with an error code."""
+        super().__init__(message, error_code, 500, cause, **context)
+
+
 # Factory functions for common error patterns
 def not_found(resource_type: str, cause: Optional[Exception] = None, **identifiers) -> NotFoundError:
     """
@@ -1,10 +1,23 @@
 """Core processor framework for API Exchange V2."""
 
+from .async_simple_processor_handler import AsyncSimpleProcessorHandler
+from .async_simple_processor_interface import AsyncSimpleProcessorInterface
+from .circuit_breaker import CircuitBreaker, CircuitState
+from .claim_check import BlobStore, ClaimCheck, LocalFileBlobStore
+from .delivery_report import DeliveryReport, DeliveryStatus, MessageDelivery
+from .fused_pipeline_runner import FusedPipelineRunner
+from .idempotency_store import IdempotencyStore
 from .message import Message, MessageType
-from .output_handlers import NoOpOutputHandler, QueueOutputHandler
+from .message_capture import MessageCapturePolicy
+from .message_codec import CodecFormat, MessageCodec, get_message_codec
+from .message_sanitizer import MessageSanitizer
+from .output_handlers import NoOpOutputHandler, QueueOutputHandler, ServiceBusOutputHandler
+from .phase_timing import PhaseTimingHook, PhaseTimingRegistry, ProcessingPhase, get_phase_timing_registry
 from .processing_result import ProcessingResult, ProcessingStatus
+from .retry_policy import RetryPolicy
 from .simple_processor_handler import SimpleProcessorHandler
 from .simple_processor_interface import SimpleProcessorInterface
+from .tracking_writer import OverflowPolicy, PipelineTrackingWriter
 
 __all__ = [
     "Message",
@@ -13,6 +26,31 @@ __all__ = [
     "ProcessingStatus",
     "SimpleProcessorInterface",
     "SimpleProcessorHandler",
+    "AsyncSimpleProcessorInterface",
+    "AsyncSimpleProcessorHandler",
+    "FusedPipelineRunner",
     "NoOpOutputHandler",
     "QueueOutputHandler",
+    "ServiceBusOutputHandler",
+    "PipelineTrackingWriter",
+    "OverflowPolicy",
+    "RetryPolicy",
+    "IdempotencyStore",
+    "CircuitBreaker",
+    "CircuitState",
+    "ClaimCheck",
+    "BlobStore",
+    "LocalFileBlobStore",
+    "DeliveryReport",
+    "DeliveryStatus",
+    "MessageDelivery",
+    "MessageCodec",
+    "CodecFormat",
+    "get_message_codec",
+    "MessageCapturePolicy",
+    "MessageSanitizer",
+    "ProcessingPhase",
+    "PhaseTimingHook",
+    "PhaseTimingRegistry",
+    "get_phase_timing_registry",
 ]
@@ -0,0 +1,309 @@
+"""
+Asynchronous processor handler for the V2 framework.
+
+This module provides the asyncio counterpart of SimpleProcessorHandler. The
+processor coroutine runs on the event loop; blocking tracking and output
+routing calls run in an executor so they do not stall other messages.
+"""
+
+import asyncio
+import time
+from concurrent.futures import Executor
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, TypeVar
+
+from ..utils.logger import BoundLogger
+from .async_simple_processor_interface import AsyncSimpleProcessorInterface
+from .base_processor_handler import BaseProcessorHandler
+from .circuit_breaker import CircuitBreaker
+from .claim_check import ClaimCheck
+from .idempotency_store import IdempotencyStore
+from .message import Message
+from .message_capture import MessageCapturePolicy
+from .output_handlers.base_output_handler import BaseOutputHandler
+from .phase_timing import PhaseTimingHook, ProcessingPhase
+from .processing_result import ProcessingResult
+from .retry_policy import RetryPolicy
+from .tracking_writer import PipelineTrackingWriter
+
+T = TypeVar("T")
+
+
+class AsyncSimpleProcessorHandler(BaseProcessorHandler):
+    """
+    Handler for asynchronous processor execution with pipeline tracking.
+
+    Provides the same tracking, message storage, output routing and logging as
+    SimpleProcessorHandler, for processors whose process() is a coroutine.
+    Many messages can be processed concurrently on one event loop.
+    """
+
+    processor: AsyncSimpleProcessorInterface
+
+    def __init__(
+        self,
+        processor: AsyncSimpleProcessorInterface,
+        enable_pipeline_tracking: bool = True,
+        enable_metrics: bool = True,
+        enable_message_storage: bool = False,
+        message_sanitization_rules: Optional[Dict[str, Any]] = None,
+        tracking_writer: Optional[PipelineTrackingWriter] = None,
+        output_handler: Optional[BaseOutputHandler] = None,
+        executor: Optional[Executor] = None,
+        enforce_processing_timeout: bool = False,
+        processing_timeout: Optional[float] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        message_capture: Optional[MessageCapturePolicy] = None,
+        sanitization_hash_key: Optional[str] = None,
+        execution_cache_size: int = 1024,
+        phase_timing_hooks: Optional[List[PhaseTimingHook]] = None,
+        idempotency_store: Optional[IdempotencyStore] = None,
+        tracking_breaker: Optional[CircuitBreaker] = None,
+        claim_check: Optional[ClaimCheck] = None,
+    ):
+        """
+        Initialize the async processor handler.
+
+        Args:
+            processor: The async processor to handle
+            enable_pipeline_tracking: Whether to track pipeline execution
+            enable_metrics: Whether to time each processing phase and report it to phase_timing_hooks
+            enable_message_storage: Whether to store input/output messages for debugging
+            message_sanitization_rules: Rules for sanitizing sensitive data in messages
+            tracking_writer: Optional write-behind writer; when set, tracking never blocks the event loop
+            output_handler: Optional handler that routes output messages after successful processing
+            executor: Executor for blocking tracking and routing calls (None uses the loop's default)
+            enforce_processing_timeout: Whether processor.process runs under a deadline
+            processing_timeout: Deadline in seconds; when None and enforcement is enabled,
+                ProcessingConfig.processing_timeout is used. Passing a value enables enforcement.
+                Streamed outputs are produced after the deadline check and are not covered.
+            retry_policy: Optional policy for retrying transient failures in-process
+                (see RetryPolicy.from_config); None disables retries. A failure while
+                streaming outputs is not retried, since earlier outputs were already routed.
+            message_capture: Sampling, size cap and failures-only settings for message
+                storage; None captures every message in full
+            sanitization_hash_key: Secret key for "hash" sanitization rules, at most 64 bytes
+                (defaults to SecurityConfig.encryption_key); required if any rule hashes
+            execution_cache_size: Number of pipeline_id to execution_id mappings kept
+                in-process (0 disables the cache)
+            phase_timing_hooks: Receivers of per-phase durations; None uses the
+                process-wide registry from get_phase_timing_registry()
+            idempotency_store: Optional store of processed message ids; redelivered
+                messages short-circuit to their recorded result without reprocessing
+            tracking_breaker: Circuit breaker around synchronous tracking database calls;
+                None uses a CircuitBreaker with default thresholds
+            claim_check: Optional claim check resolving payloads that the sender offloaded
+                to a blob store; their blobs are deleted after successful processing
+        """
+        super().__init__(
+            processor,
+            enable_pipeline_tracking=enable_pipeline_tracking,
+            enable_metrics=enable_metrics,
+            enable_message_storage=enable_message_storage,
+            message_sanitization_rules=message_sanitization_rules,
+            tracking_writer=tracking_writer,
+            output_handler=output_handler,
+            enforce_processing_timeout=enforce_processing_timeout,
+            processing_timeout=processing_timeout,
+            retry_policy=retry_policy,
+            message_capture=message_capture,
+            sanitization_hash_key=sanitization_hash_key,
+            execution_cache_size=execution_cache_size,
+            phase_timing_hooks=phase_timing_hooks,
+            idempotency_store=idempotency_store,
+            tracking_breaker=tracking_breaker,
+            claim_check=claim_check,
+        )
+        self.executor = executor
+
+    async def process_message(self, message: Message, context: Optional[Dict[str, Any]] = None) -> ProcessingResult:
+        """
+        Process a message through the async processor with full tracking.
+
+        Args:
+            message: Message to process
+            context: Additional processing context
+
+        Returns:
+            ProcessingResult with success/failure status and output messages
+        """
+        context = context or {}
+        processor_name = self.processor.get_processor_name()
+        start_time = time.time()
+        timer = self._new_phase_timer()
+        step_id = None  # Local step_id for this message processing
+        execution_id = None
+        retries = 0
+
+        # Bind the message's identifiers to every log record
+        log = self._bind_logger(message, processor_name)
+
+        with timer.phase(ProcessingPhase.LOGGING):
+            log.info("Starting processing: %s", processor_name)
+
+        try:
+            # Short-circuit messages that were already processed (if enabled), before anything reads
+            # the payload: a duplicate's offloaded payload may already have been released
+            if self.idempotency_store is not None:
+                with timer.phase(ProcessingPhase.DEDUPLICATION):
+                    duplicate = await self._call(
+                        self._deduplication_blocks,
+                        partial(self._find_duplicate, message, processor_name, context, log),
+                    )
+                if duplicate is not None:
+                    return duplicate
+
+            # Fetch an offloaded payload off the event loop, before validation reads it (if enabled)
+            claim_ref = self.claim_check.resolve(message) if self.claim_check is not None else None
+            if claim_ref is not None:
+                with timer.phase(ProcessingPhase.CLAIM_CHECK):
+                    await self._call(True, message.load_payload)
+
+            # Validate message
+            with timer.phase(ProcessingPhase.VALIDATION):
+                is_valid = self.processor.validate_message(message)
+            if not is_valid:
+                return ProcessingResult.failure_result(error_message="Message validation failed", error_code="INVALID_MESSAGE")
+
+            # Track pipeline execution start and store input (if enabled)
+            step_id, execution_id = await self._call(
+                self._tracking_blocks,
+                partial(self._begin_tracking, message, processor_name, context, timer=timer),
+            )
+
+            # Process the message, retrying transient failures in-process (if configured)
+            while True:
+                try:
+                    with timer.phase(ProcessingPhase.PROCESS):
+                        result = await self._run_processor(message, context, processor_name, time.time(), log)
+                except Exception as e:
+                    delay = self._next_retry_delay(retries, processor_name, log, error=e)
+                    if delay is None:
+                        raise
+                else:
+                    delay = self._next_retry_delay(retries, processor_name, log, result=result)
+                    if delay is None:
+                        break
+                retries += 1
+                with timer.phase(ProcessingPhase.RETRY_BACKOFF):
+                    await asyncio.sleep(delay)
+
+            result = await self._call(
+                self._tracking_blocks or self.output_handler is not None or self._deduplication_blocks,
+                partial(
+                    self._complete_processing,
+                    message,
+                    processor_name,
+                    context,
+                    result,
+                    start_time,
+                    step_id,
+                    execution_id,
+                    log,
+                    retry_count=retries,
+                    timer=timer,
+                ),
+            )
+
+            # Delete the offloaded payload once it can no longer be needed
+            if claim_ref is not None and result.success:
+                with timer.phase(ProcessingPhase.CLAIM_CHECK):
+                    await self._call(True, partial(self._release_claim_check, claim_ref, log))
+            return result
+
+        except Exception as e:
+            return await self._call(
+                self._tracking_blocks,
+                partial(
+                    self._fail_processing,
+                    message,
+                    processor_name,
+                    context,
+                    e,
+                    start_time,
+                    step_id,
+                    log,
+                    retry_count=retries,
+                    execution_id=execution_id,
+                    timer=timer,
+                ),
+            )
+
+        finally:
+            self._report_phase_timings(processor_name, timer)
+
+    async def _run_processor(
+        self,
+        message: Message,
+        context: Dict[str, Any],
+        processor_name: str,
+        attempt_started: float,
+        log: BoundLogger,
+    ) -> ProcessingResult:
+        """
+        Make one processing attempt; on timeout the processor coroutine is cancelled.
+
+        Args:
+            message: Message to process
+            context: Processing context
+            processor_name: Name of the processor
+            attempt_started: time.time() when the attempt started
+            log: Logger bound to the message's identifiers
+
+        Returns:
+            The processor result, or a timeout result if the deadline passed
+        """
+        if self.processing_timeout is None:
+            return self._as_result(await self.processor.process(message, context))
+
+        try:
+            return self._as_result(await asyncio.wait_for(self.processor.process(message, context), self.processing_timeout))
+        except asyncio.TimeoutError:
+            return self._timeout_result(processor_name, attempt_started, log)
+
+    async def process_messages(
+        self,
+        messages: List[Message],
+        context: Optional[Dict[str, Any]] = None,
+        max_concurrency: Optional[int] = None,
+    ) -> List[ProcessingResult]:
+        """
+        Process messages concurrently on the event loop.
+
+        Args:
+            messages: Messages to process
+            context: Additional processing context shared by all messages
+            max_concurrency: Maximum number of messages in flight (None for no limit)
+
+        Returns:
+            List of ProcessingResult objects, in the same order as the input messages
+        """
+        if not messages:
+            return []
+
+        if max_concurrency is None:
+            return list(await asyncio.gather(*(self.process_message(message, context) for message in messages)))
+
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def bounded(message: Message) -> ProcessingResult:
+            async with semaphore:
+                return await self.process_message(message, context)
+
+        return list(await asyncio.gather(*(bounded(message) for message in messages)))
+
+    async def _call(self, blocking: bool, func: Callable[[], T]) -> T:
+        """
+        Run a handler phase, off the event loop if it does blocking I/O.
+
+        Args:
+            blocking: Whether the phase performs blocking database or network calls
+            func: Zero-argument callable for the phase
+
+        Returns:
+            The phase's return value
+        """
+        if not blocking:
+            return func()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, func)
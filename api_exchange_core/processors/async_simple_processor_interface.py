@@ -0,0 +1,39 @@
+"""
+Asynchronous processor interface for the V2 framework.
+
+This module provides the asyncio counterpart of SimpleProcessorInterface for
+processors that spend most of their time waiting on external I/O.
+"""
+
+from abc import abstractmethod
+from typing import Any, Dict
+
+from .message import Message
+from .processing_result import ProcessingResult
+from .simple_processor_interface import BaseProcessorInterface
+
+
+class AsyncSimpleProcessorInterface(BaseProcessorInterface):
+    """
+    Minimal asynchronous processor interface for pipeline operations.
+
+    Identical to SimpleProcessorInterface except that process() is a coroutine,
+    so processors can await external HTTP APIs without blocking the event loop.
+    """
+
+    @abstractmethod
+    async def process(self, message: Message, context: Dict[str, Any]) -> ProcessingResult:
+        """
+        Process a message and return the result.
+
+        Args:
+            message: Input message to process
+            context: Processing context (tenant_id, request_id, etc.)
+
+        Returns:
+            ProcessingResult with success/failure status and output messages
+
+        Raises:
+            Should not raise exceptions - return failure result instead
+        """
+        pass
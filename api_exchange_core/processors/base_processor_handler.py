@@ -0,0 +1,1526 @@
+"""
+Base processor handler for the V2 framework.
+
+This module provides the configuration, pipeline tracking, message storage and
+output routing shared by the synchronous and asynchronous processor handlers.
+"""
+
+import copy
+import logging
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from functools import partial
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from uuid import uuid4
+
+from sqlalchemy import select, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from ..config import get_config
+from ..db.db_config import get_db_manager
+from ..db.db_pipeline_tracking_models import PipelineExecution, PipelineMessage, PipelineStep, ProcessedMessage
+from ..utils.logger import BoundLogger, get_logger
+from .async_simple_processor_interface import AsyncSimpleProcessorInterface
+from .circuit_breaker import CircuitBreaker
+from .claim_check import ClaimCheck
+from .delivery_report import DeliveryReport
+from .execution_cache import ExecutionIdCache
+from .idempotency_store import IdempotencyStore, ProcessedMessageRecord
+from .message import Message
+from .message_capture import MessageCapturePolicy
+from .message_sanitizer import MessageSanitizer
+from .output_handlers.base_output_handler import BaseOutputHandler
+from .phase_timing import NULL_PHASE_TIMER, PhaseTimer, PhaseTimingHook, ProcessingPhase, get_phase_timing_registry
+from .processing_result import ProcessingResult, ProcessingStatus
+from .retry_policy import RetryPolicy
+from .simple_processor_interface import SimpleProcessorInterface
+from .tracking_writer import PipelineTrackingWriter
+
+# Streamed output messages stored per pipeline_message write
+_OUTPUT_CAPTURE_CHUNK_SIZE = 100
+
+# Dialects whose INSERT supports ON CONFLICT ... DO UPDATE ... RETURNING
+_UPSERT_INSERTS = {
+    "postgresql": postgresql_insert,
+    "sqlite": sqlite_insert,
+}
+
+
+class BaseProcessorHandler:
+    """
+    Shared behaviour for processor handlers.
+
+    Processing is split into phases so the sync and async handlers differ only
+    in how they call the processor:
+    - _begin_tracking: track the step start and capture the input message
+    - _complete_processing: track completion, capture outputs, route and log
+    - _fail_processing: track and log an exception raised by the processor
+
+    Per-message state (step and execution ids) is passed between phases rather
+    than stored on the handler, so one handler can process messages concurrently.
+    """
+
+    def __init__(
+        self,
+        processor: Union[SimpleProcessorInterface, AsyncSimpleProcessorInterface],
+        enable_pipeline_tracking: bool = True,
+        enable_metrics: bool = True,
+        enable_message_storage: bool = False,
+        message_sanitization_rules: Optional[Dict[str, Any]] = None,
+        tracking_writer: Optional[PipelineTrackingWriter] = None,
+        output_handler: Optional[BaseOutputHandler] = None,
+        enforce_processing_timeout: bool = False,
+        processing_timeout: Optional[float] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        message_capture: Optional[MessageCapturePolicy] = None,
+        sanitization_hash_key: Optional[str] = None,
+        execution_cache_size: int = 1024,
+        phase_timing_hooks: Optional[List[PhaseTimingHook]] = None,
+        idempotency_store: Optional[IdempotencyStore] = None,
+        tracking_breaker: Optional[CircuitBreaker] = None,
+        claim_check: Optional[ClaimCheck] = None,
+    ):
+        """
+        Initialize the processor handler.
+
+        Args:
+            processor: The processor to handle
+            enable_pipeline_tracking: Whether to track pipeline execution
+            enable_metrics: Whether to time each processing phase and report it to phase_timing_hooks
+            enable_message_storage: Whether to store input/output messages for debugging
+            message_sanitization_rules: Rules for sanitizing sensitive data in messages
+            tracking_writer: Optional write-behind writer; when set, tracking writes are
+                queued and applied by a background thread instead of blocking processing
+            output_handler: Optional handler that routes output messages after successful processing
+            enforce_processing_timeout: Whether processor.process runs under a deadline
+            processing_timeout: Deadline in seconds; when None and enforcement is enabled,
+                ProcessingConfig.processing_timeout is used. Passing a value enables enforcement.
+                Streamed outputs are produced after the deadline check and are not covered.
+            retry_policy: Optional policy for retrying transient failures in-process
+                (see RetryPolicy.from_config); None disables retries. A failure while
+                streaming outputs is not retried, since earlier outputs were already routed.
+            message_capture: Sampling, size cap and failures-only settings for message
+                storage; None captures every message in full
+            sanitization_hash_key: Secret key for "hash" sanitization rules, at most 64 bytes
+                (defaults to SecurityConfig.encryption_key); required if any rule hashes
+            execution_cache_size: Number of pipeline_id to execution_id mappings kept
+                in-process (0 disables the cache)
+            phase_timing_hooks: Receivers of per-phase durations; None uses the
+                process-wide registry from get_phase_timing_registry()
+            idempotency_store: Optional store of processed message ids; redelivered
+                messages short-circuit to their recorded result without reprocessing
+            tracking_breaker: Circuit breaker around synchronous tracking database calls;
+                None uses a CircuitBreaker with default thresholds
+            claim_check: Optional claim check resolving payloads that the sender offloaded
+                to a blob store; their blobs are deleted after successful processing
+
+        Raises:
+            ValidationError: If a sanitization rule is invalid, or a "hash" rule has no usable key
+        """
+        self.processor = processor
+        self.enable_pipeline_tracking = enable_pipeline_tracking
+        self.enable_metrics = enable_metrics
+        self.enable_message_storage = enable_message_storage
+        self.message_sanitization_rules = message_sanitization_rules or {}
+        if sanitization_hash_key is None and self.message_sanitization_rules:
+            sanitization_hash_key = get_config().security.encryption_key
+        self._sanitizer = MessageSanitizer(self.message_sanitization_rules, hash_key=sanitization_hash_key)
+        self.tracking_writer = tracking_writer
+        self.output_handler = output_handler
+        self.logger = get_logger()
+
+        if processing_timeout is None and enforce_processing_timeout:
+            processing_timeout = get_config().processing.processing_timeout
+        self.processing_timeout: Optional[float] = processing_timeout
+        self.retry_policy = retry_policy
+        self.message_capture = message_capture or MessageCapturePolicy()
+        self.execution_cache = ExecutionIdCache(execution_cache_size)
+        if phase_timing_hooks is None:
+            phase_timing_hooks = [get_phase_timing_registry()]
+        self.phase_timing_hooks: List[PhaseTimingHook] = phase_timing_hooks if enable_metrics else []
+        self.idempotency_store = idempotency_store
+        self.tracking_breaker = tracking_breaker or CircuitBreaker()
+        self.claim_check = claim_check
+
+    def flush_tracking(self) -> None:
+        """
+        Wait for queued tracking writes to reach the database.
+
+        Only has an effect in write-behind mode. Call this before the host
+        freezes or recycles the worker to avoid losing telemetry.
+        """
+        if self.tracking_writer is not None:
+            self.tracking_writer.flush()
+
+    def _new_phase_timer(self) -> PhaseTimer:
+        """Create the timer for one message; a no-op when no hooks are installed."""
+        return PhaseTimer() if self.phase_timing_hooks else NULL_PHASE_TIMER
+
+    def _report_phase_timings(self, processor_name: str, timer: PhaseTimer) -> None:
+        """
+        Send one message's phase durations to every hook.
+
+        Args:
+            processor_name: Name of the processor
+            timer: The message's phase timer
+        """
+        if not timer.durations:
+            return
+        for hook in self.phase_timing_hooks:
+            try:
+                hook.record(processor_name, timer.durations)
+            except Exception as e:
+                self.logger.error(f"Phase timing hook failed: {str(e)}", extra={"processor_name": processor_name, "hook": type(hook).__name__})
+                # Continue - instrumentation must never fail processing
+
+    @property
+    def _tracking_blocks(self) -> bool:
+        """Whether tracking writes block the caller on database I/O."""
+        return self.enable_pipeline_tracking and self.tracking_writer is None
+
+    @property
+    def _deduplication_blocks(self) -> bool:
+        """Whether duplicate checks and records may do blocking database I/O."""
+        return self.idempotency_store is not None and self.idempotency_store.persistent
+
+    def _bind_logger(self, message: Message, processor_name: str) -> BoundLogger:
+        """
+        Bind the handler's logger to a message's identifiers.
+
+        Args:
+            message: Message being processed
+            processor_name: Name of the processor
+
+        Returns:
+            BoundLogger attaching the identifiers to every record for the message
+        """
+        return self.logger.bind(
+            processor_name=processor_name,
+            pipeline_id=message.pipeline_id,
+            message_id=message.message_id,
+            correlation_id=message.correlation_id,
+            tenant_id=message.tenant_id,
+        )
+
+    def _begin_tracking(
+        self,
+        message: Message,
+        processor_name: str,
+        context: Dict[str, Any],
+        session: Optional[Session] = None,
+        timer: PhaseTimer = NULL_PHASE_TIMER,
+    ) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Track the start of a step and store the input message (if enabled).
+
+        Args:
+            message: Message being processed
+            processor_name: Name of the processor
+            context: Processing context
+            session: Optional shared batch session
+            timer: Phase timer for the message
+
+        Returns:
+            Tuple of (step_id, execution_id); either may be None if tracking is off or failed
+        """
+        if not self.enable_pipeline_tracking:
+            return None, None
+
+        with timer.phase(ProcessingPhase.TRACKING_START):
+            step_id, execution_id = self._track_pipeline_start(message, processor_name, context, session)
+
+        # Store input message (if enabled and not deferred until the outcome is known)
+        if self.enable_message_storage and step_id and self.message_capture.should_capture(message):
+            with timer.phase(ProcessingPhase.INPUT_CAPTURE):
+                self._store_input_message(message, step_id, context, session, execution_id)
+
+        return step_id, execution_id
+
+    def _complete_processing(
+        self,
+        message: Message,
+        processor_name: str,
+        context: Dict[str, Any],
+        result: ProcessingResult,
+        start_time: float,
+        step_id: Optional[str],
+        execution_id: Optional[str],
+        log: BoundLogger,
+        session: Optional[Session] = None,
+        retry_count: int = 0,
+        timer: PhaseTimer = NULL_PHASE_TIMER,
+    ) -> ProcessingResult:
+        """
+        Record a processor result: duration, routing, tracking, output storage and logging.
+
+        Args:
+            message: Message that was processed
+            processor_name: Name of the processor
+            context: Processing context
+            result: Result returned by the processor
+            start_time: time.time() when processing started
+            step_id: The pipeline step ID
+            execution_id: The pipeline execution ID
+            log: Logger bound to the message's identifiers
+            session: Optional shared batch session
+            retry_count: Number of retries made before this result
+            timer: Phase timer for the message
+
+        Returns:
+            The processor result, with processing_duration_ms filled in
+        """
+        # Drain streamed outputs first so completion tracking sees the final output count
+        if result.output_stream is not None:
+            self._drain_output_stream(message, context, result, step_id, execution_id, session, timer)
+
+        # Calculate processing duration, including the time a streamed result took to produce
+        processing_duration_ms = int((time.time() - start_time) * 1000)
+        if result.processing_duration_ms is None:
+            result.processing_duration_ms = processing_duration_ms
+
+        # Route output messages (if configured) before tracking, so completion records where they were delivered
+        if self.output_handler is not None and result.success and result.output_messages:
+            with timer.phase(ProcessingPhase.OUTPUT_ROUTING):
+                self._route_output(result, message, context)
+
+        # Track pipeline execution completion (if enabled)
+        if self.enable_pipeline_tracking:
+            with timer.phase(ProcessingPhase.TRACKING_COMPLETION):
+                self._track_pipeline_completion(message, processor_name, result, context, step_id, session, retry_count)
+
+            # Store messages (if enabled and selected by the capture policy)
+            if self.enable_message_storage and step_id and self.message_capture.should_capture(message, result.success):
+                if self.message_capture.failures_only:
+                    # Input capture was deferred until the step failed
+                    with timer.phase(ProcessingPhase.INPUT_CAPTURE):
+                        self._store_input_message(message, step_id, context, session, execution_id)
+                if result.output_messages:
+                    with timer.phase(ProcessingPhase.OUTPUT_CAPTURE):
+                        self._store_output_messages(
+                            result.output_messages, step_id, context, session, execution_id, result.delivery_report
+                        )
+
+        # Remember the message so redeliveries are skipped (if enabled)
+        if self.idempotency_store is not None and result.success:
+            with timer.phase(ProcessingPhase.DEDUPLICATION):
+                self._record_processed_message(message, processor_name, result, session)
+
+        with timer.phase(ProcessingPhase.LOGGING):
+            self._log_result(processor_name, result, processing_duration_ms, retry_count, log)
+
+        return result
+
+    def _find_duplicate(
+        self,
+        message: Message,
+        processor_name: str,
+        context: Dict[str, Any],
+        log: BoundLogger,
+        session: Optional[Session] = None,
+    ) -> Optional[ProcessingResult]:
+        """
+        Check whether a message was already processed successfully.
+
+        Args:
+            message: Message about to be processed
+            processor_name: Name of the processor
+            context: Processing context
+            log: Logger bound to the message's identifiers
+            session: Optional shared batch session
+
+        Returns:
+            The recorded result for a duplicate, or None if the message should be processed
+        """
+        store: IdempotencyStore = self.idempotency_store  # type: ignore[assignment]
+        record = store.get_cached(processor_name, message.message_id)
+        if record is None and store.should_query_database(context):
+            try:
+                record = self._call_tracking_database(partial(store.load, processor_name=processor_name, message_id=message.message_id), session)
+            except Exception as e:
+                log.error("Error checking processed messages: %s", e)
+                # Continue - processing the message again is safer than dropping it
+
+        if record is None:
+            return None
+
+        log.info(
+            "Skipping duplicate message: %s",
+            processor_name,
+            extra={"dequeue_count": context.get("dequeue_count"), "processed_at": record.processed_at},
+        )
+        return record.to_result()
+
+    def _release_claim_check(self, ref: str, log: BoundLogger) -> None:
+        """
+        Delete the offloaded payload of a successfully processed message.
+
+        Args:
+            ref: Blob reference returned by ClaimCheck.resolve
+            log: Logger bound to the message's identifiers
+        """
+        try:
+            self.claim_check.release(ref)  # type: ignore[union-attr]
+        except Exception as e:
+            log.error("Error releasing offloaded payload %s: %s", ref, e)
+            # Continue - an orphaned blob must not fail a processed message
+
+    def _record_processed_message(
+        self,
+        message: Message,
+        processor_name: str,
+        result: ProcessingResult,
+        session: Optional[Session] = None,
+    ) -> None:
+        """
+        Remember a successfully processed message in the idempotency store.
+
+        Args:
+            message: Message that was processed
+            processor_name: Name of the processor
+            result: Successful processing result
+            session: Optional shared batch session
+        """
+        store: IdempotencyStore = self.idempotency_store  # type: ignore[assignment]
+        record = store.build_record(processor_name, message, result)
+        store.remember(record)
+        if not store.persistent:
+            return
+
+        try:
+            operation = partial(self._write_processed_message, record=record, expires_at=store.expires_at(record))
+            self._run_tracking_operation(operation, session)
+        except Exception as e:
+            self.logger.error(f"Error recording processed message: {str(e)}")
+            # Continue - the in-process cache still covers redeliveries to this worker
+
+    def _write_processed_message(self, session: Session, record: ProcessedMessageRecord, expires_at: datetime) -> None:
+        """
+        Upsert the processed_message row for a message.
+
+        Args:
+            session: Session to write to
+            record: The recorded outcome
+            expires_at: When the record stops deduplicating redeliveries
+        """
+        values = {
+            "pipeline_id": record.pipeline_id,
+            "tenant_id": record.tenant_id,
+            "status": record.status.value,
+            "records_processed": record.records_processed,
+            "output_count": record.output_count,
+            "processed_at": record.processed_at,
+            "expires_at": expires_at,
+        }
+        insert_factory = _UPSERT_INSERTS.get(session.get_bind().dialect.name)
+
+        if insert_factory is not None:
+            now = datetime.now(timezone.utc)
+            statement = (
+                insert_factory(ProcessedMessage)
+                .values(
+                    id=str(uuid4()),
+                    processor_name=record.processor_name,
+                    message_id=record.message_id,
+                    created_at=now,
+                    updated_at=now,
+                    **values,
+                )
+                .on_conflict_do_update(
+                    index_elements=[ProcessedMessage.processor_name, ProcessedMessage.message_id],
+                    set_={**values, "updated_at": now},
+                )
+            )
+            session.execute(statement)
+            return
+
+        result = session.execute(
+            update(ProcessedMessage)
+            .where(ProcessedMessage.processor_name == record.processor_name, ProcessedMessage.message_id == record.message_id)
+            .values(**values),
+            execution_options={"synchronize_session": False},
+        )
+        if not result.rowcount:
+            session.add(ProcessedMessage(id=str(uuid4()), processor_name=record.processor_name, message_id=record.message_id, **values))
+
+    def _as_result(self, output: Union[ProcessingResult, Iterable[Message]]) -> ProcessingResult:
+        """
+        Normalize a processor's return value to a ProcessingResult.
+
+        Args:
+            output: A ProcessingResult, or an iterable (typically a generator) of output messages
+
+        Returns:
+            The result itself, or a streaming result wrapping the iterable
+        """
+        if isinstance(output, ProcessingResult):
+            return output
+        return ProcessingResult.streaming_result(output_stream=output)
+
+    def _drain_output_stream(
+        self,
+        message: Message,
+        context: Dict[str, Any],
+        result: ProcessingResult,
+        step_id: Optional[str],
+        execution_id: Optional[str],
+        session: Optional[Session] = None,
+        timer: PhaseTimer = NULL_PHASE_TIMER,
+    ) -> None:
+        """
+        Consume a result's output stream, routing and capturing messages as they are produced.
+
+        Without an output handler the stream is collected into output_messages.
+        With one, messages are handed to the handler incrementally and only
+        their count and the handler's delivery report are kept. Output routing
+        errors are logged like any other routing failure; an error raised by the
+        stream itself is re-raised so the step is recorded as failed.
+
+        A streamed processor does its work here, after processor.process has
+        returned, so it opts out of the processing timeout and of in-process
+        retries: messages routed before a failure cannot be recalled, and a
+        retry would send them again. Time spent producing messages is recorded
+        as the PROCESS phase, the rest as OUTPUT_ROUTING and OUTPUT_CAPTURE.
+
+        Args:
+            message: Message that was processed
+            context: Processing context
+            result: Result whose output_stream is consumed
+            step_id: The pipeline step ID
+            execution_id: The pipeline execution ID
+            session: Optional shared batch session
+            timer: Phase timer for the message
+
+        Raises:
+            Exception: Whatever the output stream raised
+        """
+        stream, result.output_stream = result.output_stream, None
+
+        if not result.success:
+            # Nothing is routed for a failed result; let the generator clean up
+            close = getattr(stream, "close", None)
+            if close is not None:
+                close()
+            return
+
+        if self.output_handler is None:
+            with timer.phase(ProcessingPhase.PROCESS):
+                result.output_messages.extend(stream)  # type: ignore[arg-type]
+            return
+
+        capture = (
+            self.enable_pipeline_tracking
+            and self.enable_message_storage
+            and step_id is not None
+            and self.message_capture.should_capture(message, True)
+        )
+        stream_errors: List[BaseException] = []
+        produced = 0
+
+        def produce() -> Iterator[Message]:
+            nonlocal produced
+            pending: List[Message] = []
+            iterator = iter(stream)  # type: ignore[arg-type]
+            while True:
+                with timer.phase(ProcessingPhase.PROCESS):
+                    try:
+                        output_message = next(iterator)
+                    except StopIteration:
+                        break
+                    except Exception as e:
+                        stream_errors.append(e)
+                        raise
+                produced += 1
+                if capture:
+                    pending.append(output_message)
+                    if len(pending) >= _OUTPUT_CAPTURE_CHUNK_SIZE:
+                        with timer.phase(ProcessingPhase.OUTPUT_CAPTURE):
+                            self._store_output_messages(pending, step_id, context, session, execution_id)  # type: ignore[arg-type]
+                        pending = []
+                yield output_message
+            if pending:
+                with timer.phase(ProcessingPhase.OUTPUT_CAPTURE):
+                    self._store_output_messages(pending, step_id, context, session, execution_id)  # type: ignore[arg-type]
+
+        # Production and capture run inside the handler's call; the remainder is routing
+        interleaved = (ProcessingPhase.PROCESS, ProcessingPhase.OUTPUT_CAPTURE)
+        interleaved_before = sum(timer.durations.get(phase, 0.0) for phase in interleaved)
+        started = time.perf_counter()
+        try:
+            report = self.output_handler.handle_output_stream(produce(), message, context)
+            if isinstance(report, DeliveryReport):
+                result.delivery_report = report
+                if capture and produced:
+                    # Messages were captured before they were routed
+                    with timer.phase(ProcessingPhase.OUTPUT_CAPTURE):
+                        self._record_target_queues(step_id, report, session)  # type: ignore[arg-type]
+        except Exception as e:
+            if not stream_errors:
+                self.logger.error(
+                    f"Output routing failed: {str(e)}",
+                    extra={"pipeline_id": message.pipeline_id, "message_id": message.message_id, "error_message": str(e)},
+                    exc_info=True,
+                )
+        finally:
+            result.streamed_output_count = produced
+            interleaved_ms = sum(timer.durations.get(phase, 0.0) for phase in interleaved) - interleaved_before
+            timer.add(ProcessingPhase.OUTPUT_ROUTING, (time.perf_counter() - started) * 1000 - interleaved_ms)
+
+        if stream_errors:
+            raise stream_errors[0]
+
+    def _log_result(
+        self,
+        processor_name: str,
+        result: ProcessingResult,
+        processing_duration_ms: int,
+        retry_count: int,
+        log: BoundLogger,
+    ) -> None:
+        """
+        Log the outcome of processing a message.
+
+        Args:
+            processor_name: Name of the processor
+            result: The processing result
+            processing_duration_ms: Processing duration in milliseconds
+            retry_count: Number of retries made before this result
+            log: Logger bound to the message's identifiers
+        """
+        if not log.is_enabled_for(logging.INFO if result.success else logging.ERROR):
+            return
+
+        result_context = {
+            "success": result.success,
+            "status": result.status,
+            "processing_duration_ms": processing_duration_ms,
+            "records_processed": result.records_processed,
+            "output_messages_count": result.output_count,
+            "retry_count": retry_count,
+        }
+
+        if result.success:
+            log.info("Processing completed successfully: %s", processor_name, extra=result_context)
+        else:
+            result_context.update(
+                {
+                    "error_message": result.error_message,
+                    "error_code": result.error_code,
+                }
+            )
+            log.error("Processing failed: %s", processor_name, extra=result_context)
+
+    def _fail_processing(
+        self,
+        message: Message,
+        processor_name: str,
+        context: Dict[str, Any],
+        error: Exception,
+        start_time: float,
+        step_id: Optional[str],
+        log: BoundLogger,
+        session: Optional[Session] = None,
+        retry_count: int = 0,
+        execution_id: Optional[str] = None,
+        timer: PhaseTimer = NULL_PHASE_TIMER,
+    ) -> ProcessingResult:
+        """
+        Record an exception raised while processing a message.
+
+        Args:
+            message: Message that was being processed
+            processor_name: Name of the processor
+            context: Processing context
+            error: The exception that was raised
+            start_time: time.time() when processing started
+            step_id: The pipeline step ID
+            log: Logger bound to the message's identifiers
+            session: Optional shared batch session
+            retry_count: Number of retries made before the exception
+            execution_id: The pipeline execution ID
+            timer: Phase timer for the message
+
+        Returns:
+            ProcessingResult describing the failure
+        """
+        processing_duration_ms = int((time.time() - start_time) * 1000)
+
+        # Track pipeline execution failure (if enabled)
+        if self.enable_pipeline_tracking:
+            with timer.phase(ProcessingPhase.TRACKING_COMPLETION):
+                self._track_pipeline_failure(message, processor_name, str(error), context, step_id, session, retry_count)
+
+            # Store the input message if its capture was deferred until the step failed
+            if self.enable_message_storage and step_id and self.message_capture.failures_only and self.message_capture.should_capture(message, False):
+                with timer.phase(ProcessingPhase.INPUT_CAPTURE):
+                    self._store_input_message(message, step_id, context, session, execution_id)
+
+        # Log error
+        error_context = {
+            "processing_duration_ms": processing_duration_ms,
+            "error_type": type(error).__name__,
+            "error_message": str(error),
+            "retry_count": retry_count,
+        }
+
+        with timer.phase(ProcessingPhase.LOGGING):
+            log.error(
+                "Processing failed with exception: %s",
+                processor_name,
+                extra=error_context,
+                exc_info=error,
+            )
+
+        return ProcessingResult.failure_result(
+            error_message=f"Processing failed: {str(error)}",
+            error_code="PROCESSING_EXCEPTION",
+            processing_duration_ms=processing_duration_ms,
+        )
+
+    def _next_retry_delay(
+        self,
+        retries: int,
+        processor_name: str,
+        log: BoundLogger,
+        error: Optional[Exception] = None,
+        result: Optional[ProcessingResult] = None,
+    ) -> Optional[float]:
+        """
+        Decide whether to retry a failed attempt and how long to back off first.
+
+        Args:
+            retries: Number of retries already made
+            processor_name: Name of the processor
+            log: Logger bound to the message's identifiers
+            error: Exception raised by the latest attempt
+            result: Result returned by the latest attempt
+
+        Returns:
+            Seconds to wait before retrying, or None if the attempt should not be retried
+        """
+        if self.retry_policy is None or not self.retry_policy.should_retry(retries, error, result):
+            return None
+
+        delay = self.retry_policy.get_delay(retries + 1)
+        reason = str(error) if error is not None else result.error_message  # type: ignore[union-attr]
+        log.warning(
+            "Retrying processing: %s",
+            processor_name,
+            extra={"retry": retries + 1, "retry_delay_seconds": round(delay, 3), "error_message": reason},
+        )
+        return delay
+
+    def _timeout_result(self, processor_name: str, start_time: float, log: BoundLogger) -> ProcessingResult:
+        """
+        Build the result for a processor call that exceeded the processing timeout.
+
+        Args:
+            processor_name: Name of the processor
+            start_time: time.time() when processing started
+            log: Logger bound to the message's identifiers
+
+        Returns:
+            ProcessingResult with TIMEOUT status
+        """
+        processing_duration_ms = int((time.time() - start_time) * 1000)
+        log.warning(
+            "Processing timed out: %s",
+            processor_name,
+            extra={"processing_timeout": self.processing_timeout, "processing_duration_ms": processing_duration_ms},
+        )
+        return ProcessingResult.timeout_result(self.processing_timeout, processing_duration_ms=processing_duration_ms)  # type: ignore[arg-type]
+
+    def _route_output(self, result: ProcessingResult, message: Message, context: Dict[str, Any]) -> None:
+        """
+        Send output messages through the configured output handler.
+
+        A delivery report returned by the handler is kept on the result for
+        completion tracking.
+
+        Args:
+            result: Successful processing result
+            message: Message that was processed
+            context: Processing context
+        """
+        try:
+            report = self.output_handler.handle_output(result, message, context)  # type: ignore[union-attr]
+            if isinstance(report, DeliveryReport):
+                result.delivery_report = report
+        except Exception as e:
+            self.logger.error(
+                f"Output routing failed: {str(e)}",
+                extra={"pipeline_id": message.pipeline_id, "message_id": message.message_id, "error_message": str(e)},
+                exc_info=True,
+            )
+            # Continue - the processing result itself is still valid
+
+    def _open_tracking_session(self) -> Optional[Session]:
+        """
+        Open a session for tracking writes.
+
+        Returns:
+            Session, or None if the database is unavailable
+        """
+        try:
+            return get_db_manager().get_session()
+        except Exception as e:
+            self.logger.error(f"Error opening tracking session: {str(e)}")
+            return None
+
+    @contextmanager
+    def _tracking_session(self, session: Optional[Session] = None) -> Iterator[Session]:
+        """
+        Provide a session for a tracking write.
+
+        If a shared batch session is given, the write runs in a savepoint and the
+        session is left for the caller to commit; a failed write then rolls back
+        only itself instead of aborting the batch's transaction (as PostgreSQL
+        does after any error). Otherwise a session is opened, committed and
+        closed here.
+
+        Args:
+            session: Optional shared batch session
+
+        Yields:
+            Session to write tracking records to
+        """
+        if session is not None:
+            with session.begin_nested():
+                yield session
+            return
+
+        own_session = get_db_manager().get_session()
+        try:
+            yield own_session
+            own_session.commit()
+        except Exception:
+            own_session.rollback()
+            raise
+        finally:
+            own_session.close()
+
+    def _run_tracking_operation(self, operation: Callable[[Session], Any], session: Optional[Session] = None) -> Any:
+        """
+        Apply a tracking operation now, or hand it to the write-behind writer.
+
+        Args:
+            operation: Callable that writes tracking records to a session
+            session: Optional shared batch session
+
+        Returns:
+            The operation's return value when applied synchronously, otherwise None
+        """
+        if self.tracking_writer is not None:
+            if not self.tracking_writer.submit(operation):
+                self.logger.debug("Tracking operation dropped by write-behind writer")
+            return None
+
+        return self._call_tracking_database(operation, session)
+
+    def _call_tracking_database(self, operation: Callable[[Session], Any], session: Optional[Session] = None) -> Any:
+        """
+        Run a tracking database call now, unless the tracking circuit is open.
+
+        Errors and calls slower than the breaker's latency threshold count towards
+        opening the circuit. While it is open, calls are skipped without touching
+        the database or waiting for a pooled connection.
+
+        Args:
+            operation: Callable that reads or writes tracking records using a session
+            session: Optional shared batch session
+
+        Returns:
+            The operation's return value, or None if it was skipped
+        """
+        if not self.tracking_breaker.allow():
+            self.logger.debug("Tracking operation skipped, tracking circuit is open")
+            return None
+
+        started = time.perf_counter()
+        try:
+            with self._tracking_session(session) as tracking_session:
+                result = operation(tracking_session)
+        except Exception:
+            self.tracking_breaker.record_failure()
+            raise
+        self.tracking_breaker.record_success((time.perf_counter() - started) * 1000)
+        return result
+
+    def _track_pipeline_start(
+        self,
+        message: Message,
+        processor_name: str,
+        context: Dict[str, Any],
+        session: Optional[Session] = None,
+    ) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Track the start of pipeline execution.
+
+        Args:
+            message: Message being processed
+            processor_name: Name of the processor
+            context: Processing context
+            session: Optional shared batch session
+
+        Returns:
+            Tuple of (step_id, execution_id). The execution_id is None in write-behind
+            mode, where it is resolved from the step when written. Both are None if
+            tracking failed or was skipped because the tracking circuit is open.
+        """
+        step_id = str(uuid4())
+        operation = partial(
+            self._write_pipeline_start,
+            message=message,
+            processor_name=processor_name,
+            context=dict(context),
+            step_id=step_id,
+            started_at=datetime.now(timezone.utc),
+        )
+
+        try:
+            execution_id = self._run_tracking_operation(operation, session)
+            if execution_id is None and self.tracking_writer is None:
+                # Skipped by the open circuit: there is no step row to complete or attach messages to
+                return None, None
+            self.logger.debug("Pipeline step created | step_id=%s | processor=%s | message_id=%s", step_id, processor_name, message.message_id)
+            return step_id, execution_id
+
+        except Exception as e:
+            self.logger.error(f"Error in pipeline tracking: {str(e)}")
+            # Continue processing even if tracking fails
+            return None, None
+
+    def _write_pipeline_start(
+        self,
+        session: Session,
+        message: Message,
+        processor_name: str,
+        context: Dict[str, Any],
+        step_id: str,
+        started_at: datetime,
+    ) -> str:
+        """
+        Write the execution and step records for a started step.
+
+        Args:
+            session: Session to write to
+            message: Message being processed
+            processor_name: Name of the processor
+            context: Processing context
+            step_id: Pre-generated id for the step record
+            started_at: When processing started
+
+        Returns:
+            str: The execution_id the step belongs to
+        """
+        execution_id = self._upsert_pipeline_execution(session, message, context, started_at)
+
+        # Create pipeline step
+        step = PipelineStep(
+            id=step_id,
+            execution_id=execution_id,
+            pipeline_id=message.pipeline_id,
+            tenant_id=message.tenant_id,
+            step_name=processor_name,
+            processor_name=processor_name,
+            function_name=context.get("function_name", processor_name),
+            message_id=message.message_id,
+            correlation_id=message.correlation_id,
+            started_at=started_at,
+            status="processing",
+            context=context,
+        )
+        session.add(step)
+
+        return execution_id
+
+    def _upsert_pipeline_execution(self, session: Session, message: Message, context: Dict[str, Any], started_at: datetime) -> str:
+        """
+        Create the execution for a pipeline, or count another step against it.
+
+        When the execution id is cached from an earlier step, the counters are
+        incremented by primary key. Otherwise, on PostgreSQL and SQLite this is a
+        single INSERT ... ON CONFLICT (pipeline_id) DO UPDATE, so concurrent function
+        instances neither create duplicate executions nor lose counter increments.
+        Other dialects fall back to an atomic UPDATE followed by an INSERT when no
+        row exists yet.
+
+        Args:
+            session: Session to write to
+            message: Message being processed
+            context: Processing context
+            started_at: When processing started
+
+        Returns:
+            str: The execution_id for the message's pipeline
+        """
+        increments = {
+            "step_count": PipelineExecution.step_count + 1,
+            "message_count": PipelineExecution.message_count + 1,
+            "updated_at": started_at,
+        }
+
+        cached_id = self.execution_cache.get(message.pipeline_id)
+        if cached_id is not None:
+            result = session.execute(
+                update(PipelineExecution).where(PipelineExecution.id == cached_id).values(**increments),
+                execution_options={"synchronize_session": False},
+            )
+            if result.rowcount:
+                return cached_id
+            # Stale entry (e.g. the creating transaction rolled back) - resolve it again
+            self.execution_cache.discard(message.pipeline_id)
+
+        execution_id = self._resolve_pipeline_execution(session, message, context, started_at, increments)
+        self.execution_cache.put(message.pipeline_id, execution_id)
+        return execution_id
+
+    def _resolve_pipeline_execution(
+        self,
+        session: Session,
+        message: Message,
+        context: Dict[str, Any],
+        started_at: datetime,
+        increments: Dict[str, Any],
+    ) -> str:
+        """
+        Upsert the execution for a pipeline by pipeline_id.
+
+        Args:
+            session: Session to write to
+            message: Message being processed
+            context: Processing context
+            started_at: When processing started
+            increments: Counter updates applied when the execution already exists
+
+        Returns:
+            str: The execution_id for the message's pipeline
+        """
+        insert_factory = _UPSERT_INSERTS.get(session.get_bind().dialect.name)
+
+        if insert_factory is not None:
+            statement = (
+                insert_factory(PipelineExecution)
+                .values(
+                    id=str(uuid4()),
+                    pipeline_id=message.pipeline_id,
+                    tenant_id=message.tenant_id,
+                    correlation_id=message.correlation_id,
+                    status="started",
+                    started_at=started_at,
+                    trigger_type=context.get("trigger_type", "queue"),
+                    trigger_source=context.get("trigger_source", "unknown"),
+                    step_count=1,
+                    message_count=1,
+                    error_count=0,
+                    context=context,
+                )
+                .on_conflict_do_update(index_elements=[PipelineExecution.pipeline_id], set_=increments)
+                .returning(PipelineExecution.id)
+            )
+            return session.execute(statement).scalar_one()
+
+        result = session.execute(
+            update(PipelineExecution).where(PipelineExecution.pipeline_id == message.pipeline_id).values(**increments),
+            execution_options={"synchronize_session": False},
+        )
+        if result.rowcount:
+            return session.scalars(select(PipelineExecution.id).where(PipelineExecution.pipeline_id == message.pipeline_id)).one()
+
+        execution = PipelineExecution(
+            id=str(uuid4()),
+            pipeline_id=message.pipeline_id,
+            tenant_id=message.tenant_id,
+            correlation_id=message.correlation_id,
+            status="started",
+            started_at=started_at,
+            trigger_type=context.get("trigger_type", "queue"),
+            trigger_source=context.get("trigger_source", "unknown"),
+            step_count=1,
+            message_count=1,
+            error_count=0,
+            context=context,
+        )
+        session.add(execution)
+        return execution.id
+
+    def _finish_pipeline_execution(
+        self,
+        session: Session,
+        execution_id: str,
+        finished_at: datetime,
+        success: bool,
+        error_message: Optional[str] = None,
+        error_step: Optional[str] = None,
+    ) -> None:
+        """
+        Mark an execution completed or failed, incrementing error_count atomically.
+
+        Args:
+            session: Session to write to
+            execution_id: The execution ID
+            finished_at: When the execution finished
+            success: Whether the execution succeeded
+            error_message: Error message if the execution failed
+            error_step: Name of the failing processor
+        """
+        started_at = session.scalar(select(PipelineExecution.started_at).where(PipelineExecution.id == execution_id))
+        if started_at is None:
+            self.logger.warning(f"Pipeline execution not found | execution_id={execution_id}")
+            return
+
+        values: Dict[str, Any] = {
+            "completed_at": finished_at,
+            "updated_at": finished_at,
+            "status": "completed" if success else "failed",
+            "duration_ms": _elapsed_ms(started_at, finished_at),
+        }
+        if not success:
+            values["error_message"] = error_message
+            values["error_step"] = error_step
+            values["error_count"] = PipelineExecution.error_count + 1
+
+        session.execute(
+            update(PipelineExecution).where(PipelineExecution.id == execution_id).values(**values),
+            execution_options={"synchronize_session": False},
+        )
+
+    def _track_pipeline_completion(
+        self,
+        message: Message,
+        processor_name: str,
+        result: ProcessingResult,
+        context: Dict[str, Any],
+        step_id: Optional[str] = None,
+        session: Optional[Session] = None,
+        retry_count: int = 0,
+    ) -> None:
+        """
+        Track the completion of pipeline execution.
+
+        Args:
+            message: Message that was processed
+            processor_name: Name of the processor
+            result: Processing result
+            context: Processing context
+            step_id: The pipeline step ID
+            session: Optional shared batch session
+            retry_count: Number of in-process retries made for the step
+        """
+        if not step_id:
+            self.logger.warning(f"No step_id to update | message_id={message.message_id}")
+            return
+
+        operation = partial(
+            self._write_pipeline_completion,
+            step_id=step_id,
+            processor_name=processor_name,
+            success=result.success,
+            timed_out=result.status == ProcessingStatus.TIMEOUT,
+            duration_ms=result.processing_duration_ms,
+            output_count=result.output_count,
+            output_queues=result.delivery_report.queue_names if result.delivery_report is not None else [],
+            error_message=result.error_message,
+            error_code=result.error_code,
+            completed_at=datetime.now(timezone.utc),
+            retry_count=retry_count,
+        )
+
+        try:
+            self._run_tracking_operation(operation, session)
+        except Exception as e:
+            self.logger.error(f"Error in pipeline completion tracking: {str(e)}")
+            # Continue processing even if tracking fails
+
+    def _write_pipeline_completion(
+        self,
+        session: Session,
+        step_id: str,
+        processor_name: str,
+        success: bool,
+        duration_ms: Optional[int],
+        output_count: int,
+        output_queues: List[str],
+        error_message: Optional[str],
+        error_code: Optional[str],
+        completed_at: datetime,
+        timed_out: bool = False,
+        retry_count: int = 0,
+    ) -> None:
+        """
+        Write the completion of a step and, for terminal steps, of its execution.
+
+        Args:
+            session: Session to write to
+            step_id: The pipeline step ID
+            processor_name: Name of the processor
+            success: Whether processing succeeded
+            duration_ms: Processing duration in milliseconds
+            output_count: Number of output messages
+            output_queues: Queues that received output messages
+            error_message: Error message if processing failed
+            error_code: Error code if processing failed
+            completed_at: When processing completed
+            timed_out: Whether processing was abandoned at the processing timeout
+            retry_count: Number of in-process retries made for the step
+        """
+        step = session.get(PipelineStep, step_id)
+        if not step:
+            self.logger.warning(f"Pipeline step not found | step_id={step_id}")
+            return
+
+        step.completed_at = completed_at
+        step.duration_ms = duration_ms
+        if timed_out:
+            step.status = "timed_out"
+        else:
+            step.status = "completed" if success else "failed"
+        step.output_count = output_count
+        step.output_queues = output_queues
+        step.retry_count = retry_count
+
+        if not success:
+            step.error_message = error_message
+            step.error_type = error_code
+
+        self.logger.debug(
+            "Pipeline step completed | step_id=%s | processor=%s | status=%s | duration=%sms", step_id, processor_name, step.status, duration_ms
+        )
+
+        # Update execution completion (if this is the last step)
+        if output_count == 0:
+            # This might be the final step - mark execution as complete
+            self._finish_pipeline_execution(session, step.execution_id, completed_at, success, error_message, processor_name)
+
+    def _track_pipeline_failure(
+        self,
+        message: Message,
+        processor_name: str,
+        error_message: str,
+        context: Dict[str, Any],
+        step_id: Optional[str] = None,
+        session: Optional[Session] = None,
+        retry_count: int = 0,
+    ) -> None:
+        """
+        Track the failure of pipeline execution.
+
+        Args:
+            message: Message that was processed
+            processor_name: Name of the processor
+            error_message: Error message
+            context: Processing context
+            step_id: The pipeline step ID
+            session: Optional shared batch session
+            retry_count: Number of in-process retries made for the step
+        """
+        if not step_id:
+            self.logger.warning(f"No step_id to mark failed | message_id={message.message_id}")
+            return
+
+        operation = partial(
+            self._write_pipeline_failure,
+            step_id=step_id,
+            processor_name=processor_name,
+            error_message=error_message,
+            failed_at=datetime.now(timezone.utc),
+            retry_count=retry_count,
+        )
+
+        try:
+            self._run_tracking_operation(operation, session)
+        except Exception as e:
+            self.logger.error(f"Error in pipeline failure tracking: {str(e)}")
+            # Continue processing even if tracking fails
+
+    def _write_pipeline_failure(
+        self,
+        session: Session,
+        step_id: str,
+        processor_name: str,
+        error_message: str,
+        failed_at: datetime,
+        retry_count: int = 0,
+    ) -> None:
+        """
+        Write the failure of a step and its execution.
+
+        Args:
+            session: Session to write to
+            step_id: The pipeline step ID
+            processor_name: Name of the processor
+            error_message: Error message
+            failed_at: When processing failed
+            retry_count: Number of in-process retries made for the step
+        """
+        step = session.get(PipelineStep, step_id)
+        if not step:
+            self.logger.warning(f"Pipeline step not found | step_id={step_id}")
+            return
+
+        # Update step failure
+        step.completed_at = failed_at
+        step.retry_count = retry_count
+        step.status = "failed"
+        step.error_message = error_message
+        step.error_type = "PROCESSING_EXCEPTION"
+        if step.started_at:
+            step.duration_ms = _elapsed_ms(step.started_at, failed_at)
+
+        # Update execution failure
+        self._finish_pipeline_execution(session, step.execution_id, failed_at, False, error_message, processor_name)
+
+    def _sanitize_message(self, message_data: Dict[str, Any]) -> tuple[Dict[str, Any], bool]:
+        """
+        Sanitize message data to remove sensitive information.
+
+        Args:
+            message_data: The message data to sanitize
+
+        Returns:
+            tuple: (sanitized_data, was_sanitized); unmodified branches are shared with message_data
+        """
+        return self._sanitizer.sanitize(message_data)
+
+    def _snapshot_payload(self, payload: Dict[str, Any], truncated: bool, session: Optional[Session] = None) -> Dict[str, Any]:
+        """
+        Copy a captured message record whose write is deferred.
+
+        Sanitization shares unmodified branches with the live message, and a
+        record queued to the write-behind writer or added to a shared batch
+        session is only serialized when flushed, after the processor (or a
+        downstream step) may have mutated the message in place.
+
+        Args:
+            payload: Captured message record
+            truncated: Whether the record is a truncation preview, which shares nothing
+            session: Optional shared batch session
+
+        Returns:
+            The record itself if it is written now, otherwise a deep copy
+        """
+        if truncated or (session is None and self.tracking_writer is None):
+            return payload
+        return copy.deepcopy(payload)
+
+    def _store_input_message(
+        self,
+        message: Message,
+        step_id: str,
+        context: Dict[str, Any],
+        session: Optional[Session] = None,
+        execution_id: Optional[str] = None,
+    ) -> None:
+        """
+        Store the input message for debugging purposes.
+
+        Args:
+            message: The input message
+            step_id: The pipeline step ID
+            context: Processing context
+            session: Optional shared batch session
+            execution_id: The execution ID, or None to resolve it from the step
+        """
+        try:
+            # Convert message to dict for storage
+            message_data = {
+                "message_id": message.message_id,
+                "pipeline_id": message.pipeline_id,
+                "tenant_id": message.tenant_id,
+                "correlation_id": message.correlation_id,
+                "payload": message.payload,
+                "context": message.context,
+                "created_at": message.created_at.isoformat() if message.created_at else None,
+            }
+
+            # Sanitize, then measure and size-cap the message data
+            sanitized_data, was_sanitized = self._sanitize_message(message_data)
+            payload, message_size, truncated = self.message_capture.fit_payload(sanitized_data)
+            payload = self._snapshot_payload(payload, truncated, session)
+
+            record = {
+                "tenant_id": message.tenant_id,
+                "message_id": message.message_id,
+                "message_type": "input",
+                "message_payload": payload,
+                "message_size_bytes": message_size,
+                "source_queue": context.get("source_queue"),
+                "target_queue": None,
+                "is_sanitized": was_sanitized,
+                "sanitization_rules": self.message_sanitization_rules if was_sanitized else None,
+                "context": dict(context),
+            }
+            operation = partial(self._write_pipeline_messages, step_id=step_id, execution_id=execution_id, records=[record])
+            self._run_tracking_operation(operation, session)
+
+            self.logger.debug(
+                "Stored input message | step_id=%s | message_id=%s | size=%s | sanitized=%s | truncated=%s",
+                step_id,
+                message.message_id,
+                message_size,
+                was_sanitized,
+                truncated,
+            )
+
+        except Exception as e:
+            self.logger.error(f"Error storing input message: {str(e)}")
+            # Continue processing even if message storage fails
+
+    def _store_output_messages(
+        self,
+        output_messages: list,
+        step_id: str,
+        context: Dict[str, Any],
+        session: Optional[Session] = None,
+        execution_id: Optional[str] = None,
+        delivery_report: Optional[DeliveryReport] = None,
+    ) -> None:
+        """
+        Store the output messages for debugging purposes.
+
+        Args:
+            output_messages: List of output messages
+            step_id: The pipeline step ID
+            context: Processing context
+            session: Optional shared batch session
+            execution_id: The execution ID, or None to resolve it from the step
+            delivery_report: Routing outcome of the messages, recorded as their target queue
+                (None if they have not been routed)
+        """
+        try:
+            target_queues = {delivery.message_id: delivery.queue_name for delivery in delivery_report} if delivery_report else {}
+            records = []
+            for output_message in output_messages:
+                # Convert message to dict for storage
+                created_at = getattr(output_message, "created_at", None)
+                message_data = {
+                    "message_id": getattr(output_message, "message_id", None),
+                    "pipeline_id": getattr(output_message, "pipeline_id", None),
+                    "tenant_id": getattr(output_message, "tenant_id", None),
+                    "correlation_id": getattr(output_message, "correlation_id", None),
+                    "payload": getattr(output_message, "payload", None),
+                    "context": getattr(output_message, "context", {}),
+                    "created_at": created_at.isoformat() if created_at else None,
+                }
+
+                # Sanitize, then measure and size-cap the message data
+                sanitized_data, was_sanitized = self._sanitize_message(message_data)
+                payload, message_size, truncated = self.message_capture.fit_payload(sanitized_data)
+                payload = self._snapshot_payload(payload, truncated, session)
+
+                records.append(
+                    {
+                        "tenant_id": getattr(output_message, "tenant_id", None),
+                        "message_id": getattr(output_message, "message_id", None),
+                        "message_type": "output",
+                        "message_payload": payload,
+                        "message_size_bytes": message_size,
+                        "source_queue": None,
+                        "target_queue": target_queues.get(getattr(output_message, "message_id", None)),
+                        "is_sanitized": was_sanitized,
+                        "sanitization_rules": self.message_sanitization_rules if was_sanitized else None,
+                        "context": dict(context),
+                    }
+                )
+
+                self.logger.debug(
+                    "Stored output message | step_id=%s | message_id=%s | size=%s | sanitized=%s | truncated=%s",
+                    step_id,
+                    records[-1]["message_id"],
+                    message_size,
+                    was_sanitized,
+                    truncated,
+                )
+
+            operation = partial(self._write_pipeline_messages, step_id=step_id, execution_id=execution_id, records=records)
+            self._run_tracking_operation(operation, session)
+
+        except Exception as e:
+            self.logger.error(f"Error storing output messages: {str(e)}")
+            # Continue processing even if message storage fails
+
+    def _record_target_queues(self, step_id: str, delivery_report: DeliveryReport, session: Optional[Session] = None) -> None:
+        """
+        Record the target queue of output messages that were stored before they were routed.
+
+        Args:
+            step_id: The pipeline step ID
+            delivery_report: Routing outcome of the stored messages
+            session: Optional shared batch session
+        """
+        message_ids: Dict[str, List[str]] = {}
+        for delivery in delivery_report:
+            if delivery.queue_name:
+                message_ids.setdefault(delivery.queue_name, []).append(delivery.message_id)
+        if not message_ids:
+            return
+
+        try:
+            operation = partial(self._write_target_queues, step_id=step_id, message_ids=message_ids)
+            self._run_tracking_operation(operation, session)
+        except Exception as e:
+            self.logger.error(f"Error recording output message queues: {str(e)}")
+            # Continue processing even if message storage fails
+
+    def _write_target_queues(self, session: Session, step_id: str, message_ids: Dict[str, List[str]]) -> None:
+        """
+        Set target_queue on a step's stored output messages.
+
+        Args:
+            session: Session to write to
+            step_id: The pipeline step ID
+            message_ids: Output message ids by the queue they were routed to
+        """
+        for queue_name, ids in message_ids.items():
+            for start in range(0, len(ids), _OUTPUT_CAPTURE_CHUNK_SIZE):
+                session.execute(
+                    update(PipelineMessage)
+                    .where(
+                        PipelineMessage.step_id == step_id,
+                        PipelineMessage.message_type == "output",
+                        PipelineMessage.message_id.in_(ids[start : start + _OUTPUT_CAPTURE_CHUNK_SIZE]),
+                    )
+                    .values(target_queue=queue_name),
+                    execution_options={"synchronize_session": False},
+                )
+
+    def _write_pipeline_messages(self, session: Session, step_id: str, execution_id: Optional[str], records: List[Dict[str, Any]]) -> None:
+        """
+        Write captured message records for a step.
+
+        Args:
+            session: Session to write to
+            step_id: The pipeline step ID
+            execution_id: The execution ID, or None to resolve it from the step
+            records: PipelineMessage column values, one dict per message
+        """
+        if execution_id is None:
+            step = session.get(PipelineStep, step_id)
+            if not step:
+                self.logger.warning(f"Pipeline step not found for message storage | step_id={step_id}")
+                return
+            execution_id = step.execution_id
+
+        for record in records:
+            session.add(PipelineMessage(step_id=step_id, execution_id=execution_id, **record))
+
+
+def _elapsed_ms(started_at: datetime, ended_at: Optional[datetime] = None) -> int:
+    """
+    Milliseconds elapsed between two timestamps.
+
+    SQLite returns naive datetimes, so compare naive-to-naive in that case.
+
+    Args:
+        started_at: Start timestamp (naive timestamps are assumed to be UTC)
+        ended_at: End timestamp (defaults to now)
+
+    Returns:
+        Elapsed time in milliseconds
+    """
+    ended_at = ended_at or datetime.now(timezone.utc)
+    if started_at.tzinfo is None:
+        ended_at = ended_at.replace(tzinfo=None)
+    return int((ended_at - started_at).total_seconds() * 1000)
@@ -0,0 +1,173 @@
+"""
+Circuit breaker for pipeline tracking writes.
+
+This module stops handlers from calling a tracking database that is failing or
+too slow, so a database brownout degrades observability instead of message
+processing. While the circuit is open, tracking operations are skipped and
+counted; after a cool-down a single probe decides whether to close it again.
+"""
+
+import threading
+import time
+from enum import Enum
+from typing import Any, Callable, Dict, Optional
+
+from ..exceptions import ValidationError
+from ..utils.logger import get_logger
+
+
+class CircuitState(str, Enum):
+    """State of a circuit breaker."""
+
+    CLOSED = "closed"  # Calls pass through
+    OPEN = "open"  # Calls are skipped
+    HALF_OPEN = "half_open"  # One probe call is allowed through
+
+
+class CircuitBreaker:
+    """
+    Thread-safe consecutive-failure circuit breaker.
+
+    A call counts as a failure when it raises or, if latency_threshold_ms is
+    set, when it takes longer than that. The circuit opens after
+    failure_threshold consecutive failures. After reset_timeout seconds the
+    next call is let through as a probe: success closes the circuit, failure
+    opens it again for another reset_timeout.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        latency_threshold_ms: Optional[float] = None,
+        name: str = "tracking",
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initialize a closed circuit breaker.
+
+        Args:
+            failure_threshold: Consecutive failures that open the circuit
+            reset_timeout: Seconds the circuit stays open before a probe is allowed
+            latency_threshold_ms: Calls slower than this count as failures (None to ignore latency)
+            name: Name used in log messages
+            clock: Monotonic clock, replaceable in tests
+
+        Raises:
+            ValidationError: If failure_threshold is less than 1
+        """
+        if failure_threshold < 1:
+            raise ValidationError(f"failure_threshold must be at least 1, got {failure_threshold}", field="failure_threshold")
+
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.latency_threshold_ms = latency_threshold_ms
+        self.name = name
+        self.logger = get_logger()
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = CircuitState.CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._skipped = 0
+        self._open_count = 0
+
+    @property
+    def state(self) -> CircuitState:
+        """Current state, moving from open to half-open once the reset timeout has passed."""
+        with self._lock:
+            if self._state == CircuitState.OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+                self._state = CircuitState.HALF_OPEN
+            return self._state
+
+    def allow(self) -> bool:
+        """
+        Decide whether a call may go through.
+
+        Every call that is allowed must be followed by record_success or
+        record_failure; every refused call is counted as skipped.
+
+        Returns:
+            True if the call should be made
+        """
+        with self._lock:
+            if self._state == CircuitState.OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+                self._state = CircuitState.HALF_OPEN
+
+            if self._state == CircuitState.CLOSED:
+                return True
+            if self._state == CircuitState.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+
+            self._skipped += 1
+            return False
+
+    def record_success(self, duration_ms: Optional[float] = None) -> None:
+        """
+        Record a completed call.
+
+        Args:
+            duration_ms: How long the call took; a call over latency_threshold_ms counts as a failure
+        """
+        if self.latency_threshold_ms is not None and duration_ms is not None and duration_ms > self.latency_threshold_ms:
+            self.record_failure(reason=f"slow call ({duration_ms:.0f}ms)")
+            return
+
+        with self._lock:
+            recovered = self._state != CircuitState.CLOSED
+            self._state = CircuitState.CLOSED
+            self._consecutive_failures = 0
+            self._probe_in_flight = False
+            skipped = self._skipped
+
+        if recovered:
+            self.logger.info(f"Circuit closed | circuit={self.name} | skipped={skipped}")
+
+    def record_failure(self, reason: str = "error") -> None:
+        """
+        Record a failed call.
+
+        Args:
+            reason: Short description of the failure for the log message
+        """
+        with self._lock:
+            self._consecutive_failures += 1
+            probe_failed = self._state == CircuitState.HALF_OPEN
+            self._probe_in_flight = False
+            if not probe_failed and (self._state == CircuitState.OPEN or self._consecutive_failures < self.failure_threshold):
+                return
+            self._state = CircuitState.OPEN
+            self._opened_at = self._clock()
+            self._open_count += 1
+            failures = self._consecutive_failures
+
+        self.logger.warning(
+            f"Circuit opened | circuit={self.name} | reason={reason} | consecutive_failures={failures} | reset_timeout={self.reset_timeout}s"
+        )
+
+    def reset(self) -> None:
+        """Close the circuit and clear its counters."""
+        with self._lock:
+            self._state = CircuitState.CLOSED
+            self._consecutive_failures = 0
+            self._probe_in_flight = False
+            self._skipped = 0
+            self._open_count = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get breaker counters.
+
+        Returns:
+            Dictionary with state, consecutive failures, skipped calls and times opened
+        """
+        state = self.state
+        with self._lock:
+            return {
+                "state": state.value,
+                "consecutive_failures": self._consecutive_failures,
+                "skipped": self._skipped,
+                "open_count": self._open_count,
+            }
@@ -0,0 +1,264 @@
+"""
+Claim-check offload of oversized message payloads.
+
+Azure Storage Queue messages are capped at 64KB. A ClaimCheck writes payloads
+above a size threshold to a BlobStore and sends a reference in the message
+context instead; the receiving handler swaps the reference back for the
+payload, fetching the blob only when the payload is first read, and deletes
+the blob once the message has been processed successfully.
+"""
+
+import json
+import os
+import threading
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Callable, Optional, Union
+from uuid import uuid4
+
+from pydantic_core import to_json
+
+from ..exceptions import ErrorCode, NotFoundError, ServiceError
+from ..utils.logger import get_logger
+from .message import Message
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None  # type: ignore[assignment]
+
+# Message context key holding the blob reference of an offloaded payload
+CLAIM_CHECK_KEY = "claim_check"
+
+# Leaves room under the 64KB queue limit for the envelope and base64 encoding
+DEFAULT_THRESHOLD_BYTES = 48 * 1024
+
+
+class BlobStore(ABC):
+    """Storage for offloaded payloads."""
+
+    @abstractmethod
+    def put(self, key: str, data: bytes) -> str:
+        """
+        Store a payload.
+
+        Args:
+            key: Suggested blob name, unique per offloaded message
+            data: Payload bytes
+
+        Returns:
+            Reference used to fetch or delete the payload
+        """
+        pass
+
+    @abstractmethod
+    def get(self, ref: str) -> bytes:
+        """
+        Fetch a payload.
+
+        Args:
+            ref: Reference returned by put
+
+        Returns:
+            Payload bytes
+
+        Raises:
+            NotFoundError: If no payload is stored under ref
+        """
+        pass
+
+    @abstractmethod
+    def delete(self, ref: str) -> None:
+        """
+        Delete a payload; deleting a missing payload is not an error.
+
+        Args:
+            ref: Reference returned by put
+        """
+        pass
+
+
+class LocalFileBlobStore(BlobStore):
+    """BlobStore keeping payloads as files under a directory, for tests and local runs."""
+
+    def __init__(self, root: Union[str, Path]):
+        """
+        Initialize the store.
+
+        Args:
+            root: Directory holding the payload files (created if missing)
+        """
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, ref: str) -> Path:
+        path = (self.root / ref).resolve()
+        if self.root.resolve() not in path.parents:
+            raise NotFoundError(f"Blob reference escapes the store: {ref}", resource_type="blob")
+        return path
+
+    def put(self, key: str, data: bytes) -> str:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write then rename so readers never see a partial payload
+        tmp_path = path.with_name(f".{path.name}.{threading.get_ident()}.tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+        return key
+
+    def get(self, ref: str) -> bytes:
+        try:
+            return self._path(ref).read_bytes()
+        except FileNotFoundError as e:
+            raise NotFoundError(f"Claim-check payload not found: {ref}", resource_type="blob", cause=e) from e
+
+    def delete(self, ref: str) -> None:
+        self._path(ref).unlink(missing_ok=True)
+
+
+class AzureBlobStore(BlobStore):
+    """BlobStore backed by an Azure Storage blob container (requires azure-storage-blob)."""
+
+    def __init__(self, connection_string: str, container_name: str):
+        """
+        Initialize the store.
+
+        Args:
+            connection_string: Azure Storage connection string
+            container_name: Container holding the payloads; it must already exist
+
+        Raises:
+            ServiceError: If azure-storage-blob is not installed
+        """
+        try:
+            from azure.storage.blob import ContainerClient
+        except ImportError as e:
+            raise ServiceError(
+                "AzureBlobStore requires the azure-storage-blob package", error_code=ErrorCode.CONFIGURATION_ERROR, cause=e
+            ) from e
+
+        self.container = ContainerClient.from_connection_string(conn_str=connection_string, container_name=container_name)
+
+    def put(self, key: str, data: bytes) -> str:
+        self.container.upload_blob(name=key, data=data, overwrite=True)
+        return key
+
+    def get(self, ref: str) -> bytes:
+        from azure.core.exceptions import ResourceNotFoundError
+
+        try:
+            return self.container.download_blob(ref).readall()
+        except ResourceNotFoundError as e:
+            raise NotFoundError(f"Claim-check payload not found: {ref}", resource_type="blob", cause=e) from e
+
+    def delete(self, ref: str) -> None:
+        from azure.core.exceptions import ResourceNotFoundError
+
+        try:
+            self.container.delete_blob(ref)
+        except ResourceNotFoundError:
+            pass
+
+
+class ClaimCheck:
+    """
+    Offloads oversized payloads to a BlobStore and resolves them on receipt.
+
+    The same instance (or one configured with the same store) is passed to the
+    sending QueueOutputHandler and the receiving processor handler.
+    """
+
+    def __init__(
+        self,
+        store: BlobStore,
+        threshold_bytes: int = DEFAULT_THRESHOLD_BYTES,
+        loads: Optional[Callable[[bytes], Any]] = None,
+    ):
+        """
+        Initialize the claim check.
+
+        Args:
+            store: Where offloaded payloads are kept
+            threshold_bytes: Encoded messages larger than this have their payload offloaded
+            loads: JSON parser for fetched payloads (defaults to orjson when installed)
+        """
+        self.store = store
+        self.threshold_bytes = threshold_bytes
+        self.loads = loads or (orjson.loads if orjson is not None else json.loads)
+        self.logger = get_logger()
+
+    def should_offload(self, encoded_size: int) -> bool:
+        """
+        Decide whether a message is too large to send inline.
+
+        Args:
+            encoded_size: Size of the encoded message in bytes
+
+        Returns:
+            True if the payload should be offloaded
+        """
+        return encoded_size > self.threshold_bytes
+
+    def offload(self, message: Message) -> Message:
+        """
+        Store a message's payload and build the message to send in its place.
+
+        Args:
+            message: Message whose payload is offloaded; it is not modified
+
+        Returns:
+            Copy of the message with an empty payload and the blob reference in its context
+        """
+        raw_payload = message.raw_payload
+        data = raw_payload.encode("utf-8") if raw_payload is not None else to_json(message.payload)
+        ref = self.store.put(f"{message.pipeline_id}/{message.message_id}-{uuid4().hex}.json", data)
+
+        self.logger.debug(f"Payload offloaded | message_id={message.message_id} | ref={ref} | size={len(data)}")
+        context = {**message.context, CLAIM_CHECK_KEY: {"ref": ref, "size": len(data)}}
+        return message.model_copy(update={"payload": {}, "context": context})
+
+    def get_reference(self, message: Message) -> Optional[str]:
+        """
+        Get the blob reference of an offloaded message.
+
+        Args:
+            message: Received message
+
+        Returns:
+            The reference, or None if the payload was sent inline
+        """
+        claim = message.context.get(CLAIM_CHECK_KEY)
+        return claim.get("ref") if isinstance(claim, dict) else None
+
+    def resolve(self, message: Message) -> Optional[str]:
+        """
+        Swap a received message's reference for its payload.
+
+        The reference is removed from the message context, so a message that
+        is forwarded unchanged does not point at a blob that will be released.
+        The blob is fetched when the payload is first read, so messages that
+        are skipped (e.g. as duplicates) never download it.
+
+        Args:
+            message: Received message
+
+        Returns:
+            The blob reference to release after successful processing, or None
+            if the payload was sent inline
+        """
+        ref = self.get_reference(message)
+        if ref is None:
+            return None
+        del message.context[CLAIM_CHECK_KEY]
+        message.defer_payload(lambda: self.loads(self.store.get(ref)))
+        return ref
+
+    def release(self, ref: str) -> None:
+        """
+        Delete the blob of a processed message.
+
+        Args:
+            ref: Reference returned by resolve
+        """
+        self.store.delete(ref)
+        self.logger.debug(f"Offloaded payload released | ref={ref}")
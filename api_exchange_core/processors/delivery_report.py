@@ -0,0 +1,131 @@
+"""
+Per-message delivery report for routed output messages.
+
+Output handlers that send messages individually return a DeliveryReport from
+handle_output, recording for each output message whether it was sent, to
+which queue, and why it failed. The processor handler keeps the report on the
+ProcessingResult so pipeline tracking can record the queues that received
+output.
+"""
+
+from enum import Enum
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+
+class DeliveryStatus(str, Enum):
+    """Outcome of routing one output message."""
+
+    SENT = "sent"
+    FAILED = "failed"
+    UNROUTED = "unrouted"  # No queue mapping matched the message
+
+
+class MessageDelivery:
+    """Delivery outcome of a single output message."""
+
+    __slots__ = ("message_id", "queue_name", "status", "error")
+
+    def __init__(self, message_id: str, queue_name: Optional[str], status: DeliveryStatus, error: Optional[str] = None):
+        """
+        Initialize the delivery outcome.
+
+        Args:
+            message_id: ID of the output message
+            queue_name: Queue the message was sent (or bound) to, None if unrouted
+            status: Delivery outcome
+            error: Error message if the send failed
+        """
+        self.message_id = message_id
+        self.queue_name = queue_name
+        self.status = status
+        self.error = error
+
+    @property
+    def sent(self) -> bool:
+        """Whether the message was sent."""
+        return self.status == DeliveryStatus.SENT
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Convert to a JSON-serializable dict.
+
+        Returns:
+            Dict with message_id, queue_name, status and error
+        """
+        return {"message_id": self.message_id, "queue_name": self.queue_name, "status": self.status.value, "error": self.error}
+
+    def __repr__(self) -> str:
+        return f"MessageDelivery(message_id={self.message_id!r}, queue_name={self.queue_name!r}, status={self.status.value!r})"
+
+
+class DeliveryReport:
+    """Delivery outcomes of the output messages of one processing result, in output order."""
+
+    def __init__(self, deliveries: Optional[Iterable[MessageDelivery]] = None):
+        """
+        Initialize the report.
+
+        Args:
+            deliveries: Delivery outcomes to start with
+        """
+        self.deliveries: List[MessageDelivery] = list(deliveries or [])
+
+    def add(self, delivery: MessageDelivery) -> None:
+        """
+        Add a delivery outcome.
+
+        Args:
+            delivery: Outcome to add
+        """
+        self.deliveries.append(delivery)
+
+    @property
+    def sent_count(self) -> int:
+        """Number of messages sent."""
+        return sum(1 for delivery in self.deliveries if delivery.status == DeliveryStatus.SENT)
+
+    @property
+    def failed_count(self) -> int:
+        """Number of messages whose send failed."""
+        return sum(1 for delivery in self.deliveries if delivery.status == DeliveryStatus.FAILED)
+
+    @property
+    def unrouted_count(self) -> int:
+        """Number of messages with no matching queue."""
+        return sum(1 for delivery in self.deliveries if delivery.status == DeliveryStatus.UNROUTED)
+
+    @property
+    def all_sent(self) -> bool:
+        """Whether every message was sent."""
+        return all(delivery.sent for delivery in self.deliveries)
+
+    @property
+    def failures(self) -> List[MessageDelivery]:
+        """Outcomes of the messages that were not sent."""
+        return [delivery for delivery in self.deliveries if not delivery.sent]
+
+    @property
+    def queue_names(self) -> List[str]:
+        """Queues that received at least one message, in first-send order."""
+        return list(dict.fromkeys(delivery.queue_name for delivery in self.deliveries if delivery.sent and delivery.queue_name))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Convert to a JSON-serializable dict.
+
+        Returns:
+            Dict with the counts, the queues sent to and the per-message outcomes
+        """
+        return {
+            "sent_count": self.sent_count,
+            "failed_count": self.failed_count,
+            "unrouted_count": self.unrouted_count,
+            "queue_names": self.queue_names,
+            "deliveries": [delivery.to_dict() for delivery in self.deliveries],
+        }
+
+    def __iter__(self) -> Iterator[MessageDelivery]:
+        return iter(self.deliveries)
+
+    def __len__(self) -> int:
+        return len(self.deliveries)
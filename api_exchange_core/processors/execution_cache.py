@@ -0,0 +1,97 @@
+"""
+In-process cache of pipeline execution ids.
+
+This module provides a bounded LRU map from pipeline_id to PipelineExecution.id
+so a warm handler can count later steps of a pipeline against its execution
+by primary key instead of resolving it through the pipeline_id index again.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+
+class ExecutionIdCache:
+    """
+    Thread-safe, bounded LRU cache of pipeline_id to execution_id.
+
+    Entries are hints only: callers must verify that a cached execution still
+    exists and discard the entry when it does not.
+    """
+
+    def __init__(self, max_size: int = 1024):
+        """
+        Initialize the cache.
+
+        Args:
+            max_size: Maximum number of pipelines remembered (0 disables caching)
+        """
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, pipeline_id: str) -> Optional[str]:
+        """
+        Look up the execution id for a pipeline.
+
+        Args:
+            pipeline_id: The pipeline ID
+
+        Returns:
+            The cached execution id, or None if it is not cached
+        """
+        with self._lock:
+            execution_id = self._entries.get(pipeline_id)
+            if execution_id is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(pipeline_id)
+            self._hits += 1
+            return execution_id
+
+    def put(self, pipeline_id: str, execution_id: str) -> None:
+        """
+        Remember the execution id for a pipeline, evicting the least recently used entry if full.
+
+        Args:
+            pipeline_id: The pipeline ID
+            execution_id: The pipeline's execution ID
+        """
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[pipeline_id] = execution_id
+            self._entries.move_to_end(pipeline_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def discard(self, pipeline_id: str) -> None:
+        """
+        Forget a pipeline's execution id.
+
+        Args:
+            pipeline_id: The pipeline ID
+        """
+        with self._lock:
+            self._entries.pop(pipeline_id, None)
+
+    def clear(self) -> None:
+        """Forget every cached execution id."""
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Get cache counters.
+
+        Returns:
+            Dictionary with size, hits and misses
+        """
+        with self._lock:
+            return {"size": len(self._entries), "hits": self._hits, "misses": self._misses}
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
@@ -0,0 +1,259 @@
+"""
+In-process runner for fused pipeline steps.
+
+This module runs a chain or small DAG of co-located processors in one process,
+passing output messages from step to step in memory instead of through a queue.
+Every step is still processed by a SimpleProcessorHandler, so each one writes
+its own PipelineStep tracking exactly as it would when deployed separately.
+"""
+
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+from ..exceptions import ErrorCode, ValidationError
+from ..utils.logger import get_logger
+from .delivery_report import DeliveryReport
+from .message import Message
+from .output_handlers.base_output_handler import BaseOutputHandler
+from .processing_result import ProcessingResult
+from .simple_processor_handler import SimpleProcessorHandler
+from .simple_processor_interface import SimpleProcessorInterface
+
+
+class FusedStep:
+    """One processor in a fused pipeline and the steps it receives messages from."""
+
+    def __init__(
+        self,
+        name: str,
+        handler: SimpleProcessorHandler,
+        upstream: List[str],
+        output_name: Optional[str] = None,
+    ):
+        """
+        Initialize the step.
+
+        Args:
+            name: Unique step name
+            handler: Handler that processes and tracks the step's messages
+            upstream: Names of the steps whose outputs this step receives
+            output_name: If set, only receive upstream outputs whose "output_name"
+                message context matches
+        """
+        self.name = name
+        self.handler = handler
+        self.upstream = upstream
+        self.output_name = output_name
+        self.downstream: List["FusedStep"] = []
+
+    def accepts(self, message: Message) -> bool:
+        """
+        Check whether an upstream output message is routed to this step.
+
+        Args:
+            message: Output message of an upstream step
+
+        Returns:
+            True if the step should process the message
+        """
+        return self.output_name is None or message.get_context("output_name") == self.output_name
+
+
+class FusedPipelineRunner:
+    """
+    Runs co-located processors in-process, skipping the queue hop between them.
+
+    Steps are added in order; a step may only follow steps that were already
+    added, so the graph is always acyclic and insertion order is a valid run
+    order. A step without upstream steps receives the input message. Outputs of
+    steps that nothing follows, and outputs that no following step accepts,
+    leave the fused segment through output_handler, e.g. a QueueOutputHandler
+    feeding the next deployed processor. Each following step receives its own
+    copy of an output message, so steps cannot see each other's changes.
+
+    Only fuse steps that are cheap and safe to run in the same process: a fused
+    step shares the caller's thread, retries and timeout with its neighbours.
+
+    Example:
+        runner = FusedPipelineRunner(output_handler=queue_handler)
+        runner.add_step("parse", ParseProcessor())
+        runner.add_step("enrich", EnrichProcessor(), after="parse")
+        runner.add_step("audit", AuditProcessor(), after="parse")
+        results = runner.run(message)
+    """
+
+    def __init__(self, output_handler: Optional[BaseOutputHandler] = None, **handler_kwargs: Any):
+        """
+        Initialize an empty fused pipeline.
+
+        Args:
+            output_handler: Handler for the outputs of terminal steps and for outputs no
+                following step accepts; None keeps them only in the returned results
+            **handler_kwargs: SimpleProcessorHandler arguments shared by every step
+                (tracking, storage, retries, timeouts, ...)
+        """
+        self.output_handler = output_handler
+        self.handler_kwargs = handler_kwargs
+        self.steps: Dict[str, FusedStep] = {}
+        self.logger = get_logger()
+
+    @classmethod
+    def chain(
+        cls,
+        processors: Sequence[SimpleProcessorInterface],
+        output_handler: Optional[BaseOutputHandler] = None,
+        **handler_kwargs: Any,
+    ) -> "FusedPipelineRunner":
+        """
+        Create a runner for a linear chain of processors.
+
+        Steps are named after their processors; repeated names get a numeric suffix.
+
+        Args:
+            processors: Processors in pipeline order
+            output_handler: Handler for the outputs of the last processor
+            **handler_kwargs: SimpleProcessorHandler arguments shared by every step
+
+        Returns:
+            FusedPipelineRunner running the processors in sequence
+        """
+        runner = cls(output_handler=output_handler, **handler_kwargs)
+        previous: Optional[str] = None
+        for processor in processors:
+            name = processor.get_processor_name()
+            if name in runner.steps:
+                name = f"{name}_{len(runner.steps)}"
+            runner.add_step(name, processor, after=previous)
+            previous = name
+        return runner
+
+    def add_step(
+        self,
+        name: str,
+        processor: SimpleProcessorInterface,
+        after: Optional[Union[str, Sequence[str]]] = None,
+        output_name: Optional[str] = None,
+    ) -> "FusedPipelineRunner":
+        """
+        Add a processor to the pipeline.
+
+        Args:
+            name: Unique step name
+            processor: The processor to run
+            after: Name(s) of already-added steps whose outputs feed this step;
+                None makes this an entry step receiving the input message
+            output_name: If set, only receive upstream outputs with this "output_name" context
+
+        Returns:
+            The runner, for chaining
+
+        Raises:
+            ValidationError: If the name is taken or an upstream step does not exist
+        """
+        if name in self.steps:
+            raise ValidationError(f"Duplicate fused step name '{name}'", field="name", error_code=ErrorCode.DUPLICATE)
+
+        upstream = [after] if isinstance(after, str) else list(after or [])
+        for upstream_name in upstream:
+            if upstream_name not in self.steps:
+                raise ValidationError(f"Fused step '{name}' follows unknown step '{upstream_name}'; add upstream steps first", field="after")
+
+        step = FusedStep(name, SimpleProcessorHandler(processor, **self.handler_kwargs), upstream, output_name)
+        if self.steps:
+            # Later steps of a pipeline resolve the same execution; share one cache between them
+            step.handler.execution_cache = next(iter(self.steps.values())).handler.execution_cache
+        for upstream_name in upstream:
+            upstream_step = self.steps[upstream_name]
+            upstream_step.downstream.append(step)
+            # An upstream step is no longer terminal: run() passes its outputs on, and routes those no step accepts
+            upstream_step.handler.output_handler = None
+        step.handler.output_handler = self.output_handler
+
+        self.steps[name] = step
+        return self
+
+    def run(self, message: Message, context: Optional[Dict[str, Any]] = None) -> Dict[str, List[ProcessingResult]]:
+        """
+        Run a message through every step of the pipeline.
+
+        All steps share one tracking transaction, committed once at the end,
+        unless tracking is disabled or written behind.
+
+        Args:
+            message: Input message for the entry steps
+            context: Additional processing context shared by all steps
+
+        Returns:
+            Mapping of step name to the results of every message the step processed, in order
+
+        Raises:
+            ValidationError: If the pipeline has no steps
+        """
+        if not self.steps:
+            raise ValidationError("Fused pipeline has no steps", error_code=ErrorCode.CONFIGURATION_ERROR)
+
+        context = context or {}
+        inboxes: Dict[str, List[Message]] = {name: ([message] if not step.upstream else []) for name, step in self.steps.items()}
+        results: Dict[str, List[ProcessingResult]] = {}
+
+        first_handler = next(iter(self.steps.values())).handler
+        with first_handler.tracking_batch() as session:
+            for name, step in self.steps.items():
+                step_messages = inboxes.pop(name)
+                step_results = [step.handler.process_message(step_message, context, session) for step_message in step_messages]
+                results[name] = step_results
+                if not step.downstream:
+                    # Terminal step: its handler already routed the outputs
+                    continue
+
+                for step_message, result in zip(step_messages, step_results):
+                    if not result.success:
+                        continue
+                    unmatched: List[Message] = []
+                    for output_message in result.output_messages:
+                        receivers = [downstream for downstream in step.downstream if downstream.accepts(output_message)]
+                        if not receivers:
+                            unmatched.append(output_message)
+                        for downstream in receivers:
+                            inboxes[downstream.name].append(output_message.model_copy(deep=True))
+                    if unmatched:
+                        self._route_unmatched(name, result, unmatched, step_message, context)
+
+        self.logger.debug(
+            f"Fused pipeline run complete | pipeline_id={message.pipeline_id} | steps={len(results)} | "
+            f"messages={sum(len(step_results) for step_results in results.values())}"
+        )
+        return results
+
+    def _route_unmatched(
+        self,
+        step_name: str,
+        result: ProcessingResult,
+        unmatched: List[Message],
+        source_message: Message,
+        context: Dict[str, Any],
+    ) -> None:
+        """
+        Send the outputs of a non-terminal step that no following step accepts through output_handler.
+
+        Args:
+            step_name: Name of the step that produced the outputs
+            result: The step's result; receives the delivery report
+            unmatched: Outputs no following step accepts
+            source_message: Message the step processed
+            context: Processing context
+        """
+        if self.output_handler is None:
+            self.logger.debug(f"Fused step outputs not routed, no output handler | step={step_name} | messages={len(unmatched)}")
+            return
+
+        try:
+            report = self.output_handler.handle_output(ProcessingResult.success_result(output_messages=unmatched), source_message, context)
+            if isinstance(report, DeliveryReport):
+                result.delivery_report = report
+        except Exception as e:
+            self.logger.error(
+                f"Output routing failed for fused step {step_name}: {str(e)}",
+                extra={"pipeline_id": source_message.pipeline_id, "message_id": source_message.message_id, "error_message": str(e)},
+                exc_info=True,
+            )
+            # Continue - the processing result itself is still valid
@@ -0,0 +1,261 @@
+"""
+Deduplication of redelivered messages.
+
+This module remembers which message ids each processor has already handled
+successfully: an in-process TTL cache answers most lookups, and the
+processed_message table answers the rest, so a message redelivered to another
+worker (or after a restart) is recognised too.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from ..db.db_pipeline_tracking_models import ProcessedMessage
+from .message import Message
+from .processing_result import ProcessingResult, ProcessingStatus
+
+
+class ProcessedMessageRecord:
+    """Outcome recorded for a processed message."""
+
+    __slots__ = ("processor_name", "message_id", "pipeline_id", "tenant_id", "status", "records_processed", "output_count", "processed_at")
+
+    def __init__(
+        self,
+        processor_name: str,
+        message_id: str,
+        pipeline_id: str,
+        tenant_id: Optional[str],
+        status: ProcessingStatus,
+        records_processed: int,
+        output_count: int,
+        processed_at: datetime,
+    ):
+        self.processor_name = processor_name
+        self.message_id = message_id
+        self.pipeline_id = pipeline_id
+        self.tenant_id = tenant_id
+        self.status = ProcessingStatus(status)
+        self.records_processed = records_processed
+        self.output_count = output_count
+        self.processed_at = processed_at
+
+    def to_result(self) -> ProcessingResult:
+        """
+        Build the result returned for a duplicate delivery.
+
+        The result carries no output messages: they were routed when the
+        message was first processed.
+
+        Returns:
+            ProcessingResult with the recorded status, flagged as a duplicate
+        """
+        return ProcessingResult(
+            status=self.status,
+            success=True,
+            records_processed=self.records_processed,
+            processing_duration_ms=0,
+            context={
+                "duplicate": True,
+                "recorded_output_count": self.output_count,
+                "processed_at": self.processed_at.isoformat(),
+            },
+        )
+
+
+class IdempotencyStore:
+    """
+    Remembers processed message ids per processor.
+
+    Only successful results are recorded, so failed messages are reprocessed
+    when the queue redelivers them. Entries expire after ttl_seconds in both
+    the cache and the database; call purge_expired periodically to delete
+    expired rows.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = 86400,
+        max_cached: int = 10000,
+        persistent: bool = True,
+        redelivery_only: bool = False,
+    ):
+        """
+        Initialize the store.
+
+        Args:
+            ttl_seconds: How long a processed message id is remembered
+            max_cached: Maximum number of ids kept in the in-process cache
+            persistent: Whether ids are also recorded in the processed_message table
+            redelivery_only: Only query the database for messages whose processing
+                context reports a dequeue_count above 1; duplicates emitted upstream
+                are then only caught by the in-process cache
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_cached = max_cached
+        self.persistent = persistent
+        self.redelivery_only = redelivery_only
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[ProcessedMessageRecord, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def should_query_database(self, context: Dict[str, Any]) -> bool:
+        """
+        Decide whether a cache miss should be checked against the database.
+
+        Args:
+            context: Processing context of the message
+
+        Returns:
+            True if the processed_message table should be queried
+        """
+        if not self.persistent:
+            return False
+        if not self.redelivery_only:
+            return True
+        return int(context.get("dequeue_count") or 1) > 1
+
+    def get_cached(self, processor_name: str, message_id: str) -> Optional[ProcessedMessageRecord]:
+        """
+        Look up a processed message in the in-process cache.
+
+        Args:
+            processor_name: Name of the processor
+            message_id: The message ID
+
+        Returns:
+            The recorded outcome, or None if it is not cached or has expired
+        """
+        key = (processor_name, message_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] <= time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[0]
+
+    def remember(self, record: ProcessedMessageRecord) -> None:
+        """
+        Add a processed message to the in-process cache.
+
+        Args:
+            record: The recorded outcome
+        """
+        if self.max_cached <= 0:
+            return
+        key = (record.processor_name, record.message_id)
+        with self._lock:
+            self._entries[key] = (record, time.monotonic() + self.ttl_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_cached:
+                self._entries.popitem(last=False)
+
+    def load(self, session: Session, processor_name: str, message_id: str) -> Optional[ProcessedMessageRecord]:
+        """
+        Look up an unexpired processed message in the database and cache it.
+
+        Args:
+            session: Session to read from
+            processor_name: Name of the processor
+            message_id: The message ID
+
+        Returns:
+            The recorded outcome, or None if the message has not been processed
+        """
+        row = session.execute(
+            select(
+                ProcessedMessage.pipeline_id,
+                ProcessedMessage.tenant_id,
+                ProcessedMessage.status,
+                ProcessedMessage.records_processed,
+                ProcessedMessage.output_count,
+                ProcessedMessage.processed_at,
+            ).where(
+                ProcessedMessage.processor_name == processor_name,
+                ProcessedMessage.message_id == message_id,
+                ProcessedMessage.expires_at > datetime.now(timezone.utc),
+            )
+        ).first()
+        if row is None:
+            return None
+
+        record = ProcessedMessageRecord(processor_name, message_id, *row)
+        self.remember(record)
+        return record
+
+    def build_record(self, processor_name: str, message: Message, result: ProcessingResult) -> ProcessedMessageRecord:
+        """
+        Build the record kept for a successfully processed message.
+
+        Args:
+            processor_name: Name of the processor
+            message: The processed message
+            result: Its successful processing result
+
+        Returns:
+            ProcessedMessageRecord for the message
+        """
+        return ProcessedMessageRecord(
+            processor_name=processor_name,
+            message_id=message.message_id,
+            pipeline_id=message.pipeline_id,
+            tenant_id=message.tenant_id,
+            status=result.status,
+            records_processed=result.records_processed,
+            output_count=result.output_count,
+            processed_at=datetime.now(timezone.utc),
+        )
+
+    def expires_at(self, record: ProcessedMessageRecord) -> datetime:
+        """
+        Get when a record stops deduplicating redeliveries.
+
+        Args:
+            record: The recorded outcome
+
+        Returns:
+            Expiry time of the record
+        """
+        return record.processed_at + timedelta(seconds=self.ttl_seconds)
+
+    def purge_expired(self, session: Session) -> int:
+        """
+        Delete expired rows from the processed_message table.
+
+        Args:
+            session: Session to delete from; the caller commits
+
+        Returns:
+            Number of rows deleted
+        """
+        result = session.execute(
+            delete(ProcessedMessage).where(ProcessedMessage.expires_at <= datetime.now(timezone.utc)),
+            execution_options={"synchronize_session": False},
+        )
+        return result.rowcount
+
+    def clear_cache(self) -> None:
+        """Forget every cached message id."""
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Get cache counters.
+
+        Returns:
+            Dictionary with size, hits and misses
+        """
+        with self._lock:
+            return {"size": len(self._entries), "hits": self._hits, "misses": self._misses}
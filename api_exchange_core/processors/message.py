@@ -7,10 +7,13 @@ in the pipeline, with automatic pipeline_id tracking for execution flow.
 
 from datetime import datetime, timezone
 from enum import Enum
-from typing import Any, Dict, Optional
+from functools import partial
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional
 from uuid import uuid4
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
+
+from ..exceptions import ErrorCode, ValidationError
 
 
 class MessageType(str, Enum):
@@ -27,6 +30,11 @@ class Message(BaseModel):
 
     Contains everything needed for pipeline execution tracking and
     data routing between processors.
+
+    A message built with with_deferred_payload keeps its payload as raw JSON
+    until the payload attribute is first read, so steps that only route on the
+    envelope fields never parse it. defer_payload does the same for a payload
+    fetched from elsewhere, such as a claim-check blob store.
     """
 
     message_id: str = Field(default_factory=lambda: str(uuid4()))
@@ -45,6 +53,98 @@ class Message(BaseModel):
     # Processing context
     context: Dict[str, Any] = Field(default_factory=dict)
 
+    # Loader of a deferred payload (and its JSON text, when known), set until the payload is first read
+    _payload_loader: Optional[Callable[[], Any]] = PrivateAttr(default=None)
+    _raw_payload: Optional[str] = PrivateAttr(default=None)
+
+    @classmethod
+    def with_deferred_payload(cls, envelope: Dict[str, Any], raw_payload: str, loads: Callable[[str], Any]) -> "Message":
+        """
+        Create a message whose payload is parsed on first access.
+
+        Args:
+            envelope: Every message field except payload
+            raw_payload: JSON text of the payload object
+            loads: JSON parser used to decode raw_payload
+
+        Returns:
+            New Message instance with a deferred payload
+        """
+        message = cls.model_validate(envelope)
+        message.defer_payload(partial(loads, raw_payload))
+        message._raw_payload = raw_payload
+        return message
+
+    def defer_payload(self, loader: Callable[[], Any]) -> None:
+        """
+        Replace the payload with one produced by loader on first access.
+
+        Args:
+            loader: Zero-argument callable returning the payload dict
+        """
+        self.__dict__.pop("payload", None)
+        self.__pydantic_fields_set__.add("payload")
+        self._payload_loader = loader
+        self._raw_payload = None
+
+    @property
+    def payload_loaded(self) -> bool:
+        """Whether the payload has been decoded."""
+        return "payload" in self.__dict__
+
+    @property
+    def raw_payload(self) -> Optional[str]:
+        """JSON text of a payload that has not been decoded yet, otherwise None."""
+        return None if self.payload_loaded else self._raw_payload
+
+    def load_payload(self) -> Dict[str, Any]:
+        """
+        Decode a deferred payload.
+
+        Returns:
+            The message payload
+
+        Raises:
+            ValidationError: If the deferred payload is not a JSON object
+            Exception: Any error raised by the payload loader
+        """
+        if "payload" in self.__dict__ or self._payload_loader is None:
+            loaded: Dict[str, Any] = self.__dict__["payload"]
+            return loaded
+
+        payload = self._payload_loader()
+        if not isinstance(payload, dict):
+            raise ValidationError(
+                f"Message payload must be a JSON object, got {type(payload).__name__}", field="payload", error_code=ErrorCode.TYPE_MISMATCH
+            )
+        self.__dict__["payload"] = payload
+        self._payload_loader = None
+        self._raw_payload = None
+        return payload
+
+    if not TYPE_CHECKING:
+        # Hidden from type checkers like BaseModel.__getattr__, so payload keeps its declared type
+
+        def __getattr__(self, name: str) -> Any:
+            # Only reached when payload is missing from __dict__, i.e. still deferred
+            if name == "payload":
+                return self.load_payload()
+            return super().__getattr__(name)
+
+    def model_dump(self, **kwargs: Any) -> Dict[str, Any]:
+        self.load_payload()
+        return super().model_dump(**kwargs)
+
+    def model_dump_json(self, **kwargs: Any) -> str:
+        self.load_payload()
+        return super().model_dump_json(**kwargs)
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, Message):
+            self.load_payload()
+            other.load_payload()
+        return super().__eq__(other)
+
     @classmethod
     def create_simple_message(
         cls,
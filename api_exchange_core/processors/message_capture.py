@@ -0,0 +1,113 @@
+"""
+Message capture policy for pipeline message storage.
+
+This module decides which messages are written to pipeline_message when
+message storage is enabled, and caps how much of each message is kept.
+"""
+
+import json
+import zlib
+from typing import Any, Dict, Optional, Tuple
+
+from ..exceptions import ValidationError
+from .message import Message
+
+
+class MessageCapturePolicy:
+    """
+    Controls sampling and size of captured pipeline messages.
+
+    Sampling is deterministic per pipeline_id, so a sampled pipeline has its
+    messages captured at every step rather than a random subset of steps.
+    """
+
+    def __init__(
+        self,
+        sample_rate: float = 1.0,
+        tenant_sample_rates: Optional[Dict[str, float]] = None,
+        max_payload_bytes: Optional[int] = None,
+        failures_only: bool = False,
+    ):
+        """
+        Initialize the capture policy.
+
+        Args:
+            sample_rate: Fraction of pipelines to capture, from 0.0 to 1.0
+            tenant_sample_rates: Per-tenant sample rates overriding sample_rate
+            max_payload_bytes: Maximum serialized size kept per message; larger messages are truncated
+            failures_only: Only capture messages for steps that fail
+        """
+        self.sample_rate = _validate_rate(sample_rate)
+        self.tenant_sample_rates = {tenant: _validate_rate(rate) for tenant, rate in (tenant_sample_rates or {}).items()}
+        self.max_payload_bytes = max_payload_bytes
+        self.failures_only = failures_only
+
+    def should_capture(self, message: Message, success: Optional[bool] = None) -> bool:
+        """
+        Decide whether to capture messages for a step.
+
+        Args:
+            message: Message being processed
+            success: Outcome of the step, or None if it is not known yet
+
+        Returns:
+            True if the message should be stored
+        """
+        if self.failures_only and success is not False:
+            return False
+        return self.is_sampled(message)
+
+    def is_sampled(self, message: Message) -> bool:
+        """
+        Check whether a message's pipeline falls within the sample.
+
+        Args:
+            message: Message being processed
+
+        Returns:
+            True if the pipeline is sampled for capture
+        """
+        rate = self.tenant_sample_rates.get(message.tenant_id, self.sample_rate) if message.tenant_id else self.sample_rate
+        if rate >= 1.0:
+            return True
+        if rate <= 0.0:
+            return False
+        key = message.pipeline_id or message.message_id
+        return zlib.crc32(key.encode("utf-8")) / 0xFFFFFFFF < rate
+
+    def fit_payload(self, message_data: Dict[str, Any]) -> Tuple[Dict[str, Any], Optional[int], bool]:
+        """
+        Measure a message record and truncate it if it exceeds the size cap.
+
+        Without a size cap the record is stored as is and not serialized here.
+        With one, it is serialized once; the same encoding provides both the
+        size and the preview kept for truncated messages.
+
+        Args:
+            message_data: Sanitized message record
+
+        Returns:
+            Tuple of (payload to store, serialized size in bytes or None if there
+            is no size cap, whether it was truncated)
+        """
+        if self.max_payload_bytes is None:
+            return message_data, None, False
+
+        encoded = json.dumps(message_data, default=str).encode("utf-8")
+        size = len(encoded)
+        if size <= self.max_payload_bytes:
+            return message_data, size, False
+
+        truncated = {
+            "message_id": message_data.get("message_id"),
+            "truncated": True,
+            "original_size_bytes": size,
+            "preview": encoded[: self.max_payload_bytes].decode("utf-8", errors="ignore"),
+        }
+        return truncated, size, True
+
+
+def _validate_rate(rate: float) -> float:
+    if not 0.0 <= rate <= 1.0:
+        raise ValidationError(f"Sample rate must be between 0.0 and 1.0, got {rate}", field="sample_rate")
+    return float(rate)
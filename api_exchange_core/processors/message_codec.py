@@ -0,0 +1,451 @@
+"""
+Wire codec for pipeline messages and processing results.
+
+This module serializes Message and ProcessingResult models to tagged JSON and
+back. Encoding always uses pydantic's serializer, which is a single pass over
+the model; decoding uses orjson when it is installed (the "orjson" extra:
+pip install api_exchange_core[orjson]) and pydantic's JSON validator
+otherwise. Every encoded document starts with a "_format" tag naming the model
+and wire version, so consumers can decode either model from the same queue. Untagged JSON (from older producers) and bodies wrapped in a queue
+compression envelope (see queue_utils.compress_message_body) are accepted too.
+
+Message documents carry their payload as the last member, so decode can build
+a Message from the envelope fields alone and leave the payload undecoded until
+it is first read (see Message.with_deferred_payload). Documents from other
+producers that may have members after the payload are decoded eagerly.
+
+Several small Message documents can be packed into one batch document (see
+encode_batch) so they travel in a single queue message; decode_messages turns
+either kind of document back into Messages.
+
+See benchmarks/message_codec_benchmark.py for throughput numbers.
+"""
+
+import json
+from abc import ABC, abstractmethod
+from enum import Enum
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Type, Union
+
+from pydantic import BaseModel
+from pydantic_core import to_json
+
+from ..exceptions import ErrorCode, ServiceError, ValidationError
+from ..utils.queue_utils import decompress_message_body
+from .message import Message
+from .processing_result import ProcessingResult
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None  # type: ignore[assignment]
+
+# Key of the format tag, written as the first member of every encoded document
+FORMAT_KEY = "_format"
+
+_FORMAT_PREFIX = b'{"' + FORMAT_KEY.encode("ascii") + b'":"'
+
+_PAYLOAD_SEPARATOR = b',"payload":'
+
+# Stdlib scanner used to read envelope members one at a time. These are json
+# module internals, unchanged since Python 2.7; should an interpreter lack
+# them, lazy payload decoding is turned off and every Message is decoded eagerly.
+_scan_value: Optional[Callable[[str, int], Tuple[Any, int]]] = getattr(json.JSONDecoder(), "scan_once", None)
+_scanstring: Optional[Callable[[str, int], Tuple[str, int]]] = getattr(json.decoder, "scanstring", None)
+_WHITESPACE: Any = getattr(json.decoder, "WHITESPACE", None)
+_SPACE = " \t\n\r"
+
+# Message fields that encode() writes before the payload
+_ENVELOPE_FIELDS = frozenset(Message.model_fields) - {"payload"}
+
+# Smaller Message documents are decoded eagerly: splitting off the payload costs
+# more than parsing it
+LAZY_PAYLOAD_MIN_BYTES = 2048
+
+Codable = Union[Message, ProcessingResult]
+
+
+class CodecFormat(str, Enum):
+    """Model and wire version of an encoded document."""
+
+    MESSAGE = "message/json;v=1"
+    PROCESSING_RESULT = "processing_result/json;v=1"
+    MESSAGE_BATCH = "message_batch/json;v=1"
+
+
+_FORMAT_MODELS: Dict[CodecFormat, Type[BaseModel]] = {
+    CodecFormat.MESSAGE: Message,
+    CodecFormat.PROCESSING_RESULT: ProcessingResult,
+}
+
+_BATCH_PREFIX = '{"' + FORMAT_KEY + '":"' + CodecFormat.MESSAGE_BATCH.value + '","messages":['
+_BATCH_SUFFIX = "]}"
+
+# Bytes a batch document adds around its packed Message documents, excluding the separating commas
+BATCH_OVERHEAD_BYTES = len(_BATCH_PREFIX) + len(_BATCH_SUFFIX)
+
+
+class JsonBackend(ABC):
+    """JSON implementation used by MessageCodec."""
+
+    name = "abstract"
+
+    def dump_model(self, model: BaseModel) -> bytes:
+        """
+        Serialize a model to JSON.
+
+        Pydantic's serializer is used by every backend: it was measured faster
+        than model_dump() followed by a JSON library for all payload sizes.
+
+        Args:
+            model: Model to serialize
+
+        Returns:
+            UTF-8 encoded JSON object
+        """
+        return model.model_dump_json().encode("utf-8")
+
+    @abstractmethod
+    def loads(self, data: Union[bytes, str]) -> Any:
+        """
+        Parse a JSON document.
+
+        Args:
+            data: JSON text or UTF-8 encoded JSON
+
+        Returns:
+            The parsed value
+        """
+        pass
+
+    @abstractmethod
+    def load_model(self, data: bytes, model_cls: Type[BaseModel]) -> BaseModel:
+        """
+        Parse and validate a JSON object as a model.
+
+        Unknown members, including the format tag, are ignored.
+
+        Args:
+            data: UTF-8 encoded JSON object
+            model_cls: Model class to validate against
+
+        Returns:
+            The validated model
+        """
+        pass
+
+
+class PydanticJsonBackend(JsonBackend):
+    """Backend using only pydantic and the standard library."""
+
+    name = "pydantic"
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return json.loads(data)
+
+    def load_model(self, data: bytes, model_cls: Type[BaseModel]) -> BaseModel:
+        return model_cls.model_validate_json(data)
+
+
+class OrjsonBackend(JsonBackend):
+    """Backend parsing with orjson, then validating the parsed data."""
+
+    name = "orjson"
+
+    def __init__(self):
+        """
+        Initialize the backend.
+
+        Raises:
+            ServiceError: If orjson is not installed
+        """
+        if orjson is None:
+            raise ServiceError("orjson is not installed", error_code=ErrorCode.CONFIGURATION_ERROR)
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return orjson.loads(data)
+
+    def load_model(self, data: bytes, model_cls: Type[BaseModel]) -> BaseModel:
+        return model_cls.model_validate(orjson.loads(data))
+
+
+def get_default_backend() -> JsonBackend:
+    """
+    Get the fastest installed JSON backend.
+
+    Returns:
+        OrjsonBackend if orjson is installed, otherwise PydanticJsonBackend
+    """
+    return OrjsonBackend() if orjson is not None else PydanticJsonBackend()
+
+
+class MessageCodec:
+    """Encodes and decodes Message and ProcessingResult documents."""
+
+    def __init__(self, backend: Optional[JsonBackend] = None):
+        """
+        Initialize the codec.
+
+        Args:
+            backend: JSON backend (defaults to get_default_backend())
+        """
+        self.backend = backend or get_default_backend()
+
+    def encode(self, model: Codable) -> bytes:
+        """
+        Serialize a model to tagged JSON.
+
+        Args:
+            model: Message or ProcessingResult to serialize
+
+        Returns:
+            UTF-8 encoded JSON object with the format tag as its first member
+
+        Raises:
+            ValidationError: If the model is not a Message or ProcessingResult
+        """
+        if isinstance(model, Message):
+            tag = _FORMAT_PREFIX + CodecFormat.MESSAGE.value.encode("ascii") + b'",'
+            # Envelope fields first and payload last, so decode can stop before the payload
+            envelope = BaseModel.model_dump_json(model, exclude={"payload"}).encode("utf-8")
+            raw_payload = model.raw_payload
+            payload = raw_payload.encode("utf-8") if raw_payload is not None else to_json(model.payload)
+            return tag + envelope[1:-1] + _PAYLOAD_SEPARATOR + payload + b"}"
+
+        if not isinstance(model, ProcessingResult):
+            raise ValidationError(f"Cannot encode {type(model).__name__}, expected Message or ProcessingResult", error_code=ErrorCode.TYPE_MISMATCH)
+
+        body = self.backend.dump_model(model)
+        # Splice the tag into the serialized object instead of re-serializing a copy
+        tag = _FORMAT_PREFIX + CodecFormat.PROCESSING_RESULT.value.encode("ascii") + b'"'
+        return tag + (b"}" if body == b"{}" else b"," + body[1:])
+
+    def encode_text(self, model: Codable) -> str:
+        """
+        Serialize a model to tagged JSON text, e.g. for a queue message body.
+
+        Args:
+            model: Message or ProcessingResult to serialize
+
+        Returns:
+            JSON text with the format tag as its first member
+        """
+        return self.encode(model).decode("utf-8")
+
+    def decode(self, data: Union[bytes, str], default_model: Type[BaseModel] = Message, lazy_payload: bool = False) -> Codable:
+        """
+        Deserialize a tagged or untagged JSON document.
+
+        Args:
+            data: Encoded document
+            default_model: Model used for documents without a format tag
+            lazy_payload: Defer decoding a tagged Message's payload until it is
+                first read; other documents, and Messages under
+                LAZY_PAYLOAD_MIN_BYTES, are decoded eagerly
+
+        Returns:
+            The decoded Message or ProcessingResult
+
+        Raises:
+            ValidationError: If the format tag is unknown or the document is a message batch
+            ValueError: If the document is not valid JSON for the model (raised by the backend)
+        """
+        data = decompress_message_body(data)
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+
+        codec_format = self.read_format(data)
+        if codec_format == CodecFormat.MESSAGE_BATCH:
+            raise ValidationError("Cannot decode a message batch as one document, use decode_messages", error_code=ErrorCode.INVALID_FORMAT)
+        if lazy_payload and codec_format == CodecFormat.MESSAGE and len(data) >= LAZY_PAYLOAD_MIN_BYTES:
+            return self.decode_envelope(data)
+
+        model_cls = _FORMAT_MODELS[codec_format] if codec_format is not None else default_model
+        return self.backend.load_model(data, model_cls)  # type: ignore[return-value]
+
+    def encode_batch(self, documents: Sequence[str]) -> str:
+        """
+        Pack encoded Message documents into one batch document.
+
+        The documents are embedded as-is, so packing costs no re-serialization.
+        The batch is BATCH_OVERHEAD_BYTES plus the documents and one comma
+        between each pair of them.
+
+        Args:
+            documents: Message documents from encode_text
+
+        Returns:
+            Batch document text
+        """
+        return _BATCH_PREFIX + ",".join(documents) + _BATCH_SUFFIX
+
+    def decode_messages(self, data: Union[bytes, str], lazy_payload: bool = False) -> List[Message]:
+        """
+        Deserialize a queue message body holding one Message or a packed batch.
+
+        Args:
+            data: Message document or batch document from encode_batch
+            lazy_payload: Defer decoding the payload of a single large Message (see decode);
+                Messages in a batch are small and decoded eagerly
+
+        Returns:
+            The decoded Messages, in packing order
+
+        Raises:
+            ValidationError: If the body holds a ProcessingResult or an invalid batch
+            ValueError: If the body is not valid JSON for a Message (raised by the backend)
+        """
+        data = decompress_message_body(data)
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+
+        if self.read_format(data) != CodecFormat.MESSAGE_BATCH:
+            message = self.decode(data, lazy_payload=lazy_payload)
+            if not isinstance(message, Message):
+                raise ValidationError(f"Expected a Message document, got {type(message).__name__}", error_code=ErrorCode.TYPE_MISMATCH)
+            return [message]
+
+        documents = self.backend.loads(data).get("messages")
+        if not isinstance(documents, list):
+            raise ValidationError("Invalid message batch: 'messages' must be a list", field="messages", error_code=ErrorCode.INVALID_FORMAT)
+        return [Message.model_validate(document) for document in documents]
+
+    def decode_envelope(self, data: Union[bytes, str]) -> Message:
+        """
+        Deserialize a tagged Message, leaving its payload undecoded.
+
+        Only the envelope fields (ids, tenant, context, ...) are parsed and
+        validated here; the payload is parsed by the backend on first access.
+        A document whose payload may not be its last member is decoded eagerly.
+
+        Args:
+            data: Message document written by encode()
+
+        Returns:
+            Message with a deferred payload
+
+        Raises:
+            ValidationError: If the document is invalid
+        """
+        data = decompress_message_body(data)
+        text = data.decode("utf-8") if isinstance(data, bytes) else data
+        split = _split_payload(text)
+        if split is None:
+            return self.backend.load_model(text.encode("utf-8"), Message)  # type: ignore[return-value]
+        envelope, raw_payload = split
+        if raw_payload is None:
+            return Message.model_validate(envelope)
+        return Message.with_deferred_payload(envelope, raw_payload, self.backend.loads)
+
+    def read_format(self, data: bytes) -> Optional[CodecFormat]:
+        """
+        Read the format tag of an encoded document.
+
+        Args:
+            data: Encoded document
+
+        Returns:
+            The document's format, or None if it is untagged
+
+        Raises:
+            ValidationError: If the format tag is unknown
+        """
+        tag: Optional[str]
+        if data.startswith(_FORMAT_PREFIX):
+            end = data.find(b'"', len(_FORMAT_PREFIX))
+            tag = data[len(_FORMAT_PREFIX) : end].decode("ascii")
+        elif b'"' + FORMAT_KEY.encode("ascii") + b'"' in data:
+            # Tagged by another producer, not in first position
+            parsed = self.backend.loads(data)
+            tag = parsed.get(FORMAT_KEY) if isinstance(parsed, dict) else None
+            if tag is None:
+                return None
+        else:
+            return None
+
+        try:
+            return CodecFormat(tag)
+        except ValueError:
+            raise ValidationError(f"Unknown codec format '{tag}'", field=FORMAT_KEY, error_code=ErrorCode.INVALID_FORMAT) from None
+
+
+def _split_payload(text: str) -> Optional[Tuple[Dict[str, Any], Optional[str]]]:
+    """
+    Parse the members of a Message document that precede its payload.
+
+    Members are read with the stdlib's C scanner; whitespace is only skipped
+    where present, since encode() writes none. The payload is only split off
+    when every other Message field precedes it, as encode() writes them, and
+    it is followed by nothing but the closing brace; otherwise members after
+    it could be folded into the payload text.
+
+    Args:
+        text: Message document
+
+    Returns:
+        Tuple of (envelope members, payload JSON text or None if there is no payload),
+        or None if the payload cannot be split off (or the stdlib scanner is unavailable)
+        and the document must be decoded whole
+
+    Raises:
+        ValidationError: If the document is not a JSON object
+    """
+    scan_value, scanstring = _scan_value, _scanstring
+    if scan_value is None or scanstring is None or _WHITESPACE is None:
+        return None
+
+    skip = _WHITESPACE.match
+    envelope: Dict[str, Any] = {}
+    try:
+        end = skip(text, 0).end()
+        if text[end] != "{":
+            raise ValidationError("Invalid message document: expected a JSON object", error_code=ErrorCode.INVALID_FORMAT)
+        end += 1
+        while True:
+            if text[end] in _SPACE:
+                end = skip(text, end).end()
+            if text[end] == ",":
+                end += 1
+                if text[end] in _SPACE:
+                    end = skip(text, end).end()
+            if text[end] == "}":
+                return envelope, None
+            if text[end] != '"':
+                raise ValidationError(f"Invalid message document: expected a member name at position {end}", error_code=ErrorCode.INVALID_FORMAT)
+            key, end = scanstring(text, end + 1)
+            if text[end] in _SPACE:
+                end = skip(text, end).end()
+            if text[end] != ":":
+                raise ValidationError(f"Invalid message document: expected ':' at position {end}", error_code=ErrorCode.INVALID_FORMAT)
+            end += 1
+            if text[end] in _SPACE:
+                end = skip(text, end).end()
+            if key == "payload":
+                raw_payload = text[end:].rstrip()
+                if not raw_payload.endswith("}"):
+                    raise ValidationError("Invalid message document: unterminated JSON object", error_code=ErrorCode.INVALID_FORMAT)
+                raw_payload = raw_payload[:-1].rstrip()
+                if not _ENVELOPE_FIELDS.issubset(envelope) or not raw_payload.endswith("}"):
+                    return None
+                return envelope, raw_payload
+            envelope[key], end = scan_value(text, end)
+    except StopIteration as e:
+        raise ValidationError(f"Invalid message document: expected a value at position {e.value}", error_code=ErrorCode.INVALID_FORMAT) from None
+    except (IndexError, ValueError) as e:
+        # Truncated text, or a malformed string or value reported by the stdlib scanner
+        raise ValidationError(f"Invalid message document: {e}", error_code=ErrorCode.INVALID_FORMAT, cause=e) from e
+
+
+_default_codec: Optional[MessageCodec] = None
+
+
+def get_message_codec() -> MessageCodec:
+    """
+    Get the process-wide codec using the default backend.
+
+    Returns:
+        The default MessageCodec
+    """
+    global _default_codec
+    if _default_codec is None:
+        _default_codec = MessageCodec()
+    return _default_codec
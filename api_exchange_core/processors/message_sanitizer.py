@@ -0,0 +1,180 @@
+"""
+Compiled sanitization of captured pipeline messages.
+
+This module turns message sanitization rules into a path trie once, then
+applies it to message data copy-on-write: only the containers on the path to
+a sanitized field are copied, everything else is shared with the input.
+"""
+
+import hashlib
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from ..exceptions import ErrorCode, ValidationError
+
+# Path segment matching every key of a dict or every item of a list
+WILDCARD = "*"
+
+MASK_VALUE = "***MASKED***"
+
+SANITIZATION_ACTIONS = ("mask", "remove", "hash")
+
+# Longest key blake2b accepts
+MAX_HASH_KEY_BYTES = hashlib.blake2b.MAX_KEY_SIZE
+
+# Marker returned for a field that a "remove" rule deleted
+_REMOVED = object()
+
+
+class _RuleNode:
+    """One segment of the compiled rule trie."""
+
+    __slots__ = ("children", "action")
+
+    def __init__(self) -> None:
+        self.children: Dict[str, "_RuleNode"] = {}
+        self.action: Optional[str] = None
+
+
+class MessageSanitizer:
+    """
+    Applies sanitization rules to message data.
+
+    Rules map dot-separated field paths to an action ("mask", "remove" or "hash").
+    A path segment may be a dict key, a list index, or "*" to match every key or
+    list item, e.g. "payload.customers.*.ssn" or "payload.cards.0.number".
+    """
+
+    def __init__(self, rules: Optional[Dict[str, str]] = None, hash_key: Optional[Union[str, bytes]] = None):
+        """
+        Compile sanitization rules.
+
+        Args:
+            rules: Mapping of field path to action
+            hash_key: Secret key for the "hash" action, at most 64 bytes; digests are
+                stable across processes and hosts for the same key
+
+        Raises:
+            ValidationError: If a rule has an unknown action or an empty path segment, or if
+                a "hash" rule is given without a key or with a key longer than 64 bytes
+        """
+        self.rules = dict(rules or {})
+        self._hash_key = hash_key.encode("utf-8") if isinstance(hash_key, str) else (hash_key or b"")
+        self._root = _RuleNode()
+        for field_path, action in self.rules.items():
+            self._add_rule(field_path, action)
+
+        if "hash" in self.rules.values():
+            # An unkeyed digest of a low-entropy field (SSN, card number) can be reversed by enumeration
+            if not self._hash_key:
+                raise ValidationError(
+                    "Sanitization rules use the 'hash' action but no hash key is configured",
+                    field="sanitization_hash_key",
+                    error_code=ErrorCode.MISSING_REQUIRED,
+                )
+            if len(self._hash_key) > MAX_HASH_KEY_BYTES:
+                raise ValidationError(
+                    f"Sanitization hash key is {len(self._hash_key)} bytes, the maximum is {MAX_HASH_KEY_BYTES}",
+                    field="sanitization_hash_key",
+                    error_code=ErrorCode.CONSTRAINT_VIOLATION,
+                )
+
+    def __bool__(self) -> bool:
+        return bool(self.rules)
+
+    def sanitize(self, data: Dict[str, Any]) -> Tuple[Dict[str, Any], bool]:
+        """
+        Sanitize message data without modifying it.
+
+        Args:
+            data: Message data to sanitize
+
+        Returns:
+            Tuple of (sanitized data, whether any rule matched). The sanitized data
+            is the input object itself when nothing matched; otherwise it shares
+            every unmodified branch with the input.
+        """
+        if not self.rules:
+            return data, False
+        sanitized = self._apply(self._root, data)
+        return sanitized, sanitized is not data
+
+    def digest(self, value: Any) -> str:
+        """
+        Compute the keyed digest used by the "hash" action.
+
+        Args:
+            value: Field value to digest
+
+        Returns:
+            Masked digest string
+        """
+        digest = hashlib.blake2b(str(value).encode("utf-8"), digest_size=16, key=self._hash_key).hexdigest()
+        return f"***HASH:{digest}***"
+
+    def _add_rule(self, field_path: str, action: str) -> None:
+        if action not in SANITIZATION_ACTIONS:
+            raise ValidationError(
+                f"Unknown sanitization action '{action}' for '{field_path}', expected one of {SANITIZATION_ACTIONS}", field=field_path
+            )
+
+        node = self._root
+        for segment in field_path.split("."):
+            if not segment:
+                raise ValidationError(f"Empty path segment in sanitization rule '{field_path}'", field=field_path)
+            node = node.children.setdefault(segment, _RuleNode())
+        node.action = action
+
+    def _apply(self, node: _RuleNode, value: Any) -> Any:
+        """Apply a trie node's children to a value, copying only what changes."""
+        if isinstance(value, dict):
+            return self._apply_to_dict(node, value)
+        if isinstance(value, list):
+            return self._apply_to_list(node, value)
+        return value
+
+    def _apply_to_dict(self, node: _RuleNode, value: Dict[str, Any]) -> Dict[str, Any]:
+        result = value
+        wildcard = node.children.get(WILDCARD)
+        keys = value.keys() if wildcard is not None else [key for key in node.children if key in value]
+
+        for key in list(keys):
+            new_item = self._apply_matches(node.children.get(key), wildcard, value[key])
+            if new_item is value[key]:
+                continue
+            if result is value:
+                result = dict(value)
+            if new_item is _REMOVED:
+                del result[key]
+            else:
+                result[key] = new_item
+        return result
+
+    def _apply_to_list(self, node: _RuleNode, value: List[Any]) -> List[Any]:
+        wildcard = node.children.get(WILDCARD)
+        if wildcard is not None:
+            indexes = range(len(value))
+        else:
+            indexes = [int(key) for key in node.children if key.isdigit() and int(key) < len(value)]
+
+        replacements: Dict[int, Any] = {}
+        for index in indexes:
+            new_item = self._apply_matches(node.children.get(str(index)), wildcard, value[index])
+            if new_item is not value[index]:
+                replacements[index] = new_item
+
+        if not replacements:
+            return value
+        return [replacements.get(index, item) for index, item in enumerate(value) if replacements.get(index) is not _REMOVED]
+
+    def _apply_matches(self, exact: Optional[_RuleNode], wildcard: Optional[_RuleNode], item: Any) -> Any:
+        """Apply the exact-segment node, then the wildcard node, to one field."""
+        for match in (exact, wildcard):
+            if match is None:
+                continue
+            if match.action is not None:
+                if match.action == "remove":
+                    return _REMOVED
+                # Masking/hashing the whole field makes any deeper rules moot
+                return MASK_VALUE if match.action == "mask" else self.digest(item)
+            item = self._apply(match, item)
+        return item
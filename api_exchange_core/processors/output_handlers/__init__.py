@@ -2,8 +2,11 @@
 
 from .no_op_output_handler import NoOpOutputHandler
 from .queue_output_handler import QueueOutputHandler
+from .service_bus_output_handler import FakeServiceBusSender, ServiceBusOutputHandler
 
 __all__ = [
     "NoOpOutputHandler",
     "QueueOutputHandler",
+    "ServiceBusOutputHandler",
+    "FakeServiceBusSender",
 ]
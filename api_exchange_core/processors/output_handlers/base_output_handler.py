@@ -6,8 +6,9 @@ output handlers must implement.
 """
 
 from abc import ABC, abstractmethod
-from typing import Any, Dict
+from typing import Any, Dict, Iterable, List, Optional
 
+from ..delivery_report import DeliveryReport
 from ..message import Message
 from ..processing_result import ProcessingResult
 
@@ -20,7 +21,7 @@ class BaseOutputHandler(ABC):
     """
 
     @abstractmethod
-    def handle_output(self, result: ProcessingResult, source_message: Message, context: Dict[str, Any]) -> None:
+    def handle_output(self, result: ProcessingResult, source_message: Message, context: Dict[str, Any]) -> Optional[DeliveryReport]:
         """
         Handle output messages from processing results.
 
@@ -28,9 +29,55 @@ class BaseOutputHandler(ABC):
             result: Processing result with output messages
             source_message: Original message that was processed
             context: Processing context
+
+        Returns:
+            Per-message delivery report, or None if the handler does not report delivery
         """
         pass
 
+    def handle_output_stream(
+        self,
+        output_messages: Iterable[Message],
+        source_message: Message,
+        context: Dict[str, Any],
+        chunk_size: int = 100,
+    ) -> Optional[DeliveryReport]:
+        """
+        Handle lazily produced output messages.
+
+        The default implementation passes the stream to handle_output in chunks,
+        so at most chunk_size messages are held at once. Handlers that can send
+        one message at a time should override this.
+
+        Args:
+            output_messages: Output messages, consumed once
+            source_message: Original message that was processed
+            context: Processing context
+            chunk_size: Maximum number of messages handled per handle_output call
+
+        Returns:
+            Delivery report of every streamed message, or None if handle_output does not report delivery
+        """
+        report: Optional[DeliveryReport] = DeliveryReport()
+
+        def handle(chunk: List[Message]) -> None:
+            nonlocal report
+            chunk_report = self.handle_output(ProcessingResult.success_result(output_messages=chunk), source_message, context)
+            if report is not None and isinstance(chunk_report, DeliveryReport):
+                report.deliveries.extend(chunk_report.deliveries)
+            else:
+                report = None
+
+        chunk: List[Message] = []
+        for output_message in output_messages:
+            chunk.append(output_message)
+            if len(chunk) >= chunk_size:
+                handle(chunk)
+                chunk = []
+        if chunk:
+            handle(chunk)
+        return report
+
     @abstractmethod
     def get_handler_name(self) -> str:
         """
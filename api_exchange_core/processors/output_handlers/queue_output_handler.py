@@ -5,21 +5,61 @@ This handler takes processing results and sends output messages
 to configured Azure Storage Queues.
 """
 
-from typing import Any, Dict, Optional
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from functools import partial
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
 
+from ...exceptions import ValidationError
 from ...utils.logger import get_logger
-from ...utils.queue_utils import send_message_to_queue_direct
+from ...utils.queue_utils import DEFAULT_COMPRESSION_MIN_BYTES, QueueCompression, compress_message_body, send_message_to_queue_direct
+from ..claim_check import ClaimCheck
+from ..delivery_report import DeliveryReport, DeliveryStatus, MessageDelivery
 from ..message import Message
+from ..message_codec import BATCH_OVERHEAD_BYTES, MessageCodec, get_message_codec
 from ..processing_result import ProcessingResult
 from .base_output_handler import BaseOutputHandler
 
+# Leaves room under the 64KB queue limit for base64 encoding, like the claim-check threshold
+DEFAULT_MAX_PACKED_BYTES = 48 * 1024
+
+# Delivery outcomes of one queue send, keyed by the position of each message in the output
+_Outcomes = List[Tuple[int, MessageDelivery]]
+
+
+class _PackedBatch:
+    """Encoded messages waiting to be packed into one queue message."""
+
+    __slots__ = ("indexes", "messages", "documents", "size")
+
+    def __init__(self) -> None:
+        self.indexes: List[int] = []
+        self.messages: List[Message] = []
+        self.documents: List[str] = []
+        self.size = BATCH_OVERHEAD_BYTES
+
+    def add(self, index: int, message: Message, document: str, document_size: int) -> None:
+        if self.documents:
+            self.size += 1  # separating comma
+        self.indexes.append(index)
+        self.messages.append(message)
+        self.documents.append(document)
+        self.size += document_size
+
 
 class QueueOutputHandler(BaseOutputHandler):
     """
     Output handler that routes messages to Azure Storage Queues.
 
     This handler takes output messages from processing results
-    and sends them to the configured output queues.
+    and sends them to the configured output queues. With max_concurrent_sends
+    above 1, sends overlap on a thread pool owned by the handler; queue clients
+    are shared and thread-safe, so each worker reuses their connections.
+
+    With pack_messages, small messages bound for the same queue are packed into
+    one queue message of up to max_packed_bytes, cutting the number of queue
+    transactions; receivers unpack them with MessageCodec.decode_messages (see
+    SimpleProcessorHandler.process_queue_message).
     """
 
     def __init__(
@@ -27,6 +67,13 @@ class QueueOutputHandler(BaseOutputHandler):
         queue_mappings: Dict[str, str],
         connection_string: str,
         default_queue: Optional[str] = None,
+        codec: Optional[MessageCodec] = None,
+        claim_check: Optional[ClaimCheck] = None,
+        compression: QueueCompression = QueueCompression.NONE,
+        compression_min_bytes: int = DEFAULT_COMPRESSION_MIN_BYTES,
+        max_concurrent_sends: int = 1,
+        pack_messages: bool = False,
+        max_packed_bytes: int = DEFAULT_MAX_PACKED_BYTES,
     ):
         """
         Initialize the queue output handler.
@@ -35,23 +82,52 @@ class QueueOutputHandler(BaseOutputHandler):
             queue_mappings: Map of output_name -> queue_name
             connection_string: Azure Storage connection string
             default_queue: Default queue name if no specific mapping found
+            codec: Codec used to serialize queue message bodies (defaults to get_message_codec())
+            claim_check: Optional claim check; messages still larger than its threshold
+                after compression have their payload offloaded to its blob store
+            compression: Codec for message bodies of at least compression_min_bytes
+            compression_min_bytes: Smallest message body worth compressing
+            max_concurrent_sends: Maximum number of sends in flight at once (1 sends sequentially)
+            pack_messages: Pack messages bound for the same queue into shared queue messages;
+                a message larger than max_packed_bytes on its own is sent alone
+            max_packed_bytes: Largest packed queue message body, before compression
+
+        Raises:
+            ValidationError: If max_concurrent_sends is less than 1
         """
+        if max_concurrent_sends < 1:
+            raise ValidationError(f"max_concurrent_sends must be at least 1, got {max_concurrent_sends}", field="max_concurrent_sends")
+
         self.queue_mappings = queue_mappings
         self.connection_string = connection_string
         self.default_queue = default_queue
+        self.codec = codec or get_message_codec()
+        self.claim_check = claim_check
+        self.compression = QueueCompression(compression)
+        self.compression_min_bytes = compression_min_bytes
+        self.max_concurrent_sends = max_concurrent_sends
+        self.pack_messages = pack_messages
+        self.max_packed_bytes = max_packed_bytes
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
         self.logger = get_logger()
 
-    def handle_output(self, result: ProcessingResult, source_message: Message, context: Dict[str, Any]) -> None:
+    def handle_output(self, result: ProcessingResult, source_message: Message, context: Dict[str, Any]) -> DeliveryReport:
         """
         Handle output messages by sending them to queues.
 
+        A failed send is logged and reported without stopping the other sends.
+
         Args:
             result: Processing result with output messages
             source_message: Original message that was processed
             context: Processing context
+
+        Returns:
+            Delivery outcome of each output message, in output order
         """
         if not result.output_messages:
-            return
+            return DeliveryReport()
 
         log_context = {
             "pipeline_id": source_message.pipeline_id,
@@ -62,29 +138,257 @@ class QueueOutputHandler(BaseOutputHandler):
 
         self.logger.info(f"Routing {len(result.output_messages)} output messages", extra=log_context)
 
-        for output_message in result.output_messages:
+        report = self._deliver_all(result.output_messages, context, log_context)
+        if report.failed_count or report.unrouted_count:
+            self.logger.warning(
+                f"Output messages not delivered | failed={report.failed_count} | unrouted={report.unrouted_count}",
+                extra={**log_context, "failed_count": report.failed_count, "unrouted_count": report.unrouted_count},
+            )
+        return report
+
+    def handle_output_stream(
+        self,
+        output_messages: Iterable[Message],
+        source_message: Message,
+        context: Dict[str, Any],
+        chunk_size: int = 100,
+    ) -> DeliveryReport:
+        """
+        Send lazily produced output messages to queues as they are produced.
+
+        Messages are sent one at a time rather than in chunks; with concurrent
+        sends, at most max_concurrent_sends messages (or packed batches) are
+        held while their sends are in flight.
+
+        Args:
+            output_messages: Output messages, consumed once
+            source_message: Original message that was processed
+            context: Processing context
+            chunk_size: Unused; accepted for compatibility with BaseOutputHandler, as
+                messages are sent one at a time
+
+        Returns:
+            Delivery outcome of each streamed message, in output order
+        """
+        log_context = {
+            "pipeline_id": source_message.pipeline_id,
+            "source_message_id": source_message.message_id,
+            "tenant_id": source_message.tenant_id,
+        }
+
+        report = self._deliver_all(output_messages, context, log_context)
+
+        count = len(report)
+        self.logger.info(
+            f"Routed {count} streamed output messages",
+            extra={**log_context, "output_messages_count": count, "failed_count": report.failed_count},
+        )
+        return report
+
+    def close(self) -> None:
+        """Shut down the send thread pool, waiting for sends in flight."""
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """
+        Get the send thread pool, creating it on first use.
+
+        Returns:
+            Thread pool with max_concurrent_sends workers
+        """
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.max_concurrent_sends, thread_name_prefix="queue-output")
+        return self._executor
+
+    def _deliver_all(self, messages: Iterable[Message], context: Dict[str, Any], log_context: Dict[str, Any]) -> DeliveryReport:
+        """
+        Send messages, sequentially or with bounded concurrency.
+
+        Args:
+            messages: Messages to send, consumed once
+            context: Processing context
+            log_context: Extra fields for per-message error logs
+
+        Returns:
+            Delivery outcome of each message, in input order
+        """
+        sends = self._plan_sends(messages, context, log_context)
+        outcomes: _Outcomes = []
+
+        if self.max_concurrent_sends == 1:
+            for send in sends:
+                outcomes.extend(send())
+        else:
+            executor = self._get_executor()
+            futures: List["Future[_Outcomes]"] = []
+            in_flight: Set["Future[_Outcomes]"] = set()
             try:
-                self._send_message_to_queue(output_message, context)
-            except Exception as e:
-                self.logger.error(
-                    f"Failed to send message to queue: {str(e)}",
-                    extra={
-                        **log_context,
-                        "output_message_id": output_message.message_id,
-                        "error_message": str(e),
-                    },
-                    exc_info=True,
-                )
-                # Don't fail the entire operation for one message
+                while True:
+                    if len(in_flight) >= self.max_concurrent_sends:
+                        # Wait before taking the next message, so a stream is not consumed faster than it is sent
+                        _, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    send = next(sends, None)
+                    if send is None:
+                        break
+                    future = executor.submit(send)
+                    futures.append(future)
+                    in_flight.add(future)
+            finally:
+                # Sends already started finish even if the message iterable raised
+                wait(in_flight)
+            for future in futures:
+                outcomes.extend(future.result())
+
+        if self.pack_messages:
+            # Packed messages are sent when their batch fills, not in output order
+            outcomes.sort(key=lambda outcome: outcome[0])
+        return DeliveryReport(delivery for _, delivery in outcomes)
+
+    def _plan_sends(self, messages: Iterable[Message], context: Dict[str, Any], log_context: Dict[str, Any]) -> Iterator[Callable[[], _Outcomes]]:
+        """
+        Turn messages into queue sends, packing them per queue if enabled.
+
+        Packed batches are yielded as soon as they are full, so a stream is sent
+        while it is produced; partly filled batches are yielded at the end.
+
+        Args:
+            messages: Messages to send, consumed once
+            context: Processing context
+            log_context: Extra fields for per-message error logs
+
+        Returns:
+            Iterator of sends, each returning the outcomes of the messages it carried
+        """
+        if not self.pack_messages:
+            for index, message in enumerate(messages):
+                yield partial(self._deliver_at, index, message, context, log_context)
+            return
+
+        batches: Dict[str, _PackedBatch] = {}
+        for index, message in enumerate(messages):
+            queue_name = self._get_queue_name(message, context)
+            document = self.codec.encode_text(message) if queue_name else ""
+            document_size = len(document.encode("utf-8"))
+            if not queue_name or BATCH_OVERHEAD_BYTES + document_size > self.max_packed_bytes:
+                # Unrouted and oversized messages take the single-message path (compression, claim check)
+                yield partial(self._deliver_at, index, message, context, log_context)
                 continue
 
-    def _send_message_to_queue(self, message: Message, context: Dict[str, Any]) -> None:
+            batch = batches.get(queue_name)
+            if batch is not None and batch.size + 1 + document_size > self.max_packed_bytes:
+                yield partial(self._send_batch, queue_name, batches.pop(queue_name), context, log_context)
+                batch = None
+            if batch is None:
+                batch = batches[queue_name] = _PackedBatch()
+            batch.add(index, message, document, document_size)
+
+        for queue_name, batch in batches.items():
+            yield partial(self._send_batch, queue_name, batch, context, log_context)
+
+    def _deliver_at(self, index: int, message: Message, context: Dict[str, Any], log_context: Dict[str, Any]) -> _Outcomes:
+        return [(index, self._deliver(message, context, log_context))]
+
+    def _send_batch(self, queue_name: str, batch: _PackedBatch, context: Dict[str, Any], log_context: Dict[str, Any]) -> _Outcomes:
+        """
+        Send a packed batch as one queue message; send errors are logged, not raised.
+
+        Args:
+            queue_name: Queue every message in the batch is bound for
+            batch: Messages to send
+            context: Processing context
+            log_context: Extra fields for the error log
+
+        Returns:
+            Outcome of each message in the batch
+        """
+        if len(batch.messages) == 1:
+            return self._deliver_at(batch.indexes[0], batch.messages[0], context, log_context)
+
+        try:
+            body = compress_message_body(self.codec.encode_batch(batch.documents), self.compression, self.compression_min_bytes)
+            send_message_to_queue_direct(connection_string=self.connection_string, queue_name=queue_name, message_data=body)
+        except Exception as e:
+            self.logger.error(
+                f"Failed to send packed messages to queue {queue_name}: {str(e)}",
+                extra={
+                    **log_context,
+                    "queue_name": queue_name,
+                    "output_message_ids": [message.message_id for message in batch.messages],
+                    "error_message": str(e),
+                },
+                exc_info=True,
+            )
+            return [
+                (index, MessageDelivery(message.message_id, queue_name, DeliveryStatus.FAILED, error=str(e)))
+                for index, message in zip(batch.indexes, batch.messages)
+            ]
+
+        self.logger.debug(
+            f"Packed messages sent to queue: {queue_name}",
+            extra={**log_context, "queue_name": queue_name, "packed_count": len(batch.messages), "packed_bytes": batch.size},
+        )
+        return [
+            (index, MessageDelivery(message.message_id, queue_name, DeliveryStatus.SENT)) for index, message in zip(batch.indexes, batch.messages)
+        ]
+
+    def _deliver(self, message: Message, context: Dict[str, Any], log_context: Dict[str, Any]) -> MessageDelivery:
+        """
+        Send a single message and record the outcome; send errors are logged, not raised.
+
+        Args:
+            message: Message to send
+            context: Processing context
+            log_context: Extra fields for the error log
+
+        Returns:
+            Delivery outcome of the message
+        """
+        try:
+            queue_name = self._send_message_to_queue(message, context)
+        except Exception as e:
+            self.logger.error(
+                f"Failed to send message to queue: {str(e)}",
+                extra={
+                    **log_context,
+                    "output_message_id": message.message_id,
+                    "error_message": str(e),
+                },
+                exc_info=True,
+            )
+            # Don't fail the entire operation for one message
+            return MessageDelivery(message.message_id, self._get_queue_name(message, context), DeliveryStatus.FAILED, error=str(e))
+
+        if queue_name is None:
+            return MessageDelivery(message.message_id, None, DeliveryStatus.UNROUTED)
+        return MessageDelivery(message.message_id, queue_name, DeliveryStatus.SENT)
+
+    def _encode_body(self, message: Message) -> str:
+        """
+        Serialize a message to a queue message body.
+
+        Args:
+            message: Message to serialize
+
+        Returns:
+            Encoded message, in a compression envelope if compression applies
+        """
+        return compress_message_body(self.codec.encode_text(message), self.compression, self.compression_min_bytes)
+
+    def _send_message_to_queue(self, message: Message, context: Dict[str, Any]) -> Optional[str]:
         """
         Send a single message to the appropriate queue.
 
         Args:
             message: Message to send
             context: Processing context
+
+        Returns:
+            Name of the queue the message was sent to, or None if no mapping matched
         """
         # Determine target queue
         queue_name = self._get_queue_name(message, context)
@@ -98,14 +402,18 @@ class QueueOutputHandler(BaseOutputHandler):
                     "available_queues": list(self.queue_mappings.keys()),
                 },
             )
-            return
+            return None
 
-        # Send message to queue
+        # Send message to queue, compressing it and offloading an oversized payload first (if enabled)
         try:
+            body = self._encode_body(message)
+            if self.claim_check is not None and self.claim_check.should_offload(len(body.encode("utf-8"))):
+                body = self._encode_body(self.claim_check.offload(message))
+
             send_message_to_queue_direct(
                 connection_string=self.connection_string,
                 queue_name=queue_name,
-                message_data=message.model_dump(),
+                message_data=body,
             )
 
             self.logger.debug(
@@ -132,6 +440,8 @@ class QueueOutputHandler(BaseOutputHandler):
             )
             raise
 
+        return queue_name
+
     def _get_queue_name(self, message: Message, context: Dict[str, Any]) -> Optional[str]:
         """
         Determine the target queue for a message.
@@ -160,6 +470,18 @@ class QueueOutputHandler(BaseOutputHandler):
         # No queue mapping found
         return None
 
+    def get_queue_names(self) -> List[str]:
+        """
+        Get every queue this handler can send to, for startup provisioning.
+
+        Returns:
+            Mapped queue names and the default queue, without duplicates
+        """
+        names = list(self.queue_mappings.values())
+        if self.default_queue:
+            names.append(self.default_queue)
+        return list(dict.fromkeys(names))
+
     def get_handler_name(self) -> str:
         """
         Get the name of this output handler.
@@ -0,0 +1,388 @@
+"""
+Service Bus output handler for routing messages to Azure Service Bus queues.
+
+Output messages are sent in ServiceBusMessageBatch batches, many per AMQP
+call, over one sender link per queue that stays open for the life of the
+handler. Messages with a session ID are batched per session, so a
+session-enabled queue delivers each session's messages in output order.
+
+azure-servicebus is imported on first use, keeping it off the cold-start path
+of function apps that only use storage queues.
+"""
+
+import threading
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
+
+from ...exceptions import ErrorCode, ServiceError, ValidationError
+from ...utils.logger import get_logger
+from ..delivery_report import DeliveryReport, DeliveryStatus, MessageDelivery
+from ..message import Message
+from ..message_codec import MessageCodec, get_message_codec
+from ..processing_result import ProcessingResult
+from .base_output_handler import BaseOutputHandler
+
+if TYPE_CHECKING:
+    from azure.servicebus import ServiceBusMessage, ServiceBusMessageBatch
+
+# Message context key read for the session ID by default
+SESSION_ID_KEY = "session_id"
+
+# Largest batch a Standard tier namespace accepts
+DEFAULT_MAX_BATCH_SIZE_BYTES = 256 * 1024
+
+SessionIdResolver = Callable[[Message], Optional[str]]
+
+
+def _context_session_id(message: Message) -> Optional[str]:
+    session_id = message.get_context(SESSION_ID_KEY)
+    return str(session_id) if session_id is not None else None
+
+
+@lru_cache(maxsize=None)
+def _recording_batch_class() -> type:
+    """Build a ServiceBusMessageBatch that remembers its messages, for FakeServiceBusSender."""
+    from azure.servicebus import ServiceBusMessageBatch
+
+    class RecordingMessageBatch(ServiceBusMessageBatch):
+        def __init__(self, max_size_in_bytes: Optional[int] = None) -> None:
+            super().__init__(max_size_in_bytes=max_size_in_bytes)
+            self.messages: List["ServiceBusMessage"] = []
+
+        def add_message(self, message: Any) -> None:
+            super().add_message(message)
+            self.messages.append(message)
+
+    return RecordingMessageBatch
+
+
+class FakeServiceBusSender:
+    """In-memory stand-in for a ServiceBusSender, for tests and local runs."""
+
+    def __init__(self, queue_name: str, max_batch_size_in_bytes: int = DEFAULT_MAX_BATCH_SIZE_BYTES):
+        """
+        Initialize the sender.
+
+        Args:
+            queue_name: Queue the sender is bound to
+            max_batch_size_in_bytes: Size limit of the batches it creates
+        """
+        self.queue_name = queue_name
+        self.max_batch_size_in_bytes = max_batch_size_in_bytes
+        self.sent_batches: List[List["ServiceBusMessage"]] = []
+        self.send_error: Optional[Exception] = None
+        self.closed = False
+
+    @property
+    def sent_messages(self) -> List["ServiceBusMessage"]:
+        """Every message sent, in send order."""
+        return [message for batch in self.sent_batches for message in batch]
+
+    def create_message_batch(self, max_size_in_bytes: Optional[int] = None) -> "ServiceBusMessageBatch":
+        batch: "ServiceBusMessageBatch" = _recording_batch_class()(max_size_in_bytes=max_size_in_bytes or self.max_batch_size_in_bytes)
+        return batch
+
+    def send_messages(self, message: Any, timeout: Optional[float] = None) -> None:
+        if self.closed:
+            raise ServiceError(f"Sender for {self.queue_name} is closed", queue_name=self.queue_name)
+        if self.send_error is not None:
+            raise self.send_error
+        self.sent_batches.append(list(message.messages) if hasattr(message, "messages") else [message])
+
+    def close(self) -> None:
+        self.closed = True
+
+
+class ServiceBusOutputHandler(BaseOutputHandler):
+    """
+    Output handler that routes messages to Azure Service Bus queues.
+
+    Senders are created per queue on first use and reused by every call until
+    close(). A sender link carries one batch at a time, so concurrent calls
+    (e.g. from SimpleProcessorHandler.process_concurrently) take turns per
+    queue.
+    """
+
+    def __init__(
+        self,
+        queue_mappings: Dict[str, str],
+        connection_string: Optional[str] = None,
+        default_queue: Optional[str] = None,
+        codec: Optional[MessageCodec] = None,
+        session_id_resolver: Optional[SessionIdResolver] = None,
+        max_batch_size_in_bytes: Optional[int] = None,
+        sender_factory: Optional[Callable[[str], Any]] = None,
+    ):
+        """
+        Initialize the Service Bus output handler.
+
+        Args:
+            queue_mappings: Map of output_name -> queue_name
+            connection_string: Service Bus namespace connection string (not needed with sender_factory)
+            default_queue: Default queue name if no specific mapping found
+            codec: Codec used to serialize message bodies (defaults to get_message_codec())
+            session_id_resolver: Returns the session ID of a message, or None to send it
+                without one (defaults to the message context's "session_id")
+            max_batch_size_in_bytes: Batch size limit (defaults to the limit of the sender link)
+            sender_factory: Creates the sender for a queue name, e.g. FakeServiceBusSender
+                in tests (defaults to a ServiceBusClient sender)
+
+        Raises:
+            ValidationError: If neither connection_string nor sender_factory is given
+        """
+        if connection_string is None and sender_factory is None:
+            raise ValidationError(
+                "ServiceBusOutputHandler requires a connection_string or a sender_factory", error_code=ErrorCode.CONFIGURATION_ERROR
+            )
+
+        self.queue_mappings = queue_mappings
+        self.connection_string = connection_string
+        self.default_queue = default_queue
+        self.codec = codec or get_message_codec()
+        self.session_id_resolver = session_id_resolver or _context_session_id
+        self.max_batch_size_in_bytes = max_batch_size_in_bytes
+        self._sender_factory = sender_factory or self._create_sender
+        self._client: Any = None
+        self._senders: Dict[str, Tuple[Any, threading.Lock]] = {}
+        self._senders_lock = threading.Lock()
+        self.logger = get_logger()
+
+    def handle_output(self, result: ProcessingResult, source_message: Message, context: Dict[str, Any]) -> DeliveryReport:
+        """
+        Handle output messages by sending them to Service Bus queues in batches.
+
+        Messages are grouped per queue and session, keeping output order within
+        each group. A failed batch is logged and reported for each of its
+        messages without stopping the other batches.
+
+        Args:
+            result: Processing result with output messages
+            source_message: Original message that was processed
+            context: Processing context
+
+        Returns:
+            Delivery outcome of each output message, in output order
+        """
+        if not result.output_messages:
+            return DeliveryReport()
+
+        log_context = {
+            "pipeline_id": source_message.pipeline_id,
+            "source_message_id": source_message.message_id,
+            "tenant_id": source_message.tenant_id,
+            "output_messages_count": len(result.output_messages),
+        }
+        self.logger.info(f"Routing {len(result.output_messages)} output messages to Service Bus", extra=log_context)
+
+        outcomes: Dict[int, MessageDelivery] = {}
+        groups: Dict[Tuple[str, Optional[str]], List[Tuple[int, Message]]] = {}
+        for index, message in enumerate(result.output_messages):
+            queue_name = self._get_queue_name(message, context)
+            if not queue_name:
+                self.logger.warning(
+                    f"No queue mapping found for message: {message.message_id}",
+                    extra={"message_id": message.message_id, "pipeline_id": message.pipeline_id, "available_queues": list(self.queue_mappings)},
+                )
+                outcomes[index] = MessageDelivery(message.message_id, None, DeliveryStatus.UNROUTED)
+                continue
+            groups.setdefault((queue_name, self.session_id_resolver(message)), []).append((index, message))
+
+        for (queue_name, session_id), group in groups.items():
+            outcomes.update(self._send_group(queue_name, session_id, group, log_context))
+
+        return DeliveryReport(outcomes[index] for index in range(len(result.output_messages)))
+
+    def close(self) -> None:
+        """Close every sender link and the client."""
+        with self._senders_lock:
+            senders, self._senders = list(self._senders.values()), {}
+            client, self._client = self._client, None
+        for sender, lock in senders:
+            with lock:
+                try:
+                    sender.close()
+                except Exception as e:
+                    self.logger.error(f"Error closing Service Bus sender: {str(e)}")
+        if client is not None:
+            client.close()
+
+    def _create_sender(self, queue_name: str) -> Any:
+        """
+        Create a sender for a queue on the handler's ServiceBusClient.
+
+        Args:
+            queue_name: Name of the queue
+
+        Returns:
+            ServiceBusSender for the queue
+        """
+        from azure.servicebus import ServiceBusClient
+
+        if self._client is None:
+            self._client = ServiceBusClient.from_connection_string(conn_str=self.connection_string)  # type: ignore[arg-type]
+        return self._client.get_queue_sender(queue_name=queue_name)
+
+    def _get_sender(self, queue_name: str) -> Tuple[Any, threading.Lock]:
+        """
+        Get the sender for a queue and the lock serializing its sends, creating them on first use.
+
+        Args:
+            queue_name: Name of the queue
+
+        Returns:
+            Tuple of (sender, lock)
+        """
+        entry = self._senders.get(queue_name)
+        if entry is not None:
+            return entry
+
+        with self._senders_lock:
+            entry = self._senders.get(queue_name)
+            if entry is None:
+                entry = (self._sender_factory(queue_name), threading.Lock())
+                self._senders[queue_name] = entry
+            return entry
+
+    def _to_service_bus_message(self, message: Message, session_id: Optional[str]) -> "ServiceBusMessage":
+        """
+        Convert a message to a ServiceBusMessage.
+
+        The message ID is kept, so duplicate detection on the queue can drop
+        resent messages.
+
+        Args:
+            message: Message to convert
+            session_id: Session ID, or None
+
+        Returns:
+            ServiceBusMessage with the encoded message as its body
+        """
+        from azure.servicebus import ServiceBusMessage
+
+        return ServiceBusMessage(
+            self.codec.encode_text(message),
+            message_id=message.message_id,
+            correlation_id=message.correlation_id,
+            session_id=session_id,
+            content_type="application/json",
+        )
+
+    def _send_group(
+        self, queue_name: str, session_id: Optional[str], group: List[Tuple[int, Message]], log_context: Dict[str, Any]
+    ) -> Dict[int, MessageDelivery]:
+        """
+        Send messages bound for one queue and session in as few batches as fit.
+
+        Args:
+            queue_name: Queue every message is bound for
+            session_id: Session ID of every message, or None
+            group: Messages with their position in the output, in output order
+            log_context: Extra fields for error logs
+
+        Returns:
+            Delivery outcome of each message, keyed by its position in the output
+        """
+        from azure.servicebus.exceptions import MessageSizeExceededError
+
+        outcomes: Dict[int, MessageDelivery] = {}
+        try:
+            sender, lock = self._get_sender(queue_name)
+        except Exception as e:
+            self.logger.error(f"Failed to create Service Bus sender for {queue_name}: {str(e)}", extra={**log_context, "queue_name": queue_name})
+            for index, message in group:
+                outcomes[index] = MessageDelivery(message.message_id, queue_name, DeliveryStatus.FAILED, error=str(e))
+            return outcomes
+
+        def send(batch: "ServiceBusMessageBatch", batched: List[Tuple[int, Message]]) -> None:
+            error: Optional[str]
+            try:
+                sender.send_messages(batch)
+            except Exception as e:
+                self.logger.error(
+                    f"Failed to send message batch to Service Bus queue {queue_name}: {str(e)}",
+                    extra={
+                        **log_context,
+                        "queue_name": queue_name,
+                        "output_message_ids": [message.message_id for _, message in batched],
+                        "error_message": str(e),
+                    },
+                    exc_info=True,
+                )
+                status, error = DeliveryStatus.FAILED, str(e)
+            else:
+                self.logger.debug(
+                    f"Message batch sent to Service Bus queue: {queue_name}",
+                    extra={**log_context, "queue_name": queue_name, "batch_count": len(batched), "batch_bytes": batch.size_in_bytes},
+                )
+                status, error = DeliveryStatus.SENT, None
+            for index, message in batched:
+                outcomes[index] = MessageDelivery(message.message_id, queue_name, status, error=error)
+
+        with lock:
+            try:
+                batch = sender.create_message_batch(max_size_in_bytes=self.max_batch_size_in_bytes)
+                batched: List[Tuple[int, Message]] = []
+                for index, message in group:
+                    service_bus_message = self._to_service_bus_message(message, session_id)
+                    try:
+                        batch.add_message(service_bus_message)
+                    except MessageSizeExceededError:
+                        if batched:
+                            # Batch is full: send it and start the next one with this message
+                            send(batch, batched)
+                            batch = sender.create_message_batch(max_size_in_bytes=self.max_batch_size_in_bytes)
+                            batched = []
+                        try:
+                            batch.add_message(service_bus_message)
+                        except MessageSizeExceededError as e:
+                            self.logger.error(
+                                f"Message too large for a Service Bus batch: {message.message_id}",
+                                extra={**log_context, "queue_name": queue_name, "output_message_id": message.message_id},
+                            )
+                            outcomes[index] = MessageDelivery(message.message_id, queue_name, DeliveryStatus.FAILED, error=str(e))
+                            continue
+                    batched.append((index, message))
+                if batched:
+                    send(batch, batched)
+            except Exception as e:
+                # The link failed outside a send (e.g. opening it); report the rest of the group as failed
+                self.logger.error(
+                    f"Failed to send messages to Service Bus queue {queue_name}: {str(e)}",
+                    extra={**log_context, "queue_name": queue_name, "error_message": str(e)},
+                    exc_info=True,
+                )
+                for index, message in group:
+                    if index not in outcomes:
+                        outcomes[index] = MessageDelivery(message.message_id, queue_name, DeliveryStatus.FAILED, error=str(e))
+
+        return outcomes
+
+    def _get_queue_name(self, message: Message, context: Dict[str, Any]) -> Optional[str]:
+        """
+        Determine the target queue for a message.
+
+        Args:
+            message: Message to route
+            context: Processing context
+
+        Returns:
+            Queue name or None if no mapping found
+        """
+        output_name = message.get_context("output_name")
+        if output_name and output_name in self.queue_mappings:
+            return self.queue_mappings[output_name]
+
+        output_name = context.get("output_name")
+        if output_name and output_name in self.queue_mappings:
+            return self.queue_mappings[output_name]
+
+        return self.default_queue
+
+    def get_handler_name(self) -> str:
+        """
+        Get the name of this output handler.
+
+        Returns:
+            Handler name for logging
+        """
+        return "ServiceBusOutputHandler"
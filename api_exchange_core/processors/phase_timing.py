@@ -0,0 +1,253 @@
+"""
+Per-phase timing instrumentation for processor handlers.
+
+This module times each phase of message handling (validation, tracking,
+message capture, the processor itself, routing and logging) and reports the
+durations to pluggable hooks. The default hook is an in-process registry of
+histograms keyed by processor name and phase.
+"""
+
+import bisect
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager, nullcontext
+from enum import Enum
+from typing import Any, ContextManager, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from ..schemas.metric_model import Metric
+
+
+class ProcessingPhase(str, Enum):
+    """Phases of handling one message."""
+
+    VALIDATION = "validation"
+    DEDUPLICATION = "deduplication"
+    CLAIM_CHECK = "claim_check"
+    TRACKING_START = "tracking_start"
+    INPUT_CAPTURE = "input_capture"
+    PROCESS = "process"
+    RETRY_BACKOFF = "retry_backoff"
+    TRACKING_COMPLETION = "tracking_completion"
+    OUTPUT_CAPTURE = "output_capture"
+    OUTPUT_ROUTING = "output_routing"
+    LOGGING = "logging"
+
+
+# Histogram bucket upper bounds in milliseconds; larger values land in an overflow bucket
+DEFAULT_BUCKETS_MS: Tuple[float, ...] = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+
+class PhaseTimer:
+    """Accumulates phase durations for one message."""
+
+    __slots__ = ("durations",)
+
+    def __init__(self) -> None:
+        self.durations: Dict[ProcessingPhase, float] = {}
+
+    @contextmanager
+    def phase(self, phase: ProcessingPhase) -> Iterator[None]:
+        """
+        Time a block of code as part of a phase.
+
+        Args:
+            phase: The phase being timed; repeated blocks of a phase are summed
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.durations[phase] = self.durations.get(phase, 0.0) + (time.perf_counter() - started) * 1000
+
+    def add(self, phase: ProcessingPhase, duration_ms: float) -> None:
+        """
+        Add a duration measured outside a phase block, e.g. one interleaved with other phases.
+
+        Args:
+            phase: The phase the time belongs to
+            duration_ms: Duration in milliseconds
+        """
+        self.durations[phase] = self.durations.get(phase, 0.0) + duration_ms
+
+
+class _NullPhaseTimer(PhaseTimer):
+    """Timer used when instrumentation is disabled."""
+
+    __slots__ = ()
+
+    def phase(self, phase: ProcessingPhase) -> ContextManager[None]:  # type: ignore[override]
+        return nullcontext()
+
+    def add(self, phase: ProcessingPhase, duration_ms: float) -> None:
+        pass
+
+
+NULL_PHASE_TIMER = _NullPhaseTimer()
+
+
+class PhaseTimingHook(ABC):
+    """Receives the phase durations of each processed message."""
+
+    @abstractmethod
+    def record(self, processor_name: str, timings: Dict[ProcessingPhase, float]) -> None:
+        """
+        Record the phase durations of one message.
+
+        Args:
+            processor_name: Name of the processor that handled the message
+            timings: Milliseconds spent in each phase that ran
+        """
+        pass
+
+
+class PhaseHistogram:
+    """Bucketed distribution of phase durations."""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS_MS):
+        """
+        Initialize an empty histogram.
+
+        Args:
+            buckets: Ascending bucket upper bounds in milliseconds
+        """
+        self.buckets = tuple(buckets)
+        self.bucket_counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.min_ms: Optional[float] = None
+        self.max_ms: Optional[float] = None
+
+    def observe(self, duration_ms: float) -> None:
+        """
+        Add one duration to the histogram.
+
+        Args:
+            duration_ms: Duration in milliseconds
+        """
+        self.bucket_counts[bisect.bisect_left(self.buckets, duration_ms)] += 1
+        self.count += 1
+        self.total_ms += duration_ms
+        self.min_ms = duration_ms if self.min_ms is None else min(self.min_ms, duration_ms)
+        self.max_ms = duration_ms if self.max_ms is None else max(self.max_ms, duration_ms)
+
+    @property
+    def mean_ms(self) -> Optional[float]:
+        """Average duration in milliseconds, or None if empty."""
+        return self.total_ms / self.count if self.count else None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Convert the histogram to a dictionary.
+
+        Returns:
+            Dictionary with count, total, min, max, mean and cumulative bucket counts
+        """
+        cumulative = 0
+        buckets: Dict[str, int] = {}
+        for bound, bucket_count in zip([*map(str, self.buckets), "inf"], self.bucket_counts):
+            cumulative += bucket_count
+            buckets[bound] = cumulative
+        return {
+            "count": self.count,
+            "total_ms": self.total_ms,
+            "min_ms": self.min_ms,
+            "max_ms": self.max_ms,
+            "mean_ms": self.mean_ms,
+            "buckets": buckets,
+        }
+
+
+class PhaseTimingRegistry(PhaseTimingHook):
+    """
+    In-process histograms of phase durations keyed by processor name and phase.
+
+    Thread-safe; one lock acquisition per recorded message.
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS_MS):
+        """
+        Initialize the registry.
+
+        Args:
+            buckets: Ascending bucket upper bounds in milliseconds
+        """
+        self.buckets = tuple(buckets)
+        self._histograms: Dict[Tuple[str, ProcessingPhase], PhaseHistogram] = {}
+        self._lock = threading.Lock()
+
+    def record(self, processor_name: str, timings: Dict[ProcessingPhase, float]) -> None:
+        """
+        Record the phase durations of one message.
+
+        Args:
+            processor_name: Name of the processor that handled the message
+            timings: Milliseconds spent in each phase that ran
+        """
+        with self._lock:
+            for phase, duration_ms in timings.items():
+                histogram = self._histograms.get((processor_name, phase))
+                if histogram is None:
+                    histogram = self._histograms[(processor_name, phase)] = PhaseHistogram(self.buckets)
+                histogram.observe(duration_ms)
+
+    def get_histogram(self, processor_name: str, phase: ProcessingPhase) -> Optional[PhaseHistogram]:
+        """
+        Get the histogram for a processor phase.
+
+        Args:
+            processor_name: Name of the processor
+            phase: The processing phase
+
+        Returns:
+            The histogram, or None if nothing was recorded
+        """
+        with self._lock:
+            return self._histograms.get((processor_name, ProcessingPhase(phase)))
+
+    def snapshot(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """
+        Get every histogram as plain data.
+
+        Returns:
+            Mapping of processor name to phase to histogram dictionary
+        """
+        with self._lock:
+            result: Dict[str, Dict[str, Dict[str, Any]]] = {}
+            for (processor_name, phase), histogram in self._histograms.items():
+                result.setdefault(processor_name, {})[phase.value] = histogram.to_dict()
+            return result
+
+    def to_metrics(self) -> List[Metric]:
+        """
+        Summarize the histograms as metrics for send_metrics_to_queue.
+
+        Returns:
+            One count, mean and max metric per processor phase
+        """
+        metrics: List[Metric] = []
+        for processor_name, phases in self.snapshot().items():
+            for phase, histogram in phases.items():
+                labels = {"processor_name": processor_name, "phase": phase}
+                metrics.append(Metric(metric_name="processor_phase_count", value=histogram["count"], labels=labels))
+                metrics.append(Metric(metric_name="processor_phase_mean_ms", value=histogram["mean_ms"], labels=labels))
+                metrics.append(Metric(metric_name="processor_phase_max_ms", value=histogram["max_ms"], labels=labels))
+        return metrics
+
+    def reset(self) -> None:
+        """Discard every recorded histogram."""
+        with self._lock:
+            self._histograms.clear()
+
+
+_default_registry = PhaseTimingRegistry()
+
+
+def get_phase_timing_registry() -> PhaseTimingRegistry:
+    """
+    Get the process-wide phase timing registry used by handlers with metrics enabled.
+
+    Returns:
+        The default PhaseTimingRegistry
+    """
+    return _default_registry
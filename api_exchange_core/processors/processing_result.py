@@ -7,12 +7,16 @@ including success/failure status and output routing instructions.
 
 from datetime import datetime, timezone
 from enum import Enum
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, List, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
+from .delivery_report import DeliveryReport
 from .message import Message
 
+# Error code for results produced when processing exceeds its deadline
+PROCESSING_TIMEOUT_ERROR_CODE = "PROCESSING_TIMEOUT"
+
 
 class ProcessingStatus(str, Enum):
     """Status of processing operation."""
@@ -20,6 +24,7 @@ class ProcessingStatus(str, Enum):
     SUCCESS = "success"
     FAILURE = "failure"
     PARTIAL_SUCCESS = "partial_success"
+    TIMEOUT = "timeout"
 
 
 class ProcessingResult(BaseModel):
@@ -29,12 +34,28 @@ class ProcessingResult(BaseModel):
     Contains status, output messages, and optional metadata about the processing.
     """
 
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
     status: ProcessingStatus = Field(description="Processing status")
     success: bool = Field(description="Whether processing succeeded")
 
     # Output routing
     output_messages: List[Message] = Field(default_factory=list, description="Messages to route to output queues")
 
+    output_stream: Optional[Iterable[Message]] = Field(
+        default=None,
+        exclude=True,
+        description="Lazily produced output messages, routed one at a time instead of held in output_messages",
+    )
+
+    streamed_output_count: Optional[int] = Field(default=None, description="Number of messages the output stream produced")
+
+    delivery_report: Optional[DeliveryReport] = Field(
+        default=None,
+        exclude=True,
+        description="Per-message delivery outcomes reported by the output handler after routing",
+    )
+
     # Optional metadata
     processing_duration_ms: Optional[int] = Field(default=None, description="Processing duration in milliseconds")
 
@@ -50,6 +71,17 @@ class ProcessingResult(BaseModel):
 
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc), description="Result creation timestamp")
 
+    def model_dump(self, **kwargs: Any) -> Dict[str, Any]:
+        # Nested messages are serialized from their fields, so decode deferred payloads first
+        for message in self.output_messages:
+            message.load_payload()
+        return super().model_dump(**kwargs)
+
+    def model_dump_json(self, **kwargs: Any) -> str:
+        for message in self.output_messages:
+            message.load_payload()
+        return super().model_dump_json(**kwargs)
+
     @classmethod
     def success_result(
         cls,
@@ -140,6 +172,70 @@ class ProcessingResult(BaseModel):
             **kwargs,
         )
 
+    @classmethod
+    def timeout_result(
+        cls,
+        timeout_seconds: float,
+        processing_duration_ms: Optional[int] = None,
+        **kwargs,
+    ) -> "ProcessingResult":
+        """
+        Create a result for processing that exceeded its deadline.
+
+        Args:
+            timeout_seconds: The deadline that was exceeded
+            processing_duration_ms: Processing duration in milliseconds
+            **kwargs: Additional context
+
+        Returns:
+            ProcessingResult configured for timeout
+        """
+        return cls(
+            status=ProcessingStatus.TIMEOUT,
+            success=False,
+            error_message=f"Processing exceeded timeout of {timeout_seconds}s",
+            error_code=PROCESSING_TIMEOUT_ERROR_CODE,
+            processing_duration_ms=processing_duration_ms,
+            **kwargs,
+        )
+
+    @classmethod
+    def streaming_result(
+        cls,
+        output_stream: Iterable[Message],
+        records_processed: int = 0,
+        processing_duration_ms: Optional[int] = None,
+        **kwargs,
+    ) -> "ProcessingResult":
+        """
+        Create a successful result whose output messages are produced lazily.
+
+        The handler consumes the stream once, routing each message as it is
+        produced, so large fan-outs never have to be held in memory.
+
+        Args:
+            output_stream: Iterable (typically a generator) of output messages
+            records_processed: Number of records processed
+            processing_duration_ms: Processing duration in milliseconds
+            **kwargs: Additional context
+
+        Returns:
+            ProcessingResult configured for streamed success
+        """
+        return cls(
+            status=ProcessingStatus.SUCCESS,
+            success=True,
+            output_stream=output_stream,
+            records_processed=records_processed,
+            processing_duration_ms=processing_duration_ms,
+            **kwargs,
+        )
+
+    @property
+    def output_count(self) -> int:
+        """Number of output messages, including those already routed from the output stream."""
+        return len(self.output_messages) + (self.streamed_output_count or 0)
+
     def add_output_message(self, message: Message) -> None:
         """
         Add an output message to the result.
@@ -0,0 +1,175 @@
+"""
+Retry policy for in-process processor retries.
+
+This module classifies processing failures into recovery strategies using the
+framework's ErrorCode and RecoveryStrategy enums, and computes exponential
+backoff delays with jitter from ProcessingConfig.
+"""
+
+import random
+from typing import Dict, Optional, Tuple, Type
+
+from ..config import ProcessingConfig, get_config
+from ..constants import RecoveryStrategy
+from ..exceptions import BaseError, ErrorCode
+from .processing_result import ProcessingResult
+
+# How each error code should be recovered from; codes not listed need manual review
+ERROR_RECOVERY_STRATEGIES: Dict[ErrorCode, RecoveryStrategy] = {
+    # Transient infrastructure and downstream failures
+    ErrorCode.DATABASE_ERROR: RecoveryStrategy.RETRY,
+    ErrorCode.CONNECTION_ERROR: RecoveryStrategy.RETRY,
+    ErrorCode.TIMEOUT_ERROR: RecoveryStrategy.RETRY,
+    ErrorCode.LOCKED: RecoveryStrategy.RETRY,
+    ErrorCode.CONFLICT: RecoveryStrategy.RETRY,
+    ErrorCode.LIMIT_EXCEEDED: RecoveryStrategy.RETRY,
+    ErrorCode.ADAPTER_ERROR: RecoveryStrategy.RETRY,
+    ErrorCode.QUEUE_ERROR: RecoveryStrategy.RETRY,
+    ErrorCode.EXTERNAL_API_ERROR: RecoveryStrategy.RETRY,
+    ErrorCode.INTEGRATION_ERROR: RecoveryStrategy.RETRY,
+    ErrorCode.DOWNSTREAM_ERROR: RecoveryStrategy.RETRY,
+    # Broken deployment
+    ErrorCode.CONFIGURATION_ERROR: RecoveryStrategy.SYSTEM_RESTART,
+    # Nothing left to do for this message
+    ErrorCode.NOT_FOUND: RecoveryStrategy.SKIP,
+    ErrorCode.DUPLICATE: RecoveryStrategy.SKIP,
+    ErrorCode.EXPIRED: RecoveryStrategy.SKIP,
+}
+
+# Built-in exceptions that indicate a transient failure
+DEFAULT_RETRYABLE_EXCEPTIONS: Tuple[Type[BaseException], ...] = (ConnectionError, TimeoutError)
+
+
+class RetryPolicy:
+    """
+    Decides whether a failed processing attempt is retried and how long to wait.
+
+    Failures are classified by error code: a BaseError's error_code, or a failure
+    ProcessingResult whose error_code is an ErrorCode value or name. Built-in
+    connection and timeout exceptions are always treated as retryable.
+    """
+
+    def __init__(
+        self,
+        max_retry_attempts: int = 3,
+        retry_backoff_base: float = 2,
+        retry_backoff_max: float = 300,
+        jitter: bool = True,
+        retryable_exceptions: Tuple[Type[BaseException], ...] = DEFAULT_RETRYABLE_EXCEPTIONS,
+        recovery_strategies: Optional[Dict[ErrorCode, RecoveryStrategy]] = None,
+    ):
+        """
+        Initialize the retry policy.
+
+        Args:
+            max_retry_attempts: Maximum retries after the first attempt
+            retry_backoff_base: Base for exponential backoff (seconds); retry n waits base ** n
+            retry_backoff_max: Maximum backoff time (seconds)
+            jitter: Whether to randomize each delay between 0 and the backoff ("full jitter")
+            retryable_exceptions: Exception types retried regardless of error code
+            recovery_strategies: Overrides for the error code to recovery strategy mapping
+        """
+        self.max_retry_attempts = max_retry_attempts
+        self.retry_backoff_base = retry_backoff_base
+        self.retry_backoff_max = retry_backoff_max
+        self.jitter = jitter
+        self.retryable_exceptions = retryable_exceptions
+        self.recovery_strategies = {**ERROR_RECOVERY_STRATEGIES, **(recovery_strategies or {})}
+
+    @classmethod
+    def from_config(cls, config: Optional[ProcessingConfig] = None, **kwargs) -> "RetryPolicy":
+        """
+        Create a retry policy from processing configuration.
+
+        Args:
+            config: Processing configuration (defaults to the global config)
+            **kwargs: Additional RetryPolicy arguments
+
+        Returns:
+            RetryPolicy using the configured attempts and backoff
+        """
+        config = config or get_config().processing
+        return cls(
+            max_retry_attempts=config.max_retry_attempts,
+            retry_backoff_base=config.retry_backoff_base,
+            retry_backoff_max=config.retry_backoff_max,
+            **kwargs,
+        )
+
+    def get_recovery_strategy(
+        self,
+        error: Optional[BaseException] = None,
+        result: Optional[ProcessingResult] = None,
+    ) -> RecoveryStrategy:
+        """
+        Classify a raised exception or a failed result.
+
+        Args:
+            error: Exception raised by the processor
+            result: Failure result returned by the processor
+
+        Returns:
+            The recovery strategy for the failure
+        """
+        if error is not None:
+            if isinstance(error, BaseError):
+                return self._strategy_for_code(error.error_code)
+            if isinstance(error, self.retryable_exceptions):
+                return RecoveryStrategy.RETRY
+            return RecoveryStrategy.MANUAL_REVIEW
+
+        if result is not None and result.error_code:
+            error_code = _parse_error_code(result.error_code)
+            if error_code is not None:
+                return self._strategy_for_code(error_code)
+
+        return RecoveryStrategy.MANUAL_REVIEW
+
+    def should_retry(
+        self,
+        retries: int,
+        error: Optional[BaseException] = None,
+        result: Optional[ProcessingResult] = None,
+    ) -> bool:
+        """
+        Decide whether another attempt should be made.
+
+        Args:
+            retries: Number of retries already made
+            error: Exception raised by the latest attempt
+            result: Result returned by the latest attempt
+
+        Returns:
+            True if the failure is retryable and attempts remain
+        """
+        if retries >= self.max_retry_attempts:
+            return False
+        if error is None and (result is None or result.success):
+            return False
+        return self.get_recovery_strategy(error, result) == RecoveryStrategy.RETRY
+
+    def get_delay(self, retry: int) -> float:
+        """
+        Get the backoff before a retry.
+
+        Args:
+            retry: 1-based number of the retry about to be made
+
+        Returns:
+            Seconds to wait
+        """
+        delay = min(float(self.retry_backoff_max), float(self.retry_backoff_base) ** retry)
+        if self.jitter:
+            delay = random.uniform(0, delay)
+        return delay
+
+    def _strategy_for_code(self, error_code: ErrorCode) -> RecoveryStrategy:
+        return self.recovery_strategies.get(error_code, RecoveryStrategy.MANUAL_REVIEW)
+
+
+def _parse_error_code(error_code: str) -> Optional[ErrorCode]:
+    """Resolve a result's error code given as an ErrorCode value ("1002") or name ("CONNECTION_ERROR")."""
+    try:
+        return ErrorCode(error_code)
+    except ValueError:
+        return ErrorCode.__members__.get(error_code)
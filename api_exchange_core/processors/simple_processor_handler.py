@@ -5,22 +5,25 @@ This module provides a lightweight handler that manages pipeline execution
 tracking and output routing for processors.
 """
 
-import time
 import threading
-import json
-import copy
-from datetime import datetime, timezone
-from typing import Any, Dict, Optional
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Union
+
+from sqlalchemy.orm import Session
 
-from ..utils.logger import get_logger
+from ..exceptions import ValidationError
+from ..utils.logger import BoundLogger
+from .base_processor_handler import BaseProcessorHandler
 from .message import Message
+from .message_codec import MessageCodec, get_message_codec
+from .phase_timing import ProcessingPhase
 from .processing_result import ProcessingResult
 from .simple_processor_interface import SimpleProcessorInterface
-from ..db.db_config import get_db_manager
-from ..db.db_pipeline_tracking_models import PipelineExecution, PipelineStep, PipelineMessage
 
 
-class SimpleProcessorHandler:
+class SimpleProcessorHandler(BaseProcessorHandler):
     """
     Handler for processor execution with pipeline tracking.
 
@@ -33,525 +36,328 @@ class SimpleProcessorHandler:
     Unlike the old ProcessorHandler, this doesn't depend on entity persistence.
     """
 
-    def __init__(
-        self,
-        processor: SimpleProcessorInterface,
-        enable_pipeline_tracking: bool = True,
-        enable_metrics: bool = True,
-        enable_message_storage: bool = False,
-        message_sanitization_rules: Optional[Dict[str, Any]] = None,
-    ):
-        """
-        Initialize the processor handler.
+    processor: SimpleProcessorInterface
 
-        Args:
-            processor: The processor to handle
-            enable_pipeline_tracking: Whether to track pipeline execution
-            enable_metrics: Whether to collect processing metrics
-            enable_message_storage: Whether to store input/output messages for debugging
-            message_sanitization_rules: Rules for sanitizing sensitive data in messages
-        """
-        self.processor = processor
-        self.enable_pipeline_tracking = enable_pipeline_tracking
-        self.enable_metrics = enable_metrics
-        self.enable_message_storage = enable_message_storage
-        self.message_sanitization_rules = message_sanitization_rules or {}
-        self.logger = get_logger()
-        self._execution_id = None
-        # Remove self._step_id as it will be local to each process_message call
-
-    def process_message(self, message: Message, context: Optional[Dict[str, Any]] = None) -> ProcessingResult:
+    def process_message(self, message: Message, context: Optional[Dict[str, Any]] = None, session: Optional[Session] = None) -> ProcessingResult:
         """
         Process a message through the processor with full tracking.
 
         Args:
             message: Message to process
             context: Additional processing context
+            session: Shared session from tracking_batch(); when None the message's
+                tracking is committed on its own
 
         Returns:
             ProcessingResult with success/failure status and output messages
         """
-        context = context or {}
-        processor_name = self.processor.get_processor_name()
-        start_time = time.time()
-        step_id = None  # Local step_id for this message processing
-
-        # Set up logging context
-        log_context = {
-            "processor_name": processor_name,
-            "pipeline_id": message.pipeline_id,
-            "message_id": message.message_id,
-            "correlation_id": message.correlation_id,
-            "tenant_id": message.tenant_id,
-        }
-
-        self.logger.info(f"Starting processing: {processor_name}", extra=log_context)
-
-        try:
-            # Validate message
-            if not self.processor.validate_message(message):
-                return ProcessingResult.failure_result(error_message="Message validation failed", error_code="INVALID_MESSAGE")
+        return self._process_message(message, context or {}, session)
 
-            # Track pipeline execution start (if enabled)
-            if self.enable_pipeline_tracking:
-                step_id = self._track_pipeline_start(message, processor_name, context)
-                
-                # Store input message (if enabled)
-                if self.enable_message_storage and step_id:
-                    self._store_input_message(message, step_id, context)
-
-            # Process the message
-            result = self.processor.process(message, context)
-
-            # Calculate processing duration
-            processing_duration_ms = int((time.time() - start_time) * 1000)
-            if result.processing_duration_ms is None:
-                result.processing_duration_ms = processing_duration_ms
-
-            # Track pipeline execution completion (if enabled)
-            if self.enable_pipeline_tracking:
-                self._track_pipeline_completion(message, processor_name, result, context, step_id)
-                
-                # Store output messages (if enabled)
-                if self.enable_message_storage and step_id and result.output_messages:
-                    self._store_output_messages(result.output_messages, step_id, context)
-
-            # Log result
-            result_context = {
-                **log_context,
-                "success": result.success,
-                "status": result.status,
-                "processing_duration_ms": processing_duration_ms,
-                "records_processed": result.records_processed,
-                "output_messages_count": len(result.output_messages),
-            }
-
-            if result.success:
-                self.logger.info(f"Processing completed successfully: {processor_name}", extra=result_context)
-            else:
-                result_context.update(
-                    {
-                        "error_message": result.error_message,
-                        "error_code": result.error_code,
-                    }
-                )
-                self.logger.error(f"Processing failed: {processor_name}", extra=result_context)
+    @contextmanager
+    def tracking_batch(self) -> Iterator[Optional[Session]]:
+        """
+        Share one tracking transaction between several process_message calls.
 
-            return result
+        The session is committed when the block exits, or rolled back if the
+        block raises. The commit goes through the tracking circuit breaker and
+        is skipped, losing the batch's tracking, while the circuit is open.
+        No session is opened when tracking does not block (disabled or written
+        behind); None is yielded and each message is tracked on its own.
 
-        except Exception as e:
-            processing_duration_ms = int((time.time() - start_time) * 1000)
-
-            # Track pipeline execution failure (if enabled)
-            if self.enable_pipeline_tracking:
-                self._track_pipeline_failure(message, processor_name, str(e), context, step_id)
-
-            # Log error
-            error_context = {
-                **log_context,
-                "processing_duration_ms": processing_duration_ms,
-                "error_type": type(e).__name__,
-                "error_message": str(e),
-            }
-
-            self.logger.error(
-                f"Processing failed with exception: {processor_name}",
-                extra=error_context,
-                exc_info=True,
-            )
+        Example:
+            with handler.tracking_batch() as session:
+                results = [handler.process_message(message, context, session) for message in messages]
 
-            return ProcessingResult.failure_result(
-                error_message=f"Processing failed: {str(e)}",
-                error_code="PROCESSING_EXCEPTION",
-                processing_duration_ms=processing_duration_ms,
-            )
-
-    def _track_pipeline_start(self, message: Message, processor_name: str, context: Dict[str, Any]) -> str:
+        Yields:
+            Session to pass to process_message, or None
         """
-        Track the start of pipeline execution.
+        session = self._open_tracking_session() if self._tracking_blocks else None
+        if session is None:
+            yield None
+            return
 
-        Args:
-            message: Message being processed
-            processor_name: Name of the processor
-            context: Processing context
-            
-        Returns:
-            str: The step_id for this processing step
-        """
         try:
-            db_manager = get_db_manager()
-            session = db_manager.get_session()
-            
+            yield session
+        except BaseException:
+            session.rollback()
+            raise
+        else:
+            if not self.tracking_breaker.allow():
+                session.rollback()
+                self.logger.warning("Batch tracking skipped, tracking circuit is open")
+                return
+
+            started = time.perf_counter()
             try:
-                # Check if pipeline execution already exists
-                existing_execution = session.query(PipelineExecution).filter_by(
-                    pipeline_id=message.pipeline_id
-                ).first()
-                
-                if not existing_execution:
-                    # Create new pipeline execution
-                    execution = PipelineExecution(
-                        pipeline_id=message.pipeline_id,
-                        tenant_id=message.tenant_id,
-                        correlation_id=message.correlation_id,
-                        status="started",
-                        started_at=datetime.now(timezone.utc),
-                        trigger_type=context.get("trigger_type", "queue"),
-                        trigger_source=context.get("trigger_source", "unknown"),
-                        step_count=0,
-                        message_count=1,
-                        error_count=0,
-                        context=context
-                    )
-                    session.add(execution)
-                    session.flush()
-                    self._execution_id = execution.id
-                else:
-                    self._execution_id = existing_execution.id
-                    # Update message count
-                    existing_execution.message_count += 1
-                
-                # Create pipeline step
-                step = PipelineStep(
-                    execution_id=self._execution_id,
-                    pipeline_id=message.pipeline_id,
-                    tenant_id=message.tenant_id,
-                    step_name=processor_name,
-                    processor_name=processor_name,
-                    function_name=context.get("function_name", processor_name),
-                    message_id=message.message_id,
-                    correlation_id=message.correlation_id,
-                    started_at=datetime.now(timezone.utc),
-                    status="processing",
-                    context=context
-                )
-                session.add(step)
-                session.flush()
-                step_id = step.id
-                
-                # Update execution step count
-                if existing_execution:
-                    existing_execution.step_count += 1
-                else:
-                    execution.step_count += 1
-                
                 session.commit()
-                self.logger.debug(f"Pipeline step created | step_id={step_id} | processor={processor_name} | message_id={message.message_id}")
-                
-                return step_id
-                
             except Exception as e:
+                self.tracking_breaker.record_failure()
                 session.rollback()
-                self.logger.error(f"Failed to track pipeline start: {str(e)}")
-                raise
-            finally:
-                session.close()
-                
-        except Exception as e:
-            self.logger.error(f"Error in pipeline tracking: {str(e)}")
-            # Continue processing even if tracking fails
-            return None
+                self.logger.error(f"Failed to commit batch tracking: {str(e)}")
+                # Continue - processing results are still valid
+            else:
+                self.tracking_breaker.record_success((time.perf_counter() - started) * 1000)
+                self.logger.debug("Committed batch tracking")
+        finally:
+            session.close()
 
-    def _track_pipeline_completion(
-        self,
-        message: Message,
-        processor_name: str,
-        result: ProcessingResult,
-        context: Dict[str, Any],
-        step_id: str = None,
-    ) -> None:
+    def process_messages(self, messages: List[Message], context: Optional[Dict[str, Any]] = None) -> List[ProcessingResult]:
         """
-        Track the completion of pipeline execution.
+        Process a batch of messages, writing all tracking data in one transaction.
+
+        Each message is processed independently and gets its own ProcessingResult,
+        but every PipelineExecution/PipelineStep/PipelineMessage write for the batch
+        shares a single session and is committed once at the end.
 
         Args:
-            message: Message that was processed
-            processor_name: Name of the processor
-            result: Processing result
-            context: Processing context
+            messages: Messages to process, in order
+            context: Additional processing context shared by all messages
+
+        Returns:
+            List of ProcessingResult objects, one per input message
         """
-        try:
-            db_manager = get_db_manager()
-            session = db_manager.get_session()
-            
-            try:
-                # Update step completion
-                if step_id:
-                    step = session.query(PipelineStep).filter_by(id=step_id).first()
-                    if step:
-                        step.completed_at = datetime.now(timezone.utc)
-                        step.duration_ms = result.processing_duration_ms
-                        step.status = "completed" if result.success else "failed"
-                        step.output_count = len(result.output_messages)
-                        step.output_queues = [msg.destination_queue for msg in result.output_messages if hasattr(msg, 'destination_queue')]
-                        
-                        if not result.success:
-                            step.error_message = result.error_message
-                            step.error_type = result.error_code
-                        
-                        self.logger.debug(f"Pipeline step completed | step_id={step_id} | processor={processor_name} | status={step.status} | duration={result.processing_duration_ms}ms")
-                    else:
-                        self.logger.warning(f"Pipeline step not found | step_id={step_id}")
-                else:
-                    self.logger.warning(f"No step_id to update | message_id={message.message_id}")
-                
-                # Update execution completion (if this is the last step)
-                if self._execution_id and len(result.output_messages) == 0:
-                    # This might be the final step - mark execution as complete
-                    execution = session.query(PipelineExecution).filter_by(id=self._execution_id).first()
-                    if execution:
-                        execution.completed_at = datetime.now(timezone.utc)
-                        execution.status = "completed" if result.success else "failed"
-                        if execution.started_at:
-                            execution.duration_ms = int((datetime.now(timezone.utc) - execution.started_at).total_seconds() * 1000)
-                        
-                        if not result.success:
-                            execution.error_message = result.error_message
-                            execution.error_step = processor_name
-                            execution.error_count += 1
-                
-                session.commit()
-                
-            except Exception as e:
-                session.rollback()
-                self.logger.error(f"Failed to track pipeline completion: {str(e)}")
-                raise
-            finally:
-                session.close()
-                
-        except Exception as e:
-            self.logger.error(f"Error in pipeline completion tracking: {str(e)}")
-            # Continue processing even if tracking fails
+        context = context or {}
+        if not messages:
+            return []
 
-    def _track_pipeline_failure(self, message: Message, processor_name: str, error_message: str, context: Dict[str, Any], step_id: str = None) -> None:
+        # The write-behind writer already batches, so only share a session for synchronous tracking
+        with self.tracking_batch() as session:
+            return [self._process_message(message, context, session) for message in messages]
+
+    def process_queue_message(
+        self,
+        body: Union[str, bytes],
+        context: Optional[Dict[str, Any]] = None,
+        codec: Optional[MessageCodec] = None,
+    ) -> List[ProcessingResult]:
         """
-        Track the failure of pipeline execution.
+        Unpack a queue message body and process every Message it carries.
+
+        The body may hold a single Message or a batch packed by a
+        QueueOutputHandler with pack_messages; a batch is processed like
+        process_messages, in one tracking transaction. A failed message does
+        not fail the batch, but if the function errors the whole queue message
+        is redelivered, so configure an idempotency_store to skip the messages
+        that were already processed.
 
         Args:
-            message: Message that was processed
-            processor_name: Name of the processor
-            error_message: Error message
-            context: Processing context
+            body: Queue message body
+            context: Additional processing context shared by all messages
+            codec: Codec used to decode the body (defaults to get_message_codec())
+
+        Returns:
+            List of ProcessingResult objects, one per unpacked message
+
+        Raises:
+            ValidationError: If the body holds a ProcessingResult or an invalid batch
+            ValueError: If the body is not valid JSON for a Message
         """
-        try:
-            db_manager = get_db_manager()
-            session = db_manager.get_session()
-            
-            try:
-                # Update step failure
-                if step_id:
-                    step = session.query(PipelineStep).filter_by(id=step_id).first()
-                    if step:
-                        step.completed_at = datetime.now(timezone.utc)
-                        step.status = "failed"
-                        step.error_message = error_message
-                        step.error_type = "PROCESSING_EXCEPTION"
-                        if step.started_at:
-                            step.duration_ms = int((datetime.now(timezone.utc) - step.started_at).total_seconds() * 1000)
-                
-                # Update execution failure
-                if self._execution_id:
-                    execution = session.query(PipelineExecution).filter_by(id=self._execution_id).first()
-                    if execution:
-                        execution.completed_at = datetime.now(timezone.utc)
-                        execution.status = "failed"
-                        execution.error_message = error_message
-                        execution.error_step = processor_name
-                        execution.error_count += 1
-                        if execution.started_at:
-                            execution.duration_ms = int((datetime.now(timezone.utc) - execution.started_at).total_seconds() * 1000)
-                
-                session.commit()
-                
-            except Exception as e:
-                session.rollback()
-                self.logger.error(f"Failed to track pipeline failure: {str(e)}")
-                raise
-            finally:
-                session.close()
-                
-        except Exception as e:
-            self.logger.error(f"Error in pipeline failure tracking: {str(e)}")
-            # Continue processing even if tracking fails
+        messages = (codec or get_message_codec()).decode_messages(body, lazy_payload=True)
+        if len(messages) == 1:
+            return [self.process_message(messages[0], context)]
+        return self.process_messages(messages, context)
 
-    def _sanitize_message(self, message_data: Dict[str, Any]) -> tuple[Dict[str, Any], bool]:
+    def process_concurrently(
+        self,
+        messages: Iterable[Message],
+        max_workers: int = 8,
+        context: Optional[Dict[str, Any]] = None,
+        max_in_flight: Optional[int] = None,
+    ) -> List[ProcessingResult]:
         """
-        Sanitize message data to remove sensitive information.
-        
+        Process messages in parallel on a thread pool.
+
+        Intended for I/O-bound processors: one handler serves every worker thread,
+        since all per-message state is local to the processing call. Messages are
+        pulled from the iterable only as capacity frees up, so at most max_in_flight
+        messages are submitted but not yet finished at any time.
+
+        Each message's tracking is written on its own (or queued to the write-behind
+        writer); the processor itself must be safe to call from several threads.
+
         Args:
-            message_data: The message data to sanitize
-            
+            messages: Messages to process
+            max_workers: Number of worker threads
+            context: Additional processing context shared by all messages
+            max_in_flight: Maximum messages submitted at once (defaults to 2 * max_workers)
+
         Returns:
-            tuple: (sanitized_data, was_sanitized)
+            List of ProcessingResult objects, in the same order as the input messages
+
+        Raises:
+            ValidationError: If max_workers is less than 1
         """
-        if not self.message_sanitization_rules:
-            return message_data, False
-            
-        sanitized_data = copy.deepcopy(message_data)
-        was_sanitized = False
-        
-        # Apply sanitization rules
-        for field_path, action in self.message_sanitization_rules.items():
-            if self._apply_sanitization_rule(sanitized_data, field_path, action):
-                was_sanitized = True
-                
-        return sanitized_data, was_sanitized
-    
-    def _apply_sanitization_rule(self, data: Dict[str, Any], field_path: str, action: str) -> bool:
+        if max_workers < 1:
+            raise ValidationError(f"max_workers must be at least 1, got {max_workers}", field="max_workers")
+
+        context = context or {}
+        max_in_flight = max(max_in_flight or 2 * max_workers, 1)
+        results: Dict[int, ProcessingResult] = {}
+        pending: Set[Future] = set()
+        indexes: Dict[Future, int] = {}
+
+        def collect(done: Set[Future]) -> None:
+            for future in done:
+                results[indexes.pop(future)] = future.result()
+
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="processor-handler") as executor:
+            for index, message in enumerate(messages):
+                if len(pending) >= max_in_flight:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    collect(done)
+                future = executor.submit(self._process_message, message, context)
+                indexes[future] = index
+                pending.add(future)
+
+            done, _ = wait(pending)
+            collect(done)
+
+        self.logger.debug(f"Processed messages concurrently | messages={len(results)} | max_workers={max_workers}")
+        return [results[index] for index in range(len(results))]
+
+    def _process_message(self, message: Message, context: Dict[str, Any], session: Optional[Session] = None) -> ProcessingResult:
         """
-        Apply a single sanitization rule to data.
-        
+        Process a single message, optionally writing tracking data to a shared session.
+
         Args:
-            data: The data to modify
-            field_path: Dot-separated path to the field (e.g., "user.password")
-            action: The action to take ("mask", "remove", "hash")
-            
+            message: Message to process
+            context: Processing context
+            session: Shared batch session; when None each tracking call commits on its own
+
         Returns:
-            bool: Whether any sanitization was applied
+            ProcessingResult with success/failure status and output messages
         """
-        keys = field_path.split('.')
-        current = data
-        
-        # Navigate to the parent of the target field
-        for key in keys[:-1]:
-            if isinstance(current, dict) and key in current:
-                current = current[key]
-            else:
-                return False
-                
-        # Apply the action to the final key
-        final_key = keys[-1]
-        if isinstance(current, dict) and final_key in current:
-            if action == "remove":
-                del current[final_key]
-            elif action == "mask":
-                current[final_key] = "***MASKED***"
-            elif action == "hash":
-                current[final_key] = f"***HASH:{hash(str(current[final_key]))}***"
-            return True
-            
-        return False
-
-    def _store_input_message(self, message: Message, step_id: str, context: Dict[str, Any]) -> None:
+        processor_name = self.processor.get_processor_name()
+        start_time = time.time()
+        timer = self._new_phase_timer()
+        step_id = None  # Local step_id for this message processing
+        execution_id = None
+        retries = 0
+
+        # Bind the message's identifiers to every log record
+        log = self._bind_logger(message, processor_name)
+
+        with timer.phase(ProcessingPhase.LOGGING):
+            log.info("Starting processing: %s", processor_name)
+
+        try:
+            # Short-circuit messages that were already processed (if enabled), before anything reads
+            # the payload: a duplicate's offloaded payload may already have been released
+            if self.idempotency_store is not None:
+                with timer.phase(ProcessingPhase.DEDUPLICATION):
+                    duplicate = self._find_duplicate(message, processor_name, context, log, session)
+                if duplicate is not None:
+                    return duplicate
+
+            # Swap an offloaded payload's reference for a fetch on first access (if enabled)
+            claim_ref = self.claim_check.resolve(message) if self.claim_check is not None else None
+
+            # Validate message
+            with timer.phase(ProcessingPhase.VALIDATION):
+                is_valid = self.processor.validate_message(message)
+            if not is_valid:
+                return ProcessingResult.failure_result(error_message="Message validation failed", error_code="INVALID_MESSAGE")
+
+            # Track pipeline execution start and store input (if enabled)
+            step_id, execution_id = self._begin_tracking(message, processor_name, context, session, timer)
+
+            # Process the message, retrying transient failures in-process (if configured)
+            while True:
+                try:
+                    with timer.phase(ProcessingPhase.PROCESS):
+                        result = self._run_processor(message, context, processor_name, time.time(), log)
+                except Exception as e:
+                    delay = self._next_retry_delay(retries, processor_name, log, error=e)
+                    if delay is None:
+                        raise
+                else:
+                    delay = self._next_retry_delay(retries, processor_name, log, result=result)
+                    if delay is None:
+                        break
+                retries += 1
+                with timer.phase(ProcessingPhase.RETRY_BACKOFF):
+                    time.sleep(delay)
+
+            result = self._complete_processing(
+                message, processor_name, context, result, start_time, step_id, execution_id, log, session, retries, timer
+            )
+
+            # Delete the offloaded payload once it can no longer be needed
+            if claim_ref is not None and result.success:
+                with timer.phase(ProcessingPhase.CLAIM_CHECK):
+                    self._release_claim_check(claim_ref, log)
+            return result
+
+        except Exception as e:
+            return self._fail_processing(
+                message, processor_name, context, e, start_time, step_id, log, session, retries, execution_id, timer
+            )
+
+        finally:
+            self._report_phase_timings(processor_name, timer)
+
+    def _run_processor(
+        self,
+        message: Message,
+        context: Dict[str, Any],
+        processor_name: str,
+        attempt_started: float,
+        log: BoundLogger,
+    ) -> ProcessingResult:
         """
-        Store the input message for debugging purposes.
-        
+        Make one processing attempt, under the processing timeout if one is set.
+
         Args:
-            message: The input message
-            step_id: The pipeline step ID
+            message: Message to process
             context: Processing context
+            processor_name: Name of the processor
+            attempt_started: time.time() when the attempt started
+            log: Logger bound to the message's identifiers
+
+        Returns:
+            The processor result, or a timeout result if the deadline passed
         """
-        try:
-            # Convert message to dict for storage
-            message_data = {
-                "message_id": message.message_id,
-                "pipeline_id": message.pipeline_id,
-                "tenant_id": message.tenant_id,
-                "correlation_id": message.correlation_id,
-                "payload": message.payload,
-                "context": message.context,
-                "created_at": message.created_at.isoformat() if message.created_at else None,
-            }
-            
-            # Sanitize the message data
-            sanitized_data, was_sanitized = self._sanitize_message(message_data)
-            
-            # Calculate message size
-            message_size = len(json.dumps(sanitized_data, default=str))
-            
-            db_manager = get_db_manager()
-            session = db_manager.get_session()
-            
-            try:
-                pipeline_message = PipelineMessage(
-                    step_id=step_id,
-                    execution_id=self._execution_id,
-                    tenant_id=message.tenant_id,
-                    message_id=message.message_id,
-                    message_type="input",
-                    message_payload=sanitized_data,
-                    message_size_bytes=message_size,
-                    source_queue=context.get("source_queue"),
-                    target_queue=None,
-                    is_sanitized=was_sanitized,
-                    sanitization_rules=self.message_sanitization_rules if was_sanitized else None,
-                    context=context
-                )
-                session.add(pipeline_message)
-                session.commit()
-                
-                self.logger.debug(f"Stored input message | step_id={step_id} | message_id={message.message_id} | size={message_size} | sanitized={was_sanitized}")
-                
-            except Exception as e:
-                session.rollback()
-                self.logger.error(f"Failed to store input message: {str(e)}")
-                raise
-            finally:
-                session.close()
-                
-        except Exception as e:
-            self.logger.error(f"Error storing input message: {str(e)}")
-            # Continue processing even if message storage fails
+        if self.processing_timeout is None:
+            return self._as_result(self.processor.process(message, context))
+
+        result = self._process_with_deadline(message, context, processor_name)
+        if result is None:
+            return self._timeout_result(processor_name, attempt_started, log)
+        return self._as_result(result)
 
-    def _store_output_messages(self, output_messages: list, step_id: str, context: Dict[str, Any]) -> None:
+    def _process_with_deadline(self, message: Message, context: Dict[str, Any], processor_name: str) -> Optional[ProcessingResult]:
         """
-        Store the output messages for debugging purposes.
-        
+        Run processor.process on a daemon thread and wait up to the processing timeout.
+
+        Python cannot interrupt a blocked call, so on timeout the worker thread is
+        abandoned: its eventual result is discarded and, being a daemon, it does not
+        keep the host process alive.
+
         Args:
-            output_messages: List of output messages
-            step_id: The pipeline step ID
+            message: Message to process
             context: Processing context
+            processor_name: Name of the processor
+
+        Returns:
+            The processor result, or None if the deadline passed first
+
+        Raises:
+            Exception: Whatever processor.process raised
         """
-        try:
-            db_manager = get_db_manager()
-            session = db_manager.get_session()
-            
+        outcome: Dict[str, Any] = {}
+
+        def run() -> None:
             try:
-                for output_message in output_messages:
-                    # Convert message to dict for storage
-                    created_at = getattr(output_message, 'created_at', None)
-                    message_data = {
-                        "message_id": getattr(output_message, 'message_id', None),
-                        "pipeline_id": getattr(output_message, 'pipeline_id', None),
-                        "tenant_id": getattr(output_message, 'tenant_id', None),
-                        "correlation_id": getattr(output_message, 'correlation_id', None),
-                        "payload": getattr(output_message, 'payload', None),
-                        "context": getattr(output_message, 'context', {}),
-                        "created_at": created_at.isoformat() if created_at else None,
-                    }
-                    
-                    # Sanitize the message data
-                    sanitized_data, was_sanitized = self._sanitize_message(message_data)
-                    
-                    # Calculate message size
-                    message_size = len(json.dumps(sanitized_data, default=str))
-                    
-                    pipeline_message = PipelineMessage(
-                        step_id=step_id,
-                        execution_id=self._execution_id,
-                        tenant_id=getattr(output_message, 'tenant_id', None),
-                        message_id=getattr(output_message, 'message_id', None),
-                        message_type="output",
-                        message_payload=sanitized_data,
-                        message_size_bytes=message_size,
-                        source_queue=None,
-                        target_queue=getattr(output_message, 'destination_queue', None),
-                        is_sanitized=was_sanitized,
-                        sanitization_rules=self.message_sanitization_rules if was_sanitized else None,
-                        context=context
-                    )
-                    session.add(pipeline_message)
-                    
-                    self.logger.debug(f"Stored output message | step_id={step_id} | message_id={getattr(output_message, 'message_id', None)} | size={message_size} | sanitized={was_sanitized}")
-                
-                session.commit()
-                
-            except Exception as e:
-                session.rollback()
-                self.logger.error(f"Failed to store output messages: {str(e)}")
-                raise
-            finally:
-                session.close()
-                
-        except Exception as e:
-            self.logger.error(f"Error storing output messages: {str(e)}")
-            # Continue processing even if message storage fails
+                outcome["result"] = self.processor.process(message, context)
+            except BaseException as e:
+                outcome["error"] = e
+
+        worker = threading.Thread(target=run, name=f"processor-{processor_name}", daemon=True)
+        worker.start()
+        worker.join(self.processing_timeout)
+
+        if worker.is_alive():
+            return None
+        if "error" in outcome:
+            raise outcome["error"]
+        return outcome["result"]
@@ -6,45 +6,19 @@ focuses purely on message transformation without external dependencies.
 """
 
 from abc import ABC, abstractmethod
-from typing import Any, Dict
+from typing import Any, Dict, Iterable, Union
 
 from .message import Message
 from .processing_result import ProcessingResult
 
 
-class SimpleProcessorInterface(ABC):
+class BaseProcessorInterface(ABC):
     """
-    Minimal processor interface for pipeline operations.
-
-    This interface focuses purely on message transformation:
-    - Receive a Message
-    - Apply business logic
-    - Return a ProcessingResult
+    Helpers shared by the synchronous and asynchronous processor interfaces.
 
-    No dependencies on persistence, external services, or complex state management.
+    Subclasses add the process() method in the flavour they support.
     """
 
-    @abstractmethod
-    def process(self, message: Message, context: Dict[str, Any]) -> ProcessingResult:
-        """
-        Process a message and return the result.
-
-        This is the core method that all processors must implement.
-        It should contain only the business logic for transforming
-        the input message into output messages.
-
-        Args:
-            message: Input message to process
-            context: Processing context (tenant_id, request_id, etc.)
-
-        Returns:
-            ProcessingResult with success/failure status and output messages
-
-        Raises:
-            Should not raise exceptions - return failure result instead
-        """
-        pass
-
     def get_processor_name(self) -> str:
         """
         Get the name of this processor.
@@ -61,7 +35,9 @@ class SimpleProcessorInterface(ABC):
         """
         Validate that the message is suitable for processing.
 
-        Default implementation performs basic validation.
+        Default implementation performs basic validation. A payload that is
+        still raw JSON (see MessageCodec.decode with lazy_payload) is checked
+        for presence without decoding it.
         Override this method to add custom validation logic.
 
         Args:
@@ -71,7 +47,11 @@ class SimpleProcessorInterface(ABC):
             True if message is valid, False otherwise
         """
         # Basic validation
-        if not message.payload:
+        raw_payload = message.raw_payload
+        if raw_payload is not None:
+            if not raw_payload.startswith("{") or not raw_payload[1:-1].strip():
+                return False
+        elif not message.payload:
             return False
 
         if not message.pipeline_id:
@@ -93,3 +73,44 @@ class SimpleProcessorInterface(ABC):
             New Message with inherited context
         """
         return source_message.create_child_message(payload=payload, processor_name=self.get_processor_name())
+
+
+class SimpleProcessorInterface(BaseProcessorInterface):
+    """
+    Minimal processor interface for pipeline operations.
+
+    This interface focuses purely on message transformation:
+    - Receive a Message
+    - Apply business logic
+    - Return a ProcessingResult
+
+    No dependencies on persistence, external services, or complex state management.
+    """
+
+    @abstractmethod
+    def process(self, message: Message, context: Dict[str, Any]) -> Union[ProcessingResult, Iterable[Message]]:
+        """
+        Process a message and return the result.
+
+        This is the core method that all processors must implement.
+        It should contain only the business logic for transforming
+        the input message into output messages.
+
+        Processors with large fan-outs may instead be generators yielding
+        output messages (or return ProcessingResult.streaming_result); the
+        handler then routes each message as it is produced. Messages are
+        produced after process returns, so the handler's processing timeout
+        and in-process retries do not apply to them.
+
+        Args:
+            message: Input message to process
+            context: Processing context (tenant_id, request_id, etc.)
+
+        Returns:
+            ProcessingResult with success/failure status and output messages,
+            or an iterable of output messages
+
+        Raises:
+            Should not raise exceptions - return failure result instead
+        """
+        pass
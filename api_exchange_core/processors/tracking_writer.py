@@ -0,0 +1,290 @@
+"""
+Write-behind writer for pipeline tracking data.
+
+This module provides a background writer that takes tracking operations off the
+message processing hot path. Handlers submit operations to a bounded in-process
+queue and a single writer thread drains them in batches, applying each batch in
+one database session and one commit. Writes go through a circuit breaker, so
+while the database is failing queued operations are skipped instead of being
+attempted at full rate.
+"""
+
+import atexit
+import queue
+import threading
+import time
+from enum import Enum
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from ..db.db_config import get_db_manager
+from ..utils.logger import get_logger
+from .circuit_breaker import CircuitBreaker
+
+TrackingOperation = Callable[[Session], Any]
+
+
+class OverflowPolicy(str, Enum):
+    """What to do when the tracking queue is full."""
+
+    DROP = "drop"
+    BLOCK = "block"
+
+
+class PipelineTrackingWriter:
+    """
+    Background writer that applies tracking operations in batches.
+
+    Operations are callables that take a SQLAlchemy session and add or update
+    tracking records on it. They are applied in submission order by a single
+    daemon thread, so a step's start is always written before its completion.
+    """
+
+    def __init__(
+        self,
+        max_queue_size: int = 10000,
+        batch_size: int = 100,
+        flush_interval: float = 0.5,
+        overflow_policy: OverflowPolicy = OverflowPolicy.DROP,
+        block_timeout: Optional[float] = None,
+        register_atexit: bool = True,
+        breaker: Optional[CircuitBreaker] = None,
+    ):
+        """
+        Initialize the tracking writer and start its background thread.
+
+        Args:
+            max_queue_size: Maximum number of pending operations
+            batch_size: Maximum number of operations written per commit
+            flush_interval: Seconds the writer waits for more work before writing a partial batch
+            overflow_policy: Drop new operations or block the caller when the queue is full
+            block_timeout: Seconds to block before dropping (None blocks until space is available)
+            register_atexit: Whether to flush pending operations at interpreter shutdown
+            breaker: Circuit breaker around batch writes; None uses a CircuitBreaker
+                with default thresholds. Operations are skipped while it is open.
+        """
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.overflow_policy = OverflowPolicy(overflow_policy)
+        self.block_timeout = block_timeout
+        self.breaker = breaker or CircuitBreaker(name="tracking-writer")
+        self.logger = get_logger()
+
+        self._queue: "queue.Queue[Optional[TrackingOperation]]" = queue.Queue(maxsize=max_queue_size)
+        self._stats_lock = threading.Lock()
+        self._stats = {"submitted": 0, "written": 0, "dropped": 0, "failed": 0, "skipped": 0, "batches": 0}
+        self._closed = False
+        # Guards _closed and counts submit() calls between their closed check and their put,
+        # so close() only queues its stop sentinel behind every operation it accepted
+        self._submit_condition = threading.Condition()
+        self._submitting = 0
+
+        self._thread = threading.Thread(target=self._run, name="pipeline-tracking-writer", daemon=True)
+        self._thread.start()
+
+        if register_atexit:
+            atexit.register(self.close)
+
+    def submit(self, operation: TrackingOperation) -> bool:
+        """
+        Queue a tracking operation for background writing.
+
+        Args:
+            operation: Callable that applies the operation to a session
+
+        Returns:
+            True if the operation was queued, False if it was dropped
+        """
+        with self._submit_condition:
+            if self._closed:
+                self._increment("dropped")
+                return False
+            self._submitting += 1
+
+        try:
+            if self.overflow_policy == OverflowPolicy.BLOCK:
+                self._queue.put(operation, timeout=self.block_timeout)
+            else:
+                self._queue.put_nowait(operation)
+        except queue.Full:
+            self._increment("dropped")
+            return False
+        finally:
+            with self._submit_condition:
+                self._submitting -= 1
+                self._submit_condition.notify_all()
+
+        self._increment("submitted")
+        return True
+
+    def flush(self) -> None:
+        """Block until every operation submitted so far has been written or failed."""
+        self._queue.join()
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """
+        Stop accepting operations, write everything pending and stop the writer thread.
+
+        Operations already being submitted by other threads are queued before
+        the writer is told to stop, so they are written rather than stranded.
+
+        Args:
+            timeout: Maximum seconds to wait for the writer thread to finish
+        """
+        with self._submit_condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._submit_condition.wait_for(lambda: self._submitting == 0)
+        self._queue.put(None)
+        self._thread.join(timeout)
+        atexit.unregister(self.close)
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Get writer counters.
+
+        Returns:
+            Dictionary with submitted, written, dropped, failed, skipped, batches and pending counts
+        """
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats["pending"] = self._queue.qsize()
+        return stats
+
+    @property
+    def dropped_count(self) -> int:
+        """Number of operations dropped because the queue was full or the writer was closed."""
+        with self._stats_lock:
+            return self._stats["dropped"]
+
+    def _increment(self, counter: str, amount: int = 1) -> None:
+        with self._stats_lock:
+            self._stats[counter] += amount
+
+    def _run(self) -> None:
+        """Drain the queue in batches until a stop sentinel is received."""
+        stopping = False
+        while not stopping:
+            first = self._queue.get()
+            batch: List[TrackingOperation] = []
+            taken = 1
+            if first is None:
+                stopping = True
+            else:
+                batch.append(first)
+
+            # Collect more work until the batch is full or the flush interval elapses
+            deadline = time.monotonic() + self.flush_interval
+            while not stopping and len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    operation = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                taken += 1
+                if operation is None:
+                    stopping = True
+                else:
+                    batch.append(operation)
+
+            if stopping:
+                # Drain anything submitted before close() so shutdown loses nothing
+                while True:
+                    try:
+                        operation = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    taken += 1
+                    if operation is not None:
+                        batch.append(operation)
+
+            try:
+                if batch:
+                    self._write_batch(batch)
+            except Exception as e:
+                # The writer thread must survive anything, or flush() and blocked submitters hang forever
+                self._increment("failed", len(batch))
+                self.logger.error(f"Tracking writer failed to write batch: {str(e)}", exc_info=True)
+            finally:
+                for _ in range(taken):
+                    self._queue.task_done()
+
+    def _write_batch(self, batch: List[TrackingOperation]) -> None:
+        """
+        Apply a batch of operations in one session and one commit.
+
+        If the batch commit fails, operations are retried one at a time so a
+        single bad operation does not discard the rest of the batch. Every
+        attempt is reported to the breaker; while it is open, operations are
+        skipped without touching the database.
+
+        Args:
+            batch: Operations to apply, in submission order
+        """
+        if not self.breaker.allow():
+            self._increment("skipped", len(batch))
+            self.logger.debug(f"Tracking writer skipped batch, tracking circuit is open | operations={len(batch)}")
+            return
+
+        started = time.perf_counter()
+        try:
+            session = get_db_manager().get_session()
+        except Exception as e:
+            self.breaker.record_failure()
+            self.logger.error(f"Tracking writer could not open session: {str(e)}")
+            self._increment("failed", len(batch))
+            return
+
+        try:
+            for operation in batch:
+                operation(session)
+            session.commit()
+            self.breaker.record_success((time.perf_counter() - started) * 1000)
+            self._increment("written", len(batch))
+            self._increment("batches")
+            self.logger.debug(f"Tracking writer committed batch | operations={len(batch)}")
+            return
+        except Exception as e:
+            self.breaker.record_failure()
+            self.logger.warning(f"Tracking writer batch failed, retrying individually: {str(e)}")
+        finally:
+            self._end_session(session)
+
+        for operation in batch:
+            if not self.breaker.allow():
+                self._increment("skipped")
+                continue
+
+            retry_session: Optional[Session] = None
+            started = time.perf_counter()
+            try:
+                retry_session = get_db_manager().get_session()
+                operation(retry_session)
+                retry_session.commit()
+                self.breaker.record_success((time.perf_counter() - started) * 1000)
+                self._increment("written")
+            except Exception as e:
+                self.breaker.record_failure()
+                self._increment("failed")
+                self.logger.error(f"Tracking writer failed to apply operation: {str(e)}")
+            finally:
+                if retry_session is not None:
+                    self._end_session(retry_session)
+
+    def _end_session(self, session: Session) -> None:
+        """
+        Roll back anything uncommitted and close a session, without raising.
+
+        Rolling back after a lost connection can itself fail; the writer thread
+        must carry on regardless.
+
+        Args:
+            session: Session to end
+        """
+        try:
+            session.rollback()
+            session.close()
+        except Exception as e:
+            self.logger.error(f"Tracking writer could not close session: {str(e)}")
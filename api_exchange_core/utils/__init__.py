@@ -84,6 +84,8 @@ from .pipeline_utils import (
     update_pipeline_definition,
     update_pipeline_execution,
 )
+from .queue_client_registry import QueueClientRegistry, close_queue_clients, get_queue_client
+from .queue_provisioning import ensure_queue_exists, get_pipeline_queue_names, provision_queues
 from .queue_utils import send_message_to_queue_binding, send_message_to_queue_direct
 
 # Schema factory functions
@@ -119,6 +121,12 @@ __all__ = [
     "send_metrics_to_queue",
     "send_message_to_queue_binding",
     "send_message_to_queue_direct",
+    "QueueClientRegistry",
+    "get_queue_client",
+    "close_queue_clients",
+    "provision_queues",
+    "ensure_queue_exists",
+    "get_pipeline_queue_names",
     "track_message_receive",
     "calculate_queue_time",
     "get_message_metadata",
@@ -14,27 +14,43 @@ import traceback
 from datetime import datetime, timezone
 from typing import Any, Dict, List, Optional, Union
 
-from azure.storage.queue import QueueClient, QueueServiceClient
 from pydantic_core import to_jsonable_python
 
 from ..config import get_config
+from .queue_client_registry import get_queue_client
 
 _function_logger = None
 
 
+# Standard logging level for each ContextAwareLogger method
+_LOG_LEVELS = {
+    "debug": logging.DEBUG,
+    "info": logging.INFO,
+    "warning": logging.WARNING,
+    "error": logging.ERROR,
+    "exception": logging.ERROR,
+}
+
+
+def _format_extra(extra: Dict[str, Any]) -> str:
+    """Format extra data as pipe-delimited key=value pairs."""
+    return " | ".join(f"{k}={v}" for k, v in extra.items())
+
+
 class ContextAwareLogger:
     """
     Logger wrapper that formats extra attributes in message while preserving them.
 
     This ensures extras appear in console output even when Azure Functions
-    overrides the formatters.
+    overrides the formatters. Nothing is formatted for disabled levels, and
+    %-style args are only interpolated when the record is emitted.
     """
 
     def __init__(self, logger):
         """Initialize with an existing logger."""
         self.logger = logger
 
-    def _log_with_formatted_extra(self, level, msg, **kwargs):
+    def _log_with_formatted_extra(self, level, msg, *args, **kwargs):
         """
         Log with extra data formatted for console output while preserving structured data.
 
@@ -43,17 +59,21 @@ class ContextAwareLogger:
 
         Args:
             level: Logging level method to use
-            msg: Log message
+            msg: Log message, optionally with %-style placeholders
+            *args: Values for the placeholders in msg
             **kwargs: Additional arguments including 'extra'
         """
+        if not self.logger.isEnabledFor(_LOG_LEVELS[level]):
+            return
+        if args:
+            msg = msg % args
+
         # Extract extra if present
         extra = kwargs.pop("extra", {})
 
         # Format extra as pipe-delimited key=value pairs for console readability
         if extra:
-            extra_parts = [f"{k}={v}" for k, v in extra.items()]
-            extra_str = " | ".join(extra_parts)
-            full_msg = f"{msg} | {extra_str}"
+            full_msg = f"{msg} | {_format_extra(extra)}"
         else:
             full_msg = msg
 
@@ -62,29 +82,145 @@ class ContextAwareLogger:
         log_method = getattr(self.logger, level)
         log_method(full_msg, extra=extra, **kwargs)
 
+    def is_enabled_for(self, level: int) -> bool:
+        """
+        Check whether records at a level would be emitted.
+
+        Args:
+            level: Standard logging level, e.g. logging.DEBUG
+
+        Returns:
+            True if the underlying logger is enabled for the level
+        """
+        return self.logger.isEnabledFor(level)
+
+    def bind(self, **context) -> "BoundLogger":
+        """
+        Create a logger that attaches the same context to every record.
+
+        Args:
+            **context: Extra data added to each record, e.g. message identifiers
+
+        Returns:
+            BoundLogger carrying the context
+        """
+        return BoundLogger(self, context)
+
     def set_level(self, level):
         """Set the logging level of the underlying logger."""
         self.logger.setLevel(level)
 
-    def info(self, msg, **kwargs):
+    def info(self, msg, *args, **kwargs):
         """Log at INFO level with formatted extra."""
-        self._log_with_formatted_extra("info", msg, **kwargs)
+        self._log_with_formatted_extra("info", msg, *args, **kwargs)
 
-    def error(self, msg, **kwargs):
+    def error(self, msg, *args, **kwargs):
         """Log at ERROR level with formatted extra."""
-        self._log_with_formatted_extra("error", msg, **kwargs)
+        self._log_with_formatted_extra("error", msg, *args, **kwargs)
 
-    def warning(self, msg, **kwargs):
+    def warning(self, msg, *args, **kwargs):
         """Log at WARNING level with formatted extra."""
-        self._log_with_formatted_extra("warning", msg, **kwargs)
+        self._log_with_formatted_extra("warning", msg, *args, **kwargs)
 
-    def debug(self, msg, **kwargs):
+    def debug(self, msg, *args, **kwargs):
         """Log at DEBUG level with formatted extra."""
-        self._log_with_formatted_extra("debug", msg, **kwargs)
+        self._log_with_formatted_extra("debug", msg, *args, **kwargs)
 
-    def exception(self, msg, **kwargs):
+    def exception(self, msg, *args, **kwargs):
         """Log exception with formatted extra."""
-        self._log_with_formatted_extra("exception", msg, **kwargs)
+        self._log_with_formatted_extra("exception", msg, *args, **kwargs)
+
+
+class BoundLogger:
+    """
+    ContextAwareLogger view that carries a fixed context, e.g. one message's identifiers.
+
+    The context dict is shared, not copied, for records without their own
+    extra data, and its console formatting is computed once on first use.
+    Per-call extra data is merged into the context only when the level is enabled.
+    """
+
+    __slots__ = ("_logger", "context", "_formatted_context")
+
+    def __init__(self, logger: ContextAwareLogger, context: Dict[str, Any]):
+        """
+        Initialize the bound logger.
+
+        Args:
+            logger: Logger that emits the records
+            context: Extra data attached to every record; must not be modified afterwards
+        """
+        self._logger = logger
+        self.context = context
+        self._formatted_context: Optional[str] = None
+
+    def bind(self, **context) -> "BoundLogger":
+        """
+        Create a logger with additional context.
+
+        Args:
+            **context: Extra data added to this logger's context
+
+        Returns:
+            BoundLogger carrying both contexts
+        """
+        return BoundLogger(self._logger, {**self.context, **context})
+
+    def is_enabled_for(self, level: int) -> bool:
+        """
+        Check whether records at a level would be emitted.
+
+        Args:
+            level: Standard logging level, e.g. logging.DEBUG
+
+        Returns:
+            True if the underlying logger is enabled for the level
+        """
+        return self._logger.logger.isEnabledFor(level)
+
+    def _log(self, level: str, msg: str, args: tuple, extra: Optional[Dict[str, Any]], kwargs: Dict[str, Any]) -> None:
+        logger = self._logger.logger
+        if not logger.isEnabledFor(_LOG_LEVELS[level]):
+            return
+        if args:
+            msg = msg % args
+
+        if self._formatted_context is None:
+            self._formatted_context = _format_extra(self.context)
+
+        if not extra:
+            record_extra = self.context
+            full_msg = f"{msg} | {self._formatted_context}" if self._formatted_context else msg
+        elif self.context.keys() & extra.keys():
+            # Overridden context keys must not appear twice in the console message
+            record_extra = {**self.context, **extra}
+            full_msg = f"{msg} | {_format_extra(record_extra)}"
+        else:
+            record_extra = {**self.context, **extra}
+            formatted_extra = _format_extra(extra)
+            full_msg = f"{msg} | {self._formatted_context} | {formatted_extra}" if self._formatted_context else f"{msg} | {formatted_extra}"
+
+        getattr(logger, level)(full_msg, extra=record_extra, **kwargs)
+
+    def info(self, msg, *args, extra=None, **kwargs):
+        """Log at INFO level with the bound context."""
+        self._log("info", msg, args, extra, kwargs)
+
+    def error(self, msg, *args, extra=None, **kwargs):
+        """Log at ERROR level with the bound context."""
+        self._log("error", msg, args, extra, kwargs)
+
+    def warning(self, msg, *args, extra=None, **kwargs):
+        """Log at WARNING level with the bound context."""
+        self._log("warning", msg, args, extra, kwargs)
+
+    def debug(self, msg, *args, extra=None, **kwargs):
+        """Log at DEBUG level with the bound context."""
+        self._log("debug", msg, args, extra, kwargs)
+
+    def exception(self, msg, *args, extra=None, **kwargs):
+        """Log exception with the bound context."""
+        self._log("exception", msg, args, extra, kwargs)
 
 
 class AzureQueueHandler(logging.Handler):
@@ -129,25 +265,21 @@ class AzureQueueHandler(logging.Handler):
         """
         Ensure the specified queue exists, creating it if necessary.
 
+        The queue is checked once per process, with a single create request
+        rather than a listing of every queue in the account.
+
         Returns:
             True if the queue exists or was created successfully
         """
         if not self.connection_string:
             return False
 
-        try:
-            # Create queue service client
-            queue_service = QueueServiceClient.from_connection_string(self.connection_string)
+        # Import here to avoid circular dependency
+        from .queue_provisioning import ensure_queue_exists
 
-            # Check if queue exists
-            queues = queue_service.list_queues()
-            queue_exists = any(queue.name == self.queue_name for queue in queues)
-
-            if not queue_exists:
-                sys.stderr.write(f"Queue '{self.queue_name}' does not exist. Creating...\n")
-                queue_service.create_queue(self.queue_name)
+        try:
+            if ensure_queue_exists(self.connection_string, self.queue_name):
                 sys.stderr.write(f"Queue '{self.queue_name}' created successfully\n")
-
             return True
 
         except Exception as e:
@@ -248,8 +380,8 @@ class AzureQueueHandler(logging.Handler):
             return
 
         try:
-            # Create queue client
-            queue_client = QueueClient.from_connection_string(conn_str=self.connection_string, queue_name=self.queue_name)
+            # Reuse the process-wide client for this queue
+            queue_client = get_queue_client(self.connection_string, self.queue_name)
 
             # Send individual log entries (like metrics) to avoid base64 encoding bug
             for log_entry in self.log_buffer:
@@ -7,11 +7,11 @@ This module handles sending metrics to Azure Storage Queues for monitoring.
 import os
 from typing import List, Optional
 
-from azure.storage.queue import QueueClient
-
 from ..constants import EnvironmentVariable, QueueName
 from ..schemas.metric_model import Metric
 from .logger import get_logger
+from .queue_client_registry import get_queue_client
+from .queue_provisioning import provision_missing_queue
 
 
 def send_metrics_to_queue(
@@ -22,6 +22,9 @@ def send_metrics_to_queue(
     """
     Send a list of metrics to an Azure Storage Queue.
 
+    The queue is one of the standard queues created by provision_queues at
+    startup; if it is missing anyway it is created on the first failed send.
+
     Args:
         metrics: List of metrics to process
         queue_name: Name of the Azure Storage Queue (defaults to QueueName.METRICS)
@@ -43,8 +46,8 @@ def send_metrics_to_queue(
         return
 
     try:
-        # Create queue client
-        queue_client = QueueClient.from_connection_string(conn_str=connection_string, queue_name=queue_name)
+        # Reuse the process-wide client for this queue
+        queue_client = get_queue_client(connection_string, queue_name)
 
         log.debug(f"Sending {len(metrics)} metrics to queue {queue_name}")
 
@@ -54,18 +57,14 @@ def send_metrics_to_queue(
                 queue_client.send_message(json_metric)
                 log.debug(f"Metric {idx + 1} sent to queue: {json_metric}")
             except Exception as e:
-                # Check if queue doesn't exist and try to create it
-                if "QueueNotFound" in str(e) or "does not exist" in str(e):
-                    try:
-                        log.debug(f"Queue {queue_name} not found, creating it...")
-                        queue_client.create_queue()
-                        # Retry sending the message
-                        queue_client.send_message(json_metric)
-                        log.debug(f"Metric {idx + 1} sent to queue after creation: {json_metric}")
-                    except Exception as create_error:
-                        log.error(f"Failed to create queue or send metric {idx + 1}: {str(create_error)}")
-                else:
+                if not provision_missing_queue(connection_string, queue_name, e):
                     log.error(f"Failed to send metric {idx + 1}: {str(e)}")
+                    continue
+                try:
+                    queue_client.send_message(json_metric)
+                    log.debug(f"Metric {idx + 1} sent to queue after creation: {json_metric}")
+                except Exception as retry_error:
+                    log.error(f"Failed to send metric {idx + 1}: {str(retry_error)}")
 
         log.debug(f"Processed {len(metrics)} metrics")
 
@@ -13,6 +13,7 @@ from sqlalchemy.orm import Session
 from ..db.db_pipeline_definition_models import PipelineDefinition, PipelineStepDefinition
 from ..utils.crud_helpers import create_record, get_record, list_records, update_record
 from ..utils.logger import get_logger
+from .queue_provisioning import provision_queues
 
 
 def register_pipeline_definition(
@@ -250,11 +251,14 @@ def auto_register_function_step(
     input_trigger: Optional[str] = None,
     output_queues: Optional[List[str]] = None,
     is_root: bool = False,
+    connection_string: Optional[str] = None,
 ) -> str:
     """
     Auto-register a function step with sensible defaults.
 
-    Convenience function for Azure Functions to self-register on startup.
+    Convenience function for Azure Functions to self-register on startup. With
+    a connection string, the pipeline's queues are provisioned too, so sends
+    never have to create them.
 
     Args:
         session: Database session
@@ -265,6 +269,8 @@ def auto_register_function_step(
         input_trigger: Input trigger (auto-detected if possible)
         output_queues: Output queues (empty list if not specified)
         is_root: Whether this is a root step
+        connection_string: Azure Storage connection string; when given, the standard
+            queues and the queues of the pipeline's registered steps are provisioned
 
     Returns:
         Step definition ID
@@ -273,7 +279,7 @@ def auto_register_function_step(
     step_name = step_name or function_name
     pipeline_name = pipeline_name or function_name.split("_")[0] if "_" in function_name else function_name
 
-    return register_function_step(
+    step_id = register_function_step(
         session=session,
         pipeline_name=pipeline_name,
         step_name=step_name,
@@ -283,3 +289,14 @@ def auto_register_function_step(
         output_queues=output_queues or [],
         is_root=is_root,
     )
+
+    if connection_string:
+        try:
+            provision_queues(connection_string, session=session, pipeline_name=pipeline_name)
+        except Exception as e:
+            get_logger().error(
+                f"Queue provisioning failed, missing queues are created on first send | pipeline_name={pipeline_name} | error={str(e)}"
+            )
+            # Continue - registration succeeded and sends fall back to creating their queue
+
+    return step_id
@@ -0,0 +1,121 @@
+"""
+Process-wide registry of Azure Storage QueueClients.
+
+Building a QueueClient parses the connection string and creates a new HTTP
+pipeline with its own connection pool, so creating one per send throws away
+TCP/TLS keep-alive. This module keeps one client per (connection string,
+queue name) for the life of the process; clients are thread-safe and shared by
+every sender.
+"""
+
+import atexit
+import sys
+import threading
+from typing import Dict, Optional, Tuple
+
+from azure.storage.queue import QueueClient
+
+_ClientKey = Tuple[str, str]
+
+
+class QueueClientRegistry:
+    """Thread-safe cache of QueueClients keyed by (connection string, queue name)."""
+
+    def __init__(self) -> None:
+        self._clients: Dict[_ClientKey, QueueClient] = {}
+        self._lock = threading.Lock()
+
+    def get_client(self, connection_string: str, queue_name: str) -> QueueClient:
+        """
+        Get the shared client for a queue, creating it on first use.
+
+        Args:
+            connection_string: Azure Storage connection string
+            queue_name: Name of the queue
+
+        Returns:
+            QueueClient for the queue
+        """
+        key = (connection_string, queue_name)
+        client = self._clients.get(key)
+        if client is not None:
+            return client
+
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                client = QueueClient.from_connection_string(conn_str=connection_string, queue_name=queue_name)
+                self._clients[key] = client
+            return client
+
+    def close_client(self, connection_string: str, queue_name: str) -> None:
+        """
+        Close and forget the client for a queue, e.g. after its credentials change.
+
+        Args:
+            connection_string: Azure Storage connection string
+            queue_name: Name of the queue
+        """
+        with self._lock:
+            client = self._clients.pop((connection_string, queue_name), None)
+        if client is not None:
+            _close_quietly(client)
+
+    def close(self) -> None:
+        """Close every client; later calls to get_client create new ones."""
+        with self._lock:
+            clients = list(self._clients.values())
+            self._clients.clear()
+        for client in clients:
+            _close_quietly(client)
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+
+def _close_quietly(client: QueueClient) -> None:
+    try:
+        client.close()
+    except Exception as e:
+        # Logging may already be shut down at exit, so report on stderr like AzureQueueHandler
+        sys.stderr.write(f"Error closing queue client: {str(e)}\n")
+
+
+_registry: Optional[QueueClientRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_queue_client_registry() -> QueueClientRegistry:
+    """
+    Get the process-wide queue client registry.
+
+    Returns:
+        The shared QueueClientRegistry
+    """
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = QueueClientRegistry()
+                atexit.register(_registry.close)
+    return _registry
+
+
+def get_queue_client(connection_string: str, queue_name: str) -> QueueClient:
+    """
+    Get the shared client for a queue from the process-wide registry.
+
+    Args:
+        connection_string: Azure Storage connection string
+        queue_name: Name of the queue
+
+    Returns:
+        QueueClient for the queue
+    """
+    return get_queue_client_registry().get_client(connection_string, queue_name)
+
+
+def close_queue_clients() -> None:
+    """Close every client in the process-wide registry."""
+    if _registry is not None:
+        _registry.close()
@@ -0,0 +1,212 @@
+"""
+Startup provisioning of Azure Storage Queues.
+
+Queues are created once when a function app starts (provision_queues, or
+auto_register_function_step with a connection string), not on the send path.
+ensure_queue_exists remembers the queues it has seen for the life of the
+process, so provisioning the same queue again (e.g. from each logging handler)
+costs no further requests.
+
+Apps that do not provision at startup keep working: the first send that finds
+its queue missing creates it once per process (provision_missing_queue) and
+logs a warning, instead of probing for the queue before every send.
+"""
+
+import re
+import threading
+from typing import Any, Iterable, List, Optional, Set, Tuple
+
+from azure.core.exceptions import ResourceExistsError, ResourceNotFoundError
+from sqlalchemy.orm import Session
+
+from ..constants import QueueName
+from ..db.db_pipeline_definition_models import PipelineStepDefinition
+from .logger import get_logger
+from .queue_client_registry import get_queue_client
+
+# Step input triggers that are not queues
+NON_QUEUE_TRIGGERS = frozenset({"timer", "http", "blob", "eventgrid", "eventhub", "servicebus", "manual"})
+
+# Azure queue names: 3-63 lowercase letters, digits and single hyphens, not starting or ending with a hyphen
+_QUEUE_NAME_PATTERN = re.compile(r"^(?!.*--)[a-z0-9][a-z0-9-]{1,61}[a-z0-9]$")
+
+_provisioned_queues: Set[Tuple[str, str]] = set()
+_provisioned_queues_lock = threading.Lock()
+
+
+def is_valid_queue_name(queue_name: str) -> bool:
+    """
+    Check a name against the Azure Storage queue naming rules.
+
+    Args:
+        queue_name: Candidate queue name
+
+    Returns:
+        True if the name is a valid queue name
+    """
+    return bool(_QUEUE_NAME_PATTERN.match(queue_name))
+
+
+def ensure_queue_exists(connection_string: str, queue_name: str) -> bool:
+    """
+    Create a queue unless it already exists, once per process.
+
+    Args:
+        connection_string: Azure Storage connection string
+        queue_name: Name of the queue
+
+    Returns:
+        True if this call created the queue, False if it already existed or was provisioned earlier
+    """
+    key = (connection_string, queue_name)
+    if key in _provisioned_queues:
+        return False
+
+    try:
+        get_queue_client(connection_string, queue_name).create_queue()
+        created = True
+    except ResourceExistsError:
+        created = False
+
+    with _provisioned_queues_lock:
+        _provisioned_queues.add(key)
+    return created
+
+
+def is_queue_provisioned(connection_string: str, queue_name: str) -> bool:
+    """
+    Check whether a queue was provisioned by this process.
+
+    Args:
+        connection_string: Azure Storage connection string
+        queue_name: Name of the queue
+
+    Returns:
+        True if ensure_queue_exists has succeeded for the queue
+    """
+    return (connection_string, queue_name) in _provisioned_queues
+
+
+def clear_provisioned_queues() -> None:
+    """Forget provisioned queues, so the next ensure_queue_exists checks them again."""
+    with _provisioned_queues_lock:
+        _provisioned_queues.clear()
+
+
+def is_queue_not_found_error(error: Exception) -> bool:
+    """
+    Check whether a queue operation failed because the queue does not exist.
+
+    Args:
+        error: Exception raised by the queue client
+
+    Returns:
+        True if the error reports a missing queue
+    """
+    if isinstance(error, ResourceNotFoundError) and getattr(error, "error_code", None) == "QueueNotFound":
+        return True
+    return "QueueNotFound" in str(error)
+
+
+def provision_missing_queue(connection_string: str, queue_name: str, error: Exception) -> bool:
+    """
+    Create a queue that a send found missing, at most once per process.
+
+    Fallback for apps that do not call provision_queues at startup. A queue
+    that was already provisioned by this process is not created again, so a
+    queue deleted while the app runs keeps failing sends.
+
+    Args:
+        connection_string: Azure Storage connection string
+        queue_name: Name of the queue
+        error: Exception the send raised
+
+    Returns:
+        True if the queue exists now and the send should be retried once
+    """
+    if not is_queue_not_found_error(error) or is_queue_provisioned(connection_string, queue_name):
+        return False
+
+    logger = get_logger()
+    logger.warning(f"Queue was not provisioned at startup, creating it | queue_name={queue_name}")
+    try:
+        ensure_queue_exists(connection_string, queue_name)
+    except Exception as e:
+        logger.error(f"Failed to create missing queue | queue_name={queue_name} | error={str(e)}")
+        return False
+    return True
+
+
+def get_pipeline_queue_names(session: Session, pipeline_name: Optional[str] = None) -> List[str]:
+    """
+    Collect the queues named by registered pipeline step definitions.
+
+    Both the output queues and queue input triggers of each step are
+    collected; triggers such as "timer" or "http" are skipped.
+
+    Args:
+        session: Database session
+        pipeline_name: Only collect queues of this pipeline (default: all pipelines)
+
+    Returns:
+        Queue names, without duplicates
+    """
+    query = session.query(PipelineStepDefinition.input_trigger, PipelineStepDefinition.output_queues)
+    if pipeline_name is not None:
+        query = query.filter(PipelineStepDefinition.pipeline_name == pipeline_name)
+
+    names: List[str] = []
+    for input_trigger, output_queues in query:
+        if input_trigger and input_trigger.lower() not in NON_QUEUE_TRIGGERS and is_valid_queue_name(input_trigger):
+            names.append(input_trigger)
+        names.extend(output_queues or [])
+    return list(dict.fromkeys(names))
+
+
+def provision_queues(
+    connection_string: str,
+    queue_names: Iterable[str] = (),
+    output_handlers: Iterable[Any] = (),
+    include_standard_queues: bool = True,
+    session: Optional[Session] = None,
+    pipeline_name: Optional[str] = None,
+) -> List[str]:
+    """
+    Ensure every queue a function app sends to exists; call once at startup.
+
+    Args:
+        connection_string: Azure Storage connection string
+        queue_names: Additional queue names
+        output_handlers: Output handlers whose queues are provisioned, e.g.
+            QueueOutputHandler (anything with get_queue_names())
+        include_standard_queues: Whether to provision the framework queues in QueueName
+        session: Database session; when given, the queues of registered
+            pipeline step definitions are provisioned too
+        pipeline_name: Only provision step definition queues of this pipeline
+
+    Returns:
+        Names of the queues that had to be created
+
+    Raises:
+        Exception: Whatever the storage service raised for a queue that could not be created
+    """
+    logger = get_logger()
+
+    names: List[str] = [queue.value for queue in QueueName] if include_standard_queues else []
+    names.extend(queue_names)
+    for handler in output_handlers:
+        names.extend(handler.get_queue_names())
+    if session is not None:
+        names.extend(get_pipeline_queue_names(session, pipeline_name))
+
+    created: List[str] = []
+    for queue_name in dict.fromkeys(names):
+        try:
+            if ensure_queue_exists(connection_string, queue_name):
+                created.append(queue_name)
+        except Exception as e:
+            logger.error(f"Failed to provision queue | queue_name={queue_name} | error={str(e)}")
+            raise
+
+    logger.info(f"Queues provisioned | queue_count={len(dict.fromkeys(names))} | created={created}")
+    return created
@@ -2,17 +2,112 @@
 Azure Storage Queue utilities.
 
 This module provides utilities for sending messages to Azure Storage Queues
-via both Azure Functions output bindings and direct SDK calls.
+via both Azure Functions output bindings and direct SDK calls, and the optional
+compression envelope for queue message bodies.
 """
 
+import base64
 import json
-from typing import Any, Dict, Optional
+import lzma
+import zlib
+from enum import Enum
+from typing import Any, Callable, Dict, Optional, Tuple, Union
 
 import azure.functions as func
-from azure.storage.queue import QueueClient
 from pydantic_core import to_jsonable_python
 
+from ..exceptions import ErrorCode, ValidationError
 from .logger import get_logger
+from .queue_client_registry import get_queue_client
+from .queue_provisioning import provision_missing_queue
+
+
+class QueueCompression(str, Enum):
+    """Compression codecs for queue message bodies."""
+
+    NONE = "none"
+    ZLIB = "zlib"
+    LZMA = "lzma"
+
+
+# Bodies shorter than this are sent as-is: the envelope and base64 overhead outweigh the savings
+DEFAULT_COMPRESSION_MIN_BYTES = 1024
+
+_ENVELOPE_PREFIX = '{"_compression":"'
+_ENVELOPE_PREFIX_BYTES = _ENVELOPE_PREFIX.encode("ascii")
+
+_CODECS: Dict[QueueCompression, Tuple[Callable[[bytes], bytes], Callable[[bytes], bytes]]] = {
+    QueueCompression.ZLIB: (zlib.compress, zlib.decompress),
+    QueueCompression.LZMA: (lzma.compress, lzma.decompress),
+}
+
+
+def compress_message_body(
+    body: str,
+    compression: QueueCompression = QueueCompression.ZLIB,
+    min_bytes: int = DEFAULT_COMPRESSION_MIN_BYTES,
+) -> str:
+    """
+    Wrap a message body in a compression envelope.
+
+    The envelope is a JSON object naming the codec, with the compressed body
+    base64 encoded: {"_compression": "zlib", "data": "..."}. Bodies below
+    min_bytes, or that would not shrink, are returned unchanged.
+
+    Args:
+        body: Serialized message body
+        compression: Codec to compress with
+        min_bytes: Smallest body worth compressing
+
+    Returns:
+        The envelope, or body itself if it was not compressed
+    """
+    if compression == QueueCompression.NONE or len(body) < min_bytes:
+        return body
+
+    compress, _ = _CODECS[compression]
+    data = base64.b64encode(compress(body.encode("utf-8"))).decode("ascii")
+    envelope = f'{_ENVELOPE_PREFIX}{compression.value}","data":"{data}"}}'
+    return envelope if len(envelope) < len(body) else body
+
+
+def is_compressed_message_body(body: Union[str, bytes]) -> bool:
+    """
+    Check whether a message body is a compression envelope.
+
+    Args:
+        body: Received message body
+
+    Returns:
+        True if the body was written by compress_message_body
+    """
+    prefix = _ENVELOPE_PREFIX_BYTES if isinstance(body, bytes) else _ENVELOPE_PREFIX
+    return body[: len(prefix)] == prefix
+
+
+def decompress_message_body(body: Union[str, bytes]) -> Union[str, bytes]:
+    """
+    Unwrap a compression envelope; uncompressed bodies pass through unchanged.
+
+    Args:
+        body: Received message body
+
+    Returns:
+        The original serialized body
+
+    Raises:
+        ValidationError: If the envelope names an unknown codec or is corrupt
+    """
+    if not is_compressed_message_body(body):
+        return body
+
+    envelope = json.loads(body)
+    try:
+        compression = QueueCompression(envelope["_compression"])
+        _, decompress = _CODECS[compression]
+        return decompress(base64.b64decode(envelope["data"])).decode("utf-8")
+    except (KeyError, ValueError, zlib.error, lzma.LZMAError) as e:
+        raise ValidationError(f"Invalid compressed message body: {str(e)}", error_code=ErrorCode.INVALID_FORMAT, cause=e) from e
 
 
 def _send_to_binding_core(output_binding: func.Out[Any], data: Any, binding_name: str = "", logger: Optional[Any] = None) -> None:
@@ -56,44 +151,55 @@ def send_message_to_queue_binding(output_binding: func.Out[str], message: Dict[s
     _send_to_binding_core(output_binding, json_data, f"queue:{queue_name}", logger)
 
 
-def send_message_to_queue_direct(connection_string: str, queue_name: str, message_data: Dict[str, Any]) -> None:
+def send_message_to_queue_direct(
+    connection_string: str,
+    queue_name: str,
+    message_data: Union[Dict[str, Any], str],
+    compression: QueueCompression = QueueCompression.NONE,
+    compression_min_bytes: int = DEFAULT_COMPRESSION_MIN_BYTES,
+) -> None:
     """
     Send a message directly to Azure Storage Queue using SDK.
 
+    Queues should be provisioned once at startup with provision_queues; a queue
+    that is missing anyway is created on the first send that finds it missing.
+
     Args:
         connection_string: Azure Storage connection string
         queue_name: Name of the target queue
-        message_data: Message data to send (will be JSON serialized)
+        message_data: Message data to send; a dict is JSON serialized, a string
+            (e.g. from MessageCodec.encode_text) is sent as-is
+        compression: Codec for bodies of at least compression_min_bytes (see compress_message_body)
+        compression_min_bytes: Smallest body worth compressing
     """
     logger = get_logger()
 
     try:
-        # Serialize message data
-        json_data = json.dumps(to_jsonable_python(message_data))
+        # Serialize message data unless the caller already did
+        json_data = message_data if isinstance(message_data, str) else json.dumps(to_jsonable_python(message_data))
+        json_data = compress_message_body(json_data, compression, compression_min_bytes)
     except Exception as e:
         logger.error(f"Failed to serialize message for queue {queue_name}: {str(e)}")
         raise
 
+    queue_client = None
     try:
-        # Create queue client and send message
-        queue_client = QueueClient.from_connection_string(conn_str=connection_string, queue_name=queue_name)
+        # Reuse the process-wide client for this queue and send message
+        queue_client = get_queue_client(connection_string, queue_name)
 
         logger.debug(f"Sending message to queue: {queue_name}")
         queue_client.send_message(json_data)
         logger.debug(f"Successfully sent message to queue: {queue_name}")
 
     except Exception as e:
-        # Check if queue doesn't exist and try to create it
-        if "QueueNotFound" in str(e) or "does not exist" in str(e):
-            try:
-                logger.debug(f"Queue {queue_name} not found, creating it...")
-                queue_client.create_queue()
-                # Retry sending the message
-                queue_client.send_message(json_data)
-                logger.debug(f"Message sent to queue after creation: {queue_name}")
-            except Exception as create_error:
-                logger.error(f"Failed to create queue or send message to {queue_name}: {str(create_error)}")
-                raise
-        else:
+        # Queues are created at startup (see queue_provisioning); create one that was missed, once
+        if queue_client is None or not provision_missing_queue(connection_string, queue_name, e):
             logger.error(f"Failed to send message to queue {queue_name}: {str(e)}")
             raise
+
+        try:
+            queue_client.send_message(json_data)
+            logger.debug(f"Message sent to queue after creation: {queue_name}")
+        except Exception as retry_error:
+            logger.error(f"Failed to send message to queue {queue_name}: {str(retry_error)}")
+            raise
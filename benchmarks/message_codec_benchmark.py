@@ -0,0 +1,73 @@
+"""
+Encode/decode throughput of the message codec.
+
+Compares the legacy queue path (model_dump() then json.dumps(to_jsonable_python(...)))
+with MessageCodec on the pydantic and orjson backends, for small, medium and
+~60KB message payloads. The "lazy" row decodes with lazy_payload=True, which
+is what a step that only reads the envelope fields pays.
+
+Usage:
+    python benchmarks/message_codec_benchmark.py [--number N]
+"""
+
+import argparse
+import json
+import timeit
+
+from pydantic_core import to_jsonable_python
+
+from api_exchange_core.processors import Message, MessageCodec
+from api_exchange_core.processors.message_codec import PydanticJsonBackend, orjson
+
+
+def _payload(records: int) -> dict:
+    return {
+        "records": [
+            {"id": f"rec-{i}", "name": f"Customer {i}", "amount": i * 1.25, "active": i % 2 == 0, "tags": ["a", "b", "c"]}
+            for i in range(records)
+        ]
+    }
+
+
+SIZES = {"small": 1, "medium": 12, "60KB": 560}
+
+
+def _legacy_encode(message: Message) -> str:
+    return json.dumps(to_jsonable_python(message.model_dump()))
+
+
+def _legacy_decode(data: str) -> Message:
+    return Message(**json.loads(data))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--number", type=int, default=0, help="Iterations per case (default scales with payload size)")
+    args = parser.parse_args()
+
+    codecs = {"pydantic": MessageCodec(backend=PydanticJsonBackend())}
+    if orjson is not None:
+        codecs["orjson"] = MessageCodec()
+
+    print(f"{'payload':>8} {'bytes':>7} {'variant':>9} {'encode us':>10} {'decode us':>10}")
+    for size_name, records in SIZES.items():
+        message = Message.create_simple_message(payload=_payload(records), pipeline_id="bench", tenant_id="bench")
+        number = args.number or max(200, 20000 // records)
+
+        legacy = _legacy_encode(message)
+        cases = [("legacy", lambda: _legacy_encode(message), lambda: _legacy_decode(legacy))]
+        for name, codec in codecs.items():
+            encoded = codec.encode(message)
+            cases.append((name, lambda codec=codec: codec.encode(message), lambda codec=codec, encoded=encoded: codec.decode(encoded)))
+        codec = MessageCodec()
+        encoded = codec.encode(message)
+        cases.append(("lazy", lambda: codec.encode(message), lambda: codec.decode(encoded, lazy_payload=True)))
+
+        for name, encode, decode in cases:
+            encode_us = min(timeit.repeat(encode, number=number, repeat=3)) / number * 1e6
+            decode_us = min(timeit.repeat(decode, number=number, repeat=3)) / number * 1e6
+            print(f"{size_name:>8} {len(legacy):>7} {name:>9} {encode_us:>10.1f} {decode_us:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
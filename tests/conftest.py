@@ -13,7 +13,9 @@ from api_exchange_core.db import (
     DatabaseManager,
     import_all_models,
 )
-from api_exchange_core.db.db_config import Base, initialize_db
+from api_exchange_core.db.db_config import Base, get_db_manager, initialize_db, set_db_manager
+from api_exchange_core.utils.queue_client_registry import close_queue_clients
+from api_exchange_core.utils.queue_provisioning import clear_provisioned_queues
 
 
 @pytest.fixture(scope="session")
@@ -66,6 +68,40 @@ def db_session(db_manager: DatabaseManager) -> Session:
     Base.metadata.drop_all(db_manager.engine)
 
 
+@pytest.fixture
+def file_db_manager(tmp_path, db_manager: DatabaseManager) -> DatabaseManager:
+    """
+    Swap the global database manager for a file-backed SQLite database.
+
+    The in-memory database is private to each thread's connection, so tests
+    that write tracking data from worker threads need a shared file.
+    """
+    manager = DatabaseManager(
+        DatabaseConfig(
+            db_type="sqlite",
+            database=str(tmp_path / "tracking.db"),
+            host="localhost",
+            username="test",
+            password="test",
+            development_mode=True,
+        )
+    )
+    manager.create_tables()
+    previous = get_db_manager()
+    set_db_manager(manager)
+    yield manager
+    set_db_manager(previous)
+    manager.close()
+
+
+@pytest.fixture(autouse=True)
+def reset_queue_clients():
+    """Drop queue clients and provisioned queues cached by a test, so patched QueueClient classes do not leak."""
+    yield
+    close_queue_clients()
+    clear_provisioned_queues()
+
+
 @pytest.fixture
 def sample_tenant_id() -> str:
     """Standard tenant ID for testing."""
@@ -0,0 +1,259 @@
+"""
+Unit tests for AsyncSimpleProcessorHandler.
+
+Blocking tracking calls run in executor threads, so tests that track use a
+file-backed SQLite database that every thread's connection can see.
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from api_exchange_core.db.db_pipeline_tracking_models import PipelineExecution, PipelineStep
+from api_exchange_core.processors import (
+    AsyncSimpleProcessorHandler,
+    AsyncSimpleProcessorInterface,
+    ClaimCheck,
+    IdempotencyStore,
+    LocalFileBlobStore,
+    Message,
+    PipelineTrackingWriter,
+    ProcessingResult,
+    ProcessingStatus,
+    RetryPolicy,
+    get_message_codec,
+)
+from api_exchange_core.processors.output_handlers.base_output_handler import BaseOutputHandler
+
+
+class GatedProcessor(AsyncSimpleProcessorInterface):
+    """Processor that waits until a number of messages are in flight at once."""
+
+    def __init__(self, expected: int):
+        self.expected = expected
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.all_arrived = asyncio.Event()
+
+    async def process(self, message: Message, context: dict) -> ProcessingResult:
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        if self.in_flight >= self.expected:
+            self.all_arrived.set()
+        await asyncio.wait_for(self.all_arrived.wait(), timeout=5)
+        self.in_flight -= 1
+        output = self.create_output_message(payload={"echo": message.payload}, source_message=message)
+        return ProcessingResult.success_result(output_messages=[output], records_processed=1)
+
+
+class ExplodingProcessor(AsyncSimpleProcessorInterface):
+    """Processor that raises on every message."""
+
+    async def process(self, message: Message, context: dict) -> ProcessingResult:
+        await asyncio.sleep(0)
+        raise RuntimeError("boom")
+
+
+class SlowProcessor(AsyncSimpleProcessorInterface):
+    """Processor that awaits longer than any test deadline."""
+
+    def __init__(self):
+        self.cancelled = False
+
+    async def process(self, message: Message, context: dict) -> ProcessingResult:
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        return ProcessingResult.success_result()
+
+
+class RecordingOutputHandler(BaseOutputHandler):
+    """Output handler that records the results it was given."""
+
+    def __init__(self):
+        self.handled = []
+
+    def handle_output(self, result, source_message, context) -> None:
+        self.handled.append((result, source_message))
+
+    def get_handler_name(self) -> str:
+        return "RecordingOutputHandler"
+
+
+def _message(pipeline_id: str = "pipeline-1") -> Message:
+    return Message.create_simple_message(payload={"value": 1}, pipeline_id=pipeline_id, tenant_id="tenant-1")
+
+
+class TestAsyncProcessMessage:
+    """Test async single-message processing."""
+
+    async def test_tracks_execution_and_step(self, file_db_manager):
+        handler = AsyncSimpleProcessorHandler(GatedProcessor(expected=1), enable_message_storage=True)
+
+        result = await handler.process_message(_message())
+
+        assert result.success
+        session = file_db_manager.get_session()
+        try:
+            execution = session.query(PipelineExecution).one()
+            assert execution.step_count == 1
+            step = session.query(PipelineStep).one()
+            assert step.status == "completed"
+            assert step.output_count == 1
+        finally:
+            session.close()
+
+    async def test_exception_is_tracked_as_failure(self, file_db_manager):
+        handler = AsyncSimpleProcessorHandler(ExplodingProcessor())
+
+        result = await handler.process_message(_message())
+
+        assert not result.success
+        assert result.error_code == "PROCESSING_EXCEPTION"
+        session = file_db_manager.get_session()
+        try:
+            assert session.query(PipelineStep).one().status == "failed"
+        finally:
+            session.close()
+
+    async def test_outputs_are_routed(self):
+        output_handler = RecordingOutputHandler()
+        handler = AsyncSimpleProcessorHandler(GatedProcessor(expected=1), enable_pipeline_tracking=False, output_handler=output_handler)
+        message = _message()
+
+        result = await handler.process_message(message)
+
+        assert output_handler.handled == [(result, message)]
+
+    async def test_offloaded_payload_is_fetched_and_released(self, tmp_path):
+        claim_check = ClaimCheck(LocalFileBlobStore(tmp_path), threshold_bytes=0)
+        handler = AsyncSimpleProcessorHandler(GatedProcessor(expected=1), enable_pipeline_tracking=False, claim_check=claim_check)
+        message = claim_check.offload(_message())
+        ref = claim_check.get_reference(message)
+
+        result = await handler.process_message(message)
+
+        assert result.output_messages[0].payload == {"echo": {"value": 1}}
+        assert not (tmp_path / ref).exists()
+
+    async def test_redelivery_after_release_is_skipped_as_duplicate(self, tmp_path):
+        claim_check = ClaimCheck(LocalFileBlobStore(tmp_path), threshold_bytes=0)
+        handler = AsyncSimpleProcessorHandler(
+            GatedProcessor(expected=1), enable_pipeline_tracking=False, claim_check=claim_check, idempotency_store=IdempotencyStore()
+        )
+        codec = get_message_codec()
+        body = codec.encode(claim_check.offload(_message()))
+
+        first = await handler.process_message(codec.decode(body))
+        redelivered = await handler.process_message(codec.decode(body), {"dequeue_count": 2})
+
+        assert first.success
+        assert redelivered.context["duplicate"] is True
+
+    async def test_write_behind_tracking_stays_on_event_loop(self, file_db_manager):
+        writer = PipelineTrackingWriter(flush_interval=0.01, register_atexit=False)
+        executor = ThreadPoolExecutor(max_workers=1)
+        submitted = []
+        original_submit = executor.submit
+
+        def counting_submit(*args, **kwargs):
+            submitted.append(args)
+            return original_submit(*args, **kwargs)
+
+        executor.submit = counting_submit
+        handler = AsyncSimpleProcessorHandler(GatedProcessor(expected=1), tracking_writer=writer, executor=executor)
+
+        try:
+            result = await handler.process_message(_message())
+            handler.flush_tracking()
+        finally:
+            writer.close(timeout=5)
+            executor.shutdown()
+
+        assert result.success
+        assert submitted == []
+        session = file_db_manager.get_session()
+        try:
+            assert session.query(PipelineStep).one().status == "completed"
+        finally:
+            session.close()
+
+
+    async def test_slow_processor_times_out(self, file_db_manager):
+        processor = SlowProcessor()
+        handler = AsyncSimpleProcessorHandler(processor, processing_timeout=0.05)
+
+        result = await handler.process_message(_message())
+
+        assert result.status == ProcessingStatus.TIMEOUT
+        assert processor.cancelled
+        session = file_db_manager.get_session()
+        try:
+            assert session.query(PipelineStep).one().status == "timed_out"
+        finally:
+            session.close()
+
+
+    async def test_transient_failure_is_retried(self):
+        attempts = []
+
+        class FlakyProcessor(AsyncSimpleProcessorInterface):
+            async def process(self, message: Message, context: dict) -> ProcessingResult:
+                attempts.append(message.message_id)
+                if len(attempts) < 3:
+                    raise ConnectionError("connection reset")
+                return ProcessingResult.success_result()
+
+        policy = RetryPolicy(max_retry_attempts=3, retry_backoff_base=0, jitter=False)
+        handler = AsyncSimpleProcessorHandler(FlakyProcessor(), enable_pipeline_tracking=False, retry_policy=policy)
+
+        result = await handler.process_message(_message())
+
+        assert result.success
+        assert len(attempts) == 3
+
+
+class TestAsyncProcessMessages:
+    """Test concurrent processing of many messages."""
+
+    async def test_messages_run_concurrently(self):
+        processor = GatedProcessor(expected=5)
+        handler = AsyncSimpleProcessorHandler(processor, enable_pipeline_tracking=False)
+        messages = [_message(pipeline_id=f"pipeline-{i}") for i in range(5)]
+
+        results = await handler.process_messages(messages)
+
+        assert all(r.success for r in results)
+        assert processor.max_in_flight == 5
+        assert [r.output_messages[0].payload["echo"] for r in results] == [m.payload for m in messages]
+
+    async def test_max_concurrency_bounds_in_flight(self):
+        processor = GatedProcessor(expected=2)
+        handler = AsyncSimpleProcessorHandler(processor, enable_pipeline_tracking=False)
+
+        results = await handler.process_messages([_message() for _ in range(6)], max_concurrency=2)
+
+        assert len(results) == 6
+        assert processor.max_in_flight == 2
+
+    async def test_tracking_for_concurrent_messages(self, file_db_manager):
+        handler = AsyncSimpleProcessorHandler(GatedProcessor(expected=4), executor=ThreadPoolExecutor(max_workers=4))
+
+        results = await handler.process_messages([_message(pipeline_id="shared") for _ in range(4)])
+        handler.executor.shutdown()
+
+        assert all(r.success for r in results)
+        session = file_db_manager.get_session()
+        try:
+            execution = session.query(PipelineExecution).one()
+            assert execution.step_count == 4
+            assert session.query(PipelineStep).filter_by(status="completed").count() == 4
+        finally:
+            session.close()
+
+    async def test_empty_batch(self):
+        handler = AsyncSimpleProcessorHandler(GatedProcessor(expected=1), enable_pipeline_tracking=False)
+
+        assert await handler.process_messages([]) == []
+
@@ -0,0 +1,92 @@
+"""
+Unit tests for CircuitBreaker.
+
+Tests opening on consecutive failures and slow calls, skipping while open,
+and the half-open probe.
+"""
+
+import pytest
+
+from api_exchange_core.exceptions import ValidationError
+from api_exchange_core.processors import CircuitBreaker, CircuitState
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _fail(breaker: CircuitBreaker, times: int) -> None:
+    for _ in range(times):
+        assert breaker.allow()
+        breaker.record_failure()
+
+
+class TestCircuitBreaker:
+    """Test circuit breaker state transitions."""
+
+    def test_opens_after_consecutive_failures(self):
+        breaker = CircuitBreaker(failure_threshold=3)
+
+        _fail(breaker, 2)
+        assert breaker.state == CircuitState.CLOSED
+        _fail(breaker, 1)
+
+        assert breaker.state == CircuitState.OPEN
+        assert not breaker.allow()
+        assert breaker.get_stats() == {"state": "open", "consecutive_failures": 3, "skipped": 1, "open_count": 1}
+
+    def test_success_resets_failure_count(self):
+        breaker = CircuitBreaker(failure_threshold=2)
+
+        _fail(breaker, 1)
+        breaker.allow()
+        breaker.record_success(1.0)
+        _fail(breaker, 1)
+
+        assert breaker.state == CircuitState.CLOSED
+
+    def test_slow_calls_count_as_failures(self):
+        breaker = CircuitBreaker(failure_threshold=2, latency_threshold_ms=100)
+
+        for _ in range(2):
+            breaker.allow()
+            breaker.record_success(250.0)
+
+        assert breaker.state == CircuitState.OPEN
+
+    def test_half_open_allows_a_single_probe(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock)
+        _fail(breaker, 1)
+
+        clock.now = 10
+        assert breaker.state == CircuitState.HALF_OPEN
+        assert breaker.allow()
+        assert not breaker.allow()
+
+        breaker.record_success(1.0)
+        assert breaker.state == CircuitState.CLOSED
+        assert breaker.allow()
+
+    def test_failed_probe_reopens(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock)
+        _fail(breaker, 1)
+
+        clock.now = 10
+        _fail(breaker, 1)
+
+        assert breaker.state == CircuitState.OPEN
+        clock.now = 15
+        assert not breaker.allow()
+        assert breaker.get_stats()["open_count"] == 2
+
+    def test_invalid_threshold(self):
+        with pytest.raises(ValidationError):
+            CircuitBreaker(failure_threshold=0)
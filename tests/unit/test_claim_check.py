@@ -0,0 +1,124 @@
+"""
+Unit tests for ClaimCheck and LocalFileBlobStore.
+
+Tests payload offload, deferred resolution and queue output integration.
+"""
+
+from unittest.mock import patch
+
+import pytest
+
+from api_exchange_core.exceptions import NotFoundError
+from api_exchange_core.processors import ClaimCheck, LocalFileBlobStore, Message, ProcessingResult
+from api_exchange_core.processors.claim_check import CLAIM_CHECK_KEY
+from api_exchange_core.processors.message_codec import get_message_codec
+from api_exchange_core.processors.output_handlers.queue_output_handler import QueueOutputHandler
+from api_exchange_core.utils.queue_utils import QueueCompression
+
+
+def _message(size: int = 10) -> Message:
+    return Message.create_simple_message(payload={"data": "x" * size}, pipeline_id="pipeline-1", tenant_id="tenant-1")
+
+
+class TestLocalFileBlobStore:
+    """Test the filesystem blob store."""
+
+    def test_put_get_delete(self, tmp_path):
+        store = LocalFileBlobStore(tmp_path)
+
+        ref = store.put("pipeline-1/message.json", b'{"a": 1}')
+
+        assert store.get(ref) == b'{"a": 1}'
+        store.delete(ref)
+        store.delete(ref)
+        with pytest.raises(NotFoundError):
+            store.get(ref)
+
+    def test_reference_outside_store_is_rejected(self, tmp_path):
+        store = LocalFileBlobStore(tmp_path / "blobs")
+
+        with pytest.raises(NotFoundError):
+            store.get("../secrets.json")
+
+
+class TestClaimCheck:
+    """Test offloading and resolving payloads."""
+
+    def test_offload_replaces_payload_with_reference(self, tmp_path):
+        claim_check = ClaimCheck(LocalFileBlobStore(tmp_path))
+        message = _message()
+
+        offloaded = claim_check.offload(message)
+
+        assert offloaded.payload == {}
+        assert offloaded.message_id == message.message_id
+        assert offloaded.context[CLAIM_CHECK_KEY]["size"] == len('{"data":"xxxxxxxxxx"}')
+        assert message.payload == {"data": "x" * 10}
+        assert CLAIM_CHECK_KEY not in message.context
+
+    def test_resolve_fetches_payload_on_first_access(self, tmp_path):
+        store = LocalFileBlobStore(tmp_path)
+        claim_check = ClaimCheck(store)
+        received = get_message_codec().decode(get_message_codec().encode(claim_check.offload(_message())))
+
+        with patch.object(store, "get", wraps=store.get) as get:
+            ref = claim_check.resolve(received)
+            assert get.call_count == 0
+            assert received.payload == {"data": "x" * 10}
+            assert get.call_count == 1
+
+        assert CLAIM_CHECK_KEY not in received.context
+        assert (tmp_path / ref).exists()
+
+    def test_inline_message_is_not_resolved(self, tmp_path):
+        claim_check = ClaimCheck(LocalFileBlobStore(tmp_path))
+        message = _message()
+
+        assert claim_check.resolve(message) is None
+        assert message.payload_loaded
+
+    def test_should_offload(self, tmp_path):
+        claim_check = ClaimCheck(LocalFileBlobStore(tmp_path), threshold_bytes=100)
+
+        assert not claim_check.should_offload(100)
+        assert claim_check.should_offload(101)
+
+
+class TestQueueOutputOffload:
+    """Test claim-check offload in QueueOutputHandler."""
+
+    @patch("api_exchange_core.processors.output_handlers.queue_output_handler.send_message_to_queue_direct")
+    def test_only_oversized_messages_are_offloaded(self, mock_send, tmp_path):
+        claim_check = ClaimCheck(LocalFileBlobStore(tmp_path), threshold_bytes=1024)
+        handler = QueueOutputHandler(queue_mappings={}, connection_string="UseDevelopmentStorage=true", default_queue="out", claim_check=claim_check)
+        small, large = _message(10), _message(4096)
+
+        handler.handle_output(ProcessingResult.success_result(output_messages=[small, large]), _message(), {})
+
+        sent = [get_message_codec().decode(call.kwargs["message_data"]) for call in mock_send.call_args_list]
+        assert sent[0].payload == small.payload
+        assert CLAIM_CHECK_KEY not in sent[0].context
+        assert sent[1].payload == {}
+        assert len(mock_send.call_args_list[1].kwargs["message_data"]) < 1024
+
+        claim_check.resolve(sent[1])
+        assert sent[1].payload == large.payload
+
+    @patch("api_exchange_core.processors.output_handlers.queue_output_handler.send_message_to_queue_direct")
+    def test_compression_applies_before_offload(self, mock_send, tmp_path):
+        claim_check = ClaimCheck(LocalFileBlobStore(tmp_path), threshold_bytes=1024)
+        handler = QueueOutputHandler(
+            queue_mappings={},
+            connection_string="UseDevelopmentStorage=true",
+            default_queue="out",
+            claim_check=claim_check,
+            compression=QueueCompression.ZLIB,
+        )
+        large = _message(4096)
+
+        handler.handle_output(ProcessingResult.success_result(output_messages=[large]), _message(), {})
+
+        body = mock_send.call_args.kwargs["message_data"]
+        assert body.startswith('{"_compression":"zlib"')
+        assert get_message_codec().decode(body).payload == large.payload
+        assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,47 @@
+"""
+Unit tests for ExecutionIdCache.
+"""
+
+from api_exchange_core.processors.execution_cache import ExecutionIdCache
+
+
+class TestExecutionIdCache:
+    """Test LRU behaviour and counters."""
+
+    def test_get_and_put(self):
+        cache = ExecutionIdCache(max_size=2)
+
+        assert cache.get("p1") is None
+        cache.put("p1", "e1")
+
+        assert cache.get("p1") == "e1"
+        assert cache.get_stats() == {"size": 1, "hits": 1, "misses": 1}
+
+    def test_evicts_least_recently_used(self):
+        cache = ExecutionIdCache(max_size=2)
+        cache.put("p1", "e1")
+        cache.put("p2", "e2")
+        cache.get("p1")
+
+        cache.put("p3", "e3")
+
+        assert cache.get("p2") is None
+        assert cache.get("p1") == "e1"
+        assert cache.get("p3") == "e3"
+        assert len(cache) == 2
+
+    def test_discard_and_clear(self):
+        cache = ExecutionIdCache()
+        cache.put("p1", "e1")
+        cache.put("p2", "e2")
+
+        cache.discard("p1")
+        assert cache.get("p1") is None
+        cache.clear()
+        assert len(cache) == 0
+
+    def test_zero_size_disables_cache(self):
+        cache = ExecutionIdCache(max_size=0)
+        cache.put("p1", "e1")
+
+        assert cache.get("p1") is None
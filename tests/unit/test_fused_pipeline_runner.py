@@ -0,0 +1,174 @@
+"""
+Unit tests for FusedPipelineRunner.
+
+Tests in-memory message passing between fused steps, per-step pipeline
+tracking and routing of terminal outputs.
+"""
+
+import pytest
+from sqlalchemy.orm import Session
+
+from api_exchange_core.db.db_pipeline_tracking_models import PipelineExecution, PipelineStep
+from api_exchange_core.exceptions import ValidationError
+from api_exchange_core.processors import (
+    FusedPipelineRunner,
+    Message,
+    ProcessingResult,
+    SimpleProcessorInterface,
+)
+from api_exchange_core.processors.output_handlers.base_output_handler import BaseOutputHandler
+
+
+class AddProcessor(SimpleProcessorInterface):
+    """Processor that adds a constant to the payload value."""
+
+    def __init__(self, amount: int, name: str = None):
+        self.amount = amount
+        self.name = name
+
+    def get_processor_name(self) -> str:
+        return self.name or super().get_processor_name()
+
+    def process(self, message: Message, context: dict) -> ProcessingResult:
+        output = self.create_output_message(payload={"value": message.payload["value"] + self.amount}, source_message=message)
+        return ProcessingResult.success_result(output_messages=[output], records_processed=1)
+
+
+class SplitProcessor(SimpleProcessorInterface):
+    """Processor that emits an even and an odd labelled output."""
+
+    def process(self, message: Message, context: dict) -> ProcessingResult:
+        outputs = []
+        for label in ("even", "odd"):
+            output = self.create_output_message(payload={"value": message.payload["value"], "label": label}, source_message=message)
+            output.add_context(output_name=label)
+            outputs.append(output)
+        return ProcessingResult.success_result(output_messages=outputs)
+
+
+class TagProcessor(SimpleProcessorInterface):
+    """Processor that marks its input payload in place and passes it on."""
+
+    def __init__(self, tag: str):
+        self.tag = tag
+
+    def get_processor_name(self) -> str:
+        return f"TagProcessor_{self.tag}"
+
+    def process(self, message: Message, context: dict) -> ProcessingResult:
+        message.payload.setdefault("tags", []).append(self.tag)
+        output = self.create_output_message(payload=dict(message.payload), source_message=message)
+        return ProcessingResult.success_result(output_messages=[output])
+
+
+class FailingProcessor(SimpleProcessorInterface):
+    """Processor that always returns a failure."""
+
+    def process(self, message: Message, context: dict) -> ProcessingResult:
+        return ProcessingResult.failure_result(error_message="Requested failure", error_code="REQUESTED")
+
+
+class RecordingOutputHandler(BaseOutputHandler):
+    """Output handler that records routed messages."""
+
+    def __init__(self):
+        self.routed = []
+
+    def handle_output(self, result, source_message, context) -> None:
+        self.routed.extend(result.output_messages)
+
+    def get_handler_name(self) -> str:
+        return "RecordingOutputHandler"
+
+
+def _message(value: int = 1) -> Message:
+    return Message.create_simple_message(payload={"value": value}, pipeline_id="pipeline-1", tenant_id="tenant-1")
+
+
+class TestFusedChain:
+    """Test linear chains of fused processors."""
+
+    def test_outputs_pass_between_steps_in_memory(self, db_session: Session):
+        output_handler = RecordingOutputHandler()
+        runner = FusedPipelineRunner.chain([AddProcessor(1), AddProcessor(10)], output_handler=output_handler)
+
+        results = runner.run(_message(1))
+
+        assert list(results) == ["AddProcessor", "AddProcessor_1"]
+        assert results["AddProcessor_1"][0].output_messages[0].payload == {"value": 12}
+        # Only the terminal step routes its outputs out of the fused segment
+        assert [routed.payload for routed in output_handler.routed] == [{"value": 12}]
+
+    def test_every_step_is_tracked(self, db_session: Session):
+        runner = FusedPipelineRunner.chain([AddProcessor(1, name="first"), AddProcessor(2, name="second")])
+
+        runner.run(_message())
+
+        steps = db_session.query(PipelineStep).all()
+        assert sorted(step.processor_name for step in steps) == ["first", "second"]
+        assert all(step.status == "completed" for step in steps)
+        execution = db_session.query(PipelineExecution).one()
+        assert execution.step_count == 2
+
+    def test_failed_step_stops_downstream(self, db_session: Session):
+        runner = FusedPipelineRunner.chain([FailingProcessor(), AddProcessor(1)])
+
+        results = runner.run(_message())
+
+        assert not results["FailingProcessor"][0].success
+        assert results["AddProcessor"] == []
+        assert db_session.query(PipelineStep).count() == 1
+
+
+class TestFusedDag:
+    """Test fan-out and output_name routing between fused steps."""
+
+    def test_output_name_routes_to_matching_branch(self, db_session: Session):
+        runner = FusedPipelineRunner(enable_pipeline_tracking=False)
+        runner.add_step("split", SplitProcessor())
+        runner.add_step("even", AddProcessor(100), after="split", output_name="even")
+        runner.add_step("all", AddProcessor(1), after="split")
+
+        results = runner.run(_message(2))
+
+        assert len(results["even"]) == 1
+        assert results["even"][0].output_messages[0].payload == {"value": 102}
+        assert len(results["all"]) == 2
+
+    def test_outputs_no_step_accepts_are_routed(self, db_session: Session):
+        output_handler = RecordingOutputHandler()
+        runner = FusedPipelineRunner(output_handler=output_handler, enable_pipeline_tracking=False)
+        runner.add_step("split", SplitProcessor())
+        runner.add_step("even", AddProcessor(100), after="split", output_name="even")
+
+        runner.run(_message(2))
+
+        assert sorted((m.payload["value"], m.payload.get("label")) for m in output_handler.routed) == [(2, "odd"), (102, None)]
+
+    def test_each_downstream_step_gets_its_own_copy(self, db_session: Session):
+        runner = FusedPipelineRunner(enable_pipeline_tracking=False)
+        runner.add_step("parse", AddProcessor(0))
+        runner.add_step("left", TagProcessor("left"), after="parse")
+        runner.add_step("right", TagProcessor("right"), after="parse")
+
+        results = runner.run(_message(1))
+
+        assert results["left"][0].output_messages[0].payload["tags"] == ["left"]
+        assert results["right"][0].output_messages[0].payload["tags"] == ["right"]
+        assert "tags" not in results["parse"][0].output_messages[0].payload
+
+    def test_unknown_upstream_is_rejected(self):
+        runner = FusedPipelineRunner()
+
+        with pytest.raises(ValidationError, match="unknown step"):
+            runner.add_step("enrich", AddProcessor(1), after="parse")
+
+    def test_duplicate_name_is_rejected(self):
+        runner = FusedPipelineRunner().add_step("parse", AddProcessor(1))
+
+        with pytest.raises(ValidationError, match="Duplicate"):
+            runner.add_step("parse", AddProcessor(2))
+
+    def test_empty_pipeline_cannot_run(self):
+        with pytest.raises(ValidationError, match="no steps"):
+            FusedPipelineRunner().run(_message())
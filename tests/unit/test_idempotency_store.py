@@ -0,0 +1,105 @@
+"""
+Unit tests for IdempotencyStore.
+
+Tests the in-process TTL cache and the processed_message table lookups.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy.orm import Session
+
+from api_exchange_core.db.db_pipeline_tracking_models import ProcessedMessage
+from api_exchange_core.processors import IdempotencyStore, Message, ProcessingResult, ProcessingStatus
+
+
+def _record(store: IdempotencyStore, message_id: str = "m1"):
+    message = Message.create_simple_message(payload={}, pipeline_id="pipeline-1", tenant_id="tenant-1")
+    message.message_id = message_id
+    return store.build_record("Processor", message, ProcessingResult.success_result(records_processed=2))
+
+
+def _row(message_id: str, expires_at: datetime) -> ProcessedMessage:
+    return ProcessedMessage(
+        processor_name="Processor",
+        message_id=message_id,
+        pipeline_id="pipeline-1",
+        tenant_id="tenant-1",
+        status="success",
+        records_processed=1,
+        output_count=3,
+        processed_at=datetime.now(timezone.utc),
+        expires_at=expires_at,
+    )
+
+
+class TestIdempotencyCache:
+    """Test the in-process TTL cache."""
+
+    def test_remember_and_get(self):
+        store = IdempotencyStore()
+        store.remember(_record(store))
+
+        record = store.get_cached("Processor", "m1")
+
+        assert record.records_processed == 2
+        assert store.get_cached("Other", "m1") is None
+        assert store.get_stats() == {"size": 1, "hits": 1, "misses": 1}
+
+    def test_expired_entries_are_dropped(self):
+        store = IdempotencyStore(ttl_seconds=0)
+        store.remember(_record(store))
+
+        assert store.get_cached("Processor", "m1") is None
+        assert store.get_stats()["size"] == 0
+
+    def test_evicts_oldest_entry_when_full(self):
+        store = IdempotencyStore(max_cached=1)
+        store.remember(_record(store, "m1"))
+        store.remember(_record(store, "m2"))
+
+        assert store.get_cached("Processor", "m1") is None
+        assert store.get_cached("Processor", "m2") is not None
+
+    def test_redelivery_only_checks_database_for_redeliveries(self):
+        store = IdempotencyStore(redelivery_only=True)
+
+        assert not store.should_query_database({})
+        assert not store.should_query_database({"dequeue_count": 1})
+        assert store.should_query_database({"dequeue_count": 2})
+        assert not IdempotencyStore(persistent=False).should_query_database({"dequeue_count": 2})
+
+    def test_duplicate_result_carries_no_outputs(self):
+        store = IdempotencyStore()
+
+        result = _record(store).to_result()
+
+        assert result.success
+        assert result.status == ProcessingStatus.SUCCESS
+        assert result.output_messages == []
+        assert result.context["duplicate"] is True
+
+
+class TestIdempotencyDatabase:
+    """Test processed_message lookups and cleanup."""
+
+    def test_load_reads_unexpired_rows_into_cache(self, db_session: Session):
+        store = IdempotencyStore()
+        db_session.add(_row("m1", datetime.now(timezone.utc) + timedelta(hours=1)))
+        db_session.add(_row("m2", datetime.now(timezone.utc) - timedelta(hours=1)))
+        db_session.commit()
+
+        record = store.load(db_session, "Processor", "m1")
+
+        assert record.output_count == 3
+        assert store.get_cached("Processor", "m1") is not None
+        assert store.load(db_session, "Processor", "m2") is None
+
+    def test_purge_expired(self, db_session: Session):
+        store = IdempotencyStore()
+        db_session.add(_row("m1", datetime.now(timezone.utc) + timedelta(hours=1)))
+        db_session.add(_row("m2", datetime.now(timezone.utc) - timedelta(hours=1)))
+        db_session.commit()
+
+        assert store.purge_expired(db_session) == 1
+        db_session.commit()
+        assert [row.message_id for row in db_session.query(ProcessedMessage).all()] == ["m1"]
@@ -14,6 +14,7 @@ from unittest.mock import Mock, patch, MagicMock, call
 from typing import Dict, Any
 
 import pytest
+from azure.core.exceptions import ResourceExistsError
 from azure.storage.queue import QueueClient, QueueServiceClient
 
 from api_exchange_core.utils.logger import (
@@ -164,6 +165,92 @@ class TestContextAwareLogger:
         assert kwargs["stack_info"] is False
 
 
+class TestLazyLogging:
+    """Test level checks and %-style args in ContextAwareLogger."""
+
+    def setup_method(self):
+        """Set up a real logger at INFO level."""
+        self.logger = logging.getLogger("test.lazy_logging")
+        self.logger.setLevel(logging.INFO)
+        self.logger.info = Mock()
+        self.logger.debug = Mock()
+        self.context_logger = ContextAwareLogger(self.logger)
+
+    def teardown_method(self):
+        """Remove the mocked methods."""
+        del self.logger.info
+        del self.logger.debug
+
+    def test_disabled_level_does_not_format(self):
+        """Test that nothing is formatted or called for a disabled level."""
+        value = MagicMock()
+
+        self.context_logger.debug("Value: %s", value, extra={"value": value})
+
+        self.logger.debug.assert_not_called()
+        value.__str__.assert_not_called()
+        assert not self.context_logger.is_enabled_for(logging.DEBUG)
+
+    def test_args_are_interpolated(self):
+        """Test that %-style args are interpolated before extras are appended."""
+        self.context_logger.info("Processed %s messages", 3, extra={"queue": "orders"})
+
+        self.logger.info.assert_called_once_with("Processed 3 messages | queue=orders", extra={"queue": "orders"})
+
+
+class TestBoundLogger:
+    """Test BoundLogger context handling."""
+
+    def setup_method(self):
+        """Set up a bound logger over a mock logger."""
+        self.mock_logger = Mock(spec=logging.Logger)
+        self.mock_logger.isEnabledFor.return_value = True
+        self.context = {"message_id": "m1", "tenant_id": "t1"}
+        self.bound = ContextAwareLogger(self.mock_logger).bind(**self.context)
+
+    def test_context_is_shared_without_extra(self):
+        """Test that records without extra reuse the bound context dict."""
+        self.bound.info("Started %s", "Processor")
+
+        args, kwargs = self.mock_logger.info.call_args
+        assert args == ("Started Processor | message_id=m1 | tenant_id=t1",)
+        assert kwargs["extra"] is self.bound.context
+
+    def test_extra_is_merged(self):
+        """Test that per-call extra data is merged after the context."""
+        self.bound.error("Failed", extra={"error_code": "E1"}, exc_info=True)
+
+        self.mock_logger.error.assert_called_once_with(
+            "Failed | message_id=m1 | tenant_id=t1 | error_code=E1",
+            extra={"message_id": "m1", "tenant_id": "t1", "error_code": "E1"},
+            exc_info=True,
+        )
+        assert self.bound.context == self.context
+
+    def test_overridden_keys_appear_once(self):
+        """Test that extra data overriding a context key is not formatted twice."""
+        self.bound.warning("Retry", extra={"tenant_id": "t2"})
+
+        self.mock_logger.warning.assert_called_once_with("Retry | message_id=m1 | tenant_id=t2", extra={"message_id": "m1", "tenant_id": "t2"})
+
+    def test_disabled_level_skips_merge(self):
+        """Test that nothing is logged for a disabled level."""
+        self.mock_logger.isEnabledFor.return_value = False
+
+        self.bound.debug("Details", extra={"size": 10})
+
+        self.mock_logger.debug.assert_not_called()
+
+    def test_bind_adds_context(self):
+        """Test that bind returns a logger with the combined context."""
+        child = self.bound.bind(step_id="s1")
+
+        child.info("Step")
+
+        self.mock_logger.info.assert_called_once_with("Step | message_id=m1 | tenant_id=t1 | step_id=s1", extra={**self.context, "step_id": "s1"})
+        assert "step_id" not in self.bound.context
+
+
 class TestAzureQueueHandler:
     """Test AzureQueueHandler functionality."""
 
@@ -217,51 +304,38 @@ class TestAzureQueueHandler:
             
             assert "Failed to ensure queue exists: Queue error" in mock_stderr.getvalue()
 
-    @patch('api_exchange_core.utils.logger.QueueServiceClient')
-    def test_ensure_queue_exists_success_existing_queue(self, mock_queue_service_class):
+    @patch('api_exchange_core.utils.queue_client_registry.QueueClient')
+    def test_ensure_queue_exists_success_existing_queue(self, mock_queue_client_class):
         """Test _ensure_queue_exists when queue already exists."""
-        # Setup mock
-        mock_queue_service = Mock()
-        mock_queue_service_class.from_connection_string.return_value = mock_queue_service
-        
-        # Mock existing queue
-        mock_queue = Mock()
-        mock_queue.name = self.queue_name
-        mock_queue_service.list_queues.return_value = [mock_queue]
-        
-        # Test
+        mock_queue_client = mock_queue_client_class.from_connection_string.return_value
+        mock_queue_client.create_queue.side_effect = ResourceExistsError("The specified queue already exists.")
+
         handler = AzureQueueHandler.__new__(AzureQueueHandler)
         handler.connection_string = self.connection_string
         handler.queue_name = self.queue_name
-        
-        result = handler._ensure_queue_exists()
-        
-        assert result is True
-        mock_queue_service.list_queues.assert_called_once()
-        mock_queue_service.create_queue.assert_not_called()
 
-    @patch('api_exchange_core.utils.logger.QueueServiceClient')
-    def test_ensure_queue_exists_success_create_queue(self, mock_queue_service_class):
+        assert handler._ensure_queue_exists() is True
+        # Checked once per process, without listing the account's queues
+        assert handler._ensure_queue_exists() is True
+        mock_queue_client.create_queue.assert_called_once()
+
+    @patch('api_exchange_core.utils.queue_client_registry.QueueClient')
+    def test_ensure_queue_exists_success_create_queue(self, mock_queue_client_class):
         """Test _ensure_queue_exists when queue needs to be created."""
-        # Setup mock
-        mock_queue_service = Mock()
-        mock_queue_service_class.from_connection_string.return_value = mock_queue_service
-        
-        # Mock no existing queues
-        mock_queue_service.list_queues.return_value = []
-        
-        # Test
+        mock_queue_client = mock_queue_client_class.from_connection_string.return_value
+
         with patch('sys.stderr', new_callable=StringIO) as mock_stderr:
             handler = AzureQueueHandler.__new__(AzureQueueHandler)
             handler.connection_string = self.connection_string
             handler.queue_name = self.queue_name
-            
+
             result = handler._ensure_queue_exists()
-            
+
             assert result is True
-            mock_queue_service.list_queues.assert_called_once()
-            mock_queue_service.create_queue.assert_called_once_with(self.queue_name)
-            assert f"Queue '{self.queue_name}' does not exist. Creating..." in mock_stderr.getvalue()
+            mock_queue_client_class.from_connection_string.assert_called_once_with(
+                conn_str=self.connection_string, queue_name=self.queue_name
+            )
+            mock_queue_client.create_queue.assert_called_once()
             assert f"Queue '{self.queue_name}' created successfully" in mock_stderr.getvalue()
 
     def test_ensure_queue_exists_no_connection_string(self):
@@ -273,11 +347,11 @@ class TestAzureQueueHandler:
         
         assert result is False
 
-    @patch('api_exchange_core.utils.logger.QueueServiceClient')
-    def test_ensure_queue_exists_failure(self, mock_queue_service_class):
+    @patch('api_exchange_core.utils.queue_client_registry.QueueClient')
+    def test_ensure_queue_exists_failure(self, mock_queue_client_class):
         """Test _ensure_queue_exists when Azure operation fails."""
         # Setup mock to raise exception
-        mock_queue_service_class.from_connection_string.side_effect = Exception("Azure error")
+        mock_queue_client_class.from_connection_string.side_effect = Exception("Azure error")
         
         # Test
         with patch('sys.stderr', new_callable=StringIO) as mock_stderr:
@@ -454,7 +528,7 @@ class TestAzureQueueHandler:
                 
                 mock_handle_error.assert_called_once_with(record)
 
-    @patch('api_exchange_core.utils.logger.QueueClient')
+    @patch('api_exchange_core.utils.queue_client_registry.QueueClient')
     def test_flush_success(self, mock_queue_client_class):
         """Test successful log flushing."""
         # Setup mock
@@ -514,7 +588,7 @@ class TestAzureQueueHandler:
             # Buffer should remain unchanged
             assert len(handler.log_buffer) == 1
 
-    @patch('api_exchange_core.utils.logger.QueueClient')
+    @patch('api_exchange_core.utils.queue_client_registry.QueueClient')
     def test_flush_send_failure(self, mock_queue_client_class):
         """Test flush behavior when individual message send fails."""
         # Setup mock to fail on send_message
@@ -540,7 +614,7 @@ class TestAzureQueueHandler:
             # Buffer should still be cleared
             assert handler.log_buffer == []
 
-    @patch('api_exchange_core.utils.logger.QueueClient')
+    @patch('api_exchange_core.utils.queue_client_registry.QueueClient')
     def test_flush_client_creation_failure(self, mock_queue_client_class):
         """Test flush behavior when queue client creation fails."""
         # Setup mock to fail on client creation
@@ -0,0 +1,98 @@
+"""
+Unit tests for MessageCapturePolicy.
+
+Tests sampling, per-tenant overrides, failure-only capture and size caps.
+"""
+
+from unittest.mock import patch
+
+import pytest
+
+from api_exchange_core.exceptions import ValidationError
+from api_exchange_core.processors import Message, MessageCapturePolicy
+
+
+def _message(pipeline_id: str = "pipeline-1", tenant_id: str = "tenant-1") -> Message:
+    return Message.create_simple_message(payload={"value": 1}, pipeline_id=pipeline_id, tenant_id=tenant_id)
+
+
+class TestSampling:
+    """Test which messages are selected for capture."""
+
+    def test_default_captures_everything(self):
+        assert MessageCapturePolicy().should_capture(_message())
+
+    def test_zero_rate_captures_nothing(self):
+        assert not MessageCapturePolicy(sample_rate=0.0).should_capture(_message())
+
+    def test_sampling_is_stable_per_pipeline(self):
+        policy = MessageCapturePolicy(sample_rate=0.5)
+
+        decisions = {policy.is_sampled(_message(pipeline_id="pipeline-7")) for _ in range(5)}
+
+        assert len(decisions) == 1
+
+    def test_sample_rate_is_roughly_honoured(self):
+        policy = MessageCapturePolicy(sample_rate=0.25)
+
+        sampled = sum(policy.is_sampled(_message(pipeline_id=f"pipeline-{i}")) for i in range(2000))
+
+        assert 400 < sampled < 600
+
+    def test_tenant_override(self):
+        policy = MessageCapturePolicy(sample_rate=0.0, tenant_sample_rates={"vip": 1.0})
+
+        assert policy.should_capture(_message(tenant_id="vip"))
+        assert not policy.should_capture(_message(tenant_id="other"))
+
+    def test_failures_only(self):
+        policy = MessageCapturePolicy(failures_only=True)
+
+        assert not policy.should_capture(_message())
+        assert not policy.should_capture(_message(), success=True)
+        assert policy.should_capture(_message(), success=False)
+
+    def test_invalid_rate(self):
+        with pytest.raises(ValidationError):
+            MessageCapturePolicy(sample_rate=1.5)
+
+
+class TestFitPayload:
+    """Test size measurement and truncation."""
+
+    def test_small_payload_is_kept(self):
+        data = {"message_id": "m1", "payload": {"value": 1}}
+
+        payload, size, truncated = MessageCapturePolicy(max_payload_bytes=1000).fit_payload(data)
+
+        assert payload is data
+        assert size == len('{"message_id": "m1", "payload": {"value": 1}}')
+        assert not truncated
+
+    def test_large_payload_is_truncated(self):
+        data = {"message_id": "m1", "payload": {"blob": "x" * 5000}}
+
+        payload, size, truncated = MessageCapturePolicy(max_payload_bytes=100).fit_payload(data)
+
+        assert truncated
+        assert size > 5000
+        assert payload["truncated"] is True
+        assert payload["original_size_bytes"] == size
+        assert payload["message_id"] == "m1"
+        assert len(payload["preview"].encode("utf-8")) <= 100
+
+    def test_size_is_in_bytes(self):
+        _, size, _ = MessageCapturePolicy(max_payload_bytes=1000).fit_payload({"payload": "é"})
+
+        assert size == len('{"payload": "\\u00e9"}')
+
+    def test_uncapped_payload_is_not_measured(self):
+        data = {"message_id": "m1", "payload": {"value": 1}}
+
+        with patch("api_exchange_core.processors.message_capture.json.dumps") as mock_dumps:
+            payload, size, truncated = MessageCapturePolicy().fit_payload(data)
+
+        mock_dumps.assert_not_called()
+        assert payload is data
+        assert size is None
+        assert not truncated
@@ -0,0 +1,229 @@
+"""
+Unit tests for MessageCodec.
+
+Tests tagged round trips, untagged (legacy) decoding and both JSON backends.
+"""
+
+import json
+
+import pytest
+
+from api_exchange_core.exceptions import ValidationError
+from api_exchange_core.processors import CodecFormat, Message, MessageCodec, ProcessingResult, ProcessingStatus
+from api_exchange_core.processors import message_codec as message_codec_module
+from api_exchange_core.processors.message_codec import FORMAT_KEY, PydanticJsonBackend, orjson
+from api_exchange_core.utils.queue_utils import compress_message_body
+
+
+def _message() -> Message:
+    return Message.create_simple_message(
+        payload={"order_id": "o-1", "lines": [{"sku": "a", "qty": 2}], "note": "café"},
+        pipeline_id="pipeline-1",
+        tenant_id="tenant-1",
+    )
+
+
+BACKENDS = [PydanticJsonBackend()]
+if orjson is not None:
+    from api_exchange_core.processors.message_codec import OrjsonBackend
+
+    BACKENDS.append(OrjsonBackend())
+
+
+@pytest.mark.parametrize("backend", BACKENDS, ids=lambda backend: backend.name)
+class TestMessageCodecRoundTrip:
+    """Test encoding and decoding with each backend."""
+
+    def test_message_round_trip(self, backend):
+        codec = MessageCodec(backend=backend)
+        message = _message()
+
+        decoded = codec.decode(codec.encode(message))
+
+        assert isinstance(decoded, Message)
+        assert decoded == message
+
+    def test_processing_result_round_trip(self, backend):
+        codec = MessageCodec(backend=backend)
+        result = ProcessingResult.success_result(output_messages=[_message()], records_processed=3)
+
+        decoded = codec.decode(codec.encode_text(result))
+
+        assert isinstance(decoded, ProcessingResult)
+        assert decoded.status == ProcessingStatus.SUCCESS
+        assert decoded.records_processed == 3
+        assert decoded.output_messages[0].payload == result.output_messages[0].payload
+
+    def test_untagged_document_uses_default_model(self, backend):
+        codec = MessageCodec(backend=backend)
+        message = _message()
+
+        assert codec.decode(message.model_dump_json()) == message
+
+
+class TestMessageCodecFormat:
+    """Test the format tag."""
+
+    def test_tag_is_first_member(self):
+        encoded = MessageCodec().encode(_message())
+
+        assert encoded.startswith(b'{"_format":"message/json;v=1",')
+        assert json.loads(encoded)[FORMAT_KEY] == CodecFormat.MESSAGE.value
+
+    def test_tag_in_other_position_is_read(self):
+        codec = MessageCodec()
+        document = json.loads(ProcessingResult.success_result().model_dump_json())
+        document[FORMAT_KEY] = CodecFormat.PROCESSING_RESULT.value
+
+        assert isinstance(codec.decode(json.dumps(document)), ProcessingResult)
+
+    def test_unknown_tag_is_rejected(self):
+        with pytest.raises(ValidationError, match="Unknown codec format"):
+            MessageCodec().decode(b'{"_format":"message/json;v=99"}')
+
+    def test_compressed_body_is_decoded(self):
+        codec = MessageCodec()
+        message = Message.create_simple_message(payload={"records": [{"id": i} for i in range(200)]})
+
+        body = compress_message_body(codec.encode_text(message))
+
+        assert body.startswith('{"_compression":')
+        assert codec.decode(body) == message
+        assert codec.decode(body, lazy_payload=True) == message
+
+    def test_unsupported_model_is_rejected(self):
+        with pytest.raises(ValidationError):
+            MessageCodec().encode({"not": "a model"})
+
+
+class TestLazyPayload:
+    """Test decoding Messages with a deferred payload."""
+
+    def _encoded(self, codec: MessageCodec) -> bytes:
+        message = Message.create_simple_message(
+            payload={"records": [{"id": i, "name": f"record {i}"} for i in range(200)]},
+            pipeline_id="pipeline-1",
+            tenant_id="tenant-1",
+        )
+        message.add_context(output_name="valid", nested={"payload": {"brace": "}"}})
+        return codec.encode(message)
+
+    def test_envelope_is_decoded_without_payload(self):
+        codec = MessageCodec()
+
+        message = codec.decode(self._encoded(codec), lazy_payload=True)
+
+        assert not message.payload_loaded
+        assert message.tenant_id == "tenant-1"
+        assert message.get_context("output_name") == "valid"
+        assert message.context["nested"] == {"payload": {"brace": "}"}}
+
+    def test_payload_is_decoded_on_first_access(self):
+        codec = MessageCodec()
+        encoded = self._encoded(codec)
+
+        message = codec.decode(encoded, lazy_payload=True)
+
+        assert message.payload["records"][199]["name"] == "record 199"
+        assert message.payload_loaded
+        assert message == codec.decode(encoded)
+
+    def test_reencoding_reuses_raw_payload(self):
+        codec = MessageCodec()
+        encoded = self._encoded(codec)
+
+        message = codec.decode(encoded, lazy_payload=True)
+
+        assert codec.encode(message) == encoded
+        assert not message.payload_loaded
+
+    def test_serializing_loads_payload(self):
+        codec = MessageCodec()
+        message = codec.decode(self._encoded(codec), lazy_payload=True)
+        result = ProcessingResult.success_result(output_messages=[message])
+
+        assert len(result.model_dump()["output_messages"][0]["payload"]["records"]) == 200
+        assert len(message.model_dump()["payload"]["records"]) == 200
+
+    def test_small_and_untagged_messages_are_decoded_eagerly(self):
+        codec = MessageCodec()
+        message = _message()
+
+        assert codec.decode(codec.encode(message), lazy_payload=True).payload_loaded
+        untagged = json.loads(self._encoded(codec))
+        del untagged[FORMAT_KEY]
+        assert codec.decode(json.dumps(untagged), lazy_payload=True).payload_loaded
+
+    def test_members_after_the_payload_are_decoded_eagerly(self):
+        codec = MessageCodec()
+        encoded = self._encoded(codec)
+        document = json.loads(encoded)
+        payload = document.pop("payload")
+        tenant_id = document.pop("tenant_id")
+        reordered = json.dumps({**document, "payload": payload, "tenant_id": tenant_id})
+
+        message = codec.decode(reordered, lazy_payload=True)
+
+        assert message.payload_loaded
+        assert message.tenant_id == "tenant-1"
+        assert message == codec.decode(encoded)
+
+    def test_payload_is_decoded_eagerly_without_the_stdlib_scanner(self, monkeypatch):
+        codec = MessageCodec()
+        encoded = self._encoded(codec)
+        monkeypatch.setattr(message_codec_module, "_scan_value", None)
+
+        message = codec.decode(encoded, lazy_payload=True)
+
+        assert message.payload_loaded
+        assert message == codec.decode(encoded)
+
+    def test_non_object_payload_is_rejected(self):
+        message = Message.with_deferred_payload({"pipeline_id": "pipeline-1"}, "[1, 2]", json.loads)
+
+        with pytest.raises(ValidationError, match="JSON object"):
+            message.payload
+
+    def test_invalid_document_is_rejected(self):
+        with pytest.raises(ValidationError, match="Invalid message document"):
+            MessageCodec().decode_envelope('{"_format":"message/json;v=1","message_id":')
+
+
+class TestMessageBatch:
+    """Test packing several Messages into one batch document."""
+
+    def test_batch_round_trip(self):
+        codec = MessageCodec()
+        messages = [_message() for _ in range(3)]
+
+        batch = codec.encode_batch([codec.encode_text(message) for message in messages])
+
+        assert json.loads(batch)[FORMAT_KEY] == CodecFormat.MESSAGE_BATCH.value
+        assert codec.decode_messages(batch) == messages
+
+    def test_single_message_is_decoded_as_one_item(self):
+        codec = MessageCodec()
+        message = _message()
+
+        assert codec.decode_messages(codec.encode(message)) == [message]
+
+    def test_compressed_batch_is_decoded(self):
+        codec = MessageCodec()
+        messages = [Message.create_simple_message(payload={"records": [{"id": i} for i in range(50)]}) for _ in range(4)]
+
+        body = compress_message_body(codec.encode_batch([codec.encode_text(message) for message in messages]))
+
+        assert body.startswith('{"_compression":')
+        assert codec.decode_messages(body) == messages
+
+    def test_batch_is_not_decoded_as_one_document(self):
+        codec = MessageCodec()
+
+        with pytest.raises(ValidationError, match="decode_messages"):
+            codec.decode(codec.encode_batch([codec.encode_text(_message())]))
+
+    def test_processing_result_is_rejected(self):
+        codec = MessageCodec()
+
+        with pytest.raises(ValidationError, match="Expected a Message"):
+            codec.decode_messages(codec.encode(ProcessingResult.success_result()))
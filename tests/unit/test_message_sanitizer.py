@@ -0,0 +1,123 @@
+"""
+Unit tests for MessageSanitizer.
+
+Tests rule compilation, wildcard and list paths, copy-on-write behaviour
+and the keyed hash action.
+"""
+
+import pytest
+
+from api_exchange_core.exceptions import ValidationError
+from api_exchange_core.processors import MessageSanitizer
+
+
+def _data():
+    return {
+        "message_id": "m1",
+        "payload": {
+            "user": {"name": "Ada", "password": "secret", "ssn": "123-45-6789"},
+            "customers": [{"name": "A", "ssn": "1"}, {"name": "B", "ssn": "2"}],
+            "cards": [{"number": "4111"}, {"number": "5500"}],
+            "bulk": {"rows": list(range(100))},
+        },
+    }
+
+
+class TestRules:
+    """Test the supported rule paths and actions."""
+
+    def test_mask_remove_hash(self):
+        sanitizer = MessageSanitizer({"payload.user.password": "remove", "payload.user.name": "mask", "payload.user.ssn": "hash"}, hash_key="key")
+
+        result, changed = sanitizer.sanitize(_data())
+
+        assert changed
+        user = result["payload"]["user"]
+        assert "password" not in user
+        assert user["name"] == "***MASKED***"
+        assert user["ssn"].startswith("***HASH:")
+
+    def test_wildcard_over_list(self):
+        sanitizer = MessageSanitizer({"payload.customers.*.ssn": "mask"})
+
+        result, _ = sanitizer.sanitize(_data())
+
+        assert [c["ssn"] for c in result["payload"]["customers"]] == ["***MASKED***", "***MASKED***"]
+        assert [c["name"] for c in result["payload"]["customers"]] == ["A", "B"]
+
+    def test_wildcard_over_dict(self):
+        sanitizer = MessageSanitizer({"payload.*.ssn": "remove"})
+
+        result, _ = sanitizer.sanitize(_data())
+
+        assert "ssn" not in result["payload"]["user"]
+
+    def test_list_index(self):
+        sanitizer = MessageSanitizer({"payload.cards.0.number": "mask", "payload.cards.9.number": "mask"})
+
+        result, _ = sanitizer.sanitize(_data())
+
+        assert [c["number"] for c in result["payload"]["cards"]] == ["***MASKED***", "5500"]
+
+    def test_remove_list_items(self):
+        sanitizer = MessageSanitizer({"payload.cards.1": "remove"})
+
+        result, _ = sanitizer.sanitize(_data())
+
+        assert result["payload"]["cards"] == [{"number": "4111"}]
+
+    def test_missing_path_is_not_sanitized(self):
+        data = _data()
+
+        result, changed = MessageSanitizer({"payload.account.token": "mask"}).sanitize(data)
+
+        assert not changed
+        assert result is data
+
+    @pytest.mark.parametrize("rules", [{"payload.user": "encrypt"}, {"payload..user": "mask"}])
+    def test_invalid_rules_are_rejected(self, rules):
+        with pytest.raises(ValidationError):
+            MessageSanitizer(rules)
+
+
+class TestCopyOnWrite:
+    """Test that only modified branches are copied."""
+
+    def test_input_is_not_modified(self):
+        data = _data()
+
+        MessageSanitizer({"payload.user.password": "remove", "payload.customers.*.ssn": "mask"}).sanitize(data)
+
+        assert data == _data()
+
+    def test_untouched_branches_are_shared(self):
+        data = _data()
+
+        result, _ = MessageSanitizer({"payload.user.password": "mask"}).sanitize(data)
+
+        assert result is not data
+        assert result["payload"] is not data["payload"]
+        assert result["payload"]["user"] is not data["payload"]["user"]
+        assert result["payload"]["bulk"] is data["payload"]["bulk"]
+        assert result["payload"]["customers"] is data["payload"]["customers"]
+
+
+class TestHash:
+    """Test the keyed, stable hash action."""
+
+    def test_digest_is_stable_and_keyed(self):
+        first = MessageSanitizer({"a": "hash"}, hash_key="key-1")
+        again = MessageSanitizer({"a": "hash"}, hash_key="key-1")
+        other = MessageSanitizer({"a": "hash"}, hash_key="key-2")
+
+        assert first.digest("123") == again.digest("123")
+        assert first.digest("123") != other.digest("123")
+        assert first.digest("123") != first.digest("124")
+
+    @pytest.mark.parametrize("hash_key", [None, "", "k" * 65])
+    def test_missing_or_oversized_key_is_rejected(self, hash_key):
+        with pytest.raises(ValidationError, match="hash key"):
+            MessageSanitizer({"a": "hash"}, hash_key=hash_key)
+
+    def test_key_is_only_required_by_hash_rules(self):
+        assert MessageSanitizer({"a": "mask"}).sanitize({"a": 1})[0] == {"a": "***MASKED***"}
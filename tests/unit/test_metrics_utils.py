@@ -56,7 +56,7 @@ class TestSendMetricsToQueue:
         """Test passing connection string as parameter."""
         metrics = [Metric(metric_name="test_metric", value=42)]
         
-        with patch('api_exchange_core.utils.metrics_utils.QueueClient') as mock_queue_client_class:
+        with patch('api_exchange_core.utils.queue_client_registry.QueueClient') as mock_queue_client_class:
             with patch('api_exchange_core.utils.metrics_utils.get_logger') as mock_get_logger:
                 logger_instance = Mock()
                 mock_get_logger.return_value = logger_instance
@@ -83,7 +83,7 @@ class TestSendMetricsToQueue:
         metrics = [Metric(metric_name="env_test", value=123)]
         env_connection_string = "DefaultEndpointsProtocol=https;AccountName=env;AccountKey=envkey=="
         
-        with patch('api_exchange_core.utils.metrics_utils.QueueClient') as mock_queue_client_class:
+        with patch('api_exchange_core.utils.queue_client_registry.QueueClient') as mock_queue_client_class:
             with patch('api_exchange_core.utils.metrics_utils.get_logger') as mock_get_logger:
                 with patch.dict(os.environ, {EnvironmentVariable.AZURE_STORAGE_CONNECTION.value: env_connection_string}):
                     logger_instance = Mock()
@@ -106,7 +106,7 @@ class TestSendMetricsToQueue:
         metrics = [Metric(metric_name="custom_queue_test", value=456)]
         custom_queue = "custom-metrics-queue"
         
-        with patch('api_exchange_core.utils.metrics_utils.QueueClient') as mock_queue_client_class:
+        with patch('api_exchange_core.utils.queue_client_registry.QueueClient') as mock_queue_client_class:
             with patch('api_exchange_core.utils.metrics_utils.get_logger') as mock_get_logger:
                 logger_instance = Mock()
                 mock_get_logger.return_value = logger_instance
@@ -135,7 +135,7 @@ class TestSendMetricsToQueue:
             OperationMetric.duration("process", "module", "function", "tenant1", "success", 250.5)
         ]
         
-        with patch('api_exchange_core.utils.metrics_utils.QueueClient') as mock_queue_client_class:
+        with patch('api_exchange_core.utils.queue_client_registry.QueueClient') as mock_queue_client_class:
             with patch('api_exchange_core.utils.metrics_utils.get_logger') as mock_get_logger:
                 logger_instance = Mock()
                 mock_get_logger.return_value = logger_instance
@@ -162,7 +162,7 @@ class TestSendMetricsToQueue:
         """Test handling of queue client initialization failure."""
         metrics = [Metric(metric_name="init_fail_test", value=789)]
         
-        with patch('api_exchange_core.utils.metrics_utils.QueueClient') as mock_queue_client_class:
+        with patch('api_exchange_core.utils.queue_client_registry.QueueClient') as mock_queue_client_class:
             with patch('api_exchange_core.utils.metrics_utils.get_logger') as mock_get_logger:
                 logger_instance = Mock()
                 mock_get_logger.return_value = logger_instance
@@ -193,7 +193,7 @@ class TestSendMetricsToQueue:
             Metric(metric_name="metric_3", value=300)
         ]
         
-        with patch('api_exchange_core.utils.metrics_utils.QueueClient') as mock_queue_client_class:
+        with patch('api_exchange_core.utils.queue_client_registry.QueueClient') as mock_queue_client_class:
             with patch('api_exchange_core.utils.metrics_utils.get_logger') as mock_get_logger:
                 logger_instance = Mock()
                 mock_get_logger.return_value = logger_instance
@@ -221,62 +221,25 @@ class TestSendMetricsToQueue:
                 error_call = logger_instance.error.call_args[0][0]
                 assert "Failed to send metric 2: Network timeout" in error_call
     
-    def test_queue_not_found_and_creation_success(self):
-        """Test queue creation when queue doesn't exist."""
-        metrics = [Metric(metric_name="queue_creation_test", value=42)]
-        
-        with patch('api_exchange_core.utils.metrics_utils.QueueClient') as mock_queue_client_class:
+    def test_missing_queue_is_created_once_and_send_retried(self):
+        """Test a metrics queue that was not provisioned at startup is created on the first failed send."""
+        metrics = [Metric(metric_name="missing_queue_test", value=42), Metric(metric_name="second", value=1)]
+
+        with patch('api_exchange_core.utils.queue_client_registry.QueueClient') as mock_queue_client_class:
             with patch('api_exchange_core.utils.metrics_utils.get_logger') as mock_get_logger:
                 logger_instance = Mock()
                 mock_get_logger.return_value = logger_instance
-                
+
                 mock_queue_client = Mock()
                 mock_queue_client_class.from_connection_string.return_value = mock_queue_client
-                
-                # First send fails with QueueNotFound, retry succeeds
-                mock_queue_client.send_message.side_effect = [
-                    Exception("QueueNotFound: The specified queue does not exist."),
-                    None  # Success on retry
-                ]
-                
-                connection_string = "DefaultEndpointsProtocol=https;AccountName=test;AccountKey=key=="
-                
-                # Call with metric
-                send_metrics_to_queue(metrics, connection_string=connection_string)
-                
-                # Verify queue creation was attempted
+                mock_queue_client.send_message.side_effect = [Exception("QueueNotFound: The specified queue does not exist."), None, None]
+
+                send_metrics_to_queue(metrics, connection_string="DefaultEndpointsProtocol=https;AccountName=test;AccountKey=key==")
+
                 mock_queue_client.create_queue.assert_called_once()
-                
-                # Verify send_message was called twice (initial fail + retry)
-                assert mock_queue_client.send_message.call_count == 2
-                
-                # Verify debug logs for queue creation
-                logger_instance.debug.assert_any_call(f"Queue {QueueName.METRICS.value} not found, creating it...")
-    
-    def test_queue_creation_failure(self):
-        """Test handling of queue creation failures."""
-        metrics = [Metric(metric_name="creation_fail_test", value=123)]
-        
-        with patch('api_exchange_core.utils.metrics_utils.QueueClient') as mock_queue_client_class:
-            with patch('api_exchange_core.utils.metrics_utils.get_logger') as mock_get_logger:
-                logger_instance = Mock()
-                mock_get_logger.return_value = logger_instance
-                
-                mock_queue_client = Mock()
-                mock_queue_client_class.from_connection_string.return_value = mock_queue_client
-                
-                # Send fails with QueueNotFound, create_queue also fails
-                mock_queue_client.send_message.side_effect = Exception("does not exist")
-                mock_queue_client.create_queue.side_effect = Exception("Failed to create queue")
-                
-                connection_string = "DefaultEndpointsProtocol=https;AccountName=test;AccountKey=key=="
-                
-                # Call with metric
-                send_metrics_to_queue(metrics, connection_string=connection_string)
-                
-                # Verify error was logged for queue creation failure
-                logger_instance.error.assert_called_with("Failed to create queue or send metric 1: Failed to create queue")
-    
+                assert mock_queue_client.send_message.call_count == 3
+                logger_instance.error.assert_not_called()
+
     def test_metrics_with_complex_labels(self):
         """Test metrics with complex label structures."""
         # Create metric with complex labels
@@ -292,7 +255,7 @@ class TestSendMetricsToQueue:
             }
         )
         
-        with patch('api_exchange_core.utils.metrics_utils.QueueClient') as mock_queue_client_class:
+        with patch('api_exchange_core.utils.queue_client_registry.QueueClient') as mock_queue_client_class:
             with patch('api_exchange_core.utils.metrics_utils.get_logger') as mock_get_logger:
                 logger_instance = Mock()
                 mock_get_logger.return_value = logger_instance
@@ -328,7 +291,7 @@ class TestProcessMetricsAlias:
         
         # Since process_metrics is just an alias (process_metrics = send_metrics_to_queue),
         # we need to test that it behaves the same way as the main function
-        with patch('api_exchange_core.utils.metrics_utils.QueueClient') as mock_queue_client_class:
+        with patch('api_exchange_core.utils.queue_client_registry.QueueClient') as mock_queue_client_class:
             with patch('api_exchange_core.utils.metrics_utils.get_logger') as mock_get_logger:
                 logger_instance = Mock()
                 mock_get_logger.return_value = logger_instance
@@ -362,7 +325,7 @@ class TestMetricsUtilsIntegration:
             OperationMetric.duration("op", "mod", "func", "tenant", "success", 123.45)
         ]
         
-        with patch('api_exchange_core.utils.metrics_utils.QueueClient') as mock_queue_client_class:
+        with patch('api_exchange_core.utils.queue_client_registry.QueueClient') as mock_queue_client_class:
             with patch('api_exchange_core.utils.metrics_utils.get_logger') as mock_get_logger:
                 logger_instance = Mock()
                 mock_get_logger.return_value = logger_instance
@@ -392,7 +355,7 @@ class TestMetricsUtilsIntegration:
         test_time = datetime(2024, 1, 15, 10, 30, 45)
         metric = Metric(metric_name="timestamp_test", value=42, timestamp=test_time)
         
-        with patch('api_exchange_core.utils.metrics_utils.QueueClient') as mock_queue_client_class:
+        with patch('api_exchange_core.utils.queue_client_registry.QueueClient') as mock_queue_client_class:
             with patch('api_exchange_core.utils.metrics_utils.get_logger') as mock_get_logger:
                 logger_instance = Mock()
                 mock_get_logger.return_value = logger_instance
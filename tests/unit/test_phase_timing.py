@@ -0,0 +1,187 @@
+"""
+Unit tests for per-phase timing instrumentation.
+
+Tests the histogram registry and the phases reported by the handlers.
+"""
+
+import time
+
+from sqlalchemy.orm import Session
+
+from api_exchange_core.processors import (
+    Message,
+    NoOpOutputHandler,
+    PhaseTimingHook,
+    PhaseTimingRegistry,
+    ProcessingPhase,
+    ProcessingResult,
+    SimpleProcessorHandler,
+    SimpleProcessorInterface,
+    get_phase_timing_registry,
+)
+from api_exchange_core.processors.phase_timing import PhaseHistogram
+
+
+class SleepyProcessor(SimpleProcessorInterface):
+    """Processor that spends a measurable time in business logic."""
+
+    def process(self, message: Message, context: dict) -> ProcessingResult:
+        time.sleep(0.02)
+        output = self.create_output_message(payload={"done": True}, source_message=message)
+        return ProcessingResult.success_result(output_messages=[output])
+
+
+class SleepyStreamProcessor(SimpleProcessorInterface):
+    """Generator processor that spends a measurable time producing each output."""
+
+    def process(self, message: Message, context: dict):
+        for index in range(2):
+            time.sleep(0.02)
+            yield self.create_output_message(payload={"index": index}, source_message=message)
+
+
+class ExplodingProcessor(SimpleProcessorInterface):
+    """Processor that raises on every message."""
+
+    def process(self, message: Message, context: dict) -> ProcessingResult:
+        raise RuntimeError("boom")
+
+
+class RecordingHook(PhaseTimingHook):
+    """Hook that keeps every reported timing."""
+
+    def __init__(self):
+        self.records = []
+
+    def record(self, processor_name, timings) -> None:
+        self.records.append((processor_name, dict(timings)))
+
+
+class BrokenHook(PhaseTimingHook):
+    """Hook that always fails."""
+
+    def record(self, processor_name, timings) -> None:
+        raise RuntimeError("hook down")
+
+
+def _message() -> Message:
+    return Message.create_simple_message(payload={"value": 1}, pipeline_id="pipeline-1", tenant_id="tenant-1")
+
+
+class TestPhaseHistogram:
+    """Test histogram aggregation."""
+
+    def test_observe(self):
+        histogram = PhaseHistogram(buckets=(1, 10))
+
+        for value in (0.5, 5, 50):
+            histogram.observe(value)
+
+        data = histogram.to_dict()
+        assert data["count"] == 3
+        assert data["min_ms"] == 0.5
+        assert data["max_ms"] == 50
+        assert data["buckets"] == {"1": 1, "10": 2, "inf": 3}
+        assert histogram.mean_ms == 55.5 / 3
+
+
+class TestPhaseTimingRegistry:
+    """Test histograms keyed by processor name and phase."""
+
+    def test_record_and_snapshot(self):
+        registry = PhaseTimingRegistry()
+
+        registry.record("A", {ProcessingPhase.PROCESS: 3.0, ProcessingPhase.VALIDATION: 0.1})
+        registry.record("A", {ProcessingPhase.PROCESS: 5.0})
+        registry.record("B", {ProcessingPhase.PROCESS: 1.0})
+
+        assert registry.get_histogram("A", ProcessingPhase.PROCESS).count == 2
+        snapshot = registry.snapshot()
+        assert set(snapshot) == {"A", "B"}
+        assert snapshot["A"]["process"]["total_ms"] == 8.0
+
+    def test_to_metrics(self):
+        registry = PhaseTimingRegistry()
+        registry.record("A", {ProcessingPhase.PROCESS: 4.0})
+
+        metrics = {m.metric_name: m for m in registry.to_metrics()}
+
+        assert metrics["processor_phase_count"].value == 1
+        assert metrics["processor_phase_mean_ms"].value == 4.0
+        assert metrics["processor_phase_max_ms"].labels == {"processor_name": "A", "phase": "process"}
+
+    def test_reset(self):
+        registry = PhaseTimingRegistry()
+        registry.record("A", {ProcessingPhase.PROCESS: 4.0})
+
+        registry.reset()
+
+        assert registry.snapshot() == {}
+
+
+class TestHandlerPhaseTiming:
+    """Test the phases reported by SimpleProcessorHandler."""
+
+    def test_reports_each_phase(self, db_session: Session):
+        hook = RecordingHook()
+        handler = SimpleProcessorHandler(SleepyProcessor(), enable_message_storage=True, phase_timing_hooks=[hook])
+
+        handler.process_message(_message())
+
+        [(processor_name, timings)] = hook.records
+        assert processor_name == "SleepyProcessor"
+        assert set(timings) == {
+            ProcessingPhase.LOGGING,
+            ProcessingPhase.VALIDATION,
+            ProcessingPhase.TRACKING_START,
+            ProcessingPhase.INPUT_CAPTURE,
+            ProcessingPhase.PROCESS,
+            ProcessingPhase.TRACKING_COMPLETION,
+            ProcessingPhase.OUTPUT_CAPTURE,
+        }
+        assert timings[ProcessingPhase.PROCESS] >= 20
+
+    def test_streamed_production_is_timed_as_process(self):
+        hook = RecordingHook()
+        handler = SimpleProcessorHandler(
+            SleepyStreamProcessor(), enable_pipeline_tracking=False, output_handler=NoOpOutputHandler(), phase_timing_hooks=[hook]
+        )
+
+        handler.process_message(_message())
+
+        [(_, timings)] = hook.records
+        assert timings[ProcessingPhase.PROCESS] >= 40
+        assert timings[ProcessingPhase.OUTPUT_ROUTING] < timings[ProcessingPhase.PROCESS]
+
+    def test_exception_still_reports_timings(self, db_session: Session):
+        hook = RecordingHook()
+        handler = SimpleProcessorHandler(ExplodingProcessor(), phase_timing_hooks=[hook])
+
+        handler.process_message(_message())
+
+        [(_, timings)] = hook.records
+        assert ProcessingPhase.PROCESS in timings
+        assert ProcessingPhase.TRACKING_COMPLETION in timings
+
+    def test_default_hook_is_global_registry(self):
+        registry = get_phase_timing_registry()
+        registry.reset()
+        handler = SimpleProcessorHandler(SleepyProcessor(), enable_pipeline_tracking=False)
+
+        handler.process_message(_message())
+
+        assert registry.get_histogram("SleepyProcessor", ProcessingPhase.PROCESS).count == 1
+        registry.reset()
+
+    def test_metrics_disabled_reports_nothing(self):
+        hook = RecordingHook()
+        handler = SimpleProcessorHandler(SleepyProcessor(), enable_pipeline_tracking=False, enable_metrics=False, phase_timing_hooks=[hook])
+
+        handler.process_message(_message())
+
+        assert hook.records == []
+
+    def test_failing_hook_does_not_fail_processing(self):
+        handler = SimpleProcessorHandler(SleepyProcessor(), enable_pipeline_tracking=False, phase_timing_hooks=[BrokenHook()])
+
+        assert handler.process_message(_message()).success
@@ -0,0 +1,79 @@
+"""
+Unit tests for QueueClientRegistry.
+
+Tests client reuse per (connection string, queue name), thread safety and close.
+"""
+
+import threading
+from unittest.mock import MagicMock, patch
+
+from api_exchange_core.utils.queue_client_registry import QueueClientRegistry, close_queue_clients, get_queue_client
+from api_exchange_core.utils.queue_utils import send_message_to_queue_direct
+
+CONNECTION_STRING = "UseDevelopmentStorage=true"
+
+
+@patch("api_exchange_core.utils.queue_client_registry.QueueClient")
+class TestQueueClientRegistry:
+    """Test the client cache."""
+
+    def test_client_is_reused_per_queue(self, mock_queue_client_class):
+        mock_queue_client_class.from_connection_string.side_effect = lambda **kwargs: MagicMock(name=kwargs["queue_name"])
+        registry = QueueClientRegistry()
+
+        first = registry.get_client(CONNECTION_STRING, "queue-a")
+
+        assert registry.get_client(CONNECTION_STRING, "queue-a") is first
+        assert registry.get_client(CONNECTION_STRING, "queue-b") is not first
+        assert registry.get_client("AccountName=other", "queue-a") is not first
+        assert mock_queue_client_class.from_connection_string.call_count == 3
+        assert len(registry) == 3
+
+    def test_concurrent_first_use_creates_one_client(self, mock_queue_client_class):
+        registry = QueueClientRegistry()
+        barrier = threading.Barrier(8)
+        clients = []
+
+        def get():
+            barrier.wait()
+            clients.append(registry.get_client(CONNECTION_STRING, "queue-a"))
+
+        threads = [threading.Thread(target=get) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert mock_queue_client_class.from_connection_string.call_count == 1
+        assert len({id(client) for client in clients}) == 1
+
+    def test_close_closes_and_forgets_clients(self, mock_queue_client_class):
+        registry = QueueClientRegistry()
+        client = registry.get_client(CONNECTION_STRING, "queue-a")
+        client.close.side_effect = RuntimeError("already closed")
+
+        registry.close()
+
+        client.close.assert_called_once()
+        assert len(registry) == 0
+        registry.get_client(CONNECTION_STRING, "queue-a")
+        assert mock_queue_client_class.from_connection_string.call_count == 2
+
+    def test_close_client(self, mock_queue_client_class):
+        registry = QueueClientRegistry()
+        client = registry.get_client(CONNECTION_STRING, "queue-a")
+
+        registry.close_client(CONNECTION_STRING, "queue-a")
+        registry.close_client(CONNECTION_STRING, "queue-b")
+
+        client.close.assert_called_once()
+        assert len(registry) == 0
+
+    def test_sends_share_the_process_wide_client(self, mock_queue_client_class):
+        send_message_to_queue_direct(CONNECTION_STRING, "queue-a", {"n": 1})
+        send_message_to_queue_direct(CONNECTION_STRING, "queue-a", {"n": 2})
+
+        mock_queue_client_class.from_connection_string.assert_called_once_with(conn_str=CONNECTION_STRING, queue_name="queue-a")
+        assert get_queue_client(CONNECTION_STRING, "queue-a").send_message.call_count == 2
+        close_queue_clients()
+        assert mock_queue_client_class.from_connection_string.return_value.close.call_count == 1
@@ -4,12 +4,18 @@ Unit tests for QueueOutputHandler.
 Tests the queue output handler for routing messages to Azure Storage Queues.
 """
 
+import threading
+import time
+
 import pytest
 from unittest.mock import Mock, patch, call
 from typing import Dict, Any
 
+from api_exchange_core.exceptions import ValidationError
+from api_exchange_core.processors.delivery_report import DeliveryStatus
 from api_exchange_core.processors.output_handlers.queue_output_handler import QueueOutputHandler
 from api_exchange_core.processors.message import Message, MessageType
+from api_exchange_core.processors.message_codec import get_message_codec
 from api_exchange_core.processors.processing_result import ProcessingResult
 
 
@@ -96,7 +102,7 @@ class TestQueueOutputHandler:
         mock_send.assert_called_once_with(
             connection_string=self.connection_string,
             queue_name="success-queue",
-            message_data=output_message.model_dump()
+            message_data=get_message_codec().encode_text(output_message)
         )
 
     @patch('api_exchange_core.processors.output_handlers.queue_output_handler.send_message_to_queue_direct')
@@ -132,13 +138,13 @@ class TestQueueOutputHandler:
         first_call = mock_send.call_args_list[0]
         assert first_call[1]["connection_string"] == self.connection_string
         assert first_call[1]["queue_name"] == "success-queue"
-        assert first_call[1]["message_data"] == success_message.model_dump()
+        assert first_call[1]["message_data"] == get_message_codec().encode_text(success_message)
 
         # Check second call (audit)
         second_call = mock_send.call_args_list[1]
         assert second_call[1]["connection_string"] == self.connection_string
         assert second_call[1]["queue_name"] == "audit-queue"
-        assert second_call[1]["message_data"] == audit_message.model_dump()
+        assert second_call[1]["message_data"] == get_message_codec().encode_text(audit_message)
 
     @patch('api_exchange_core.processors.output_handlers.queue_output_handler.send_message_to_queue_direct')
     def test_handle_output_context_routing(self, mock_send):
@@ -162,7 +168,7 @@ class TestQueueOutputHandler:
         mock_send.assert_called_once_with(
             connection_string=self.connection_string,
             queue_name="error-queue",
-            message_data=output_message.model_dump()
+            message_data=get_message_codec().encode_text(output_message)
         )
 
     @patch('api_exchange_core.processors.output_handlers.queue_output_handler.send_message_to_queue_direct')
@@ -185,7 +191,7 @@ class TestQueueOutputHandler:
         mock_send.assert_called_once_with(
             connection_string=self.connection_string,
             queue_name="default-queue",
-            message_data=output_message.model_dump()
+            message_data=get_message_codec().encode_text(output_message)
         )
 
     def test_handle_output_no_mapping_no_default(self):
@@ -236,6 +242,29 @@ class TestQueueOutputHandler:
         # Verify both sends were attempted
         assert mock_send.call_count == 2
 
+    @patch('api_exchange_core.processors.output_handlers.queue_output_handler.send_message_to_queue_direct')
+    def test_handle_output_stream_sends_as_produced(self, mock_send):
+        """Test that streamed messages are sent one at a time and counted."""
+        sent_before_yield = []
+
+        def produce():
+            for index in range(3):
+                sent_before_yield.append(mock_send.call_count)
+                message = Message.create_simple_message(payload={"index": index})
+                message.add_context(output_name="success")
+                yield message
+
+        # First send fails; the stream continues
+        mock_send.side_effect = [Exception("Queue send failed"), None, None]
+        source_message = Message.create_simple_message(payload={"input": "data"})
+
+        report = self.handler.handle_output_stream(produce(), source_message, {})
+
+        assert len(report) == 3
+        assert report.failed_count == 1
+        assert sent_before_yield == [0, 1, 2]
+        assert mock_send.call_count == 3
+
     @patch('api_exchange_core.processors.output_handlers.queue_output_handler.send_message_to_queue_direct')
     def test_send_message_to_queue_success(self, mock_send):
         """Test successful message sending."""
@@ -250,7 +279,7 @@ class TestQueueOutputHandler:
         mock_send.assert_called_once_with(
             connection_string=self.connection_string,
             queue_name="success-queue",
-            message_data=message.model_dump()
+            message_data=get_message_codec().encode_text(message)
         )
 
     @patch('api_exchange_core.processors.output_handlers.queue_output_handler.send_message_to_queue_direct')
@@ -323,6 +352,224 @@ class TestQueueOutputHandler:
         assert queue_name == "default-queue"
 
 
+class TestDeliveryReport:
+    """Test the per-message delivery report returned by handle_output."""
+
+    def _result(self, *output_names) -> ProcessingResult:
+        result = ProcessingResult.success_result()
+        for index, output_name in enumerate(output_names):
+            message = Message.create_simple_message(payload={"index": index})
+            if output_name:
+                message.add_context(output_name=output_name)
+            result.add_output_message(message)
+        return result
+
+    @patch('api_exchange_core.processors.output_handlers.queue_output_handler.send_message_to_queue_direct')
+    def test_report_records_each_outcome_in_output_order(self, mock_send):
+        """Test sent, failed and unrouted messages are reported individually."""
+        mock_send.side_effect = [None, Exception("Queue send failed"), None]
+        handler = QueueOutputHandler(queue_mappings={"a": "queue-a", "b": "queue-b"}, connection_string="test-connection")
+        result = self._result("a", "b", None, "a")
+
+        report = handler.handle_output(result, Message.create_simple_message(payload={}), {})
+
+        assert [delivery.message_id for delivery in report] == [message.message_id for message in result.output_messages]
+        assert [delivery.status for delivery in report] == [
+            DeliveryStatus.SENT,
+            DeliveryStatus.FAILED,
+            DeliveryStatus.UNROUTED,
+            DeliveryStatus.SENT,
+        ]
+        assert report.deliveries[1].queue_name == "queue-b"
+        assert report.deliveries[1].error == "Queue send failed"
+        assert (report.sent_count, report.failed_count, report.unrouted_count) == (2, 1, 1)
+        assert report.queue_names == ["queue-a"]
+        assert not report.all_sent
+        assert report.to_dict()["deliveries"][1]["status"] == "failed"
+
+    def test_no_output_messages_gives_empty_report(self):
+        """Test an empty result reports nothing."""
+        handler = QueueOutputHandler(queue_mappings={}, connection_string="test-connection")
+
+        report = handler.handle_output(ProcessingResult.success_result(), Message.create_simple_message(payload={}), {})
+
+        assert len(report) == 0
+        assert report.all_sent
+
+
+class TestConcurrentSends:
+    """Test bounded-concurrency sending."""
+
+    def test_invalid_concurrency_is_rejected(self):
+        """Test max_concurrent_sends must be positive."""
+        with pytest.raises(ValidationError, match="max_concurrent_sends"):
+            QueueOutputHandler(queue_mappings={}, connection_string="test-connection", max_concurrent_sends=0)
+
+    @patch('api_exchange_core.processors.output_handlers.queue_output_handler.send_message_to_queue_direct')
+    def test_sends_overlap_up_to_the_limit(self, mock_send):
+        """Test sends run concurrently without exceeding max_concurrent_sends."""
+        lock = threading.Lock()
+        active = []
+        peak = []
+
+        def send(**kwargs):
+            with lock:
+                active.append(kwargs["queue_name"])
+                peak.append(len(active))
+            time.sleep(0.01)
+            with lock:
+                active.pop()
+            if get_message_codec().decode(kwargs["message_data"]).payload["index"] == 5:
+                raise Exception("Queue send failed")
+
+        mock_send.side_effect = send
+        handler = QueueOutputHandler(queue_mappings={}, connection_string="test-connection", default_queue="out", max_concurrent_sends=4)
+        result = ProcessingResult.success_result(output_messages=[Message.create_simple_message(payload={"index": i}) for i in range(20)])
+
+        try:
+            report = handler.handle_output(result, Message.create_simple_message(payload={}), {})
+        finally:
+            handler.close()
+
+        assert mock_send.call_count == 20
+        assert 1 < max(peak) <= 4
+        assert [delivery.message_id for delivery in report] == [message.message_id for message in result.output_messages]
+        assert report.failed_count == 1
+        assert report.deliveries[5].status == DeliveryStatus.FAILED
+
+    @patch('api_exchange_core.processors.output_handlers.queue_output_handler.send_message_to_queue_direct')
+    def test_stream_is_not_consumed_ahead_of_sends(self, mock_send):
+        """Test at most max_concurrent_sends streamed messages are taken while sends are blocked."""
+        release = threading.Event()
+        mock_send.side_effect = lambda **kwargs: release.wait(5)
+        handler = QueueOutputHandler(queue_mappings={}, connection_string="test-connection", default_queue="out", max_concurrent_sends=2)
+        produced = []
+
+        def produce():
+            for index in range(5):
+                produced.append(index)
+                yield Message.create_simple_message(payload={"index": index})
+
+        reports = []
+        source_message = Message.create_simple_message(payload={})
+        sender = threading.Thread(target=lambda: reports.append(handler.handle_output_stream(produce(), source_message, {})))
+        sender.start()
+        try:
+            deadline = time.time() + 5
+            while mock_send.call_count < 2 and time.time() < deadline:
+                time.sleep(0.001)
+            time.sleep(0.02)
+            assert produced == [0, 1]
+        finally:
+            release.set()
+            sender.join()
+            handler.close()
+
+        assert reports[0].sent_count == 5
+        assert mock_send.call_count == 5
+
+
+class TestMessagePacking:
+    """Test packing small messages into shared queue messages."""
+
+    QUEUE_MAPPINGS = {"success": "success-queue", "error": "error-queue"}
+
+    def _messages(self, count, output_name="success", size=10):
+        messages = []
+        for index in range(count):
+            message = Message.create_simple_message(payload={"index": index, "padding": "x" * size})
+            message.add_context(output_name=output_name)
+            messages.append(message)
+        return messages
+
+    @patch('api_exchange_core.processors.output_handlers.queue_output_handler.send_message_to_queue_direct')
+    def test_messages_are_packed_per_queue_up_to_the_limit(self, mock_send):
+        """Test messages share queue messages per queue, none over max_packed_bytes."""
+        handler = QueueOutputHandler(
+            queue_mappings=self.QUEUE_MAPPINGS, connection_string="test-connection", pack_messages=True, max_packed_bytes=4096
+        )
+        success = self._messages(60)
+        errors = self._messages(3, output_name="error")
+        result = ProcessingResult.success_result(output_messages=[message for pair in zip(success, errors) for message in pair] + success[3:])
+
+        report = handler.handle_output(result, Message.create_simple_message(payload={}), {})
+
+        bodies = {}
+        for send_call in mock_send.call_args_list:
+            assert len(send_call.kwargs["message_data"].encode("utf-8")) <= 4096
+            unpacked = get_message_codec().decode_messages(send_call.kwargs["message_data"])
+            bodies.setdefault(send_call.kwargs["queue_name"], []).extend(unpacked)
+        assert bodies == {"success-queue": success, "error-queue": errors}
+        assert 2 < mock_send.call_count < 10
+        assert [delivery.message_id for delivery in report] == [message.message_id for message in result.output_messages]
+        assert report.all_sent
+        assert report.queue_names == ["success-queue", "error-queue"]
+
+    @patch('api_exchange_core.processors.output_handlers.queue_output_handler.send_message_to_queue_direct')
+    def test_oversized_and_unrouted_messages_are_sent_alone(self, mock_send):
+        """Test messages that do not fit a batch take the single-message path."""
+        handler = QueueOutputHandler(
+            queue_mappings=self.QUEUE_MAPPINGS, connection_string="test-connection", pack_messages=True, max_packed_bytes=2048
+        )
+        large = self._messages(1, size=4096)[0]
+        unrouted = Message.create_simple_message(payload={"index": 0})
+        result = ProcessingResult.success_result(output_messages=[large, unrouted] + self._messages(2))
+
+        report = handler.handle_output(result, Message.create_simple_message(payload={}), {})
+
+        assert mock_send.call_count == 2
+        assert mock_send.call_args_list[0].kwargs["message_data"] == get_message_codec().encode_text(large)
+        assert len(get_message_codec().decode_messages(mock_send.call_args_list[1].kwargs["message_data"])) == 2
+        assert [delivery.status for delivery in report] == [
+            DeliveryStatus.SENT,
+            DeliveryStatus.UNROUTED,
+            DeliveryStatus.SENT,
+            DeliveryStatus.SENT,
+        ]
+
+    @patch('api_exchange_core.processors.output_handlers.queue_output_handler.send_message_to_queue_direct')
+    def test_failed_batch_fails_every_packed_message(self, mock_send):
+        """Test a failed send is reported for each message in the batch."""
+        mock_send.side_effect = Exception("Queue send failed")
+        handler = QueueOutputHandler(queue_mappings={"success": "success-queue"}, connection_string="test-connection", pack_messages=True)
+
+        report = handler.handle_output(
+            ProcessingResult.success_result(output_messages=self._messages(5)), Message.create_simple_message(payload={}), {}
+        )
+
+        assert mock_send.call_count == 1
+        assert report.failed_count == 5
+        assert {delivery.error for delivery in report} == {"Queue send failed"}
+
+    @patch('api_exchange_core.processors.output_handlers.queue_output_handler.send_message_to_queue_direct')
+    def test_stream_sends_full_batches_as_produced(self, mock_send):
+        """Test a streamed output sends each batch once it is full."""
+        handler = QueueOutputHandler(
+            queue_mappings={"success": "success-queue"},
+            connection_string="test-connection",
+            pack_messages=True,
+            max_packed_bytes=2048,
+            max_concurrent_sends=2,
+        )
+        messages = self._messages(40)
+        sends_seen = []
+
+        def produce():
+            for message in messages:
+                sends_seen.append(mock_send.call_count)
+                yield message
+
+        try:
+            report = handler.handle_output_stream(produce(), Message.create_simple_message(payload={}), {})
+        finally:
+            handler.close()
+
+        assert report.sent_count == 40
+        assert sends_seen[-1] > 0
+        codec = get_message_codec()
+        unpacked = [message for send_call in mock_send.call_args_list for message in codec.decode_messages(send_call.kwargs["message_data"])]
+        assert sorted(message.payload["index"] for message in unpacked) == list(range(40))
+
 class TestQueueOutputHandlerIntegration:
     """Integration tests for QueueOutputHandler."""
 
@@ -382,9 +629,9 @@ class TestQueueOutputHandlerIntegration:
         # First call should be next_message to processing-queue
         first_call = calls[0]
         assert first_call[1]["queue_name"] == "processing-queue"
-        assert first_call[1]["message_data"]["payload"]["next_step"] == "validation"
+        assert get_message_codec().decode(first_call[1]["message_data"]).payload["next_step"] == "validation"
 
         # Second call should be completion_message to completed-queue
         second_call = calls[1]
         assert second_call[1]["queue_name"] == "completed-queue"
-        assert second_call[1]["message_data"]["payload"]["status"] == "completed"
\ No newline at end of file
+        assert get_message_codec().decode(second_call[1]["message_data"]).payload["status"] == "completed"
\ No newline at end of file
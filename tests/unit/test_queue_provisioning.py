@@ -0,0 +1,154 @@
+"""
+Unit tests for queue provisioning.
+
+Tests that queues are created once per process and collected from output
+handlers, QueueName and pipeline step definitions.
+"""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+from azure.core.exceptions import ResourceExistsError, ResourceNotFoundError
+from sqlalchemy.orm import Session
+
+from api_exchange_core.constants import QueueName
+from api_exchange_core.processors import QueueOutputHandler
+from api_exchange_core.utils.pipeline_discovery_v2 import auto_register_function_step, register_function_step
+from api_exchange_core.utils.queue_provisioning import (
+    ensure_queue_exists,
+    get_pipeline_queue_names,
+    is_queue_provisioned,
+    is_queue_not_found_error,
+    is_valid_queue_name,
+    provision_missing_queue,
+    provision_queues,
+)
+
+CONNECTION_STRING = "UseDevelopmentStorage=true"
+
+
+@pytest.fixture
+def queue_clients():
+    """Patch QueueClient, keeping one mock client per queue name."""
+    clients = {}
+
+    def from_connection_string(conn_str, queue_name):
+        return clients.setdefault(queue_name, MagicMock(name=queue_name))
+
+    with patch("api_exchange_core.utils.queue_client_registry.QueueClient") as mock_queue_client_class:
+        mock_queue_client_class.from_connection_string.side_effect = from_connection_string
+        yield clients
+
+
+class TestEnsureQueueExists:
+    """Test the per-process existence cache."""
+
+    def test_queue_is_created_once(self, queue_clients):
+        assert ensure_queue_exists(CONNECTION_STRING, "orders") is True
+        assert ensure_queue_exists(CONNECTION_STRING, "orders") is False
+
+        queue_clients["orders"].create_queue.assert_called_once()
+        assert is_queue_provisioned(CONNECTION_STRING, "orders")
+        assert not is_queue_provisioned("AccountName=other", "orders")
+
+    def test_existing_queue_is_not_an_error(self, queue_clients):
+        queue_clients["orders"] = MagicMock()
+        queue_clients["orders"].create_queue.side_effect = ResourceExistsError("The specified queue already exists.")
+
+        assert ensure_queue_exists(CONNECTION_STRING, "orders") is False
+        assert is_queue_provisioned(CONNECTION_STRING, "orders")
+
+    def test_failure_is_raised_and_not_cached(self, queue_clients):
+        queue_clients["orders"] = MagicMock()
+        queue_clients["orders"].create_queue.side_effect = RuntimeError("AuthorizationFailure")
+
+        with pytest.raises(RuntimeError):
+            ensure_queue_exists(CONNECTION_STRING, "orders")
+
+        assert not is_queue_provisioned(CONNECTION_STRING, "orders")
+
+    def test_queue_name_rules(self):
+        assert is_valid_queue_name("orders-v2")
+        assert not is_valid_queue_name("Orders")
+        assert not is_valid_queue_name("a--b")
+        assert not is_valid_queue_name("-orders")
+        assert not is_valid_queue_name("ab")
+
+
+class TestProvisionQueues:
+    """Test collecting and provisioning an app's queues at startup."""
+
+    def test_provisions_output_handler_and_standard_queues(self, queue_clients):
+        handler = QueueOutputHandler(
+            queue_mappings={"valid": "valid-orders", "invalid": "invalid-orders", "retry": "valid-orders"},
+            connection_string=CONNECTION_STRING,
+            default_queue="unrouted-orders",
+        )
+
+        created = provision_queues(CONNECTION_STRING, queue_names=["audit"], output_handlers=[handler])
+
+        expected = [queue.value for queue in QueueName] + ["audit", "valid-orders", "invalid-orders", "unrouted-orders"]
+        assert created == expected
+        assert all(queue_clients[name].create_queue.call_count == 1 for name in expected)
+
+    def test_second_provisioning_makes_no_requests(self, queue_clients):
+        provision_queues(CONNECTION_STRING, queue_names=["audit"], include_standard_queues=False)
+
+        assert provision_queues(CONNECTION_STRING, queue_names=["audit"], include_standard_queues=False) == []
+        queue_clients["audit"].create_queue.assert_called_once()
+
+    def test_provisions_pipeline_step_definition_queues(self, db_session: Session, queue_clients):
+        register_function_step(db_session, "orders", "ingest", "IngestProcessor", input_trigger="timer", output_queues=["raw-orders"])
+        register_function_step(db_session, "orders", "map", "MapProcessor", input_trigger="raw-orders", output_queues=["mapped-orders"])
+        register_function_step(db_session, "invoices", "ingest", "InvoiceProcessor", input_trigger="invoice-inbox")
+
+        assert get_pipeline_queue_names(db_session, "orders") == ["raw-orders", "mapped-orders"]
+
+        created = provision_queues(CONNECTION_STRING, include_standard_queues=False, session=db_session)
+
+        assert sorted(created) == ["invoice-inbox", "mapped-orders", "raw-orders"]
+        assert "timer" not in queue_clients
+
+    def test_auto_registration_provisions_pipeline_queues(self, db_session: Session, queue_clients):
+        auto_register_function_step(
+            db_session, "orders_map", "MapProcessor", input_trigger="raw-orders", output_queues=["mapped-orders"], connection_string=CONNECTION_STRING
+        )
+
+        assert is_queue_provisioned(CONNECTION_STRING, "raw-orders")
+        assert is_queue_provisioned(CONNECTION_STRING, "mapped-orders")
+        assert is_queue_provisioned(CONNECTION_STRING, QueueName.METRICS.value)
+
+    def test_auto_registration_survives_provisioning_failure(self, db_session: Session, queue_clients):
+        queue_clients["mapped-orders"] = MagicMock()
+        queue_clients["mapped-orders"].create_queue.side_effect = RuntimeError("AuthorizationFailure")
+
+        step_id = auto_register_function_step(
+            db_session, "orders_map", "MapProcessor", output_queues=["mapped-orders"], connection_string=CONNECTION_STRING
+        )
+
+        assert step_id
+        assert not is_queue_provisioned(CONNECTION_STRING, "mapped-orders")
+
+
+class TestProvisionMissingQueue:
+    """Test the send path fallback for queues that were not provisioned at startup."""
+
+    def test_missing_queue_is_created_once(self, queue_clients):
+        error = ResourceNotFoundError("The specified queue does not exist.")
+        error.error_code = "QueueNotFound"
+
+        assert provision_missing_queue(CONNECTION_STRING, "orders", error) is True
+        assert provision_missing_queue(CONNECTION_STRING, "orders", error) is False
+
+        queue_clients["orders"].create_queue.assert_called_once()
+
+    def test_other_errors_are_not_handled(self, queue_clients):
+        assert not is_queue_not_found_error(RuntimeError("AuthenticationFailed"))
+        assert provision_missing_queue(CONNECTION_STRING, "orders", RuntimeError("AuthenticationFailed")) is False
+        assert "orders" not in queue_clients
+
+    def test_failed_creation_is_not_retried_by_the_send(self, queue_clients):
+        queue_clients["orders"] = MagicMock()
+        queue_clients["orders"].create_queue.side_effect = RuntimeError("AuthorizationFailure")
+
+        assert provision_missing_queue(CONNECTION_STRING, "orders", Exception("QueueNotFound")) is False
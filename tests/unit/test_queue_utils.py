@@ -4,15 +4,22 @@ Unit tests for queue utilities.
 Tests the queue message sending functionality.
 """
 
+import base64
 import json
+import os
 from unittest.mock import Mock, patch, MagicMock
 import pytest
 
+from api_exchange_core.exceptions import ValidationError
 from api_exchange_core.utils.queue_utils import (
+    QueueCompression,
+    compress_message_body,
+    decompress_message_body,
     send_message_to_queue_binding, 
     send_message_to_queue_direct,
     _send_to_binding_core
 )
+from api_exchange_core.utils.queue_provisioning import ensure_queue_exists
 
 
 class TestSendMessageToQueueBinding:
@@ -286,7 +293,7 @@ class TestSendToBindingCore:
 class TestSendMessageToQueueDirect:
     """Test send_message_to_queue_direct function."""
     
-    @patch('api_exchange_core.utils.queue_utils.QueueClient')
+    @patch('api_exchange_core.utils.queue_client_registry.QueueClient')
     @patch('api_exchange_core.utils.queue_utils.get_logger')
     def test_successful_send(self, mock_get_logger, mock_queue_client_class):
         """Test successful direct queue send."""
@@ -318,6 +325,17 @@ class TestSendMessageToQueueDirect:
         assert logger_instance.debug.call_count == 2
         logger_instance.debug.assert_any_call(f"Sending message to queue: {queue_name}")
         logger_instance.debug.assert_any_call(f"Successfully sent message to queue: {queue_name}")
+
+    @patch('api_exchange_core.utils.queue_client_registry.QueueClient')
+    @patch('api_exchange_core.utils.queue_utils.get_logger')
+    def test_serialized_string_is_sent_as_is(self, mock_get_logger, mock_queue_client_class):
+        """Test that pre-serialized message bodies are not serialized again."""
+        mock_queue_client = Mock()
+        mock_queue_client_class.from_connection_string.return_value = mock_queue_client
+
+        send_message_to_queue_direct("UseDevelopmentStorage=true", "test-queue", '{"_format":"message/json;v=1","a":1}')
+
+        mock_queue_client.send_message.assert_called_once_with('{"_format":"message/json;v=1","a":1}')
     
     @patch('api_exchange_core.utils.queue_utils.to_jsonable_python')
     @patch('api_exchange_core.utils.queue_utils.get_logger')
@@ -340,66 +358,41 @@ class TestSendMessageToQueueDirect:
             logger_instance.error.assert_called_once()
             assert "Failed to serialize message for queue test-queue" in logger_instance.error.call_args[0][0]
     
-    @patch('api_exchange_core.utils.queue_utils.QueueClient')
+    @patch('api_exchange_core.utils.queue_client_registry.QueueClient')
     @patch('api_exchange_core.utils.queue_utils.get_logger')
-    def test_queue_not_found_creates_queue(self, mock_get_logger, mock_queue_client_class):
-        """Test queue creation when queue doesn't exist."""
-        # Setup mocks
-        logger_instance = Mock()
-        mock_get_logger.return_value = logger_instance
-        
+    def test_missing_queue_is_created_once_and_send_retried(self, mock_get_logger, mock_queue_client_class):
+        """Test a queue that was not provisioned at startup is created on the first send that finds it missing."""
+        mock_get_logger.return_value = Mock()
+
         mock_queue_client = Mock()
         mock_queue_client_class.from_connection_string.return_value = mock_queue_client
-        
-        # First send_message call fails with QueueNotFound
-        # Second send_message call (after create) succeeds
-        mock_queue_client.send_message.side_effect = [
-            Exception("QueueNotFound: The specified queue does not exist."),
-            None  # Success on retry
-        ]
-        
-        # Test data
-        connection_string = "DefaultEndpointsProtocol=https;AccountName=test;AccountKey=key=="
-        queue_name = "new-queue"
-        message_data = {"test": "data"}
-        
-        # Send message
-        send_message_to_queue_direct(connection_string, queue_name, message_data)
-        
-        # Verify queue creation was attempted
+        mock_queue_client.send_message.side_effect = [Exception("QueueNotFound: The specified queue does not exist."), None]
+
+        send_message_to_queue_direct("conn_str", "new-queue", {"test": "data"})
+
         mock_queue_client.create_queue.assert_called_once()
-        
-        # Verify send_message was called twice (initial fail + retry)
         assert mock_queue_client.send_message.call_count == 2
-        
-        # Verify debug logs
-        logger_instance.debug.assert_any_call(f"Queue {queue_name} not found, creating it...")
-        logger_instance.debug.assert_any_call(f"Message sent to queue after creation: {queue_name}")
-    
-    @patch('api_exchange_core.utils.queue_utils.QueueClient')
+
+    @patch('api_exchange_core.utils.queue_client_registry.QueueClient')
     @patch('api_exchange_core.utils.queue_utils.get_logger')
-    def test_queue_creation_failure(self, mock_get_logger, mock_queue_client_class):
-        """Test handling of queue creation failures."""
-        # Setup mocks
+    def test_provisioned_queue_is_not_created_again(self, mock_get_logger, mock_queue_client_class):
+        """Test a send to a provisioned queue that went missing fails instead of creating it again."""
         logger_instance = Mock()
         mock_get_logger.return_value = logger_instance
-        
+
         mock_queue_client = Mock()
         mock_queue_client_class.from_connection_string.return_value = mock_queue_client
-        
-        # Send fails with QueueNotFound, create_queue also fails
-        mock_queue_client.send_message.side_effect = Exception("QueueNotFound")
-        mock_queue_client.create_queue.side_effect = Exception("Failed to create queue")
-        
-        # Test that exception is raised and logged
-        with pytest.raises(Exception, match="Failed to create queue"):
-            send_message_to_queue_direct("conn_str", "test-queue", {"test": "data"})
-        
-        # Verify error was logged
-        logger_instance.error.assert_called_once()
-        assert "Failed to create queue or send message to test-queue" in logger_instance.error.call_args[0][0]
-    
-    @patch('api_exchange_core.utils.queue_utils.QueueClient')
+        ensure_queue_exists("conn_str", "new-queue")
+        mock_queue_client.send_message.side_effect = Exception("QueueNotFound: The specified queue does not exist.")
+
+        with pytest.raises(Exception, match="QueueNotFound"):
+            send_message_to_queue_direct("conn_str", "new-queue", {"test": "data"})
+
+        mock_queue_client.create_queue.assert_called_once()
+        assert mock_queue_client.send_message.call_count == 1
+        assert "Failed to send message to queue new-queue" in logger_instance.error.call_args[0][0]
+
+    @patch('api_exchange_core.utils.queue_client_registry.QueueClient')
     @patch('api_exchange_core.utils.queue_utils.get_logger')
     def test_other_queue_errors(self, mock_get_logger, mock_queue_client_class):
         """Test handling of non-queue-not-found errors."""
@@ -417,38 +410,49 @@ class TestSendMessageToQueueDirect:
         with pytest.raises(Exception, match="Connection timeout"):
             send_message_to_queue_direct("conn_str", "test-queue", {"test": "data"})
         
-        # Verify create_queue was NOT called (not a queue not found error)
-        mock_queue_client.create_queue.assert_not_called()
-        
         # Verify error was logged
         logger_instance.error.assert_called_once()
         assert "Failed to send message to queue test-queue: Connection timeout" in logger_instance.error.call_args[0][0]
-    
-    @patch('api_exchange_core.utils.queue_utils.QueueClient')
-    @patch('api_exchange_core.utils.queue_utils.get_logger')
-    def test_queue_creation_retry_success(self, mock_get_logger, mock_queue_client_class):
-        """Test successful retry after queue creation."""
-        # Setup mocks
-        logger_instance = Mock()
-        mock_get_logger.return_value = logger_instance
-        
+
+
+class TestCompressionEnvelope:
+    """Test compress_message_body and decompress_message_body."""
+
+    BODY = json.dumps({"records": [{"id": i, "name": f"Customer {i}", "active": True} for i in range(100)]})
+
+    @pytest.mark.parametrize("compression", [QueueCompression.ZLIB, QueueCompression.LZMA])
+    def test_round_trip(self, compression):
+        envelope = compress_message_body(self.BODY, compression)
+
+        assert json.loads(envelope)["_compression"] == compression.value
+        assert len(envelope) * 3 < len(self.BODY)
+        assert decompress_message_body(envelope) == self.BODY
+        assert decompress_message_body(envelope.encode("ascii")) == self.BODY
+
+    def test_small_and_disabled_bodies_are_not_compressed(self):
+        assert compress_message_body('{"a": 1}') == '{"a": 1}'
+        assert compress_message_body(self.BODY, QueueCompression.NONE) == self.BODY
+
+    def test_incompressible_body_is_sent_as_is(self):
+        body = json.dumps({"data": base64.b64encode(os.urandom(2048)).decode("ascii")})
+
+        assert compress_message_body(body, min_bytes=0) == body
+
+    def test_uncompressed_body_passes_through(self):
+        assert decompress_message_body(self.BODY) == self.BODY
+        assert decompress_message_body(b'{"a": 1}') == b'{"a": 1}'
+
+    def test_unknown_codec_is_rejected(self):
+        with pytest.raises(ValidationError, match="Invalid compressed message body"):
+            decompress_message_body('{"_compression":"brotli","data":""}')
+
+    @patch('api_exchange_core.utils.queue_client_registry.QueueClient')
+    def test_send_compresses_large_bodies(self, mock_queue_client_class):
         mock_queue_client = Mock()
         mock_queue_client_class.from_connection_string.return_value = mock_queue_client
-        
-        # First send fails, create succeeds, retry send succeeds
-        call_count = 0
-        def send_side_effect(data):
-            nonlocal call_count
-            call_count += 1
-            if call_count == 1:
-                raise Exception("does not exist")
-            return None  # Success on retry
-        
-        mock_queue_client.send_message.side_effect = send_side_effect
-        
-        # Send message
-        send_message_to_queue_direct("conn_str", "test-queue", {"test": "data"})
-        
-        # Verify queue creation and retry
-        mock_queue_client.create_queue.assert_called_once()
-        assert mock_queue_client.send_message.call_count == 2
\ No newline at end of file
+
+        send_message_to_queue_direct("UseDevelopmentStorage=true", "test-queue", self.BODY, compression=QueueCompression.ZLIB)
+
+        sent = mock_queue_client.send_message.call_args[0][0]
+        assert sent.startswith('{"_compression":"zlib"')
+        assert decompress_message_body(sent) == self.BODY
@@ -0,0 +1,90 @@
+"""
+Unit tests for RetryPolicy.
+
+Tests failure classification via ErrorCode/RecoveryStrategy and backoff delays.
+"""
+
+import pytest
+
+from api_exchange_core.config import ProcessingConfig
+from api_exchange_core.constants import RecoveryStrategy
+from api_exchange_core.exceptions import ErrorCode, ExternalServiceError, ValidationError
+from api_exchange_core.processors import ProcessingResult, RetryPolicy
+
+
+class TestRecoveryStrategy:
+    """Test classification of failures."""
+
+    @pytest.mark.parametrize("error_code", ["1002", "CONNECTION_ERROR", "5002"])
+    def test_transient_result_codes_are_retried(self, error_code):
+        result = ProcessingResult.failure_result(error_message="down", error_code=error_code)
+
+        assert RetryPolicy().get_recovery_strategy(result=result) == RecoveryStrategy.RETRY
+
+    @pytest.mark.parametrize("error_code", ["2000", "PROCESSING_TIMEOUT", None])
+    def test_other_result_codes_need_review(self, error_code):
+        result = ProcessingResult.failure_result(error_message="bad", error_code=error_code)
+
+        assert RetryPolicy().get_recovery_strategy(result=result) == RecoveryStrategy.MANUAL_REVIEW
+
+    def test_not_found_is_skipped(self):
+        result = ProcessingResult.failure_result(error_message="gone", error_code=ErrorCode.NOT_FOUND.value)
+
+        assert RetryPolicy().get_recovery_strategy(result=result) == RecoveryStrategy.SKIP
+
+    def test_base_error_uses_its_error_code(self):
+        policy = RetryPolicy()
+
+        assert policy.get_recovery_strategy(error=ExternalServiceError("down", service_name="crm")) == RecoveryStrategy.RETRY
+        assert policy.get_recovery_strategy(error=ValidationError("bad")) == RecoveryStrategy.MANUAL_REVIEW
+
+    def test_builtin_transient_exceptions_are_retried(self):
+        policy = RetryPolicy()
+
+        assert policy.get_recovery_strategy(error=ConnectionResetError()) == RecoveryStrategy.RETRY
+        assert policy.get_recovery_strategy(error=TimeoutError()) == RecoveryStrategy.RETRY
+        assert policy.get_recovery_strategy(error=KeyError("x")) == RecoveryStrategy.MANUAL_REVIEW
+
+    def test_strategy_overrides(self):
+        policy = RetryPolicy(recovery_strategies={ErrorCode.VALIDATION_FAILED: RecoveryStrategy.RETRY})
+
+        assert policy.get_recovery_strategy(error=ValidationError("bad")) == RecoveryStrategy.RETRY
+
+
+class TestShouldRetry:
+    """Test retry decisions and limits."""
+
+    def test_stops_after_max_attempts(self):
+        policy = RetryPolicy(max_retry_attempts=2)
+        error = ConnectionError("down")
+
+        assert policy.should_retry(0, error=error)
+        assert policy.should_retry(1, error=error)
+        assert not policy.should_retry(2, error=error)
+
+    def test_success_is_never_retried(self):
+        assert not RetryPolicy().should_retry(0, result=ProcessingResult.success_result())
+
+
+class TestBackoff:
+    """Test exponential backoff with jitter."""
+
+    def test_exponential_without_jitter(self):
+        policy = RetryPolicy(retry_backoff_base=2, retry_backoff_max=10, jitter=False)
+
+        assert [policy.get_delay(n) for n in range(1, 5)] == [2, 4, 8, 10]
+
+    def test_jitter_stays_within_backoff(self):
+        policy = RetryPolicy(retry_backoff_base=2, retry_backoff_max=300)
+
+        delays = [policy.get_delay(3) for _ in range(50)]
+
+        assert all(0 <= d <= 8 for d in delays)
+        assert len(set(delays)) > 1
+
+    def test_from_config(self):
+        policy = RetryPolicy.from_config(ProcessingConfig(max_retry_attempts=5, retry_backoff_base=3, retry_backoff_max=60))
+
+        assert policy.max_retry_attempts == 5
+        assert policy.retry_backoff_base == 3
+        assert policy.retry_backoff_max == 60
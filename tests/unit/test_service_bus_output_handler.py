@@ -0,0 +1,134 @@
+"""
+Unit tests for ServiceBusOutputHandler.
+
+Tests batching, session grouping, sender reuse and per-message delivery
+reporting against FakeServiceBusSender.
+"""
+
+from unittest.mock import patch
+
+import pytest
+
+from api_exchange_core.exceptions import ValidationError
+from api_exchange_core.processors import ServiceBusOutputHandler
+from api_exchange_core.processors.delivery_report import DeliveryStatus
+from api_exchange_core.processors.message import Message
+from api_exchange_core.processors.message_codec import get_message_codec
+from api_exchange_core.processors.output_handlers import FakeServiceBusSender
+from api_exchange_core.processors.processing_result import ProcessingResult
+
+
+class TestServiceBusOutputHandler:
+    """Test routing output messages to Service Bus queues."""
+
+    def setup_method(self):
+        """Set up a handler backed by fake senders."""
+        self.senders = {}
+        self.handler = ServiceBusOutputHandler(
+            queue_mappings={"orders": "orders-queue", "audit": "audit-queue"},
+            default_queue="default-queue",
+            sender_factory=self._create_sender,
+        )
+        self.source_message = Message.create_simple_message(payload={"input": "data"})
+
+    def _create_sender(self, queue_name: str) -> FakeServiceBusSender:
+        sender = FakeServiceBusSender(queue_name, max_batch_size_in_bytes=8 * 1024)
+        self.senders[queue_name] = sender
+        return sender
+
+    def _messages(self, count: int, output_name: str = "orders", **context) -> list:
+        messages = []
+        for index in range(count):
+            message = Message.create_simple_message(payload={"index": index, "padding": "x" * 200})
+            message.add_context(output_name=output_name, **context)
+            messages.append(message)
+        return messages
+
+    def test_requires_connection_string_or_sender_factory(self):
+        with pytest.raises(ValidationError, match="connection_string or a sender_factory"):
+            ServiceBusOutputHandler(queue_mappings={})
+
+    def test_messages_are_sent_in_batches(self):
+        messages = self._messages(100)
+
+        report = self.handler.handle_output(ProcessingResult.success_result(output_messages=messages), self.source_message, {})
+
+        sender = self.senders["orders-queue"]
+        assert 1 < len(sender.sent_batches) < 100
+        decoded = [get_message_codec().decode(b"".join(sent.body)) for sent in sender.sent_messages]
+        assert decoded == messages
+        assert sender.sent_messages[0].message_id == messages[0].message_id
+        assert sender.sent_messages[0].content_type == "application/json"
+        assert report.sent_count == 100
+        assert report.queue_names == ["orders-queue"]
+
+    def test_sender_link_is_reused_until_closed(self):
+        self.handler.handle_output(ProcessingResult.success_result(output_messages=self._messages(2)), self.source_message, {})
+        sender = self.senders["orders-queue"]
+
+        self.handler.handle_output(ProcessingResult.success_result(output_messages=self._messages(2)), self.source_message, {})
+        self.handler.close()
+
+        assert self.senders["orders-queue"] is sender
+        assert len(sender.sent_batches) == 2
+        assert sender.closed
+
+    def test_messages_are_batched_per_session_in_output_order(self):
+        first = self._messages(3, session_id="customer-1")
+        second = self._messages(2, session_id="customer-2")
+        interleaved = [first[0], second[0], first[1], second[1], first[2]]
+
+        self.handler.handle_output(ProcessingResult.success_result(output_messages=interleaved), self.source_message, {})
+
+        batches = self.senders["orders-queue"].sent_batches
+        assert [[sent.session_id for sent in batch] for batch in batches] == [["customer-1"] * 3, ["customer-2"] * 2]
+        assert [sent.message_id for sent in batches[0]] == [message.message_id for message in first]
+
+    def test_session_id_resolver(self):
+        handler = ServiceBusOutputHandler(
+            queue_mappings={},
+            default_queue="default-queue",
+            sender_factory=self._create_sender,
+            session_id_resolver=lambda message: message.tenant_id,
+        )
+        message = Message.create_simple_message(payload={}, tenant_id="tenant-1")
+
+        handler.handle_output(ProcessingResult.success_result(output_messages=[message]), self.source_message, {})
+
+        assert self.senders["default-queue"].sent_messages[0].session_id == "tenant-1"
+
+    def test_failed_batch_is_reported_per_message(self):
+        self.handler.handle_output(ProcessingResult.success_result(output_messages=self._messages(1, output_name="audit")), self.source_message, {})
+        self.senders["audit-queue"].send_error = RuntimeError("link detached")
+        messages = self._messages(2, output_name="audit") + self._messages(1)
+
+        report = self.handler.handle_output(ProcessingResult.success_result(output_messages=messages), self.source_message, {})
+
+        assert [delivery.status for delivery in report] == [DeliveryStatus.FAILED, DeliveryStatus.FAILED, DeliveryStatus.SENT]
+        assert report.deliveries[0].error == "link detached"
+
+    def test_oversized_and_unrouted_messages_are_reported(self):
+        handler = ServiceBusOutputHandler(queue_mappings={"orders": "orders-queue"}, sender_factory=self._create_sender)
+        oversized = Message.create_simple_message(payload={"blob": "x" * 16 * 1024})
+        oversized.add_context(output_name="orders")
+        unrouted = Message.create_simple_message(payload={})
+        messages = [oversized, unrouted] + self._messages(1)
+
+        report = handler.handle_output(ProcessingResult.success_result(output_messages=messages), self.source_message, {})
+
+        assert [delivery.status for delivery in report] == [DeliveryStatus.FAILED, DeliveryStatus.UNROUTED, DeliveryStatus.SENT]
+        assert len(self.senders["orders-queue"].sent_messages) == 1
+
+    @patch("azure.servicebus.ServiceBusClient")
+    def test_default_sender_uses_one_client(self, mock_client_class):
+        client = mock_client_class.from_connection_string.return_value
+        client.get_queue_sender.side_effect = lambda queue_name: FakeServiceBusSender(queue_name)
+        handler = ServiceBusOutputHandler(queue_mappings={"orders": "orders-queue", "audit": "audit-queue"}, connection_string="Endpoint=sb://test/")
+
+        messages = self._messages(1) + self._messages(1, output_name="audit")
+        handler.handle_output(ProcessingResult.success_result(output_messages=messages), self.source_message, {})
+        handler.close()
+
+        mock_client_class.from_connection_string.assert_called_once_with(conn_str="Endpoint=sb://test/")
+        assert client.get_queue_sender.call_count == 2
+        client.close.assert_called_once()
@@ -0,0 +1,928 @@
+"""
+Unit tests for SimpleProcessorHandler.
+
+Tests message processing, pipeline tracking and message storage against
+the in-memory SQLite test database.
+"""
+
+import json
+import threading
+import time
+from functools import partial
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from api_exchange_core.config import get_config
+from api_exchange_core.db.db_pipeline_tracking_models import PipelineExecution, PipelineMessage, PipelineStep, ProcessedMessage
+from api_exchange_core.exceptions import ValidationError
+from api_exchange_core.processors import (
+    CircuitBreaker,
+    CircuitState,
+    ClaimCheck,
+    IdempotencyStore,
+    LocalFileBlobStore,
+    Message,
+    MessageCapturePolicy,
+    ProcessingResult,
+    ProcessingStatus,
+    QueueOutputHandler,
+    RetryPolicy,
+    SimpleProcessorHandler,
+    SimpleProcessorInterface,
+    get_message_codec,
+)
+from api_exchange_core.processors.output_handlers.base_output_handler import BaseOutputHandler
+
+
+class EchoProcessor(SimpleProcessorInterface):
+    """Processor that emits one child message per input."""
+
+    def process(self, message: Message, context: dict) -> ProcessingResult:
+        output = self.create_output_message(payload={"echo": message.payload}, source_message=message)
+        return ProcessingResult.success_result(output_messages=[output], records_processed=1)
+
+
+class TerminalProcessor(SimpleProcessorInterface):
+    """Processor that ends the pipeline without outputs."""
+
+    def process(self, message: Message, context: dict) -> ProcessingResult:
+        if message.payload.get("fail"):
+            return ProcessingResult.failure_result(error_message="Requested failure", error_code="REQUESTED")
+        return ProcessingResult.success_result(records_processed=1)
+
+
+class MutatingProcessor(SimpleProcessorInterface):
+    """Processor that modifies its input payload in place."""
+
+    def process(self, message: Message, context: dict) -> ProcessingResult:
+        message.payload["items"].append("added")
+        return ProcessingResult.success_result(records_processed=1)
+
+
+class RoutingProcessor(SimpleProcessorInterface):
+    """Processor that routes on the envelope without reading the payload."""
+
+    def __init__(self):
+        self.seen = []
+
+    def process(self, message: Message, context: dict) -> ProcessingResult:
+        self.seen.append(message)
+        output = self.create_output_message(payload={"tenant": message.tenant_id}, source_message=message)
+        return ProcessingResult.success_result(output_messages=[output], records_processed=1)
+
+
+class ExplodingProcessor(SimpleProcessorInterface):
+    """Processor that raises on every message."""
+
+    def process(self, message: Message, context: dict) -> ProcessingResult:
+        raise RuntimeError("boom")
+
+
+class BarrierProcessor(SimpleProcessorInterface):
+    """Processor that records how many messages run at the same time."""
+
+    def __init__(self, parties: int):
+        self.barrier = threading.Barrier(parties, timeout=5)
+        self.lock = threading.Lock()
+        self.active = 0
+        self.max_active = 0
+
+    def process(self, message: Message, context: dict) -> ProcessingResult:
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            self.barrier.wait()
+        except threading.BrokenBarrierError:
+            pass
+        with self.lock:
+            self.active -= 1
+        if message.payload.get("fail"):
+            return ProcessingResult.failure_result(error_message="Requested failure", error_code="REQUESTED")
+        return ProcessingResult.success_result(records_processed=1)
+
+
+class HangingProcessor(SimpleProcessorInterface):
+    """Processor that blocks until released, like a hung external call."""
+
+    def __init__(self):
+        self.release = threading.Event()
+
+    def process(self, message: Message, context: dict) -> ProcessingResult:
+        self.release.wait(5)
+        return ProcessingResult.success_result()
+
+
+class FlakyProcessor(SimpleProcessorInterface):
+    """Processor that fails transiently a given number of times before succeeding."""
+
+    def __init__(self, failures: int, raise_error: bool = False):
+        self.failures = failures
+        self.raise_error = raise_error
+        self.calls = 0
+
+    def process(self, message: Message, context: dict) -> ProcessingResult:
+        self.calls += 1
+        if self.calls <= self.failures:
+            if self.raise_error:
+                raise ConnectionError("connection reset")
+            return ProcessingResult.failure_result(error_message="Upstream unavailable", error_code="CONNECTION_ERROR")
+        return ProcessingResult.success_result(records_processed=1)
+
+
+class FanOutProcessor(SimpleProcessorInterface):
+    """Generator processor that yields one child message per requested output."""
+
+    def __init__(self, fail_after: int = None, delay: float = 0):
+        self.fail_after = fail_after
+        self.delay = delay
+        self.calls = 0
+        self.produced = 0
+
+    def process(self, message: Message, context: dict):
+        self.calls += 1
+        for index in range(message.payload["count"]):
+            if self.fail_after is not None and index == self.fail_after:
+                raise RuntimeError("stream broke")
+            time.sleep(self.delay)
+            self.produced += 1
+            yield self.create_output_message(payload={"index": index}, source_message=message)
+
+
+class StreamingOutputHandler(BaseOutputHandler):
+    """Output handler that records how far the processor had got when each message arrived."""
+
+    def __init__(self, processor: FanOutProcessor):
+        self.processor = processor
+        self.routed = []
+
+    def handle_output(self, result, source_message, context) -> None:
+        for output_message in result.output_messages:
+            self.routed.append((output_message.payload["index"], self.processor.produced))
+
+    def handle_output_stream(self, output_messages, source_message, context, chunk_size=100) -> None:
+        for output_message in output_messages:
+            self.routed.append((output_message.payload["index"], self.processor.produced))
+
+    def get_handler_name(self) -> str:
+        return "StreamingOutputHandler"
+
+
+@pytest.fixture
+def commit_counter(db_manager):
+    """Count transaction commits issued against the test engine."""
+    commits = []
+
+    def on_commit(conn):
+        commits.append(conn)
+
+    event.listen(db_manager.engine, "commit", on_commit)
+    yield commits
+    event.remove(db_manager.engine, "commit", on_commit)
+
+
+def _message(pipeline_id: str = "pipeline-1", **payload) -> Message:
+    return Message.create_simple_message(payload=payload or {"value": 1}, pipeline_id=pipeline_id, tenant_id="tenant-1")
+
+
+class TestProcessMessage:
+    """Test single-message processing with tracking."""
+
+    def test_tracks_execution_and_step(self, db_session: Session):
+        handler = SimpleProcessorHandler(EchoProcessor())
+
+        result = handler.process_message(_message())
+
+        assert result.success
+        execution = db_session.query(PipelineExecution).filter_by(pipeline_id="pipeline-1").one()
+        assert execution.step_count == 1
+        assert execution.message_count == 1
+        step = db_session.query(PipelineStep).one()
+        assert step.execution_id == execution.id
+        assert step.status == "completed"
+        assert step.output_count == 1
+
+    def test_terminal_failure_marks_execution_failed(self, db_session: Session):
+        handler = SimpleProcessorHandler(TerminalProcessor())
+
+        result = handler.process_message(_message(fail=True))
+
+        assert result.status == ProcessingStatus.FAILURE
+        execution = db_session.query(PipelineExecution).one()
+        assert execution.status == "failed"
+        assert execution.error_count == 1
+        assert execution.duration_ms is not None
+
+    def test_exception_is_tracked_as_failure(self, db_session: Session):
+        handler = SimpleProcessorHandler(ExplodingProcessor())
+
+        result = handler.process_message(_message())
+
+        assert not result.success
+        assert result.error_code == "PROCESSING_EXCEPTION"
+        step = db_session.query(PipelineStep).one()
+        assert step.status == "failed"
+        assert step.error_type == "PROCESSING_EXCEPTION"
+
+    def test_tracking_disabled_writes_nothing(self, db_session: Session):
+        handler = SimpleProcessorHandler(EchoProcessor(), enable_pipeline_tracking=False)
+
+        result = handler.process_message(_message())
+
+        assert result.success
+        assert db_session.query(PipelineExecution).count() == 0
+
+    def test_step_records_queues_outputs_were_delivered_to(self, db_session: Session):
+        output_handler = QueueOutputHandler(queue_mappings={}, connection_string="UseDevelopmentStorage=true", default_queue="echo-queue")
+        handler = SimpleProcessorHandler(EchoProcessor(), output_handler=output_handler)
+
+        with patch("api_exchange_core.processors.output_handlers.queue_output_handler.send_message_to_queue_direct"):
+            result = handler.process_message(_message())
+
+        assert result.delivery_report.sent_count == 1
+        assert db_session.query(PipelineStep).one().output_queues == ["echo-queue"]
+
+
+class TestProcessQueueMessage:
+    """Test unpacking and processing queue message bodies."""
+
+    def test_packed_body_is_processed_per_message(self, db_session: Session):
+        output_handler = QueueOutputHandler(
+            queue_mappings={}, connection_string="UseDevelopmentStorage=true", default_queue="out", pack_messages=True
+        )
+        inputs = [_message(value=index) for index in range(5)]
+        with patch("api_exchange_core.processors.output_handlers.queue_output_handler.send_message_to_queue_direct") as mock_send:
+            output_handler.handle_output(ProcessingResult.success_result(output_messages=inputs), _message(), {})
+        body = mock_send.call_args.kwargs["message_data"]
+
+        results = SimpleProcessorHandler(EchoProcessor()).process_queue_message(body)
+
+        assert mock_send.call_count == 1
+        assert [result.output_messages[0].payload["echo"]["value"] for result in results] == [0, 1, 2, 3, 4]
+        assert db_session.query(PipelineStep).filter_by(status="completed").count() == 5
+
+    def test_single_message_body(self, db_session: Session):
+        results = SimpleProcessorHandler(EchoProcessor()).process_queue_message(get_message_codec().encode_text(_message()))
+
+        assert len(results) == 1
+        assert results[0].success
+
+
+    def test_routing_only_step_does_not_decode_the_payload(self, db_session: Session):
+        processor = RoutingProcessor()
+        message = Message.create_simple_message(payload={"records": ["x" * 100] * 50}, pipeline_id="pipeline-1", tenant_id="tenant-1")
+
+        results = SimpleProcessorHandler(processor).process_queue_message(get_message_codec().encode_text(message))
+
+        assert results[0].success
+        assert results[0].output_messages[0].payload == {"tenant": "tenant-1"}
+        assert not processor.seen[0].payload_loaded
+
+    def test_empty_deferred_payload_fails_validation(self, db_session: Session):
+        message = Message.with_deferred_payload({"pipeline_id": "pipeline-1"}, "{ }", json.loads)
+
+        result = SimpleProcessorHandler(RoutingProcessor()).process_message(message)
+
+        assert result.error_code == "INVALID_MESSAGE"
+        assert not message.payload_loaded
+
+
+class TestProcessMessages:
+    """Test batch processing with a single tracking transaction."""
+
+    def test_returns_result_per_message(self, db_session: Session):
+        handler = SimpleProcessorHandler(TerminalProcessor())
+        messages = [_message(pipeline_id=f"pipeline-{i}", fail=(i == 1)) for i in range(3)]
+
+        results = handler.process_messages(messages)
+
+        assert [r.success for r in results] == [True, False, True]
+        assert db_session.query(PipelineExecution).count() == 3
+        assert db_session.query(PipelineStep).filter_by(status="failed").count() == 1
+
+    def test_batch_commits_once(self, db_session: Session, commit_counter):
+        handler = SimpleProcessorHandler(EchoProcessor(), enable_message_storage=True)
+        messages = [_message(pipeline_id="shared-pipeline") for _ in range(5)]
+
+        handler.process_messages(messages)
+
+        assert len(commit_counter) == 1
+        execution = db_session.query(PipelineExecution).one()
+        assert execution.step_count == 5
+        assert execution.message_count == 5
+        assert db_session.query(PipelineStep).filter_by(status="completed").count() == 5
+        assert db_session.query(PipelineMessage).count() == 10
+
+    def test_failed_tracking_write_does_not_lose_the_batch(self, db_session: Session):
+        class BrokenTrackingHandler(SimpleProcessorHandler):
+            def _write_pipeline_start(self, session, message, **kwargs):
+                execution_id = super()._write_pipeline_start(session, message, **kwargs)
+                if message.payload.get("break_tracking"):
+                    session.add(PipelineStep(id="broken-step"))  # Violates NOT NULL constraints on flush
+                return execution_id
+
+        messages = [_message(), _message(break_tracking=True), _message()]
+
+        results = BrokenTrackingHandler(TerminalProcessor()).process_messages(messages)
+
+        assert all(result.success for result in results)
+        steps = db_session.query(PipelineStep).all()
+        assert sorted(step.message_id for step in steps) == sorted([messages[0].message_id, messages[2].message_id])
+        assert {step.status for step in steps} == {"completed"}
+
+    def test_single_messages_commit_per_write(self, db_session: Session, commit_counter):
+        handler = SimpleProcessorHandler(EchoProcessor(), enable_message_storage=True)
+
+        handler.process_message(_message())
+
+        assert len(commit_counter) == 4
+
+    def test_exception_in_batch_does_not_affect_other_results(self, db_session: Session):
+        handler = SimpleProcessorHandler(ExplodingProcessor())
+
+        results = handler.process_messages([_message(pipeline_id="a"), _message(pipeline_id="b")])
+
+        assert [r.error_code for r in results] == ["PROCESSING_EXCEPTION", "PROCESSING_EXCEPTION"]
+        assert db_session.query(PipelineStep).filter_by(status="failed").count() == 2
+
+    def test_empty_batch(self, db_session: Session, commit_counter):
+        handler = SimpleProcessorHandler(EchoProcessor())
+
+        assert handler.process_messages([]) == []
+        assert commit_counter == []
+
+
+class TestExecutionUpsert:
+    """Test the single-statement execution upsert and atomic counters."""
+
+    @pytest.fixture
+    def statements(self, db_manager):
+        """Capture SQL statements issued against the test engine."""
+        captured = []
+
+        def before_execute(conn, cursor, statement, parameters, context, executemany):
+            captured.append(statement)
+
+        event.listen(db_manager.engine, "before_cursor_execute", before_execute)
+        yield captured
+        event.remove(db_manager.engine, "before_cursor_execute", before_execute)
+
+    def test_start_is_single_upsert(self, db_session: Session, statements):
+        handler = SimpleProcessorHandler(EchoProcessor())
+
+        handler._track_pipeline_start(_message(), "EchoProcessor", {})
+
+        execution_statements = [s for s in statements if "pipeline_execution" in s]
+        assert len(execution_statements) == 1
+        assert "ON CONFLICT" in execution_statements[0]
+
+    def test_cached_execution_is_updated_by_primary_key(self, db_session: Session, statements):
+        handler = SimpleProcessorHandler(EchoProcessor())
+        handler._track_pipeline_start(_message(), "EchoProcessor", {})
+        statements.clear()
+
+        handler._track_pipeline_start(_message(), "EchoProcessor", {})
+
+        execution_statements = [s for s in statements if "pipeline_execution" in s]
+        assert len(execution_statements) == 1
+        assert execution_statements[0].startswith("UPDATE")
+        assert "ON CONFLICT" not in execution_statements[0]
+        assert handler.execution_cache.get_stats()["hits"] == 1
+        assert db_session.query(PipelineExecution).one().step_count == 2
+
+    def test_stale_cache_entry_falls_back_to_upsert(self, db_session: Session):
+        handler = SimpleProcessorHandler(TerminalProcessor())
+        handler.execution_cache.put("pipeline-1", "missing-execution")
+
+        handler.process_message(_message())
+
+        execution = db_session.query(PipelineExecution).one()
+        assert db_session.query(PipelineStep).one().execution_id == execution.id
+        assert handler.execution_cache.get("pipeline-1") == execution.id
+
+    def test_counters_accumulate_across_messages(self, db_session: Session):
+        handler = SimpleProcessorHandler(TerminalProcessor())
+
+        handler.process_message(_message())
+        handler.process_message(_message(fail=True))
+        handler.process_message(_message(fail=True))
+
+        execution = db_session.query(PipelineExecution).one()
+        assert execution.step_count == 3
+        assert execution.message_count == 3
+        assert execution.error_count == 2
+
+    def test_counters_accumulate_within_batch(self, db_session: Session):
+        handler = SimpleProcessorHandler(TerminalProcessor())
+
+        handler.process_messages([_message(), _message(fail=True), _message(fail=True)])
+
+        execution = db_session.query(PipelineExecution).one()
+        assert execution.step_count == 3
+        assert execution.message_count == 3
+        assert execution.error_count == 2
+        assert execution.status == "failed"
+
+
+class TestProcessConcurrently:
+    """Test one handler processing messages on a thread pool."""
+
+    def test_messages_run_in_parallel(self, file_db_manager):
+        processor = BarrierProcessor(parties=4)
+        handler = SimpleProcessorHandler(processor)
+        messages = [_message(pipeline_id="shared", index=i, fail=(i == 2)) for i in range(4)]
+
+        results = handler.process_concurrently(messages, max_workers=4)
+
+        assert processor.max_active == 4
+        assert [r.success for r in results] == [True, True, False, True]
+        session = file_db_manager.get_session()
+        try:
+            execution = session.query(PipelineExecution).one()
+            assert execution.step_count == 4
+            assert execution.error_count == 1
+            steps = session.query(PipelineStep).all()
+            assert all(step.execution_id == execution.id for step in steps)
+            assert sorted(step.status for step in steps) == ["completed", "completed", "completed", "failed"]
+        finally:
+            session.close()
+
+    def test_in_flight_work_is_bounded(self):
+        consumed = []
+        lead = []
+
+        class LeadRecorder(SimpleProcessorInterface):
+            def process(self, message: Message, context: dict) -> ProcessingResult:
+                # How far the producer has run ahead of this message
+                lead.append(len(consumed) - message.payload["index"])
+                return ProcessingResult.success_result()
+
+        def produce():
+            for i in range(20):
+                consumed.append(i)
+                yield _message(index=i)
+
+        handler = SimpleProcessorHandler(LeadRecorder(), enable_pipeline_tracking=False)
+
+        results = handler.process_concurrently(produce(), max_workers=2, max_in_flight=2)
+
+        assert len(results) == 20
+        # At most max_in_flight submitted plus the one message waiting for a free slot
+        assert max(lead) <= 3
+
+    def test_results_keep_input_order(self):
+        handler = SimpleProcessorHandler(EchoProcessor(), enable_pipeline_tracking=False)
+        messages = [_message(index=i) for i in range(10)]
+
+        results = handler.process_concurrently(messages, max_workers=3)
+
+        assert [r.output_messages[0].payload["echo"]["index"] for r in results] == list(range(10))
+
+    def test_rejects_invalid_worker_count(self):
+        handler = SimpleProcessorHandler(EchoProcessor())
+
+        with pytest.raises(ValidationError):
+            handler.process_concurrently([_message()], max_workers=0)
+
+
+class TestProcessingTimeout:
+    """Test enforcement of the processing deadline."""
+
+    def test_hung_processor_times_out(self, db_session: Session):
+        processor = HangingProcessor()
+        handler = SimpleProcessorHandler(processor, processing_timeout=0.05)
+
+        try:
+            result = handler.process_message(_message())
+        finally:
+            processor.release.set()
+
+        assert result.status == ProcessingStatus.TIMEOUT
+        assert result.error_code == "PROCESSING_TIMEOUT"
+        assert not result.success
+        step = db_session.query(PipelineStep).one()
+        assert step.status == "timed_out"
+        assert step.error_type == "PROCESSING_TIMEOUT"
+        execution = db_session.query(PipelineExecution).one()
+        assert execution.status == "failed"
+
+    def test_fast_processor_is_unaffected(self, db_session: Session):
+        handler = SimpleProcessorHandler(EchoProcessor(), processing_timeout=5)
+
+        result = handler.process_message(_message())
+
+        assert result.success
+        assert db_session.query(PipelineStep).one().status == "completed"
+
+    def test_exception_under_deadline_is_tracked_as_failure(self, db_session: Session):
+        handler = SimpleProcessorHandler(ExplodingProcessor(), processing_timeout=5)
+
+        result = handler.process_message(_message())
+
+        assert result.error_code == "PROCESSING_EXCEPTION"
+
+    def test_timeout_defaults_to_processing_config(self):
+        assert SimpleProcessorHandler(EchoProcessor()).processing_timeout is None
+        handler = SimpleProcessorHandler(EchoProcessor(), enforce_processing_timeout=True)
+
+        assert handler.processing_timeout == get_config().processing.processing_timeout
+
+
+class TestRetries:
+    """Test in-process retries recorded on the same pipeline step."""
+
+    @staticmethod
+    def _policy(max_retry_attempts: int = 3) -> RetryPolicy:
+        return RetryPolicy(max_retry_attempts=max_retry_attempts, retry_backoff_base=0, jitter=False)
+
+    def test_transient_failure_is_retried_on_same_step(self, db_session: Session):
+        processor = FlakyProcessor(failures=2)
+        handler = SimpleProcessorHandler(processor, retry_policy=self._policy())
+
+        result = handler.process_message(_message())
+
+        assert result.success
+        assert processor.calls == 3
+        step = db_session.query(PipelineStep).one()
+        assert step.status == "completed"
+        assert step.retry_count == 2
+        assert db_session.query(PipelineExecution).one().step_count == 1
+
+    def test_retryable_exception_is_retried(self, db_session: Session):
+        processor = FlakyProcessor(failures=1, raise_error=True)
+        handler = SimpleProcessorHandler(processor, retry_policy=self._policy())
+
+        result = handler.process_message(_message())
+
+        assert result.success
+        assert db_session.query(PipelineStep).one().retry_count == 1
+
+    def test_gives_up_after_max_attempts(self, db_session: Session):
+        processor = FlakyProcessor(failures=10, raise_error=True)
+        handler = SimpleProcessorHandler(processor, retry_policy=self._policy(max_retry_attempts=2))
+
+        result = handler.process_message(_message())
+
+        assert result.error_code == "PROCESSING_EXCEPTION"
+        assert processor.calls == 3
+        step = db_session.query(PipelineStep).one()
+        assert step.status == "failed"
+        assert step.retry_count == 2
+
+    def test_non_retryable_failure_is_not_retried(self, db_session: Session):
+        handler = SimpleProcessorHandler(TerminalProcessor(), retry_policy=self._policy())
+
+        result = handler.process_message(_message(fail=True))
+
+        assert result.error_code == "REQUESTED"
+        assert db_session.query(PipelineStep).one().retry_count == 0
+
+    def test_no_policy_means_no_retries(self, db_session: Session):
+        processor = FlakyProcessor(failures=1)
+        handler = SimpleProcessorHandler(processor)
+
+        result = handler.process_message(_message())
+
+        assert not result.success
+        assert processor.calls == 1
+
+
+class TestMessageCapture:
+    """Test sampled, size-capped and failure-only message storage."""
+
+    def test_unsampled_messages_are_not_stored(self, db_session: Session):
+        handler = SimpleProcessorHandler(EchoProcessor(), enable_message_storage=True, message_capture=MessageCapturePolicy(sample_rate=0.0))
+
+        handler.process_message(_message())
+
+        assert db_session.query(PipelineStep).count() == 1
+        assert db_session.query(PipelineMessage).count() == 0
+
+    def test_failures_only_skips_successful_steps(self, db_session: Session):
+        handler = SimpleProcessorHandler(TerminalProcessor(), enable_message_storage=True, message_capture=MessageCapturePolicy(failures_only=True))
+
+        handler.process_message(_message())
+        handler.process_message(_message(fail=True))
+
+        stored = db_session.query(PipelineMessage).one()
+        assert stored.message_type == "input"
+        assert stored.message_payload["payload"] == {"fail": True}
+
+    def test_failures_only_captures_input_on_exception(self, db_session: Session):
+        handler = SimpleProcessorHandler(ExplodingProcessor(), enable_message_storage=True, message_capture=MessageCapturePolicy(failures_only=True))
+
+        handler.process_message(_message())
+
+        step = db_session.query(PipelineStep).one()
+        stored = db_session.query(PipelineMessage).one()
+        assert stored.step_id == step.id
+        assert stored.execution_id == step.execution_id
+
+    def test_captured_outputs_record_their_queue(self, db_session: Session):
+        output_handler = QueueOutputHandler(queue_mappings={}, connection_string="UseDevelopmentStorage=true", default_queue="echo-queue")
+        handler = SimpleProcessorHandler(EchoProcessor(), output_handler=output_handler, enable_message_storage=True)
+
+        with patch("api_exchange_core.processors.output_handlers.queue_output_handler.send_message_to_queue_direct"):
+            handler.process_message(_message())
+
+        stored = db_session.query(PipelineMessage).filter_by(message_type="output").one()
+        assert stored.target_queue == "echo-queue"
+
+    def test_oversized_messages_are_truncated(self, db_session: Session):
+        handler = SimpleProcessorHandler(TerminalProcessor(), enable_message_storage=True, message_capture=MessageCapturePolicy(max_payload_bytes=64))
+
+        handler.process_message(_message(blob="x" * 1000))
+
+        stored = db_session.query(PipelineMessage).one()
+        assert stored.message_payload["truncated"] is True
+        assert stored.message_size_bytes > 1000
+
+
+class TestSanitization:
+    """Test sanitization of stored messages."""
+
+    def test_stored_input_is_sanitized_without_touching_message(self, db_session: Session):
+        handler = SimpleProcessorHandler(
+            TerminalProcessor(),
+            enable_message_storage=True,
+            message_sanitization_rules={"payload.password": "mask", "payload.token": "hash"},
+            sanitization_hash_key="test-key",
+        )
+        message = _message(password="secret", token="abc", value=1)
+
+        handler.process_message(message)
+
+        stored = db_session.query(PipelineMessage).one()
+        assert stored.is_sanitized
+        assert stored.message_payload["payload"]["password"] == "***MASKED***"
+        assert stored.message_payload["payload"]["token"] == handler._sanitizer.digest("abc")
+        assert message.payload["password"] == "secret"
+
+    def test_batch_input_snapshot_is_taken_before_processing(self, db_session: Session):
+        handler = SimpleProcessorHandler(MutatingProcessor(), enable_message_storage=True, message_sanitization_rules={"payload.password": "mask"})
+        message = _message(password="secret", items=["original"])
+
+        handler.process_messages([message])
+
+        stored = db_session.query(PipelineMessage).one()
+        assert stored.message_payload["payload"] == {"password": "***MASKED***", "items": ["original"]}
+        assert message.payload["items"] == ["original", "added"]
+
+    def test_hash_rule_without_key_is_rejected(self, monkeypatch):
+        monkeypatch.setattr(get_config().security, "encryption_key", None)
+
+        with pytest.raises(ValidationError, match="no hash key"):
+            SimpleProcessorHandler(TerminalProcessor(), message_sanitization_rules={"payload.token": "hash"})
+
+
+class TestStreamedOutputs:
+    """Test generator processors whose outputs are routed as they are produced."""
+
+    def test_outputs_are_routed_incrementally(self, db_session: Session):
+        processor = FanOutProcessor()
+        output_handler = StreamingOutputHandler(processor)
+        handler = SimpleProcessorHandler(processor, output_handler=output_handler)
+
+        result = handler.process_message(_message(count=3))
+
+        assert result.success
+        assert result.output_messages == []
+        assert result.output_count == 3
+        # Each message reached the handler before the next one was produced
+        assert output_handler.routed == [(0, 1), (1, 2), (2, 3)]
+        step = db_session.query(PipelineStep).one()
+        assert step.output_count == 3
+
+    def test_default_stream_handling_chunks_into_handle_output(self, db_session: Session):
+        processor = FanOutProcessor()
+        output_handler = StreamingOutputHandler(processor)
+        output_handler.handle_output_stream = partial(BaseOutputHandler.handle_output_stream, output_handler, chunk_size=2)
+        handler = SimpleProcessorHandler(processor, output_handler=output_handler)
+
+        result = handler.process_message(_message(count=5))
+
+        assert result.output_count == 5
+        assert output_handler.routed == [(0, 2), (1, 2), (2, 4), (3, 4), (4, 5)]
+
+    def test_stream_is_collected_without_output_handler(self, db_session: Session):
+        handler = SimpleProcessorHandler(FanOutProcessor())
+
+        result = handler.process_message(_message(count=2))
+
+        assert [output.payload["index"] for output in result.output_messages] == [0, 1]
+        assert result.output_count == 2
+
+    def test_streamed_outputs_are_captured(self, db_session: Session):
+        processor = FanOutProcessor()
+        handler = SimpleProcessorHandler(processor, output_handler=StreamingOutputHandler(processor), enable_message_storage=True)
+
+        handler.process_message(_message(count=3))
+
+        assert db_session.query(PipelineMessage).filter_by(message_type="output").count() == 3
+
+    def test_streamed_delivery_is_recorded_on_the_step(self, db_session: Session):
+        output_handler = QueueOutputHandler(queue_mappings={}, connection_string="UseDevelopmentStorage=true", default_queue="fan-out-queue")
+        handler = SimpleProcessorHandler(FanOutProcessor(), output_handler=output_handler)
+
+        with patch("api_exchange_core.processors.output_handlers.queue_output_handler.send_message_to_queue_direct"):
+            result = handler.process_message(_message(count=3))
+
+        assert result.delivery_report.sent_count == 3
+        assert db_session.query(PipelineStep).one().output_queues == ["fan-out-queue"]
+
+    def test_captured_streamed_outputs_record_their_queue(self, db_session: Session):
+        output_handler = QueueOutputHandler(queue_mappings={}, connection_string="UseDevelopmentStorage=true", default_queue="fan-out-queue")
+        handler = SimpleProcessorHandler(FanOutProcessor(), output_handler=output_handler, enable_message_storage=True)
+
+        with patch("api_exchange_core.processors.output_handlers.queue_output_handler.send_message_to_queue_direct"):
+            handler.process_message(_message(count=3))
+
+        stored = db_session.query(PipelineMessage).filter_by(message_type="output").all()
+        assert [message.target_queue for message in stored] == ["fan-out-queue"] * 3
+
+    def test_streaming_opts_out_of_timeout_and_retries(self, db_session: Session):
+        processor = FanOutProcessor(fail_after=2, delay=0.02)
+        output_handler = StreamingOutputHandler(processor)
+        retry_policy = RetryPolicy(max_retry_attempts=3, retry_backoff_base=0, jitter=False)
+        handler = SimpleProcessorHandler(processor, output_handler=output_handler, processing_timeout=0.01, retry_policy=retry_policy)
+
+        result = handler.process_message(_message(count=5))
+
+        # Production outlived the deadline, and the failure was not retried: the first two outputs were already routed
+        assert result.error_code == "PROCESSING_EXCEPTION"
+        assert processor.calls == 1
+        assert [index for index, _ in output_handler.routed] == [0, 1]
+
+    def test_stream_error_fails_the_step(self, db_session: Session):
+        processor = FanOutProcessor(fail_after=2)
+        output_handler = StreamingOutputHandler(processor)
+        handler = SimpleProcessorHandler(processor, output_handler=output_handler)
+
+        result = handler.process_message(_message(count=5))
+
+        assert not result.success
+        assert result.error_code == "PROCESSING_EXCEPTION"
+        assert len(output_handler.routed) == 2
+        step = db_session.query(PipelineStep).one()
+        assert step.status == "failed"
+
+
+class TestIdempotency:
+    """Test short-circuiting of redelivered messages."""
+
+    def test_redelivery_skips_processor_and_outputs(self, db_session: Session):
+        processor = FanOutProcessor()
+        output_handler = StreamingOutputHandler(processor)
+        handler = SimpleProcessorHandler(processor, output_handler=output_handler, idempotency_store=IdempotencyStore())
+        message = _message(count=2)
+
+        first = handler.process_message(message)
+        second = handler.process_message(message, {"dequeue_count": 2})
+
+        assert first.output_count == 2
+        assert second.success
+        assert second.context["duplicate"] is True
+        assert second.context["recorded_output_count"] == 2
+        assert processor.produced == 2
+        assert len(output_handler.routed) == 2
+        assert db_session.query(PipelineStep).count() == 1
+
+    def test_redelivery_to_another_worker_uses_database(self, db_session: Session):
+        message = _message()
+        SimpleProcessorHandler(EchoProcessor(), idempotency_store=IdempotencyStore()).process_message(message)
+
+        result = SimpleProcessorHandler(EchoProcessor(), idempotency_store=IdempotencyStore()).process_message(message, {"dequeue_count": 2})
+
+        assert result.context["duplicate"] is True
+        assert result.output_messages == []
+        assert db_session.query(PipelineStep).count() == 1
+        stored = db_session.query(ProcessedMessage).one()
+        assert stored.message_id == message.message_id
+        assert stored.output_count == 1
+
+    def test_failed_messages_are_reprocessed(self, db_session: Session):
+        processor = FlakyProcessor(failures=1)
+        handler = SimpleProcessorHandler(processor, idempotency_store=IdempotencyStore())
+        message = _message()
+
+        assert not handler.process_message(message).success
+        assert handler.process_message(message).success
+        assert processor.calls == 2
+        assert db_session.query(ProcessedMessage).count() == 1
+
+
+class TestTrackingCircuitBreaker:
+    """Test that a failing tracking database does not slow processing down."""
+
+    def test_open_circuit_skips_tracking(self, db_session: Session, monkeypatch):
+        attempts = []
+
+        def unavailable(self, session=None):
+            attempts.append(1)
+            raise ConnectionError("database unavailable")
+
+        monkeypatch.setattr(SimpleProcessorHandler, "_tracking_session", unavailable)
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+        handler = SimpleProcessorHandler(EchoProcessor(), tracking_breaker=breaker)
+
+        results = [handler.process_message(_message()) for _ in range(3)]
+
+        assert all(result.success for result in results)
+        # The failed starts of the first two messages open the circuit; the third message's start is skipped
+        # and, with no step written, nothing else is attempted for it
+        assert len(attempts) == 2
+        assert breaker.get_stats()["skipped"] == 1
+
+    def test_probe_writes_a_new_step(self, db_session: Session):
+        now = [0.0]
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60, clock=lambda: now[0])
+        handler = SimpleProcessorHandler(EchoProcessor(), tracking_breaker=breaker)
+        breaker.record_failure()
+
+        assert handler.process_message(_message()).success
+        now[0] = 61
+        assert handler.process_message(_message()).success
+
+        assert breaker.state == CircuitState.CLOSED
+        assert [step.status for step in db_session.query(PipelineStep)] == ["completed"]
+
+    def test_batch_commit_is_skipped_while_circuit_is_open(self, db_session: Session):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+
+        class OutageProcessor(EchoProcessor):
+            def process(self, message: Message, context: dict) -> ProcessingResult:
+                breaker.record_failure()
+                return super().process(message, context)
+
+        results = SimpleProcessorHandler(OutageProcessor(), tracking_breaker=breaker).process_messages([_message(), _message()])
+
+        assert all(result.success for result in results)
+        assert db_session.query(PipelineStep).count() == 0
+
+    def test_slow_tracking_opens_circuit(self, db_session: Session):
+        breaker = CircuitBreaker(failure_threshold=1, latency_threshold_ms=0, reset_timeout=60)
+        handler = SimpleProcessorHandler(EchoProcessor(), tracking_breaker=breaker)
+
+        handler.process_message(_message())
+
+        assert breaker.state == CircuitState.OPEN
+        assert db_session.query(PipelineStep).count() == 1
+        step = db_session.query(PipelineStep).one()
+        assert step.status == "processing"
+
+
+class TestClaimCheck:
+    """Test resolution and release of offloaded payloads."""
+
+    def _offloaded(self, claim_check: ClaimCheck) -> Message:
+        return claim_check.offload(_message(value=42))
+
+    def test_offloaded_payload_is_resolved_and_released(self, db_session: Session, tmp_path):
+        claim_check = ClaimCheck(LocalFileBlobStore(tmp_path), threshold_bytes=0)
+        handler = SimpleProcessorHandler(EchoProcessor(), claim_check=claim_check)
+        message = self._offloaded(claim_check)
+        ref = claim_check.get_reference(message)
+
+        result = handler.process_message(message)
+
+        assert result.success
+        assert result.output_messages[0].payload == {"echo": {"value": 42}}
+        assert "claim_check" not in message.context
+        assert not (tmp_path / ref).exists()
+
+    def test_failed_message_keeps_payload(self, db_session: Session, tmp_path):
+        claim_check = ClaimCheck(LocalFileBlobStore(tmp_path), threshold_bytes=0)
+        handler = SimpleProcessorHandler(ExplodingProcessor(), claim_check=claim_check)
+        message = self._offloaded(claim_check)
+        ref = claim_check.get_reference(message)
+
+        assert not handler.process_message(message).success
+        assert (tmp_path / ref).exists()
+
+    def test_missing_payload_fails_processing(self, db_session: Session, tmp_path):
+        claim_check = ClaimCheck(LocalFileBlobStore(tmp_path), threshold_bytes=0)
+        handler = SimpleProcessorHandler(EchoProcessor(), claim_check=claim_check)
+        message = self._offloaded(claim_check)
+        claim_check.release(claim_check.get_reference(message))
+
+        result = handler.process_message(message)
+
+        assert not result.success
+        assert "not found" in result.error_message
+
+    def test_redelivery_after_release_is_skipped_as_duplicate(self, db_session: Session, tmp_path):
+        claim_check = ClaimCheck(LocalFileBlobStore(tmp_path), threshold_bytes=0)
+        handler = SimpleProcessorHandler(EchoProcessor(), claim_check=claim_check, idempotency_store=IdempotencyStore())
+        codec = get_message_codec()
+        body = codec.encode(self._offloaded(claim_check))
+
+        first = handler.process_message(codec.decode(body))
+        redelivered = handler.process_message(codec.decode(body), {"dequeue_count": 2})
+
+        assert first.success
+        assert redelivered.success
+        assert redelivered.context["duplicate"] is True
+        assert db_session.query(PipelineStep).count() == 1
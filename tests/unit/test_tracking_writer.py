@@ -0,0 +1,257 @@
+"""
+Unit tests for the write-behind pipeline tracking writer.
+
+The writer applies operations on its own thread, so these tests use a
+file-backed SQLite database that every thread's connection can see.
+"""
+
+import threading
+import time
+
+import pytest
+
+from api_exchange_core.db.db_pipeline_tracking_models import PipelineExecution, PipelineMessage, PipelineStep
+from api_exchange_core.processors import (
+    CircuitBreaker,
+    CircuitState,
+    Message,
+    OverflowPolicy,
+    PipelineTrackingWriter,
+    ProcessingResult,
+    SimpleProcessorHandler,
+    SimpleProcessorInterface,
+)
+from api_exchange_core.processors import tracking_writer as tracking_writer_module
+
+
+class EchoProcessor(SimpleProcessorInterface):
+    """Processor that emits one child message per input."""
+
+    def process(self, message: Message, context: dict) -> ProcessingResult:
+        output = self.create_output_message(payload={"echo": message.payload}, source_message=message)
+        return ProcessingResult.success_result(output_messages=[output])
+
+
+class TerminalProcessor(SimpleProcessorInterface):
+    """Processor that ends the pipeline without outputs."""
+
+    def process(self, message: Message, context: dict) -> ProcessingResult:
+        return ProcessingResult.success_result()
+
+
+@pytest.fixture
+def writer():
+    """Create a writer and make sure its thread is stopped."""
+    writers = []
+
+    def _create(**kwargs):
+        kwargs.setdefault("flush_interval", 0.01)
+        kwargs.setdefault("register_atexit", False)
+        created = PipelineTrackingWriter(**kwargs)
+        writers.append(created)
+        return created
+
+    yield _create
+    for created in writers:
+        created.close(timeout=5)
+
+
+def _block_writer(tracking_writer: PipelineTrackingWriter) -> threading.Event:
+    """Occupy the writer thread until the returned event is set."""
+    started = threading.Event()
+    gate = threading.Event()
+
+    def hold(session):
+        started.set()
+        gate.wait(5)
+
+    tracking_writer.submit(hold)
+    assert started.wait(5)
+    return gate
+
+
+def _message(pipeline_id: str = "pipeline-1") -> Message:
+    return Message.create_simple_message(payload={"value": 1}, pipeline_id=pipeline_id, tenant_id="tenant-1")
+
+
+class TestPipelineTrackingWriter:
+    """Test queueing, batching and overflow behaviour."""
+
+    def test_operations_are_applied_in_order(self, file_db_manager, writer):
+        tracking_writer = writer()
+        applied = []
+
+        for i in range(5):
+            assert tracking_writer.submit(lambda session, i=i: applied.append(i))
+        tracking_writer.flush()
+
+        assert applied == [0, 1, 2, 3, 4]
+        stats = tracking_writer.get_stats()
+        assert stats["submitted"] == 5
+        assert stats["written"] == 5
+        assert stats["dropped"] == 0
+
+    def test_batches_share_one_commit(self, file_db_manager, writer):
+        tracking_writer = writer(batch_size=50, flush_interval=0.2)
+        gate = _block_writer(tracking_writer)
+        for _ in range(10):
+            tracking_writer.submit(lambda session: None)
+        gate.set()
+        tracking_writer.flush()
+
+        # The held operation is one batch; everything queued behind it is the next
+        assert tracking_writer.get_stats()["batches"] == 2
+
+    def test_drop_policy_counts_dropped_operations(self, file_db_manager, writer):
+        tracking_writer = writer(max_queue_size=1, overflow_policy=OverflowPolicy.DROP)
+        gate = _block_writer(tracking_writer)
+
+        results = [tracking_writer.submit(lambda session: None) for _ in range(3)]
+        gate.set()
+        tracking_writer.flush()
+
+        assert results == [True, False, False]
+        assert tracking_writer.dropped_count == 2
+
+    def test_block_policy_times_out_into_drop(self, file_db_manager, writer):
+        tracking_writer = writer(max_queue_size=1, overflow_policy=OverflowPolicy.BLOCK, block_timeout=0.01)
+        gate = _block_writer(tracking_writer)
+
+        assert tracking_writer.submit(lambda session: None)
+        assert not tracking_writer.submit(lambda session: None)
+        gate.set()
+        tracking_writer.flush()
+
+        assert tracking_writer.dropped_count == 1
+
+    def test_failed_operation_does_not_discard_batch(self, file_db_manager, writer):
+        tracking_writer = writer(batch_size=10, flush_interval=0.2)
+        applied = []
+
+        def explode(session):
+            raise RuntimeError("bad operation")
+
+        tracking_writer.submit(lambda session: applied.append("a"))
+        tracking_writer.submit(explode)
+        tracking_writer.submit(lambda session: applied.append("b"))
+        tracking_writer.flush()
+
+        stats = tracking_writer.get_stats()
+        assert stats["failed"] == 1
+        assert stats["written"] == 2
+        assert applied[-2:] == ["a", "b"]
+
+    def test_writer_survives_database_errors(self, file_db_manager, writer, monkeypatch):
+        tracking_writer = writer()
+        real_get_db_manager = tracking_writer_module.get_db_manager
+        sessions = []
+
+        class FailingManager:
+            def get_session(self):
+                if sessions:
+                    raise ConnectionError("database unavailable")
+                session = real_get_db_manager().get_session()
+                session.rollback = lambda: (_ for _ in ()).throw(ConnectionError("connection lost"))
+                sessions.append(session)
+                return session
+
+        def explode(session):
+            raise RuntimeError("bad operation")
+
+        monkeypatch.setattr(tracking_writer_module, "get_db_manager", FailingManager)
+        tracking_writer.submit(explode)
+        tracking_writer.flush()
+        monkeypatch.setattr(tracking_writer_module, "get_db_manager", real_get_db_manager)
+
+        applied = []
+        tracking_writer.submit(lambda session: applied.append("after"))
+        tracking_writer.flush()
+
+        assert applied == ["after"]
+        assert tracking_writer.get_stats()["failed"] == 1
+
+    def test_open_circuit_skips_operations(self, file_db_manager, writer):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+        tracking_writer = writer(breaker=breaker)
+        applied = []
+
+        def explode(session):
+            raise ConnectionError("database unavailable")
+
+        tracking_writer.submit(explode)
+        tracking_writer.flush()
+        tracking_writer.submit(lambda session: applied.append("skipped"))
+        tracking_writer.flush()
+
+        assert breaker.state == CircuitState.OPEN
+        assert applied == []
+        assert tracking_writer.get_stats()["skipped"] == 2
+
+    def test_close_drains_pending_operations(self, file_db_manager, writer):
+        tracking_writer = writer(flush_interval=1.0)
+        applied = []
+        for i in range(3):
+            tracking_writer.submit(lambda session, i=i: applied.append(i))
+
+        tracking_writer.close(timeout=5)
+
+        assert applied == [0, 1, 2]
+        assert not tracking_writer.submit(lambda session: None)
+
+    def test_close_waits_for_submits_in_progress(self, file_db_manager, writer):
+        tracking_writer = writer(max_queue_size=1, overflow_policy=OverflowPolicy.BLOCK)
+        gate = _block_writer(tracking_writer)
+        applied = []
+        tracking_writer.submit(lambda session: applied.append("queued"))
+
+        # Blocks on the full queue, past its closed check
+        submitter = threading.Thread(target=tracking_writer.submit, args=(lambda session: applied.append("in progress"),))
+        submitter.start()
+        deadline = time.monotonic() + 5
+        while tracking_writer._submitting == 0 and time.monotonic() < deadline:
+            time.sleep(0.001)
+        closer = threading.Thread(target=tracking_writer.close, kwargs={"timeout": 5})
+        closer.start()
+        gate.set()
+        submitter.join(5)
+        closer.join(5)
+        tracking_writer.flush()
+
+        assert applied == ["queued", "in progress"]
+
+
+class TestHandlerWriteBehind:
+    """Test SimpleProcessorHandler in write-behind tracking mode."""
+
+    def test_tracking_is_written_by_background_thread(self, file_db_manager, writer):
+        handler = SimpleProcessorHandler(TerminalProcessor(), enable_message_storage=True, tracking_writer=writer())
+
+        results = handler.process_messages([_message(), _message()])
+        handler.flush_tracking()
+
+        assert all(r.success for r in results)
+        session = file_db_manager.get_session()
+        try:
+            execution = session.query(PipelineExecution).one()
+            assert execution.step_count == 2
+            assert execution.status == "completed"
+            assert session.query(PipelineStep).filter_by(status="completed").count() == 2
+            messages = session.query(PipelineMessage).all()
+            assert len(messages) == 2
+            assert all(m.execution_id == execution.id for m in messages)
+        finally:
+            session.close()
+
+    def test_output_capture_resolves_execution_from_step(self, file_db_manager, writer):
+        handler = SimpleProcessorHandler(EchoProcessor(), enable_message_storage=True, tracking_writer=writer())
+
+        handler.process_message(_message())
+        handler.flush_tracking()
+
+        session = file_db_manager.get_session()
+        try:
+            execution = session.query(PipelineExecution).one()
+            output = session.query(PipelineMessage).filter_by(message_type="output").one()
+            assert output.execution_id == execution.id
+        finally:
+            session.close()